@@ -0,0 +1,114 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import tracemalloc
+
+import torvend.spiders
+from torvend.spiders.rarbg import (RarbgSpider,)
+
+from tests import (synthetic,)
+
+import scrapy.http
+
+RESPONSE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'spiders', 'responses'
+)
+# NOTE: (spider class, listing response, detail response) of every spider
+SPIDER_RESPONSES = [
+    (torvend.spiders.ThePirateBaySpider, 'thepiratebay.html', None,),
+    (torvend.spiders.IDopeSpider, 'idope.html', None,),
+    (
+        torvend.spiders.LimeTorrentsSpider,
+        'limetorrents.html', 'limetorrents_torrent.html',
+    ),
+    (
+        torvend.spiders.OneThreeThreeSevenXSpider,
+        '1337x.html', '1337x_torrent.html',
+    ),
+    (RarbgSpider, 'rarbg.html', 'rarbg_torrent.html',),
+    (
+        torvend.spiders.TorlockSpider,
+        'torlock.html', 'torlock_torrent.html',
+    ),
+    (torvend.spiders.SkyTorrentsSpider, 'skytorrents.html', None,),
+    (torvend.spiders.Torrentz2Spider, 'torrentz2.html', None,),
+]
+
+
+def build_spider(spider_class):
+    """ Builds a spider which does not resolve its domains.
+    """
+
+    spider = spider_class(query='test')
+    spider._active_domains = list(spider.allowed_domains)
+    return spider
+
+
+def build_response(spider, response_name, request=None):
+    """ Builds a response of a recorded page for a spider.
+    """
+
+    if request is None:
+        request = scrapy.http.Request(
+            spider.get_url(spider.query, spider.paging_index)
+        )
+    with open(os.path.join(RESPONSE_DIR, response_name), 'r') as fp:
+        return scrapy.http.TextResponse(
+            url=request.url, request=request,
+            body=fp.read(), encoding='utf-8'
+        )
+
+
+def build_synthetic_response(spider, rows, seed=0):
+    """ Builds a response of a synthetic listing page for a spider.
+    """
+
+    request = scrapy.http.Request(
+        spider.get_url(spider.query, spider.paging_index)
+    )
+    return scrapy.http.TextResponse(
+        url=request.url, request=request,
+        body=synthetic.build_listing(spider.name, rows, seed=seed),
+        encoding='utf-8'
+    )
+
+
+def record_throughput(benchmark, rows):
+    """ Records the rows and pages per second of a finished benchmark.
+    """
+
+    mean = benchmark.stats.stats.mean
+    benchmark.extra_info.update({
+        'rows': rows,
+        'rows_per_second': (rows / mean),
+        'seconds_per_row': (mean / rows),
+        'pages_per_second': (1.0 / mean),
+    })
+
+
+def record_allocations(benchmark, target):
+    """ Records the memory allocations of a single (warm) call of a target.
+    """
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        target()
+        (_, peak,) = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    statistics = after.compare_to(before, 'filename')
+    benchmark.extra_info.update({
+        'peak_bytes': peak,
+        'allocated_blocks': sum(
+            stat.count_diff for stat in statistics if stat.count_diff > 0
+        ),
+        'allocated_bytes': sum(
+            stat.size_diff for stat in statistics if stat.size_diff > 0
+        ),
+    })
@@ -0,0 +1,43 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+from ._common import (SPIDER_RESPONSES, build_spider, build_response,)
+
+import pytest
+
+# NOTE: the rows per page of synthetic listing pages benchmarked by default
+ROW_COUNTS = '10,100,1000'
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--rows', default=ROW_COUNTS,
+        help=(
+            'comma separated rows per page of benchmarked synthetic listing '
+            'pages (default: {ROW_COUNTS})'
+        ).format(**globals())
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'rows' in metafunc.fixturenames:
+        row_counts = [
+            int(count)
+            for count in metafunc.config.getoption('rows').split(',')
+        ]
+        metafunc.parametrize('rows', row_counts, ids=[
+            ('{0}rows').format(count) for count in row_counts
+        ])
+
+
+@pytest.fixture(
+    params=SPIDER_RESPONSES,
+    ids=[spider_class.name for (spider_class, _, _,) in SPIDER_RESPONSES]
+)
+def spider_response(request):
+    """ Yields a spider and the response of its recorded listing page.
+    """
+
+    (spider_class, response_name, detail_name,) = request.param
+    spider = build_spider(spider_class)
+    yield (spider, build_response(spider, response_name), detail_name,)
@@ -0,0 +1,210 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+""" Drives concurrent searches against a local mock site.
+
+Run from the repository root with ``python -m benchmarks.loadtest --help``.
+"""
+
+import time
+import math
+
+from torvend.client import (TorvendClient,)
+
+from tests.mocksite import (MockSite, SPIDER_PAGES,)
+
+import click
+
+
+def get_percentile(values, percentile):
+    """ Gets the nearest-rank percentile of some values.
+
+    :param values: The values to get the percentile of
+    :type values: list[float]
+    :param float percentile: The percentile (between 0 and 100)
+    :returns: The percentile of the values
+    :rtype: float
+    """
+
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil((percentile / 100.0) * len(ordered)))
+    return ordered[(rank - 1)]
+
+
+class LoadTest(object):
+    """ Runs searches of a client with a maximum number in flight.
+    """
+
+    def __init__(self, client, searches, concurrency, results):
+        """ Initializes the load test.
+
+        :param torvend.client.TorvendClient client: The client to search with
+        :param int searches: The total number of searches
+        :param int concurrency: The maximum number of concurrent searches
+        :param int results: The minimum number of results of each spider
+        """
+
+        (self.client, self.searches, self.concurrency, self.results,) = \
+            (client, searches, concurrency, results,)
+        (self.latencies, self.items, self.failures,) = ([], 0, 0,)
+        (self.started, self.finished,) = (None, None,)
+
+    def _item_callback(self, item, **kwargs):
+        self.items += 1
+
+    def _search(self, query):
+        """ Runs a single timed search.
+
+        :param str query: The query text to search with
+        :returns: A deferred which fires once the search has finished
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        started = time.perf_counter()
+
+        def _record(result):
+            self.latencies.append(time.perf_counter() - started)
+            return result
+
+        def _failed(failure):
+            self.failures += 1
+
+        return self.client.crawl(
+            query, self._item_callback, results=self.results
+        ).addCallback(_record).addErrback(_failed)
+
+    def run(self):
+        """ Runs all searches.
+
+        :returns: A deferred which fires once all searches have finished
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.defer
+
+        def _finish(result):
+            self.finished = time.perf_counter()
+            return result
+
+        semaphore = twisted.internet.defer.DeferredSemaphore(self.concurrency)
+        self.started = time.perf_counter()
+        # NOTE: identical searches are coalesced, so every query is unique
+        return twisted.internet.defer.DeferredList([
+            semaphore.run(self._search, ('loadtest {0}').format(idx))
+            for idx in range(self.searches)
+        ]).addBoth(_finish)
+
+    def report(self):
+        """ Reports the throughput and latency percentiles.
+
+        :returns: Lines describing the load test
+        :rtype: list[str]
+        """
+
+        elapsed = (self.finished - self.started)
+        lines = [
+            ('searches:    {0} ({1} failed) in {2:.2f}s').format(
+                self.searches, self.failures, elapsed
+            ),
+            ('throughput:  {0:.2f} searches/s, {1:.2f} items/s').format(
+                (len(self.latencies) / elapsed), (self.items / elapsed)
+            ),
+        ]
+        for percentile in (50, 90, 99,):
+            lines.append(('latency p{0}: {1:.3f}s').format(
+                percentile, get_percentile(self.latencies, percentile)
+            ))
+        return lines
+
+
+@click.command()
+@click.option(
+    '-n', '--searches', type=int, default=32, show_default=True,
+    help='The total number of searches.'
+)
+@click.option(
+    '-c', '--concurrency', type=int, default=8, show_default=True,
+    help='The maximum number of concurrent searches.'
+)
+@click.option(
+    '-r', '--results', type=int, default=30, show_default=True,
+    help='The minimum number of results of each spider.'
+)
+@click.option(
+    '-s', '--spider', 'spiders', type=click.Choice(sorted(SPIDER_PAGES)),
+    multiple=True, help='The spiders to search with (default: all).'
+)
+@click.option(
+    '--latency', type=float, default=0.05, show_default=True,
+    help='The seconds to delay every response by.'
+)
+@click.option(
+    '--jitter', type=float, default=0.02, show_default=True,
+    help='The maximum seconds to randomly vary the latency by.'
+)
+@click.option(
+    '--error-rate', type=float, default=0.0, show_default=True,
+    help='The probability of a request failing.'
+)
+@click.option(
+    '--bandwidth', type=int, default=None,
+    help='The maximum bytes per second of a single response.'
+)
+@click.option(
+    '--seed', type=int, default=None,
+    help='The seed of the mock site randomness.'
+)
+@click.option(
+    '--rows', type=int, default=None,
+    help='The rows of synthetic listing pages (default: recorded pages).'
+)
+def main(
+    searches, concurrency, results, spiders,
+    latency, jitter, error_rate, bandwidth, seed, rows
+):
+    """ Load tests the crawl pipeline against a local mock site.
+    """
+
+    # NOTE: local import to speed up module loading (installs reactor)
+    import twisted.internet.reactor
+
+    reactor = twisted.internet.reactor
+    spider_classes = [
+        spider_class
+        for spider_class in TorvendClient().get_spiders()
+        if spider_class.name in (spiders or SPIDER_PAGES)
+    ]
+    site = MockSite(
+        latency=latency, jitter=jitter, error_rate=error_rate,
+        bandwidth=bandwidth, seed=seed, rows=rows
+    )
+    client = TorvendClient(
+        settings={
+            'LOG_ENABLED': False, 'RETRY_ENABLED': False,
+            'REMOTE_CONTROL_ENABLED': False,
+        },
+        allowed=spider_classes, base_urls=site.listen(spider_classes)
+    )
+
+    load_test = LoadTest(client, searches, concurrency, results)
+    reactor.callWhenRunning(
+        lambda: load_test.run().addBoth(lambda _: reactor.stop())
+    )
+    reactor.run()
+    site.stop()
+
+    click.echo(('spiders:     {0}').format(', '.join(
+        spider_class.name for spider_class in spider_classes
+    )))
+    click.echo(('requests:    {0} ({1} errors)').format(
+        site.requests, site.errors
+    ))
+    for line in load_test.report():
+        click.echo(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import torvend.spiders
+
+from ._common import (SPIDER_RESPONSES, build_spider, record_allocations,)
+
+import pytest
+
+DATETIMES = [
+    ('03-04 2016', ['%m-%d %Y', '%m-%d %H:%M', '%H:%M', 'Y-day %H:%M'],),
+    ('2017-12-01 10:00:00', ['%Y-%m-%d %H:%M:%S'],),
+    ('12/24/2017', ['%m/%d/%Y'],),
+    ('3 years ago', [],),
+    ("Dec. 24th '17", [],),
+]
+SIZES = ['924.68 KiB', '1.2 GiB', '700 MB', '4.7GB', '1024']
+MAGNET = (
+    'magnet:?xt=urn:btih:890F82C13175177C06D29B1EDEA605DD349B9F83'
+    '&dn=Ubuntu-16.04.3-Desktop-amd64'
+    '&tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce'
+)
+
+
+class TestSpiderHelpers(object):
+    """ A collection of spider helper benchmarks.
+    """
+
+    @pytest.mark.parametrize(
+        ('text', 'formats',), DATETIMES,
+        ids=[text for (text, _,) in DATETIMES]
+    )
+    def test_parse_datetime(self, benchmark, text, formats):
+        """ Benchmarks guessing datetimes.
+        """
+
+        spider = build_spider(torvend.spiders.ThePirateBaySpider)
+        benchmark.group = 'parse_datetime'
+        benchmark(spider.parse_datetime, text, formats=formats)
+        record_allocations(
+            benchmark, lambda: spider.parse_datetime(text, formats=formats)
+        )
+
+    @pytest.mark.parametrize('text', SIZES)
+    def test_parse_size(self, benchmark, text):
+        """ Benchmarks parsing byte sizes.
+        """
+
+        spider = build_spider(torvend.spiders.ThePirateBaySpider)
+        benchmark.group = 'parse_size'
+        assert benchmark(spider.parse_size, text) > 0
+
+    def test_parse_infohash(self, benchmark):
+        """ Benchmarks parsing info hashes from magnet links.
+        """
+
+        spider = build_spider(torvend.spiders.ThePirateBaySpider)
+        benchmark.group = 'parse_infohash'
+        assert len(benchmark(spider.parse_infohash, MAGNET)) == 40
+
+    @pytest.mark.parametrize(
+        'spider_class',
+        [spider_class for (spider_class, _, _,) in SPIDER_RESPONSES],
+        ids=[spider_class.name for (spider_class, _, _,) in SPIDER_RESPONSES]
+    )
+    def test_get_url(self, benchmark, spider_class):
+        """ Benchmarks building query urls.
+        """
+
+        spider = build_spider(spider_class)
+        benchmark.group = 'get_url'
+        benchmark(spider.get_url, 'ubuntu desktop', spider.paging_index)
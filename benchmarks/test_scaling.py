@@ -0,0 +1,36 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+from ._common import (
+    SPIDER_RESPONSES, build_spider, build_synthetic_response,
+    record_throughput, record_allocations,
+)
+
+import pytest
+
+
+class TestSpiderScaling(object):
+    """ A collection of parse cost by rows per page benchmarks.
+    """
+
+    @pytest.mark.parametrize(
+        'spider_class',
+        [spider_class for (spider_class, _, _,) in SPIDER_RESPONSES],
+        ids=[spider_class.name for (spider_class, _, _,) in SPIDER_RESPONSES]
+    )
+    def test_parse(self, benchmark, spider_class, rows):
+        """ Benchmarks parsing a synthetic listing page of some rows.
+        """
+
+        spider = build_spider(spider_class)
+        response = build_synthetic_response(spider, rows)
+        benchmark.group = ('scaling-{spider_class.name}').format(**locals())
+
+        def _parse():
+            return list(spider.parse(response))
+
+        # NOTE: large pages take seconds to parse, so rounds are fixed
+        results = benchmark.pedantic(_parse, rounds=3, warmup_rounds=1)
+        assert len(results) == rows
+        record_throughput(benchmark, len(results))
+        record_allocations(benchmark, _parse)
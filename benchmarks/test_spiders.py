@@ -0,0 +1,49 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+from ._common import (
+    build_response, record_throughput, record_allocations,
+)
+
+import pytest
+
+
+class TestSpiderParsing(object):
+    """ A collection of spider parsing benchmarks.
+    """
+
+    def test_parse(self, benchmark, spider_response):
+        """ Benchmarks parsing a recorded listing page.
+        """
+
+        (spider, response, _,) = spider_response
+        benchmark.group = 'parse'
+
+        def _parse():
+            return list(spider.parse(response))
+
+        results = benchmark(_parse)
+        assert len(results) > 0
+        record_throughput(benchmark, len(results))
+        record_allocations(benchmark, _parse)
+
+    def test_parse_torrent(self, benchmark, spider_response):
+        """ Benchmarks parsing a recorded torrent detail page.
+        """
+
+        (spider, response, detail_name,) = spider_response
+        if detail_name is None:
+            pytest.skip('spider does not request torrent details')
+        benchmark.group = 'parse_torrent'
+
+        request = next(iter(spider.parse(response)))
+        detail_response = build_response(spider, detail_name, request=request)
+
+        def _parse_torrent():
+            # NOTE: each parse updates the same meta torrent item
+            return list(spider._parse_torrent(detail_response))
+
+        results = benchmark(_parse_torrent)
+        assert len(results) == 1
+        record_throughput(benchmark, len(results))
+        record_allocations(benchmark, _parse_torrent)
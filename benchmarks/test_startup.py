@@ -0,0 +1,83 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+# NOTE: the target seconds of a cold start (including the interpreter)
+STARTUP_TARGET = 0.150
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = [
+    ('list', ['--quiet', '--no-color', 'list'],),
+    ('help', ['--help'],),
+    ('search-help', ['search', '--help'],),
+]
+
+
+def run_cli(args):
+    """ Runs the command-line interface in a fresh interpreter.
+    """
+
+    subprocess.run(
+        [sys.executable, '-m', 'torvend'] + args,
+        cwd=ROOT_DIR, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def get_imported(statement):
+    """ Gets the modules imported by a statement in a fresh interpreter.
+    """
+
+    process = subprocess.run(
+        [sys.executable, '-c', (
+            'import sys; {statement}; print("\\n".join(sys.modules))'
+        ).format(**locals())],
+        cwd=ROOT_DIR, check=True, stdout=subprocess.PIPE
+    )
+    return set(process.stdout.decode('utf-8').splitlines())
+
+
+class TestStartup(object):
+    """ A collection of cold start benchmarks.
+    """
+
+    @pytest.mark.parametrize(
+        'args', [args for (_, args,) in COMMANDS],
+        ids=[name for (name, _,) in COMMANDS]
+    )
+    def test_cli(self, benchmark, args):
+        """ Benchmarks cold starts of cli commands against the target.
+        """
+
+        benchmark.group = 'startup'
+        benchmark.extra_info['target'] = STARTUP_TARGET
+        benchmark.pedantic(run_cli, args=(args,), rounds=5, warmup_rounds=1)
+        assert benchmark.stats.stats.min < STARTUP_TARGET
+
+    def test_baseline(self, benchmark):
+        """ Benchmarks the cold start of a bare interpreter for reference.
+        """
+
+        benchmark.group = 'startup'
+        benchmark.pedantic(
+            subprocess.run, args=([sys.executable, '-c', 'pass'],),
+            rounds=5, warmup_rounds=1
+        )
+
+    def test_lazy_imports(self):
+        """ Tests listing spiders does not import spider code.
+        """
+
+        imported = get_imported(
+            'from torvend.cli import (cli,); '
+            'from torvend.spiders import (registry,)'
+        )
+        for module_name in (
+            'scrapy', 'bs4', 'requests', 'furl', 'yaspin', 'pyperclip',
+            'pygogo', 'torvend.spiders._common',
+        ):
+            assert module_name not in imported
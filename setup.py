@@ -12,7 +12,6 @@ REQUIRES = [
     'scrapy',
     'beautifulsoup4',
     'lxml',
-    'requests',
     'humanfriendly',
     'dateparser',
     'furl',
@@ -37,7 +36,16 @@ EXTRAS_REQUIRE = {
         'sphinx-click',
         'coverage',
         'ptpython',
-    ]
+    ],
+    'fast': [
+        'orjson',
+    ],
+    'msgpack': [
+        'msgpack',
+    ],
+    'columnar': [
+        'pyarrow',
+    ],
 }
 
 if sys.platform in ('win32', 'win64',):
@@ -114,11 +122,10 @@ setuptools.setup(
         'command-line',
         'framework',
     ],
-    python_requires='>=3.5',
+    python_requires='>=3.8',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.8',
         'License :: OSI Approved :: MIT License',
         'Intended Audience :: Developers',
         'Intended Audience :: System Administrators',
@@ -4,4 +4,23 @@
 from .test_client import (TestTorvendClient,)
 from .test_cli import (TestCli,)
 from .test_items import (TestItems,)
+from .test_ratelimit import (TestTokenBuckets,)
+from .test_cache import (TestResultCache,)
+from .test_service import (TestSearchService,)
+from .test_exporters import (TestExporters,)
+from .test_columnar import (TestColumnarSink,)
+from .test_index import (TestLocalIndex,)
+from .test_cluster import (TestReleaseClusterer,)
+from .test_filters import (TestTorrentFilter,)
+from .test_scrape import (TestTrackerScraper,)
+from .test_mocksite import (TestMockSite,)
+from .test_synthetic import (TestSynthetic,)
+from .test_stats import (TestSearchStats,)
+from .test_metrics import (TestMetricsRegistry,)
+from .test_profiler import (TestSamplingProfiler,)
+from .test_logqueue import (TestLogQueue,)
+from .test_pool import (TestConnectionPool,)
+from .test_blocking import (TestBlockingCallDetector,)
+from .test_watchdog import (TestStallWatchdog,)
+from .test_backpressure import (TestBackpressure,)
 from .spiders import *
@@ -0,0 +1,289 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import re
+import random
+
+import torvend.spiders
+from torvend.spiders.rarbg import (RarbgSpider,)
+
+from . import (synthetic,)
+
+import twisted.web.server
+import twisted.web.resource
+
+RESPONSE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'spiders', 'responses'
+)
+# NOTE: (listing response, detail response) of every spider by name
+SPIDER_PAGES = {
+    torvend.spiders.ThePirateBaySpider.name: ('thepiratebay.html', None,),
+    torvend.spiders.IDopeSpider.name: ('idope.html', None,),
+    torvend.spiders.LimeTorrentsSpider.name: (
+        'limetorrents.html', 'limetorrents_torrent.html',
+    ),
+    torvend.spiders.OneThreeThreeSevenXSpider.name: (
+        '1337x.html', '1337x_torrent.html',
+    ),
+    RarbgSpider.name: ('rarbg.html', 'rarbg_torrent.html',),
+    torvend.spiders.TorlockSpider.name: (
+        'torlock.html', 'torlock_torrent.html',
+    ),
+    torvend.spiders.SkyTorrentsSpider.name: ('skytorrents.html', None,),
+    torvend.spiders.Torrentz2Spider.name: ('torrentz2.html', None,),
+}
+# NOTE: the interval in seconds between chunks of bandwidth capped pages
+CHUNK_INTERVAL = 0.05
+
+
+def get_query_pattern(spider_class):
+    """ Builds a pattern matching the query paths of a spider.
+
+    :param spider_class: The spider class to build the pattern for
+    :type spider_class: torvend.spiders._common.BaseSpider
+    :returns: A pattern matching (the start of) the spider's query paths
+    :rtype: re.Pattern
+    """
+
+    pattern = re.escape(spider_class.query_path.fget(None).lstrip('/'))
+    for (field, replacement,) in (
+        ('query', r'(?P<query>[^/?&]+)',),
+        ('page', r'\d+',),
+    ):
+        pattern = pattern.replace(
+            re.escape(('{{{field}}}').format(**locals())), replacement
+        )
+    return re.compile(pattern)
+
+
+def read_page(response_name):
+    """ Reads a recorded page.
+
+    :param str response_name: The file name of the recorded page
+    :returns: The content of the recorded page
+    :rtype: bytes
+    """
+
+    with open(os.path.join(RESPONSE_DIR, response_name), 'rb') as fp:
+        return fp.read()
+
+
+class MockSpiderResource(twisted.web.resource.Resource):
+    """ Replays the recorded (or synthetic) pages of a single spider.
+
+    Requests matching the spider's ``query_path`` are served the listing
+    page, any other request is served the detail page.
+    """
+
+    isLeaf = True
+
+    def __init__(self, site, spider_class):
+        """ Initializes the resource.
+
+        :param MockSite site: The mock site the resource belongs to
+        :param spider_class: The spider class to replay pages for
+        :type spider_class: torvend.spiders._common.BaseSpider
+        """
+
+        super(MockSpiderResource, self).__init__()
+        (self.site, self.pattern,) = (site, get_query_pattern(spider_class),)
+        (self.listing, self.detail,) = site.get_pages(spider_class)
+
+    def get_page(self, request):
+        """ Gets the page of a request.
+
+        :param twisted.web.server.Request request: The request
+        :returns: The page (None if there is no such page)
+        :rtype: bytes
+        """
+
+        if self.pattern.match(request.uri.decode('utf-8').lstrip('/')):
+            return self.listing
+        return self.detail
+
+    def render_GET(self, request):
+        """ Renders a page after the site's latency.
+
+        :param twisted.web.server.Request request: The request
+        :returns: Nothing yet, the page is written once delayed
+        :rtype: int
+        """
+
+        self.site.requests += 1
+        if self.site.random.random() < self.site.error_rate:
+            self.site.errors += 1
+            request.setResponseCode(503)
+            return b''
+
+        page = self.get_page(request)
+        if page is None:
+            request.setResponseCode(404)
+            return b''
+
+        request.setHeader(b'Content-Type', b'text/html; charset=utf-8')
+        request.setHeader(b'Content-Length', str(len(page)).encode('utf-8'))
+        disconnected = []
+        request.notifyFinish().addErrback(disconnected.append)
+        self.site.clock.callLater(
+            self.site.get_delay(), self._write, request, page, disconnected
+        )
+        return twisted.web.server.NOT_DONE_YET
+
+    def _write(self, request, page, disconnected):
+        """ Writes a page to a request (chunked if the bandwidth is capped).
+
+        :param twisted.web.server.Request request: The request
+        :param bytes page: The (remaining) page to write
+        :param list disconnected: The failures of disconnected requests
+        :rtype: None
+        """
+
+        if disconnected:
+            return
+        chunk_size = self.site.get_chunk_size(page)
+        request.write(page[:chunk_size])
+        if chunk_size < len(page):
+            self.site.clock.callLater(
+                CHUNK_INTERVAL, self._write,
+                request, page[chunk_size:], disconnected
+            )
+            return
+        self.site.served += 1
+        request.finish()
+
+
+class MockSite(object):
+    """ A local site which replays recorded (or synthetic) pages of spiders.
+
+    Every spider is served on its own port so the spider's paths do not need
+    to be disambiguated.
+    """
+
+    def __init__(
+        self, latency=0.0, jitter=0.0, error_rate=0.0, bandwidth=None,
+        seed=None, clock=None, rows=None
+    ):
+        """ Initializes the mock site.
+
+        :param float latency: The seconds to delay every response by
+        :param float jitter: The maximum seconds to randomly add to or
+            subtract from the latency
+        :param float error_rate: The probability of a request failing with
+            a ``503`` response
+        :param int bandwidth: The maximum bytes per second written to a
+            single response (unlimited if None)
+        :param int seed: The seed of the random number generator
+        :param clock: The clock to schedule responses with
+            (default: the reactor)
+        :type clock: twisted.internet.interfaces.IReactorTime
+        :param int rows: The number of rows of synthetic listing pages to
+            serve instead of the recorded pages (see :mod:`tests.synthetic`)
+        """
+
+        if clock is None:
+            # NOTE: local import to speed up module loading (installs reactor)
+            from twisted.internet import reactor as clock
+
+        (
+            self.latency, self.jitter, self.error_rate, self.bandwidth,
+            self.clock, self.rows,
+        ) = (latency, jitter, error_rate, bandwidth, clock, rows,)
+        (self.requests, self.errors, self.served,) = (0, 0, 0,)
+        self.random = random.Random(seed)
+        self.ports = {}
+
+    def get_delay(self):
+        """ Gets the delay of a response.
+
+        :returns: The seconds to delay the response by
+        :rtype: float
+        """
+
+        return max(0.0, (
+            self.latency + self.random.uniform(-self.jitter, self.jitter)
+        ))
+
+    def get_chunk_size(self, page):
+        """ Gets the size of the next chunk of a page.
+
+        :param bytes page: The (remaining) page to write
+        :returns: The number of bytes to write at once
+        :rtype: int
+        """
+
+        if not self.bandwidth:
+            return len(page)
+        return max(1, int(self.bandwidth * CHUNK_INTERVAL))
+
+    def get_pages(self, spider_class):
+        """ Gets the listing and detail page served for a spider.
+
+        :param spider_class: The spider class to get the pages of
+        :type spider_class: torvend.spiders._common.BaseSpider
+        :returns: The listing and detail page (None if there is no detail)
+        :rtype: tuple[bytes,bytes]
+        """
+
+        if self.rows is not None:
+            seed = self.random.randrange(2 ** 32)
+            detail = synthetic.build_detail(spider_class.name, seed=seed)
+            return (
+                synthetic.build_listing(
+                    spider_class.name, self.rows, seed=seed
+                ).encode('utf-8'),
+                (detail.encode('utf-8') if detail else None),
+            )
+
+        (listing_name, detail_name,) = SPIDER_PAGES[spider_class.name]
+        return (
+            read_page(listing_name),
+            (read_page(detail_name) if detail_name else None),
+        )
+
+    def get_resource(self, spider_class):
+        """ Gets the resource replaying the pages of a spider.
+
+        :param spider_class: The spider class to replay pages for
+        :type spider_class: torvend.spiders._common.BaseSpider
+        :returns: The resource of the spider
+        :rtype: MockSpiderResource
+        """
+
+        return MockSpiderResource(self, spider_class)
+
+    def listen(self, spider_classes, host='127.0.0.1'):
+        """ Starts serving the pages of spiders on the reactor.
+
+        :param spider_classes: The spider classes to serve pages for
+        :type spider_classes: list[torvend.spiders._common.BaseSpider]
+        :param str host: The interface to listen on
+        :returns: The base urls of the spiders (by spider name), suitable
+            for the client's ``base_urls``
+        :rtype: dict[str,str]
+        """
+
+        # NOTE: local import to speed up module loading (installs reactor)
+        import twisted.internet.reactor
+
+        base_urls = {}
+        for spider_class in spider_classes:
+            port = twisted.internet.reactor.listenTCP(
+                0, twisted.web.server.Site(self.get_resource(spider_class)),
+                interface=host
+            )
+            self.ports[spider_class.name] = port
+            base_urls[spider_class.name] = ('http://{host}:{port}').format(
+                host=host, port=port.getHost().port
+            )
+        return base_urls
+
+    def stop(self):
+        """ Stops serving the pages of all spiders.
+
+        :rtype: None
+        """
+
+        (ports, self.ports,) = (self.ports, {},)
+        for port in ports.values():
+            port.stopListening()
@@ -3,3 +3,4 @@
 
 from .test_thepiratebay import (TestThePirateBaySpider,)
 from .test_torrentz2 import (TestTorrentz2Spider,)
+from .test_registry import (TestSpiderRegistry,)
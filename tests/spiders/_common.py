@@ -3,8 +3,11 @@
 
 import os
 import abc
+import gzip
 import contextlib
 
+from torvend.spiders._stream import (STREAM_KEY, RowSelector, RowStream,)
+
 import scrapy.http
 
 
@@ -31,6 +34,10 @@ class BaseSpiderTest(abc.ABC):
     def mock_response(self):
         raise NotImplementedError()
 
+    @property
+    def mock_detail_response(self):
+        return None
+
     @contextlib.contextmanager
     def spider_manager(self):
         manager = None
@@ -40,21 +47,26 @@ class BaseSpiderTest(abc.ABC):
         finally:
             del manager
 
-    def get_response(self):
-        response_path = os.path.join(self.response_dir, self.mock_response)
+    def get_response(self, response_name=None, request=None):
+        if response_name is None:
+            response_name = self.mock_response
+        response_path = os.path.join(self.response_dir, response_name)
         if not os.path.isfile(response_path):
             raise FileNotFoundError((
                 "response '{response_path}' not found"
             ).format(**locals()))
         with self.spider_manager() as spider:
-            request_url = spider.get_url(
-                self.mock_query,
-                spider.paging_index
-            )
+            # NOTE: avoid resolving the spider's domains
+            spider._active_domains = list(spider.allowed_domains)
+            if request is None:
+                request = scrapy.http.Request(url=spider.get_url(
+                    self.mock_query,
+                    spider.paging_index
+                ))
             with open(response_path, 'r') as fp:
                 return scrapy.http.TextResponse(
-                    url=request_url,
-                    request=scrapy.http.Request(url=request_url),
+                    url=request.url,
+                    request=request,
                     body=fp.read(),
                     encoding='utf-8'
                 )
@@ -96,3 +108,168 @@ class BaseSpiderTest(abc.ABC):
             assert isinstance(test_spider.query_path, str)
             assert '{query}' in test_spider.query_path
             assert '{page}' in test_spider.query_path
+
+    def test_parse(self):
+        with self.spider_manager() as test_spider:
+            results = list(test_spider.parse(self.get_response()))
+            assert len(results) > 0
+            for result in results:
+                if isinstance(result, scrapy.http.Request):
+                    assert self.mock_detail_response is not None
+                    torrent = result.meta['torrent']
+                else:
+                    torrent = result
+                assert len(torrent['name']) > 0
+                assert torrent['seeders'] >= 0
+
+            if self.mock_detail_response is not None:
+                (torrent,) = test_spider._parse_torrent(self.get_response(
+                    self.mock_detail_response, request=results[0]
+                ))
+                assert torrent['magnet'].startswith('magnet:?')
+                assert len(torrent['hash']) == 40
+                assert len(torrent['categories']) > 0
+
+    def test_get_query_path(self):
+        # NOTE: local import to avoid loading filters for other testcases
+        from torvend.filters import (TorrentFilter,)
+        from torvend.items import (TorrentCategory,)
+
+        with self.spider_manager() as test_spider:
+            assert test_spider.get_query_path() == test_spider.query_path
+            for category in TorrentCategory:
+                test_spider.torrent_filter = TorrentFilter(
+                    categories=[category]
+                )
+                query_path = test_spider.get_query_path()
+                assert '{query}' in query_path
+                assert '{page}' in query_path
+
+    def stream_response(
+        self, test_spider, response, content_encoding=None, previous=None,
+        limit=None
+    ):
+        """ Streams the rows of a response in chunks to a spider.
+        """
+
+        (streamed, body,) = ([], response.body,)
+        if content_encoding is not None:
+            body = gzip.compress(body)
+        test_spider._row_selector = RowSelector(test_spider.stream_rows)
+        test_spider._start_itemproc = streamed.append
+        response.meta[STREAM_KEY] = previous
+        test_spider._headers_received(
+            scrapy.http.Headers({'Content-Encoding': content_encoding or []}),
+            response.request, test_spider
+        )
+        assert isinstance(response.meta[STREAM_KEY], RowStream)
+        for idx in range(0, len(body), 512):
+            test_spider._bytes_received(
+                body[idx:(idx + 512)], response.request, test_spider
+            )
+            if limit is not None and (idx + 512) >= limit:
+                # NOTE: the download was interrupted before completing
+                return streamed
+        return (streamed + list(test_spider.parse(response)))
+
+    def test_stream(self):
+        if self.spider_class.stream_rows is None:
+            return
+
+        with self.spider_manager() as test_spider:
+            expected = [
+                (torrent['hash'], torrent['name'],)
+                for torrent in test_spider.parse(self.get_response())
+            ]
+            for content_encoding in (None, 'gzip',):
+                response = self.get_response()
+                assert [
+                    (torrent['hash'], torrent['name'],)
+                    for torrent in self.stream_response(
+                        test_spider, response,
+                        content_encoding=content_encoding
+                    )
+                ] == expected
+                assert response.meta[STREAM_KEY].handled > 0
+
+            # retried downloads skip the rows handled by previous downloads
+            response = self.get_response()
+            streamed = self.stream_response(
+                test_spider, response, limit=(len(response.body) // 2)
+            )
+            previous = response.meta[STREAM_KEY]
+            assert previous.handled >= len(streamed) > 0
+            response = self.get_response()
+            assert [
+                (torrent['hash'], torrent['name'],)
+                for torrent in (streamed + self.stream_response(
+                    test_spider, response, previous=previous
+                ))
+            ] == expected
+
+            # failed rows (and the rows after them) are parsed from the
+            # complete response
+            (parse_row, calls,) = (test_spider.parse_row, [],)
+
+            def failing_parse_row(row, request):
+                calls.append(request)
+                if len(calls) == 3:
+                    raise ValueError()
+                return parse_row(row, request)
+
+            test_spider.parse_row = failing_parse_row
+            response = self.get_response()
+            assert [
+                (torrent['hash'], torrent['name'],)
+                for torrent in self.stream_response(test_spider, response)
+            ] == expected
+            assert response.meta[STREAM_KEY].failed
+            # rows are parsed with their request (streamed or not)
+            assert all(request is response.request for request in calls)
+
+    def test_stream_skip_handled(self):
+        if self.spider_class.stream_rows is None:
+            return
+
+        with self.spider_manager() as test_spider:
+            expected = [
+                (torrent['hash'], torrent['name'],)
+                for torrent in test_spider.parse(self.get_response())
+            ]
+            response = self.get_response()
+            streamed = self.stream_response(
+                test_spider, response, limit=(len(response.body) // 2)
+            )
+            stream = response.meta[STREAM_KEY]
+            assert 0 < len(streamed) < len(expected)
+
+            # complete responses of failed streams skip the handled rows
+            stream.failed = True
+            parsed = list(test_spider.parse(response))
+            assert len(parsed) == len(expected) - len(streamed)
+            assert [
+                (torrent['hash'], torrent['name'],)
+                for torrent in (streamed + parsed)
+            ] == expected
+
+    def test_stream_itemproc(self, monkeypatch):
+        if self.spider_class.stream_rows is None:
+            return
+
+        # NOTE: local import to avoid loading the crawler for other testcases
+        import scrapy.crawler
+        from scrapy.core.scraper import (Scraper,)
+        from torvend.spiders._common import (ITEMPROC_METHODS,)
+
+        def build_spider():
+            return self.spider_class.from_crawler(
+                scrapy.crawler.Crawler(self.spider_class),
+                query=self.mock_query
+            )
+
+        assert build_spider().streaming
+        # NOTE: rows are not streamed without scrapy's (private) item
+        # processing api
+        for name in ITEMPROC_METHODS:
+            monkeypatch.delattr(Scraper, name, raising=False)
+        assert not build_spider().streaming
@@ -18,3 +18,7 @@ class TestLimetorrentsSpider(BaseSpiderTest):
     @property
     def mock_response(self):
         return 'limetorrents.html'
+
+    @property
+    def mock_detail_response(self):
+        return 'limetorrents_torrent.html'
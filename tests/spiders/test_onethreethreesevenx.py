@@ -18,3 +18,22 @@ class TestOneThreeThreeSevenXSpider(BaseSpiderTest):
     @property
     def mock_response(self):
         return '1337x.html'
+
+    @property
+    def mock_detail_response(self):
+        return '1337x_torrent.html'
+
+    def test_category_path(self):
+        from torvend.filters import (TorrentFilter,)
+        from torvend.items import (TorrentCategory,)
+
+        with self.spider_manager() as test_spider:
+            test_spider.torrent_filter = TorrentFilter(
+                categories=[TorrentCategory.Game]
+            )
+            assert test_spider.get_query_path() == \
+                '/category-search/{query}/Games/{page}/'
+            test_spider.torrent_filter = TorrentFilter(
+                categories=[TorrentCategory.Game, TorrentCategory.Audio]
+            )
+            assert test_spider.get_query_path() == test_spider.query_path
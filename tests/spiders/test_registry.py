@@ -0,0 +1,150 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import sys
+import contextlib
+import subprocess
+from importlib.metadata import (EntryPoint,)
+
+import torvend.spiders
+from torvend.client import (TorvendClient,)
+from torvend.spiders import (registry,)
+from torvend.spiders._common import (BaseSpider,)
+
+ENTRY_POINTS = [
+    ('Plugin', 'torvend.spiders.idope:IDopeSpider',),
+    ('broken', 'torvend.spiders.missing:MissingSpider',),
+    ('thepiratebay', 'torvend.spiders.idope:IDopeSpider',),
+    ('classless', 'torvend.spiders.idope',),
+]
+
+
+@contextlib.contextmanager
+def entry_points_manager(monkeypatch, entry_points):
+    """ A context manager for discovering mocked spider entry points.
+    """
+
+    monkeypatch.setattr(registry, '_iter_entry_points', lambda: iter([
+        EntryPoint(name, value, registry.ENTRY_POINT_GROUP)
+        for (name, value,) in entry_points
+    ]))
+    monkeypatch.setattr(registry, '_entry_points', None)
+    try:
+        yield
+    finally:
+        registry._entry_points = None
+
+
+class TestSpiderRegistry(object):
+    """ A collection of static spider registry testcases.
+    """
+
+    def test_in_sync(self):
+        """ Tests registry entries describe their spider classes.
+        """
+
+        for spider_info in registry.SPIDERS:
+            spider_class = spider_info.load()
+            assert issubclass(spider_class, BaseSpider)
+            assert spider_class.__name__ == spider_info.class_name
+            assert spider_class.name == spider_info.name
+            assert tuple(spider_class.allowed_domains) == spider_info.domains
+            assert getattr(torvend.spiders, spider_info.class_name) is \
+                spider_class
+
+            overrides_query_path = (
+                spider_class.get_query_path is not BaseSpider.get_query_path
+            )
+            assert overrides_query_path == \
+                (registry.CATEGORIES in spider_info.capabilities)
+            assert hasattr(spider_class, '_parse_torrent') == \
+                (registry.DETAILS in spider_info.capabilities)
+            assert (spider_class.stream_rows is not None) == \
+                (registry.STREAMING in spider_info.capabilities)
+
+        assert [
+            spider_info.class_name for spider_info in registry.SPIDERS
+        ] == sorted(torvend.spiders.__all__)
+
+    def test_get_spider_info(self):
+        """ Tests registry entries are found by name.
+        """
+
+        assert registry.get_spider_info(' ThePirateBay ').class_name == \
+            'ThePirateBaySpider'
+        assert registry.get_spider_info('missing') is None
+
+    def test_entry_points(self, monkeypatch):
+        """ Tests spiders are discovered from entry points.
+        """
+
+        with entry_points_manager(monkeypatch, ENTRY_POINTS):
+            discovered = registry.get_entry_points()
+            assert [spider_info.name for spider_info in discovered] == \
+                ['plugin', 'broken']
+            assert discovered[0].target == 'torvend.spiders.idope:IDopeSpider'
+            assert (discovered[0].domains, discovered[0].capabilities,) == \
+                ((), frozenset(),)
+
+            assert registry.get_spiders() == registry.SPIDERS + discovered
+            assert registry.get_spiders(plugins=False) == registry.SPIDERS
+            assert registry.get_spider_info('PLUGIN') == discovered[0]
+            assert registry.get_spider_info('plugin', plugins=False) is None
+            assert discovered[0].load() is torvend.spiders.IDopeSpider
+
+    def test_client_spider_names(self, monkeypatch):
+        """ Tests clients resolve spider names through the registry.
+        """
+
+        with entry_points_manager(monkeypatch, ENTRY_POINTS):
+            client = TorvendClient(allowed=['plugin', 'thepiratebay'])
+            assert list(client.get_spiders()) == [
+                torvend.spiders.IDopeSpider,
+                torvend.spiders.ThePirateBaySpider,
+            ]
+
+            # NOTE: broken entry point spiders are skipped
+            client = TorvendClient(ignored=['thepiratebay'])
+            spider_names = [
+                spider_class.name for spider_class in client.get_spiders()
+            ]
+            assert 'thepiratebay' not in spider_names
+            assert spider_names.count('idope') == 2
+            assert len(spider_names) == len(registry.SPIDERS)
+
+            # NOTE: ignored spider classes only ignore their own name
+            client = TorvendClient(ignored=[torvend.spiders.IDopeSpider])
+            spider_names = [
+                spider_class.name for spider_class in client.get_spiders()
+            ]
+            assert spider_names.count('idope') == 1
+            assert len(spider_names) == len(registry.SPIDERS)
+
+    def test_lazy_import(self):
+        """ Tests the registry and spiders package do not import spider code.
+        """
+
+        process = subprocess.run([
+            sys.executable, '-c', (
+                'import sys, torvend.spiders; '
+                'from torvend.spiders import registry; '
+                'registry.get_spider_info("idope"); '
+                'print(any(name in sys.modules for name in '
+                '("scrapy", "bs4", "requests", "torvend.spiders.idope")))'
+            )
+        ], stdout=subprocess.PIPE, check=True)
+        assert process.stdout.strip() == b'False'
+
+        process = subprocess.run([
+            sys.executable, '-c', (
+                'import sys; '
+                'from torvend.client import TorvendClient; '
+                'client = TorvendClient(allowed=["idope"]); '
+                'list(client.get_spiders()); '
+                'print(sorted(name for name in sys.modules if '
+                'name.startswith("torvend.spiders.") and '
+                'not name.startswith("torvend.spiders._")))'
+            )
+        ], stdout=subprocess.PIPE, check=True)
+        assert process.stdout.strip() == \
+            b"['torvend.spiders.idope', 'torvend.spiders.registry']"
@@ -18,3 +18,14 @@ class TestThePirateBaySpider(BaseSpiderTest):
     @property
     def mock_response(self):
         return 'thepiratebay.html'
+
+    def test_category_path(self):
+        from torvend.filters import (TorrentFilter,)
+        from torvend.items import (TorrentCategory,)
+
+        with self.spider_manager() as test_spider:
+            test_spider.torrent_filter = TorrentFilter(
+                categories=[TorrentCategory.Audio, TorrentCategory.Video]
+            )
+            assert test_spider.get_query_path() == \
+                '/search/{query}/{page}/99/100,200'
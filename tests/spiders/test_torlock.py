@@ -18,3 +18,7 @@ class TestTorlockSpider(BaseSpiderTest):
     @property
     def mock_response(self):
         return 'torlock.html'
+
+    @property
+    def mock_detail_response(self):
+        return 'torlock_torrent.html'
@@ -0,0 +1,562 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+""" Generates synthetic listing and detail pages of every spider.
+
+The generated pages use the same markup as the recorded pages in
+``tests/spiders/responses`` but may contain any number of rows, which allows
+measuring parse cost as a function of rows per page.
+"""
+
+import html
+import math
+import random
+import hashlib
+import datetime
+
+# NOTE: the point in time generated torrents were uploaded before
+EPOCH = datetime.datetime(2017, 12, 1, 12, 0)
+MONTHS = [
+    'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec',
+]
+TRACKERS = (
+    '&amp;tr=udp%3A%2F%2Ftracker.opentrackr.org%3A1337%2Fannounce'
+    '&amp;tr=udp%3A%2F%2Ftracker.coppersurfer.tk%3A6969'
+)
+
+# NOTE: (name templates, median bytes, size deviation) of every kind
+KINDS = {
+    'movie': ([
+        '{title} {year} {resolution} {source} {codec}-{group}',
+        '{title} ({year}) {resolution} {source}',
+    ], (1.4 * 1024 ** 3), 0.8,),
+    'tv': ([
+        '{show} S{season:02d}E{episode:02d} {resolution} {source} '
+        '{codec}-{group}',
+        '{show} Season {season} Complete {resolution}',
+    ], (450 * 1024 ** 2), 1.0,),
+    'audio': ([
+        '{artist} - {album} ({year}) [{audio}]',
+        '{artist} - Discography {audio}',
+    ], (120 * 1024 ** 2), 0.9,),
+    'software': ([
+        '{app} {major}.{minor}.{patch} {platform}',
+    ], (180 * 1024 ** 2), 1.2,),
+    'book': ([
+        '{author} - {title} ({ebook})',
+    ], (4 * 1024 ** 2), 1.0,),
+    'game': ([
+        '{game} v{major}.{minor} {platform}-{group}',
+    ], (6 * 1024 ** 3), 0.9,),
+}
+# NOTE: the (weighted) kinds of generated torrents
+KIND_WEIGHTS = [
+    ('movie', 30,), ('tv', 25,), ('audio', 15,),
+    ('software', 12,), ('book', 8,), ('game', 10,),
+]
+WORDS = {
+    'title': [
+        'Big Buck Bunny', 'Sintel', 'Tears of Steel', 'Elephants Dream',
+        'Cosmos Laundromat', 'Night of the Living Dead', 'Nosferatu',
+        'Metropolis', 'The General', 'His Girl Friday', 'Charade',
+        'Alice in Wonderland', 'Pride and Prejudice', 'The Time Machine',
+    ],
+    'show': [
+        'The Cosmos Files', 'Open Movie Weekly', 'Public Domain Theater',
+        'Space Station Diaries', 'Nature Now', 'The Archive Hour',
+    ],
+    'artist': [
+        'Kevin MacLeod', 'Musopen Orchestra', 'Jason Shaw', 'Chris Zabriskie',
+        'Podington Bear', 'Blue Dot Sessions',
+    ],
+    'album': [
+        'Royalty Free Collection', 'Chopin Complete', 'Audionautix',
+        'Cylinders', 'Sound of Picture', 'Aeronaut',
+    ],
+    'app': [
+        'LibreOffice', 'GIMP', 'Blender', 'Inkscape', 'Krita', 'Audacity',
+        'Ubuntu Desktop', 'Debian netinst', 'Fedora Workstation',
+        'Arch Linux', 'Linux Mint Cinnamon',
+    ],
+    'author': [
+        'Lewis Carroll', 'Jane Austen', 'H. G. Wells', 'Mary Shelley',
+        'Jules Verne', 'Arthur Conan Doyle',
+    ],
+    'game': [
+        'OpenTTD', 'SuperTuxKart', 'Battle for Wesnoth', '0 A.D.',
+        'Xonotic', 'Minetest',
+    ],
+    'resolution': ['720p', '1080p', '1080p', '2160p', '480p'],
+    'source': ['BluRay', 'WEB-DL', 'WEBRip', 'HDTV', 'DVDRip'],
+    'codec': ['x264', 'x265', 'H264', 'HEVC', 'XviD'],
+    'group': ['SPARKS', 'GECKOS', 'RARBG', 'NTb', 'FGT', 'CODEX', 'YIFY'],
+    'audio': ['FLAC', 'MP3 320', 'MP3 V0', 'AAC'],
+    'ebook': ['EPUB', 'MOBI', 'PDF', 'AZW3'],
+    'platform': ['Win x64', 'Linux x64', 'Mac', 'amd64', 'x86_64', 'ISO'],
+    'user': ['hubble', 'gutenberg', 'blenderfdn', 'distro-bot', 'archive'],
+}
+
+
+def _choose_kind(rng):
+    """ Chooses the kind of a generated torrent.
+    """
+
+    return rng.choices(
+        [kind for (kind, _,) in KIND_WEIGHTS],
+        weights=[weight for (_, weight,) in KIND_WEIGHTS]
+    )[0]
+
+
+def _format_size(size):
+    """ Formats a byte size like the spider sites do.
+    """
+
+    for (unit, exponent,) in (('GiB', 3,), ('MiB', 2,), ('KiB', 1,),):
+        if size >= 1024 ** exponent:
+            return ('{0:.2f}'.format(size / (1024 ** exponent)), unit,)
+    return (str(size), 'B',)
+
+
+def _format_ago(delta):
+    """ Formats a timedelta like the spider sites do.
+    """
+
+    for (unit, seconds,) in (
+        ('year', 31536000,), ('month', 2592000,), ('week', 604800,),
+        ('day', 86400,), ('hour', 3600,),
+    ):
+        count = int(delta.total_seconds() // seconds)
+        if count > 0:
+            return ('{count} {unit}{plural}').format(
+                count=count, unit=unit, plural=('s' if count > 1 else '')
+            )
+    return '1 hour'
+
+
+def generate_rows(count, seed=0):
+    """ Generates the rows of torrents listed on a synthetic page.
+
+    Names are built from templates of their kind, sizes are log-normally
+    distributed around the median of their kind, upload dates decay
+    exponentially (most torrents are recent) and seeders follow a pareto
+    distribution.
+    Rows are ordered by seeders (as sites sort search results).
+
+    :param int count: The number of rows to generate
+    :param int seed: The seed of the generated rows
+    :returns: A list of dictionaries describing every row
+    :rtype: list[dict[str,....]]
+    """
+
+    rng = random.Random(seed)
+    rows = []
+    for idx in range(count):
+        kind = _choose_kind(rng)
+        (templates, median, deviation,) = KINDS[kind]
+        fields = {
+            key: rng.choice(values)
+            for (key, values,) in WORDS.items()
+        }
+        fields.update({
+            'year': rng.randint(1920, 2017), 'season': rng.randint(1, 12),
+            'episode': rng.randint(1, 24), 'major': rng.randint(0, 12),
+            'minor': rng.randint(0, 20), 'patch': rng.randint(0, 9),
+        })
+        title = rng.choice(templates).format(**fields)
+
+        size = int(rng.lognormvariate(math.log(median), deviation)) + 1
+        (size_value, size_unit,) = _format_size(size)
+        uploaded = EPOCH - datetime.timedelta(
+            seconds=int(rng.expovariate(1.0 / (86400 * 240))) + 3600
+        )
+        seeders = int(rng.paretovariate(1.1) * 4) - 4
+        rows.append(dict(
+            idx=idx, kind=kind, title=title, name=html.escape(title),
+            slug=html.escape(title.replace(' ', '-')),
+            hash=hashlib.sha1(
+                ('{seed}:{idx}').format(**locals()).encode('utf-8')
+            ).hexdigest().upper(),
+            size=size, size_value=size_value, size_unit=size_unit,
+            unit=size_unit.replace('i', ''),
+            seeders=seeders, leechers=int(rng.paretovariate(1.5) * 2) - 1,
+            id=(1000000 + rng.randrange(9000000)), user=fields['user'],
+            year=uploaded.year, month=uploaded.month, day=uploaded.day,
+            hour=uploaded.hour, minute=uploaded.minute,
+            month_name=MONTHS[(uploaded.month - 1)],
+            ago=_format_ago(EPOCH - uploaded),
+            epoch=int(uploaded.timestamp()),
+        ))
+    rows.sort(key=lambda row: row['seeders'], reverse=True)
+    return rows
+
+
+def _build_magnet(row):
+    """ Builds the (html escaped) magnet link of a row.
+    """
+
+    return ('magnet:?xt=urn:btih:{hash}&amp;dn={slug}{trackers}').format(
+        trackers=TRACKERS, **row
+    )
+
+
+def _build_page(title, body):
+    """ Wraps the body of a page in a html document.
+    """
+
+    return (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        '<title>{title}</title>\n</head>\n<body>\n{body}\n</body>\n</html>\n'
+    ).format(title=title, body=body)
+
+
+def _build_thepiratebay(rows):
+    categories = {
+        'movie': ('200', '201', 'Video', 'Movies',),
+        'tv': ('200', '205', 'Video', 'TV shows',),
+        'audio': ('100', '101', 'Audio', 'Music',),
+        'software': ('300', '303', 'Applications', 'UNIX',),
+        'book': ('600', '601', 'Other', 'E-books',),
+        'game': ('400', '401', 'Games', 'PC',),
+    }
+    body = [
+        '<div id="main-content">', '<table id="searchResult">',
+        '<thead id="tableHead"><tr class="header"><th>Type</th>'
+        '<th>Name</th><th><abbr title="Seeders">SE</abbr></th>'
+        '<th><abbr title="Leechers">LE</abbr></th></tr></thead>',
+    ]
+    for row in rows:
+        (main, sub, main_name, sub_name,) = categories[row['kind']]
+        uploaded = (
+            '{month:02d}-{day:02d}&nbsp;{year}'
+            if row['idx'] % 3 else
+            '{month:02d}-{day:02d}&nbsp;{hour:02d}:{minute:02d}'
+        ).format(**row)
+        body.append((
+            '<tr>\n<td class="vertTh"><center>'
+            '<a href="/browse/{main}" title="More from this category">'
+            '{main_name}</a><br>(<a href="/browse/{sub}" '
+            'title="More from this category">{sub_name}</a>)</center></td>\n'
+            '<td><div class="detName"><a href="/torrent/{id}/{slug}" '
+            'class="detLink" title="Details for {name}">{name}</a></div>\n'
+            '<a href="{magnet}" title="Download this torrent using magnet">'
+            '<img src="/static/img/icon-magnet.gif" alt="Magnet link"></a>\n'
+            '<font class="detDesc">Uploaded {uploaded}, '
+            'Size {size_value}&nbsp;{size_unit}, ULed by '
+            '<a class="detDesc" href="/user/{user}/" title="Browse {user}">'
+            '{user}</a></font></td>\n<td align="right">{seeders}</td>\n'
+            '<td align="right">{leechers}</td>\n</tr>'
+        ).format(
+            main=main, sub=sub, main_name=main_name, sub_name=sub_name,
+            uploaded=uploaded, magnet=_build_magnet(row), **row
+        ))
+    body.append('</table>\n</div>')
+    return _build_page(
+        'The Pirate Bay - The galaxy\'s most resilient bittorrent site',
+        '\n'.join(body)
+    )
+
+
+def _build_idope(rows):
+    categories = {
+        'movie': 'Others', 'tv': 'TV', 'audio': 'Music',
+        'software': 'Apps', 'book': 'Books', 'game': 'Games',
+    }
+    body = ['<div id="div2">', '<div id="div2child">']
+    for row in rows:
+        body.append((
+            '<div class="resultdiv">\n'
+            '<a href="/torrent/{slug}/{hash_lower}/">'
+            '<div class="resultdivtop"><div class="resultdivtopname">\n'
+            '{name}\n</div></div></a>\n<div class="resultdivbotton">'
+            '<div class="resultdivbottontime">{ago}</div>'
+            '<div class="resultdivbottonlength">{size_value} {unit}</div>'
+            '<div class="resultdivbottonseed">{seeders}</div>'
+            '<div class="resultdivbottoncategory">\n{category}\n</div>'
+            '<div class="hideinfohash">{hash}</div></div>\n</div>'
+        ).format(
+            hash_lower=row['hash'].lower(),
+            category=categories[row['kind']], **row
+        ))
+    body.append('</div>\n</div>')
+    return _build_page('iDope - torrent search', '\n'.join(body))
+
+
+def _build_limetorrents(rows):
+    categories = {
+        'movie': 'Movies', 'tv': 'TV shows', 'audio': 'Music',
+        'software': 'Applications', 'book': 'Other', 'game': 'Games',
+    }
+    body = [
+        '<table class="table2" cellpadding="6" cellspacing="0">',
+        '<tr><th class="thnormal">Torrent Name</th>'
+        '<th class="thnormal">Added</th><th class="thnormal">Size</th>'
+        '<th class="thnormal">Seed</th><th class="thnormal">Leech</th>'
+        '<th class="thnormal">Health</th></tr>',
+    ]
+    for row in rows:
+        body.append((
+            '<tr bgcolor="#F4F4F4">\n<td class="tdleft"><div class="tt-name">'
+            '<a href="http://itorrents.org/torrent/{hash}.torrent?'
+            'title={slug}" rel="nofollow" class="csprite_dl14"></a>'
+            '<a href="/{slug}-torrent-{id}.html">{name}</a></div></td>\n'
+            '<td class="tdnormal">{ago} ago - in {category}</td>\n'
+            '<td class="tdnormal">{size_value} {unit}</td>\n'
+            '<td class="tdseed">{seeders:,}</td>\n'
+            '<td class="tdleech">{leechers:,}</td>\n'
+            '<td class="tdright"><div class="hb10"></div></td>\n</tr>'
+        ).format(category=categories[row['kind']], **row))
+    body.append('</table>')
+    return _build_page(
+        'Limetorrents - Verified Torrent Downloads', '\n'.join(body)
+    )
+
+
+def _build_limetorrents_detail(row):
+    return _build_page(('{name} - LimeTorrents').format(**row), (
+        '<div class="torrentinfo">\n<table>\n'
+        '<tr><td align="right"><b>Torrent Hash :</b></td>'
+        '<td>{hash}</td></tr>\n'
+        '<tr><td align="right"><b>Category :</b></td>'
+        '<td><a href="/browse-torrents/Movies/">Movies</a></td></tr>\n'
+        '<tr><td align="right"><b>Added :</b></td><td>{ago} ago</td></tr>\n'
+        '</table>\n<div class="downloadarea"><div class="dltorrent">'
+        '<a class="csprite_dltorrent" href="{magnet}">Magnet Download</a>'
+        '</div></div>\n</div>'
+    ).format(magnet=_build_magnet(row), **row))
+
+
+def _build_1337x(rows):
+    body = [
+        '<div class="featured-list">', '<div class="table-list-wrap">',
+        '<div class="inner-table">',
+        '<table class="table-list table table-responsive table-striped">',
+        '<thead><tr><th class="coll-1 name">name</th>'
+        '<th class="coll-2">se</th><th class="coll-3">le</th>'
+        '<th class="coll-date">time</th><th class="coll-4">'
+        '<span class="size">size</span> <span class="info">info</span></th>'
+        '<th class="coll-5">uploader</th></tr></thead>',
+        '<tbody>',
+    ]
+    for row in rows:
+        body.append((
+            '<tr>\n<td class="coll-1 name"><a href="/sub/42/0/" class="icon">'
+            '<i class="flaticon-movie"></i></a>'
+            '<a href="/torrent/{id}/{slug}/">{name}</a></td>\n'
+            '<td class="coll-2 seeds">{seeders}</td>\n'
+            '<td class="coll-3 leeches">{leechers}</td>\n'
+            '<td class="coll-date">{month_name}. {day}th \'{short_year}</td>\n'
+            '<td class="coll-4 size mob-uploader">{size_value} {unit}'
+            '<span class="seeds">{seeders}</span></td>\n'
+            '<td class="coll-5 uploader"><a href="/user/{user}/">{user}</a>'
+            '</td>\n</tr>'
+        ).format(short_year=str(row['year'])[2:], **row))
+    body.append('</tbody>\n</table>\n</div>\n</div>\n</div>')
+    return _build_page(
+        '1337x | Free Movies, Series and Music Torrents Downloads',
+        '\n'.join(body)
+    )
+
+
+def _build_1337x_detail(row):
+    return _build_page(('Download {name} Torrent | 1337x').format(**row), (
+        '<div class="box-info torrent-detail-page">\n'
+        '<div class="box-info-detail">\n'
+        '<div class="torrent-category-detail clearfix">\n'
+        '<ul class="download-links-dontblock btn-wrap-list"><li>'
+        '<a class="torrentdown1" href="{magnet}">Magnet Download</a></li>'
+        '</ul>\n<ul class="list">\n'
+        '<li> <strong>Category</strong> <span>Movies</span> </li>\n'
+        '<li> <strong>Type</strong> <span>HD</span> </li>\n'
+        '<li> <strong>Total size</strong> '
+        '<span>{size_value} {size_unit}</span> </li>\n</ul>\n</div>\n'
+        '<div class="infohash-box"><p><strong>Infohash :</strong> '
+        '<span>{hash}</span></p></div>\n</div>\n</div>'
+    ).format(magnet=_build_magnet(row), **row))
+
+
+def _build_rarbg(rows):
+    body = [
+        '<table width="100%" class="lista2t">',
+        '<tr><td align="center" class="header6">Cat.</td>'
+        '<td align="center" class="header6">File</td>'
+        '<td align="center" class="header6">Added</td>'
+        '<td align="center" class="header6">Size</td>'
+        '<td align="center" class="header6">S.</td>'
+        '<td align="center" class="header6">L.</td>'
+        '<td align="center" class="header6">comments</td>'
+        '<td align="center" class="header6">Uploader</td></tr>',
+    ]
+    for row in rows:
+        body.append((
+            '<tr class="lista2">\n<td align="left" class="lista">'
+            '<a href="/torrents.php?category=14">'
+            '<img src="/static/images/categories/cat_new14.gif"></a></td>\n'
+            '<td align="left" class="lista"><a href="/torrent/{short}" '
+            'title="{name}">{name}</a></td>\n<td align="center" class="lista">'
+            '{year}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}:00</td>\n'
+            '<td align="center" class="lista">{size_value} {unit}</td>\n'
+            '<td align="center" class="lista"><font color="#008000">'
+            '{seeders}</font></td>\n'
+            '<td align="center" class="lista">{leechers}</td>\n'
+            '<td align="center" class="lista">--</td>\n'
+            '<td align="center" class="lista">{user}</td>\n</tr>'
+        ).format(short=row['hash'][:7].lower(), **row))
+    body.append('</table>')
+    return _build_page('RARBG Torrents', '\n'.join(body))
+
+
+def _build_rarbg_detail(row):
+    return _build_page(('{name} Torrent download').format(**row), (
+        '<div class="content-rounded">\n'
+        '<table class="lista-rounded" width="100%">\n<tr><td>\n'
+        '<table class="lista" width="100%">\n'
+        '<tr><td class="header2" align="right">Torrent:</td>'
+        '<td class="lista"><a href="/download.php?id={short}&amp;'
+        'f={slug}.torrent">{name}.torrent</a> <a href="{magnet}">'
+        '<img src="/static/20/img/magnet.gif"></a></td></tr>\n'
+        '<tr><td class="header2" align="right">Size:</td>'
+        '<td class="lista">{size_value} {size_unit}</td></tr>\n'
+        '</table>\n</td></tr>\n</table>\n</div>'
+    ).format(
+        short=row['hash'][:7].lower(), magnet=_build_magnet(row), **row
+    ))
+
+
+def _build_torlock(rows):
+    body = [
+        '<div class="panel panel-default">',
+        '<div class="panel-heading">Results</div>',
+        '<table class="table table-striped table-bordered table-hover '
+        'table-condensed">',
+        '<tr><th>Name</th><th>Added</th><th>Size</th><th>Seeds</th>'
+        '<th>Peers</th><th>Health</th></tr>',
+    ]
+    for row in rows:
+        body.append((
+            '<tr>\n<td><div><a href="/torrent/{id}/{slug}.html"><b>{name}</b>'
+            '</a> <span class="hidden-xs"></span></div></td>\n'
+            '<td class="td">{month}/{day}/{year}</td>\n'
+            '<td class="ts">{size_value} {unit}</td>\n'
+            '<td class="tul">{seeders}</td>\n<td class="tdl">{leechers}</td>\n'
+            '<td class="th"><span class="health"></span></td>\n</tr>'
+        ).format(**row))
+    body.append('</table>\n</div>')
+    return _build_page('Torlock - Verified Torrents', '\n'.join(body))
+
+
+def _build_torlock_detail(row):
+    return _build_page(('{name} Torrent - Torlock').format(**row), (
+        '<article>\n<table class="table table-condensed">\n<tr><td>'
+        '<a href="{magnet}" title="Magnet Link">'
+        '<img src="/static/img/magnet.png"></a></td></tr>\n</table>\n'
+        '</article>\n<div class="well"><h1>{name}</h1></div>\n'
+        '<div class="well">\n<div class="row">\n'
+        '<div class="col-md-2"><img src="/static/img/cover.png"></div>\n'
+        '<div class="col-md-10">\n'
+        '<dl class="dl-horizontal"><dt>NAME</dt><dd>{name}</dd></dl>\n'
+        '<dl class="dl-horizontal"><dt>CATEGORY</dt><dd>'
+        '<a href="/movies/torrents/1.html">Movies</a></dd></dl>\n'
+        '<dl class="dl-horizontal"><dt>INFOHASH</dt><dd>{hash}\n</dd></dl>\n'
+        '<dl class="dl-horizontal"><dt>SIZE</dt>'
+        '<dd>{size_value} {size_unit}</dd></dl>\n</div>\n</div>\n</div>'
+    ).format(magnet=_build_magnet(row), **row))
+
+
+def _build_skytorrents(rows):
+    body = [
+        '<section class="section">', '<div class="columns">',
+        '<div class="column is-2"></div>', '<div class="column">',
+        '<table class="table is-striped is-narrow">',
+        '<thead><tr><th>Name</th><th>Size</th><th>Files</th><th>Added</th>'
+        '<th>Seeders</th><th>Leechers</th></tr></thead>',
+    ]
+    for row in rows:
+        body.append((
+            '<tr>\n<td style="word-wrap: break-word;">'
+            '<a href="/info/{hash_lower}/{slug}/" title="{name}">{name}</a>'
+            '<br><a href="{magnet}" rel="nofollow">'
+            '<img src="/files/magnet.svg" alt="magnet link" height="16"></a> '
+            '<a href="/file/{hash_lower}/{slug}.torrent" rel="nofollow">'
+            '<img src="/files/download.svg" height="16"></a></td>\n'
+            '<td class="is-hidden-touch">{size_value} {unit}</td>\n'
+            '<td class="is-hidden-touch">{files}</td>\n'
+            '<td class="is-hidden-touch">{day:02d} {month_name} {year}</td>\n'
+            '<td>{seeders}</td>\n<td>{leechers}</td>\n</tr>'
+        ).format(
+            hash_lower=row['hash'].lower(), magnet=_build_magnet(row),
+            files=(1 + row['idx'] % 7), **row
+        ))
+    body.append('</table>\n</div>\n</div>\n</section>')
+    return _build_page(
+        'Sky torrents - Search torrents privately', '\n'.join(body)
+    )
+
+
+def _build_torrentz2(rows):
+    categories = {
+        'movie': 'video movie hd', 'tv': 'video tv',
+        'audio': 'audio music flac', 'software': 'application linux',
+        'book': 'ebook epub', 'game': 'game pc',
+    }
+    body = [
+        '<div class="results">',
+        ('<h2><b>{0}</b> torrents &nbsp; <span>200 ms</span></h2>').format(
+            len(rows)
+        ),
+    ]
+    for row in rows:
+        body.append((
+            '<dl><dt><a href="/{hash_lower}">{name}</a> &#187; {category}'
+            '</dt><dd><span class="v">&#10003;</span>'
+            '<span title="{epoch}">{ago}</span>'
+            '<span>{size_value} {unit}</span>'
+            '<span>{seeders:,}</span><span>{leechers:,}</span></dd></dl>'
+        ).format(
+            hash_lower=row['hash'].lower(),
+            category=categories[row['kind']], **row
+        ))
+    body.append('</div>')
+    return _build_page('Torrentz2 - Search Engine', '\n'.join(body))
+
+
+# NOTE: (listing builder, detail builder) of every spider by name
+BUILDERS = {
+    'thepiratebay': (_build_thepiratebay, None,),
+    'idope': (_build_idope, None,),
+    'limetorrents': (_build_limetorrents, _build_limetorrents_detail,),
+    '1337x': (_build_1337x, _build_1337x_detail,),
+    'rarbg': (_build_rarbg, _build_rarbg_detail,),
+    'torlock': (_build_torlock, _build_torlock_detail,),
+    'skytorrents': (_build_skytorrents, None,),
+    'torrentz2': (_build_torrentz2, None,),
+}
+
+
+def build_listing(spider_name, rows, seed=0):
+    """ Builds a synthetic listing page of a spider.
+
+    :param str spider_name: The name of the spider to build the page for
+    :param int rows: The number of rows listed on the page
+    :param int seed: The seed of the generated rows
+    :returns: The listing page
+    :rtype: str
+    """
+
+    (build, _,) = BUILDERS[spider_name]
+    return build(generate_rows(rows, seed=seed))
+
+
+def build_detail(spider_name, seed=0):
+    """ Builds a synthetic detail page of a spider.
+
+    :param str spider_name: The name of the spider to build the page for
+    :param int seed: The seed of the generated torrent
+    :returns: The detail page (None if the spider requests no details)
+    :rtype: str
+    """
+
+    (_, build,) = BUILDERS[spider_name]
+    if build is None:
+        return
+    return build(generate_rows(1, seed=seed)[0])
@@ -0,0 +1,211 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import sys
+import queue
+import subprocess
+
+from torvend.metrics import (MetricsRegistry,)
+from torvend.backpressure import (Backpressure, ItemQueue, ShardQueue,)
+
+import twisted.internet.task
+
+SLOW_SEARCH = """
+import asyncio
+
+async def search():
+    from torvend.client import (TorvendClient, start_asyncio_reactor,)
+    start_asyncio_reactor()
+    import torvend.spiders
+    from torvend import (backpressure,)
+    from torvend.metrics import (MetricsRegistry,)
+    from tests.mocksite import (MockSite,)
+
+    (put, queued,) = (backpressure.ItemQueue.put, [],)
+
+    def measured_put(self, item, **kwargs):
+        put(self, item, **kwargs)
+        queued.append(len(self))
+
+    backpressure.ItemQueue.put = measured_put
+    spider_class = torvend.spiders.ThePirateBaySpider
+    site = MockSite(rows=30, seed=0)
+    test_client = TorvendClient(
+        allowed=[spider_class], base_urls=site.listen([spider_class]),
+        settings={
+            'LOG_ENABLED': False, 'TORVEND_MAX_QUEUED_ITEMS': 10,
+            'TORVEND_MAX_REPLAYED_ITEMS': 10, 'CONCURRENT_REQUESTS': 1,
+        },
+        metrics=MetricsRegistry()
+    )
+    (discovered, replayed,) = ([], [],)
+    async for torrent in test_client.iter_search_async(
+        'ubuntu', results=300
+    ):
+        discovered.append(torrent)
+        replayed.extend(
+            len(in_flight.torrents or ())
+            for in_flight in test_client.in_flight.values()
+        )
+        await asyncio.sleep(0.005)
+    site.stop()
+    pauses = test_client.metrics.families[
+        'torvend_crawl_pauses_total'
+    ].values[()]
+    # NOTE: only the rows of the page being downloaded exceed the bound
+    print(
+        len(discovered), pauses > 1, max(queued) <= 40, max(replayed) <= 11
+    )
+
+asyncio.run(search())
+"""
+
+
+class MockSlot(object):
+    """ A mocked engine slot counting scheduled calls.
+    """
+
+    def __init__(self):
+        self.scheduled = 0
+        self.nextcall = self
+
+    def schedule(self):
+        self.scheduled += 1
+
+
+class MockEngine(object):
+    """ A mocked engine recording if it is paused.
+    """
+
+    def __init__(self):
+        (self.paused, self._slot,) = (False, MockSlot(),)
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+
+class MockCrawler(object):
+    """ A mocked crawler with an engine.
+    """
+
+    def __init__(self):
+        self.engine = MockEngine()
+
+
+class TestBackpressure(object):
+    """ A collection of backpressure testcases.
+    """
+
+    def test_pause(self):
+        """ Tests crawls are paused until all holders resumed them.
+        """
+
+        (crawler, stopped,) = (MockCrawler(), MockCrawler(),)
+        stopped.engine = None
+        backpressure = Backpressure(
+            [crawler, stopped], metrics=MetricsRegistry()
+        )
+        backpressure.pause('first')
+        backpressure.pause('second')
+        backpressure.pause('first')
+        assert backpressure.paused and crawler.engine.paused
+        assert backpressure.pauses == 1
+
+        resumed = []
+        backpressure.wait().addCallback(resumed.append)
+        backpressure.resume('first')
+        backpressure.resume('unknown')
+        assert crawler.engine.paused and len(resumed) == 0
+        backpressure.resume('second')
+        assert not (backpressure.paused or crawler.engine.paused)
+        assert crawler.engine._slot.scheduled == 1
+        assert resumed == [None] and crawler.backpressure is backpressure
+
+        backpressure.pause('first')
+        assert backpressure.metrics.families[
+            'torvend_crawl_pauses_total'
+        ].values[()] == 2
+
+    def test_item_queue(self):
+        """ Tests item queues pause crawls between their water marks.
+        """
+
+        backpressure = Backpressure([MockCrawler()])
+        item_queue = ItemQueue(maxsize=4)
+        for item in range(4):
+            item_queue.put(item)
+        # queues attached once full pause the crawl immediately
+        item_queue.attach(backpressure)
+        assert backpressure.paused
+        item_queue.put(4)
+        assert len(item_queue) == 5
+
+        assert [item_queue.pop() for _ in range(2)] == [0, 1]
+        assert backpressure.paused
+        assert item_queue.pop() == 2
+        assert not backpressure.paused
+
+        assert ItemQueue(maxsize=4, low_water=10).low_water == 3
+        item_queue.close()
+        item_queue.put(5)
+        assert len(item_queue) == 0
+
+    def test_item_queue_wait(self):
+        """ Tests waiting consumers are woken by items and finished crawls.
+        """
+
+        (item_queue, woken,) = (ItemQueue(), [],)
+        item_queue.wait().addCallback(woken.append)
+        assert len(woken) == 0
+        item_queue.put('item')
+        assert woken == [None]
+        item_queue.wait().addCallback(woken.append)
+        assert len(woken) == 2
+
+        assert item_queue.pop() == 'item'
+        item_queue.wait().addCallback(woken.append)
+        assert item_queue.finish('result') == 'result'
+        assert len(woken) == 3 and item_queue.finished
+        item_queue.wait().addCallback(woken.append)
+        assert len(woken) == 4
+
+    def test_shard_queue(self):
+        """ Tests sharded workers pause until the parent consumed their items.
+        """
+
+        (clock, result_queue, consumed,) = \
+            (twisted.internet.task.Clock(), queue.Queue(), [0, 0],)
+        backpressure = Backpressure([MockCrawler()])
+        shard_queue = ShardQueue(
+            1, result_queue, consumed, maxsize=4, interval=1.0, clock=clock
+        )
+        shard_queue.backpressure = backpressure
+        for item in range(4):
+            shard_queue.put(item)
+        assert list(result_queue.queue) == [(1, item,) for item in range(4)]
+        assert backpressure.paused and shard_queue.pending == 4
+
+        shard_queue.put(4)
+        consumed[1] = 2
+        clock.advance(1.0)
+        assert backpressure.paused
+        consumed[1] = 3
+        clock.advance(1.0)
+        assert not backpressure.paused
+        assert shard_queue._checking is None
+        assert clock.getDelayedCalls() == []
+
+    def test_search_backpressure(self):
+        """ Tests searches of slow consumers are paused (but complete).
+        """
+
+        process = subprocess.run(
+            [sys.executable, '-c', SLOW_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == b'300 True True True'
@@ -0,0 +1,63 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import socket
+import threading
+
+from torvend.blocking import (BlockingCallDetector,)
+
+
+class TestBlockingCallDetector(object):
+    """ A collection of blocking call detector testcases.
+    """
+
+    def test_is_blocking(self):
+        """ Tests blocking calls are told apart from other audit events.
+        """
+
+        detector = BlockingCallDetector()
+        assert detector.is_blocking('socket.gethostbyname', ('localhost',))
+        assert not detector.is_blocking('open', ('file', 'r', 0,))
+        with socket.socket() as sock:
+            assert detector.is_blocking('socket.connect', (sock, None,))
+            sock.setblocking(False)
+            assert not detector.is_blocking('socket.connect', (sock, None,))
+
+    def test_audit(self):
+        """ Tests blocking calls are only recorded on the reactor thread.
+        """
+
+        detector = BlockingCallDetector()
+        detector.audit('socket.gethostbyname', ('localhost',))
+        assert len(detector.seen) == 0
+
+        detector.reactor_thread = threading.get_ident()
+        for _ in range(3):
+            detector.audit('socket.gethostbyname', ('localhost',))
+        detector.audit('open', ('file', 'r', 0,))
+        assert list(detector.seen.values()) == [3]
+
+        thread = threading.Thread(
+            target=detector.audit, args=('socket.getaddrinfo', (),)
+        )
+        thread.start()
+        thread.join()
+        assert len(detector.seen) == 1
+
+    def test_start(self):
+        """ Tests blocking calls are detected once started.
+        """
+
+        detector = BlockingCallDetector()
+        try:
+            detector.start()
+            assert detector.running
+            socket.gethostbyname('127.0.0.1')
+        finally:
+            detector.stop()
+        socket.gethostbyname('127.0.0.1')
+        assert not detector.running
+        assert [
+            (event, caller[0],)
+            for ((event, caller,), count,) in detector.seen.items()
+        ] == [('socket.gethostbyname', __file__,)]
@@ -0,0 +1,80 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import time
+import contextlib
+
+from torvend.cache import (ResultCache,)
+
+
+@contextlib.contextmanager
+def cache_manager(*args, **kwargs):
+    """ A context manager for result cache initialization.
+    """
+
+    cache = ResultCache(*args, **kwargs)
+    try:
+        yield cache
+    finally:
+        del cache
+
+
+class TestResultCache(object):
+    """ A collection of result cache testcases.
+    """
+
+    def test_get_set(self):
+        """ Tests getting and setting cached results.
+        """
+
+        with cache_manager() as test_cache:
+            assert test_cache.get(('query',)) is None
+            test_cache.set(('query',), ['result'])
+            assert test_cache.get(('query',)) == ['result']
+            assert ('query',) in test_cache
+            assert len(test_cache) == 1
+
+            test_cache.clear()
+            assert len(test_cache) == 0
+
+    def test_expiry(self):
+        """ Tests cached results expire.
+        """
+
+        with cache_manager(ttl=0.01) as test_cache:
+            test_cache.set(('query',), ['result'])
+            time.sleep(0.02)
+            assert test_cache.get(('query',)) is None
+            assert len(test_cache) == 0
+
+    def test_eviction(self):
+        """ Tests least recently used results are evicted.
+        """
+
+        with cache_manager(maxsize=2) as test_cache:
+            test_cache.set(('first',), [])
+            test_cache.set(('second',), [])
+            assert test_cache.get(('first',)) == []
+            test_cache.set(('third',), [])
+            assert ('second',) not in test_cache
+            assert ('first',) in test_cache
+            assert ('third',) in test_cache
+
+    def test_stale(self):
+        """ Tests stale results can be renewed until they are removed.
+        """
+
+        with cache_manager(ttl=0.05, stale_ttl=0.1) as test_cache:
+            test_cache.set(('query',), ['result'])
+            assert not test_cache.is_stale(('query',))
+            time.sleep(0.06)
+            assert test_cache.get(('query',)) is None
+            assert test_cache.is_stale(('query',))
+            assert test_cache.get(('query',), stale=True) == ['result']
+
+            assert test_cache.renew(('query',))
+            assert test_cache.get(('query',)) == ['result']
+            time.sleep(0.1)
+            # NOTE: renewing never extends past the stale deadline
+            assert test_cache.get(('query',), stale=True) is None
+            assert not test_cache.renew(('query',))
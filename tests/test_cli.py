@@ -1,7 +1,9 @@
 # Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
 # MIT License <https://opensource.org/licenses/MIT>
 
+import os
 import re
+import tempfile
 import contextlib
 
 import torvend.cli
@@ -45,3 +47,184 @@ class TestCli(object):
                 (spider_name, spider_domains,) = spider_entry.split(' ', 1)
                 assert name_regex.match(spider_name) is not None
                 assert domains_regex.match(spider_domains) is not None
+
+    def test_batch_empty(self):
+        """ Test the batch command with no queries.
+        """
+
+        with cli_manager(
+            torvend.cli,
+            '--quiet', '--no-color', 'batch', os.devnull
+        ) as test_invoke:
+            assert test_invoke.exit_code == 0
+            assert test_invoke.output == ''
+
+    def test_batch_output(self):
+        """ Test the batch command writing to a columnar file.
+        """
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, 'results.csv')
+            with cli_manager(
+                torvend.cli,
+                '--quiet', '--no-color', 'batch', os.devnull,
+                '--output', output
+            ) as test_invoke:
+                assert test_invoke.exit_code == 0
+                assert test_invoke.output == ''
+            with open(output, 'r') as stream:
+                assert stream.readline().startswith('name,size,seeders')
+
+    def test_batch_metrics(self):
+        """ Test the batch command writing metrics at exit.
+        """
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            metrics = os.path.join(temp_dir, 'torvend.prom')
+            with cli_manager(
+                torvend.cli,
+                '--quiet', '--no-color', 'batch', os.devnull,
+                '--metrics', metrics
+            ) as test_invoke:
+                assert test_invoke.exit_code == 0
+            with open(metrics, 'r') as stream:
+                assert stream.readline().startswith('# HELP torvend_')
+
+    def test_batch_profile(self):
+        """ Test the batch command writing a sampling profile at exit.
+        """
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile = os.path.join(temp_dir, 'profile.json')
+            with cli_manager(
+                torvend.cli,
+                '--quiet', '--no-color', 'batch', os.devnull,
+                '--profile', profile
+            ) as test_invoke:
+                assert test_invoke.exit_code == 0
+            with open(profile, 'r') as stream:
+                assert '"exporter": "torvend"' in stream.read()
+
+    def test_batch_timings(self):
+        """ Test the batch command printing timings.
+        """
+
+        with cli_manager(
+            torvend.cli,
+            '--quiet', '--no-color', 'batch', os.devnull, '--timings'
+        ) as test_invoke:
+            assert test_invoke.exit_code == 0
+            assert test_invoke.output.split()[:2] == ['spider', 'stage']
+
+    def test_search_local(self, monkeypatch):
+        """ Test the search command answering from the local index.
+        """
+
+        # NOTE: local import to avoid loading the index for other testcases
+        from torvend import (const, items,)
+        from torvend.index import (LocalIndex,)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.setattr(const, '_data_dir', temp_dir, raising=False)
+            with LocalIndex() as local_index:
+                local_index(items.Torrent(
+                    spider='tests', name='Local Torrent', hash=('a' * 40),
+                    magnet='magnet:?xt=urn:btih:', size=1, seeders=1,
+                    leechers=1, categories=[items.TorrentCategory.Unknown],
+                ))
+
+            with cli_manager(
+                torvend.cli,
+                '--quiet', '--no-color', 'search', 'local',
+                '--local', '--export', 'ndjson'
+            ) as test_invoke:
+                assert test_invoke.exit_code == 0
+                assert '"Local Torrent"' in test_invoke.output
+
+    def test_search_local_filtered(self, monkeypatch):
+        """ Test the search command filtering local index results.
+        """
+
+        # NOTE: local import to avoid loading the index for other testcases
+        from torvend import (const, items,)
+        from torvend.index import (LocalIndex,)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.setattr(const, '_data_dir', temp_dir, raising=False)
+            with LocalIndex() as local_index:
+                for (name, info_hash, size, category,) in (
+                    ('Local Audio', 'a', 1024, items.TorrentCategory.Audio,),
+                    (
+                        'Local Video', 'b', (1024 ** 3),
+                        items.TorrentCategory.Video,
+                    ),
+                ):
+                    local_index(items.Torrent(
+                        spider='tests', name=name, hash=(info_hash * 40),
+                        magnet='magnet:?xt=urn:btih:', size=size, seeders=1,
+                        leechers=1, categories=[category],
+                    ))
+
+            with cli_manager(
+                torvend.cli,
+                '--quiet', '--no-color', 'search', 'local',
+                '--local', '--export', 'ndjson',
+                '--category', 'video', '--min-size', '1GiB'
+            ) as test_invoke:
+                assert test_invoke.exit_code == 0
+                assert '"Local Video"' in test_invoke.output
+                assert '"Local Audio"' not in test_invoke.output
+
+            with cli_manager(
+                torvend.cli,
+                '--quiet', '--no-color', 'search', 'local',
+                '--local', '--min-size', 'large'
+            ) as test_invoke:
+                assert test_invoke.exit_code != 0
+
+    def test_search_hybrid(self, monkeypatch, capsys):
+        """ Test hybrid searches show indexed results before crawling.
+        """
+
+        # NOTE: local import to avoid loading the index for other testcases
+        import importlib
+        from torvend import (const, items, stats,)
+        from torvend.index import (LocalIndex,)
+
+        # NOTE: the cli group shadows its module as attribute of torvend
+        cli_module = importlib.import_module('torvend.cli')
+
+        class IndexedClient(object):
+
+            def search(self, query, callback, **kwargs):
+                shown.append(capsys.readouterr().out)
+                callback(item=items.Torrent(
+                    spider='tests', name='Live Torrent', hash=('b' * 40),
+                    magnet='magnet:?xt=urn:btih:', size=1, seeders=2,
+                    leechers=1, categories=[items.TorrentCategory.Unknown],
+                ))
+                return stats.SearchStats()
+
+        shown = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.setattr(const, '_data_dir', temp_dir, raising=False)
+            with LocalIndex() as local_index:
+                local_index(items.Torrent(
+                    spider='tests', name='Local Torrent', hash=('a' * 40),
+                    magnet='magnet:?xt=urn:btih:', size=1, seeders=1,
+                    leechers=1, categories=[items.TorrentCategory.Unknown],
+                ))
+
+            ctx = click.Context(cli_module.cli_search, obj={'quiet': True})
+            ctx.params.update(hybrid=True, format='{name}', results=25)
+            searched = list(cli_module._search_torrents(
+                ctx, IndexedClient(), 'local'
+            ))
+            assert 'Local Torrent' in shown[0]
+            assert [torrent['name'] for torrent in searched] == \
+                ['Live Torrent', 'Local Torrent']
+
+            # exported results are only written once the crawl finished
+            ctx.params.update(export='json')
+            list(cli_module._search_torrents(ctx, IndexedClient(), 'local'))
+            assert 'Local Torrent' not in shown[1]
@@ -1,13 +1,282 @@
 # Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
 # MIT License <https://opensource.org/licenses/MIT>
 
+import os
+import sys
+import socket
+import asyncio
 import inspect
+import threading
+import subprocess
 import contextlib
+import http.server
 
 import torvend.spiders
-from torvend.client import (TorvendClient,)
+from torvend.client import (TorvendClient, start_asyncio_reactor,)
+from torvend.metrics import (MetricsRegistry,)
+from torvend.profiler import (SamplingProfiler,)
 
 import pytest
+import twisted.internet.defer
+
+ASYNCIO_SEARCH = """
+import asyncio
+
+async def search():
+    from torvend.client import (TorvendClient, start_asyncio_reactor,)
+    start_asyncio_reactor()
+    from tests.test_client import (mock_site, MockSpider,)
+
+    with mock_site() as mock_url:
+        test_client = TorvendClient(
+            settings={'MOCK_URL': mock_url}, allowed=[MockSpider]
+        )
+        discovered = await test_client.search_async('alpha')
+        iterated = [
+            torrent['name']
+            async for torrent in test_client.iter_search_async('beta')
+        ]
+        joined = await asyncio.gather(
+            test_client.search_async('gamma'),
+            test_client.search_async('gamma')
+        )
+    print(len(discovered), sorted(iterated), [len(entry) for entry in joined])
+
+asyncio.run(search())
+"""
+
+STREAMED_SEARCH = """
+import sys
+import asyncio
+
+async def search(stream):
+    from torvend.client import (TorvendClient, start_asyncio_reactor,)
+    start_asyncio_reactor()
+    import torvend.spiders
+    from tests.mocksite import (MockSite,)
+
+    spider_class = torvend.spiders.ThePirateBaySpider
+    site = MockSite(rows=200, seed=0, bandwidth=200000)
+    test_client = TorvendClient(
+        allowed=[spider_class], base_urls=site.listen([spider_class]),
+        settings={'TORVEND_STREAM_ROWS': stream}
+    )
+    (served, count,) = (None, 0,)
+    async for torrent in test_client.iter_search_async('ubuntu'):
+        # NOTE: the number of pages the site finished writing
+        if served is None:
+            served = site.served
+        count += 1
+    site.stop()
+    print(count, served == 0)
+
+asyncio.run(search(sys.argv[1] == 'stream'))
+"""
+
+ABANDONED_SEARCH = """
+import gc
+import asyncio
+
+async def search():
+    from torvend.client import (start_asyncio_reactor,)
+    start_asyncio_reactor()
+    from tests.test_client import (MockCrawlClient,)
+
+    (loop, errors,) = (asyncio.get_running_loop(), [],)
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+    test_client = MockCrawlClient(settings={'LOG_ENABLED': False})
+    iterator = test_client.iter_search_async('query')
+    first = asyncio.ensure_future(iterator.__anext__())
+    await asyncio.sleep(0)
+    test_client.runners[0].callback(item='item')
+    item = await first
+    await iterator.aclose()
+
+    # NOTE: the crawl fails after its consumer exited early
+    test_client.runners[0].delay.errback(ValueError('failed'))
+    del iterator, first
+    gc.collect()
+    await asyncio.sleep(0.1)
+    print(item, len(errors))
+
+asyncio.run(search())
+"""
+
+FETCHING_SEARCH = """
+import asyncio
+
+async def search():
+    from torvend import (blocking,)
+    from torvend.client import (TorvendClient, start_asyncio_reactor,)
+    start_asyncio_reactor()
+    from tests.test_client import (mock_site, FetchingSpider,)
+
+    with mock_site() as mock_url:
+        test_client = TorvendClient(
+            settings={'MOCK_URL': mock_url, 'LOG_ENABLED': False},
+            allowed=[FetchingSpider], verbose=True
+        )
+        discovered = await test_client.search_async('alpha')
+    print(
+        sorted(torrent['name'] for torrent in discovered),
+        'socket.gethostbyname' in set(
+            event for (event, _,) in blocking.detector.seen
+        )
+    )
+
+asyncio.run(search())
+"""
+
+MOCK_ROW = (
+    '<tr><td class="vertTh"><a href="/browse/200">Video</a></td>'
+    '<td><div class="detName"><a class="detLink" href="/torrent/{idx}">'
+    '{query} {idx}</a></div>'
+    '<a href="magnet:?xt=urn:btih:{hash}&dn={query}">magnet</a>'
+    '<font class="detDesc">Uploaded 03-04&nbsp;2016, Size 1.{idx}&nbsp;GiB'
+    '</font></td><td align="right">{idx}</td><td align="right">1</td></tr>'
+)
+
+MANY_SEARCH = """
+import collections
+
+from torvend.client import (TorvendClient,)
+from tests.test_client import (mock_site, MockSpider,)
+
+crawlers = []
+
+
+class RecordingClient(TorvendClient):
+
+    def _build_runner(self, queries, callback, **kwargs):
+        runner = super()._build_runner(queries, callback, **kwargs)
+        # NOTE: finished crawlers are removed from their runner
+        crawlers.extend(runner.crawlers)
+        return runner
+
+
+with mock_site() as mock_url:
+    test_client = RecordingClient(
+        settings={'MOCK_URL': mock_url}, allowed=[MockSpider]
+    )
+    discovered = []
+    test_client.search_many(
+        ['alpha', 'beta', ' alpha ', ''],
+        lambda item, **kwargs: discovered.append(item),
+        per_domain=2, delay=0.01
+    )
+(crawler,) = crawlers
+print(
+    sorted(collections.Counter(
+        torrent['query'] for torrent in discovered
+    ).items()),
+    crawler.settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN'),
+    crawler.settings.getfloat('DOWNLOAD_DELAY')
+)
+"""
+
+
+class MockRequestHandler(http.server.BaseHTTPRequestHandler):
+    """ A request handler which serves thepiratebay like search pages.
+    """
+
+    def do_GET(self):
+        query = self.path.split('/')[2]
+        content = (
+            '<html><body><table id="searchResult"><tr><th></th></tr>'
+            '{rows}</table></body></html>'
+        ).format(rows=''.join(
+            MOCK_ROW.format(
+                query=query, idx=idx,
+                hash=('{0:040x}').format(hash((query, idx,)) & (2 ** 160 - 1))
+            )
+            for idx in range(3)
+        ))
+        content = content.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockSpider(torvend.spiders.ThePirateBaySpider):
+    """ A spider which searches a local mock site.
+    """
+
+    name = 'mock'
+    allowed_domains = ['127.0.0.1']
+
+    def get_url(self, query, page, **kwargs):
+        return ('{0}/search/{1}/{2}').format(
+            self.settings.get('MOCK_URL'), query, page
+        )
+
+
+class FetchingSpider(MockSpider):
+    """ A spider which fetches the page of another query while parsing.
+    """
+
+    name = 'fetching'
+
+    async def parse(self, response):
+        # NOTE: blocks the reactor thread (detected when verbose)
+        socket.gethostbyname('127.0.0.1')
+        fetched = await self.fetch_async(self.get_url('fetched', 0))
+        for torrent in self.parse_rows(fetched):
+            yield torrent
+
+
+class MockRunner(object):
+    """ A crawl runner which records crawls instead of crawling.
+    """
+
+    def __init__(self, queries, callback):
+        (self.queries, self.callback, self.crawlers,) = (queries, callback, [],)
+        self.delay = twisted.internet.defer.Deferred()
+
+    def join(self):
+        return self.delay
+
+
+class MockCrawlClient(TorvendClient):
+    """ A client which records crawl runners instead of crawling.
+    """
+
+    @property
+    def runners(self):
+        if not hasattr(self, '_runners'):
+            self._runners = []
+        return self._runners
+
+    def _build_runner(self, queries, callback, **kwargs):
+        runner = MockRunner(queries, callback)
+        self.runners.append(runner)
+        return runner
+
+
+@contextlib.contextmanager
+def mock_site(handler_class=MockRequestHandler):
+    """ A context manager for a local mock site.
+    """
+
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0,), handler_class
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield ('http://127.0.0.1:{0}').format(server.server_address[1])
+    finally:
+        server.shutdown()
+
+
+async def start_asyncio_reactor_async():
+    """ Starts the asyncio reactor on a running event loop.
+    """
+
+    return start_asyncio_reactor()
 
 
 @contextlib.contextmanager
@@ -44,6 +313,9 @@ class TestTorvendClient(object):
             assert isinstance(test_client.verbose, bool)
             assert test_client.verbose is False
 
+            assert isinstance(test_client.base_urls, dict)
+            assert test_client.base_urls == {}
+
     def test_settings_initialization(self):
         """ Tests settings initialization of client.
         """
@@ -165,3 +437,313 @@ class TestTorvendClient(object):
             for client_spider in test_client.get_spiders():
                 is_spider(client_spider)
                 assert client_spider not in client_ignored
+
+    def test_search_many(self):
+        """ Test queries share a crawler per spider and tag their items.
+        """
+
+        process = subprocess.run(
+            [sys.executable, '-c', MANY_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == \
+            b"[('alpha', 3), ('beta', 3)] 2 0.01"
+
+    def test_search_sharded(self):
+        """ Test sharded searches merge worker items in query order.
+        """
+
+        queries = ['alpha', 'beta', 'gamma', 'delta']
+        with mock_site() as mock_url:
+            # NOTE: workers are paused until their items are merged
+            with client_manager(
+                settings={'MOCK_URL': mock_url, 'TORVEND_MAX_QUEUED_ITEMS': 2},
+                allowed=[MockSpider]
+            ) as test_client:
+                discovered = []
+                test_client.search_many(
+                    queries + ['alpha', ''],
+                    lambda item, **kwargs: discovered.append(item),
+                    workers=2, rate=100
+                )
+
+        assert len(discovered) == (len(queries) * 3)
+        assert all(torrent['spider'] == 'mock' for torrent in discovered)
+        # NOTE: shards are contiguous, so shard order is query order
+        shard_order = [
+            (0 if torrent['query'] in queries[:2] else 1)
+            for torrent in discovered
+        ]
+        assert shard_order == sorted(shard_order)
+
+    def test_base_urls(self):
+        """ Test spiders query the base urls instead of their domains.
+        """
+
+        spider_class = torvend.spiders.ThePirateBaySpider
+        with mock_site() as mock_url:
+            spider = spider_class(query='test', base_url=mock_url)
+            assert spider.allowed_domains == ['127.0.0.1']
+            assert spider.active_domains == ['127.0.0.1']
+            assert spider.get_url('test', 0) == (
+                '{mock_url}/search/test/0'
+            ).format(**locals())
+
+            with client_manager(
+                allowed=[spider_class],
+                base_urls={spider_class.name: mock_url}
+            ) as test_client:
+                discovered = []
+                test_client.search_many(
+                    ['alpha', 'beta'],
+                    lambda item, **kwargs: discovered.append(item),
+                    workers=2
+                )
+
+        assert len(discovered) == 6
+        assert all(
+            torrent['source'].startswith(mock_url)
+            for torrent in discovered
+        )
+        assert spider_class.allowed_domains != ['127.0.0.1']
+
+        with pytest.raises(AssertionError):
+            with client_manager(base_urls=[]):
+                pass
+
+    def test_search_many_stats(self):
+        """ Test sharded searches merge the timings of their workers.
+        """
+
+        with mock_site() as mock_url:
+            with client_manager(
+                settings={'MOCK_URL': mock_url}, allowed=[MockSpider]
+            ) as test_client:
+                search_stats = test_client.search_many(
+                    ['alpha', 'beta'], lambda item, **kwargs: None,
+                    workers=2
+                )
+
+        assert search_stats.items == {MockSpider.name: 6}
+        assert search_stats.get_histogram(MockSpider.name, 'parse').count
+
+    def test_search_many_metrics(self):
+        """ Test sharded searches merge the metrics of their workers.
+        """
+
+        with mock_site() as mock_url:
+            with client_manager(
+                settings={'MOCK_URL': mock_url}, allowed=[MockSpider],
+                metrics=MetricsRegistry()
+            ) as test_client:
+                test_client.search_many(
+                    ['alpha', 'beta'], lambda item, **kwargs: None,
+                    workers=2
+                )
+
+        for (name, labels, value,) in (
+            ('torvend_requests_total', {'status': 200}, 2,),
+            ('torvend_items_scraped_total', {}, 6,),
+            ('torvend_spiders_closed_total', {'reason': 'finished'}, 2,),
+        ):
+            assert test_client.metrics.get_value(
+                name, spider=MockSpider.name, **labels
+            ) == value
+        assert test_client.metrics.get_value(
+            'torvend_response_bytes_total', spider=MockSpider.name
+        ) > 0
+
+    def test_search_many_profiler(self):
+        """ Test sharded searches merge the samples of their workers.
+        """
+
+        sampling_profiler = SamplingProfiler(interval=0.001)
+        with mock_site() as mock_url:
+            with client_manager(
+                settings={'MOCK_URL': mock_url}, allowed=[MockSpider]
+            ) as test_client:
+                test_client.search_many(
+                    ['alpha', 'beta'], lambda item, **kwargs: None,
+                    workers=2, sampling_profiler=sampling_profiler
+                )
+
+        assert len({
+            stack[0][0] for stack in sampling_profiler.samples
+            if stack[0][0].startswith('SpawnProcess')
+        }) == 2
+
+    def test_get_search_key(self):
+        """ Test search keys are normalized.
+        """
+
+        with client_manager() as test_client:
+            assert test_client.get_search_key(' My  Query', results=10) == \
+                test_client.get_search_key('my query', results=10)
+            assert test_client.get_search_key('my query', results=10) != \
+                test_client.get_search_key('my query', results=20)
+
+        client_allowed = [torvend.spiders.ThePirateBaySpider]
+        with client_manager(allowed=client_allowed) as test_client:
+            assert test_client.get_search_key('query')[1] == (
+                torvend.spiders.ThePirateBaySpider.name,
+            )
+
+    def test_crawl_single_flight(self):
+        """ Test concurrent identical crawls share a single crawl.
+        """
+
+        (first, second,) = ([], [],)
+        test_client = MockCrawlClient()
+        first_delay = test_client.crawl(
+            'query', lambda item, **kwargs: first.append(item)
+        )
+        assert len(test_client.in_flight) == 1
+        test_client.runners[0].callback(item='first')
+
+        # late joiners receive a replay of discovered items
+        second_delay = test_client.crawl(
+            'Query ', lambda item, **kwargs: second.append(item)
+        )
+        assert len(test_client.runners) == 1
+        test_client.runners[0].callback(item='second')
+
+        finished = []
+        for delay in (first_delay, second_delay,):
+            delay.addCallback(finished.append)
+        test_client.runners[0].delay.callback(None)
+
+        assert first == second == ['first', 'second']
+        assert finished == [None, None]
+        assert len(test_client.in_flight) == 0
+
+        # finished crawls are not joined
+        test_client.crawl('query', lambda item, **kwargs: None)
+        assert len(test_client.runners) == 2
+
+    def test_crawl_replay_bounded(self):
+        """ Test crawls discovering more items than replayed are not joined.
+        """
+
+        test_client = MockCrawlClient(
+            settings={'TORVEND_MAX_REPLAYED_ITEMS': 2},
+            metrics=MetricsRegistry()
+        )
+        first = test_client.crawl('query', lambda item, **kwargs: None)
+        (in_flight,) = test_client.in_flight.values()
+        for item in range(2):
+            test_client.runners[0].callback(item=item)
+        assert in_flight.joinable and in_flight.torrents == [0, 1]
+        test_client.runners[0].callback(item=2)
+        assert not in_flight.joinable and in_flight.count == 3
+
+        second = test_client.crawl('query', lambda item, **kwargs: None)
+        assert len(test_client.runners) == 2
+        # replaced crawls are still counted as running
+        assert len(test_client.in_flight) == 1
+        assert len(test_client.running) == 2
+        finished = []
+        for delay in (first, second,):
+            delay.addCallback(finished.append)
+
+        # finishing the replaced crawl keeps the new crawl in-flight
+        test_client.runners[0].delay.callback(None)
+        assert finished == [None] and len(test_client.in_flight) == 1
+        assert test_client.running == set(test_client.in_flight.values())
+        test_client.runners[1].delay.callback(None)
+        assert finished == [None, None] and len(test_client.in_flight) == 0
+        assert len(test_client.running) == 0
+        assert test_client.metrics.families[
+            'torvend_crawls_in_flight'
+        ].values[()] == 0
+
+    def test_crawl_failed(self):
+        """ Test crawls failing to start are not joined.
+        """
+
+        class FailingCrawlClient(MockCrawlClient):
+
+            def _build_runner(self, queries, callback, **kwargs):
+                if len(self.runners) <= 0:
+                    self.runners.append(None)
+                    raise ValueError('failed')
+                return super()._build_runner(queries, callback, **kwargs)
+
+        test_client = FailingCrawlClient(metrics=MetricsRegistry())
+        with pytest.raises(ValueError):
+            test_client.crawl('query', lambda item, **kwargs: None)
+        assert len(test_client.in_flight) == 0
+        assert len(test_client.running) == 0
+        assert test_client.metrics.families[
+            'torvend_crawls_in_flight'
+        ].values[()] == 0
+
+        # later identical crawls start a new crawl
+        finished = []
+        test_client.crawl(
+            'query', lambda item, **kwargs: None
+        ).addCallback(finished.append)
+        assert len(test_client.runners) == 2
+        test_client.runners[-1].delay.callback(None)
+        assert finished == [None] and len(test_client.in_flight) == 0
+
+    def test_search_async(self):
+        """ Test searches run on a running asyncio event loop.
+        """
+
+        # NOTE: the asyncio reactor must be installed before any other
+        process = subprocess.run(
+            [sys.executable, '-c', ASYNCIO_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == \
+            b"3 ['beta 0', 'beta 1', 'beta 2'] [3, 3]"
+
+        # the default reactor is installed by this process's tests
+        assert 'twisted.internet.reactor' in sys.modules
+        with pytest.raises(RuntimeError):
+            asyncio.run(start_asyncio_reactor_async())
+        with pytest.raises(RuntimeError):
+            start_asyncio_reactor()
+
+    def test_search_abandoned(self):
+        """ Test crawls failing after their consumer exited are not reported.
+        """
+
+        process = subprocess.run(
+            [sys.executable, '-c', ABANDONED_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == b'item 0'
+
+    def test_search_streamed(self):
+        """ Test listing rows are sent to pipelines as they are received.
+        """
+
+        for (argument, expected,) in (
+            ('stream', b'200 True',), ('complete', b'200 False',),
+        ):
+            process = subprocess.run(
+                [sys.executable, '-c', STREAMED_SEARCH, argument],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(
+                    __file__
+                ))),
+                stdout=subprocess.PIPE, check=True, timeout=60
+            )
+            assert process.stdout.strip() == expected
+
+    def test_search_fetching(self):
+        """ Test spiders fetch pages through the crawler's downloader.
+        """
+
+        process = subprocess.run(
+            [sys.executable, '-c', FETCHING_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == (
+            b"['alpha 0', 'alpha 1', 'alpha 2', "
+            b"'fetched 0', 'fetched 1', 'fetched 2'] True"
+        )
@@ -0,0 +1,106 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import contextlib
+
+from torvend.cluster import (ReleaseClusterer, tokenize, cluster_torrents,)
+
+
+@contextlib.contextmanager
+def clusterer_manager(*args, **kwargs):
+    """ A context manager for release clusterer initialization.
+    """
+
+    clusterer = ReleaseClusterer(*args, **kwargs)
+    try:
+        yield clusterer
+    finally:
+        del clusterer
+
+
+def build_torrent(name, size=1000, seeders=1, hash=None):
+    """ Builds a torrent dictionary for testing.
+    """
+
+    return {
+        'name': name,
+        'size': size,
+        'seeders': seeders,
+        'hash': (hash or ('{name}{size}').format(**locals())),
+    }
+
+
+class TestReleaseClusterer(object):
+    """ A collection of release clusterer testcases.
+    """
+
+    def test_tokenize(self):
+        """ Tests tokenizing torrent names.
+        """
+
+        assert tokenize('[Site] Some.Release_2017 (x264)') == \
+            {'site', 'some', 'release', '2017', 'x264'}
+        assert tokenize(None) == set()
+
+    def test_signature(self):
+        """ Tests computing minhash signatures.
+        """
+
+        with clusterer_manager(bands=4, rows=2) as test_clusterer:
+            signature = test_clusterer.get_signature({'a', 'b'})
+            assert len(signature) == 8
+            assert signature == test_clusterer.get_signature({'b', 'a'})
+            assert signature != test_clusterer.get_signature({'a', 'c'})
+            assert len(test_clusterer.get_signature(set())) == 8
+
+    def test_add(self):
+        """ Tests incrementally clustering torrents.
+        """
+
+        with clusterer_manager() as test_clusterer:
+            (cluster, created,) = test_clusterer.add(
+                build_torrent('Some.Linux.Distro.18.04.Desktop.amd64.iso')
+            )
+            assert created
+            for name in (
+                'some linux distro 18.04 desktop amd64 iso',
+                '[site] Some Linux Distro 18.04 Desktop AMD64 ISO',
+            ):
+                assert test_clusterer.add(build_torrent(name, size=1010)) == \
+                    (cluster, False,)
+
+            # NOTE: different releases and sizes are not collapsed
+            assert test_clusterer.add(
+                build_torrent('Some Linux Distro 16.04 Server i386')
+            )[-1]
+            assert test_clusterer.add(build_torrent(
+                'Some.Linux.Distro.18.04.Desktop.amd64.iso', size=3000
+            ))[-1]
+            assert len(test_clusterer.clusters) == 3
+            assert len(cluster) == 3
+
+    def test_representative(self):
+        """ Tests the representative of clusters.
+        """
+
+        (cluster,) = cluster_torrents([
+            build_torrent('Some Release', seeders=1),
+            build_torrent('Some Release', seeders=10, hash='other'),
+            build_torrent('Some Release', seeders=5, hash='another'),
+            # NOTE: identical hashes always share a cluster
+            build_torrent('Unrelated', seeders=0, hash='other'),
+        ])
+        assert cluster.representative['seeders'] == 10
+        assert len(cluster) == 4
+
+    def test_bounded_buckets(self):
+        """ Tests that buckets keep a bounded number of clusters.
+        """
+
+        with clusterer_manager(max_candidates=2) as test_clusterer:
+            for size in range(1, 10):
+                test_clusterer.add(build_torrent('Same Name', size=(size ** 4)))
+            assert len(test_clusterer.clusters) == 9
+            assert max(
+                len(bucket) for bucket in test_clusterer._buckets.values()
+            ) == 2
@@ -0,0 +1,142 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import csv
+import datetime
+import tempfile
+import contextlib
+
+from torvend import (columnar,)
+from torvend.items import (TorrentCategory, Torrent,)
+
+import pytest
+
+
+@contextlib.contextmanager
+def sink_manager(extension, *args, **kwargs):
+    """ A context manager for columnar sink initialization.
+    """
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sink = columnar.ColumnarSink(
+            os.path.join(temp_dir, ('results{extension}').format(**locals())),
+            *args, **kwargs
+        )
+        try:
+            yield sink
+        finally:
+            sink.close()
+            del sink
+
+
+def build_torrent(idx, **kwargs):
+    """ Builds a torrent item for testing.
+    """
+
+    fields = dict(
+        name=('Test Torrent {idx}').format(**locals()),
+        spider=('tests', 'other',)[idx % 2],
+        hash=('{idx:040x}').format(**locals()),
+        size=(1024 * idx),
+        seeders=idx,
+        leechers=2,
+        categories=[TorrentCategory.Video, TorrentCategory.Adult],
+        uploaded=datetime.datetime(2017, 1, 2, 3, 4, 5),
+        query='test',
+    )
+    fields.update(kwargs)
+    return Torrent(**fields)
+
+
+class TestColumnarSink(object):
+    """ A collection of columnar sink testcases.
+    """
+
+    def test_encoding(self):
+        """ Tests encoding of hashes and categories.
+        """
+
+        assert columnar.encode_hash('ff' * 20) == (b'\xff' * 20)
+        assert columnar.encode_hash('invalid') == bytes(20)
+        categories = [TorrentCategory.Audio, TorrentCategory.Book]
+        assert columnar.decode_categories(
+            columnar.encode_categories(categories)
+        ) == categories
+        assert columnar.get_format('results.parquet') == 'parquet'
+        assert columnar.get_format('results.txt') == 'csv'
+        with pytest.raises(ValueError):
+            columnar.ColumnarSink('results.csv', format='unknown')
+
+    def test_csv(self):
+        """ Tests writing row groups as CSV.
+        """
+
+        with sink_manager('.csv', row_group_size=2) as test_sink:
+            for idx in range(5):
+                test_sink(build_torrent(
+                    idx, **({'uploaded': None} if idx % 2 else {})
+                ))
+            # NOTE: full row groups are written as they fill up
+            assert len(test_sink) == 1
+            test_sink.close()
+
+            with open(test_sink.path, 'r') as stream:
+                rows = list(csv.DictReader(stream))
+            assert len(rows) == 5
+            assert rows[1]['spider'] == 'other'
+            assert rows[1]['uploaded'] == ''
+            assert rows[3]['hash'] == ('{:040x}').format(3)
+
+    def test_arrow(self):
+        """ Tests writing row groups as Arrow IPC.
+        """
+
+        pyarrow = pytest.importorskip('pyarrow')
+        import pyarrow.ipc
+
+        with sink_manager('.arrow', row_group_size=3) as test_sink:
+            test_sink.append(build_torrent(0))
+            test_sink.append(build_torrent(2))
+            test_sink.append(build_torrent(4))
+            # NOTE: new spiders may be discovered in later row groups
+            for idx in range(5):
+                test_sink.append(build_torrent(idx, uploaded=None))
+            test_sink.close()
+
+            table = pyarrow.ipc.open_file(test_sink.path).read_all()
+            assert table.num_rows == 8
+            assert table.column('spider').to_pylist()[-4:] == \
+                ['other', 'tests', 'other', 'tests']
+            assert table.column('hash').to_pylist()[1] == \
+                columnar.encode_hash(('{:040x}').format(2))
+            assert table.column('uploaded').null_count == 5
+
+    def test_parquet(self):
+        """ Tests writing row groups as Parquet.
+        """
+
+        pytest.importorskip('pyarrow')
+        import pyarrow.parquet
+
+        with sink_manager('.parquet', row_group_size=2) as test_sink:
+            for idx in range(5):
+                test_sink(build_torrent(idx))
+            test_sink.close()
+
+            parquet_file = pyarrow.parquet.ParquetFile(test_sink.path)
+            assert parquet_file.metadata.num_row_groups == 3
+            table = parquet_file.read()
+            assert table.column('seeders').to_pylist() == list(range(5))
+            assert columnar.decode_categories(
+                table.column('categories').to_pylist()[0]
+            ) == [TorrentCategory.Video, TorrentCategory.Adult]
+
+    def test_empty(self):
+        """ Tests closing a sink without rows.
+        """
+
+        with sink_manager('.csv') as test_sink:
+            test_sink.close()
+            with open(test_sink.path, 'r') as stream:
+                assert stream.read().strip() == ','.join(columnar.HEADER)
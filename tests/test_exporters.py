@@ -0,0 +1,116 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import io
+import json
+import datetime
+import contextlib
+
+from torvend import (exporters,)
+from torvend.items import (TorrentCategory, Torrent,)
+
+import pytest
+
+
+@contextlib.contextmanager
+def exporter_manager(name, *args, **kwargs):
+    """ A context manager for exporter initialization.
+    """
+
+    exporter = exporters.get_exporter(name, io.BytesIO(), *args, **kwargs)
+    try:
+        yield exporter
+    finally:
+        del exporter
+
+
+def build_torrent(**kwargs):
+    """ Builds a torrent item for testing.
+    """
+
+    fields = dict(
+        name='Test Torrent',
+        spider='tests',
+        hash='0' * 40,
+        size=1024,
+        seeders=10,
+        leechers=2,
+        categories=[TorrentCategory.Video],
+        uploaded=datetime.datetime(2017, 1, 2, 3, 4, 5),
+    )
+    fields.update(kwargs)
+    return Torrent(**fields)
+
+
+class TestExporters(object):
+    """ A collection of exporter testcases.
+    """
+
+    def test_serialize_torrent(self):
+        """ Tests serializing torrent items.
+        """
+
+        serialized = exporters.serialize_torrent(build_torrent())
+        assert serialized['categories'] == [TorrentCategory.Video.value]
+        assert serialized['uploaded'] == '2017-01-02 03:04:05'
+        assert serialized['size'] == 1024
+
+        serialized = exporters.serialize_torrent(build_torrent(uploaded=None))
+        assert serialized['uploaded'] is None
+        assert json.loads(exporters.dumps(serialized).decode('utf-8')) == \
+            serialized
+
+    def test_get_exporter(self):
+        """ Tests getting exporters by name.
+        """
+
+        with exporter_manager('json') as test_exporter:
+            assert isinstance(test_exporter, exporters.JsonExporter)
+        with pytest.raises(ValueError):
+            exporters.get_exporter('unknown', io.BytesIO())
+
+    def test_json(self):
+        """ Tests exporting torrents as a JSON array.
+        """
+
+        with exporter_manager('json') as test_exporter:
+            test_exporter.start_exporting()
+            test_exporter.finish_exporting()
+            assert json.loads(test_exporter.file.getvalue()) == []
+
+        with exporter_manager('json') as test_exporter:
+            test_exporter.start_exporting()
+            for seeders in range(3):
+                test_exporter.export_item(build_torrent(seeders=seeders))
+            test_exporter.finish_exporting()
+            exported = json.loads(test_exporter.file.getvalue())
+            assert [entry['seeders'] for entry in exported] == [0, 1, 2]
+            assert test_exporter.count == 3
+
+    def test_ndjson(self):
+        """ Tests exporting torrents as newline delimited JSON.
+        """
+
+        with exporter_manager('ndjson') as test_exporter:
+            test_exporter.start_exporting()
+            test_exporter.export_item(build_torrent())
+            # NOTE: the first item is available before exporting finishes
+            (line,) = test_exporter.file.getvalue().splitlines()
+            assert json.loads(line)['name'] == 'Test Torrent'
+            test_exporter.export_item(build_torrent(name='Other Torrent'))
+            test_exporter.finish_exporting()
+            assert len(test_exporter.file.getvalue().splitlines()) == 2
+
+    def test_msgpack(self):
+        """ Tests exporting torrents as msgpack maps.
+        """
+
+        msgpack = pytest.importorskip('msgpack')
+        with exporter_manager('msgpack') as test_exporter:
+            test_exporter.export_item(build_torrent())
+            test_exporter.export_item(build_torrent(name='Other Torrent'))
+            unpacked = list(msgpack.Unpacker(
+                io.BytesIO(test_exporter.file.getvalue()), raw=False
+            ))
+            assert [entry['name'] for entry in unpacked] == \
+                ['Test Torrent', 'Other Torrent']
@@ -0,0 +1,87 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import contextlib
+import unittest.mock
+
+from torvend.filters import (TorrentFilter, FilterPipeline,)
+from torvend.items import (TorrentCategory, Torrent,)
+
+import pytest
+import scrapy.exceptions
+
+
+@contextlib.contextmanager
+def filter_manager(*args, **kwargs):
+    """ A context manager for torrent filter initialization.
+    """
+
+    torrent_filter = TorrentFilter(*args, **kwargs)
+    try:
+        yield torrent_filter
+    finally:
+        del torrent_filter
+
+
+class TestTorrentFilter(object):
+    """ A collection of torrent filter testcases.
+    """
+
+    def test_bool(self):
+        """ Tests checking if filters filter anything.
+        """
+
+        with filter_manager() as test_filter:
+            assert not test_filter
+            assert test_filter.accepts(Torrent(seeders=0))
+        with filter_manager(min_seeders=0) as test_filter:
+            assert test_filter
+        with filter_manager(categories=['video']) as test_filter:
+            assert test_filter.categories == {TorrentCategory.Video}
+
+    def test_key(self):
+        """ Tests the hashable keys of filters.
+        """
+
+        assert TorrentFilter(
+            categories=[TorrentCategory.Video, TorrentCategory.Audio]
+        ).key == TorrentFilter(categories=['audio', 'video']).key
+        assert TorrentFilter(min_size=1).key != TorrentFilter(max_size=1).key
+
+    def test_accepts(self):
+        """ Tests accepting partially parsed torrents.
+        """
+
+        with filter_manager(
+            categories=[TorrentCategory.Video],
+            min_size=10, max_size=100, min_seeders=5
+        ) as test_filter:
+            # NOTE: missing fields are not filtered
+            assert test_filter.accepts(Torrent())
+            assert test_filter.accepts(Torrent(seeders=5))
+            assert not test_filter.accepts(Torrent(seeders=4))
+            assert not test_filter.accepts(Torrent(size=9))
+            assert not test_filter.accepts(Torrent(size=101))
+            assert not test_filter.accepts(Torrent(
+                categories=[TorrentCategory.Audio]
+            ))
+            assert test_filter.accepts(Torrent(
+                categories=[TorrentCategory.Audio, TorrentCategory.Video],
+                size=50, seeders=10
+            ))
+
+    def test_pipeline(self):
+        """ Tests dropping rejected torrents in the item pipeline.
+        """
+
+        crawler = unittest.mock.Mock()
+        crawler.spider.torrent_filter = TorrentFilter(min_seeders=5)
+        test_pipeline = FilterPipeline.from_crawler(crawler)
+
+        torrent = Torrent(seeders=5)
+        assert test_pipeline.process_item(torrent) is torrent
+        with pytest.raises(scrapy.exceptions.DropItem):
+            test_pipeline.process_item(Torrent(seeders=4))
+
+        crawler.spider.torrent_filter = None
+        assert test_pipeline.process_item(Torrent(seeders=4))
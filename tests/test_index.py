@@ -0,0 +1,113 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import datetime
+import tempfile
+import contextlib
+
+from torvend.index import (LocalIndex, build_match,)
+from torvend.items import (TorrentCategory, Torrent,)
+
+
+@contextlib.contextmanager
+def index_manager(*args, **kwargs):
+    """ A context manager for local index initialization.
+    """
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = LocalIndex(
+            os.path.join(temp_dir, 'index', 'index.sqlite3'),
+            *args, **kwargs
+        )
+        try:
+            yield index
+        finally:
+            index.close()
+            del index
+
+
+def build_torrent(**kwargs):
+    """ Builds a torrent item for testing.
+    """
+
+    fields = dict(
+        name='Some.Linux.Distribution.2017.x64',
+        spider='tests',
+        source='http://127.0.0.1/torrent/0',
+        hash='A' * 40,
+        magnet='magnet:?xt=urn:btih:' + ('A' * 40),
+        size=1024,
+        seeders=10,
+        leechers=2,
+        categories=[TorrentCategory.Application],
+        uploaded=datetime.datetime(2017, 1, 2, 3, 4, 5),
+        uploader='uploader',
+    )
+    fields.update(kwargs)
+    return Torrent(**fields)
+
+
+class TestLocalIndex(object):
+    """ A collection of local index testcases.
+    """
+
+    def test_build_match(self):
+        """ Tests building FTS5 match expressions.
+        """
+
+        assert build_match('  linux  distro ') == '"linux" "distro"'
+        assert build_match('say "hi"') == '"say" """hi"""'
+        assert build_match('') == ''
+
+    def test_search(self):
+        """ Tests searching indexed torrents.
+        """
+
+        with index_manager(batch_size=2) as test_index:
+            test_index(build_torrent())
+            test_index(build_torrent(
+                name='Another Linux Distribution', hash=('b' * 40),
+                seeders=100
+            ))
+            test_index(build_torrent(name='Unrelated', hash=('c' * 40)))
+            assert len(test_index) == 3
+
+            found = test_index.search('linux distribution')
+            assert [torrent['hash'] for torrent in found] == \
+                [('b' * 40), ('a' * 40)]
+            assert found[1]['uploaded'] == \
+                datetime.datetime(2017, 1, 2, 3, 4, 5)
+            assert found[1]['categories'] == [TorrentCategory.Application]
+            assert found[1]['query'] == 'linux distribution'
+
+            assert test_index.search('LINUX', results=1)[0]['seeders'] == 100
+            assert test_index.search('windows') == []
+            assert test_index.search('   ') == []
+            assert test_index.search('linux', max_age=-1) == []
+
+    def test_sightings(self):
+        """ Tests keeping the seeders and leechers of each spider.
+        """
+
+        with index_manager() as test_index:
+            test_index(build_torrent(spider='first', seeders=5))
+            test_index(build_torrent(spider='second', seeders=50))
+            test_index(build_torrent(spider='first', seeders=500))
+            assert len(test_index) == 1
+
+            (found,) = test_index.search('distribution')
+            assert (found['spider'], found['seeders'],) == ('first', 500,)
+            assert test_index.connection.execute(
+                'SELECT count(*) FROM sightings'
+            ).fetchone()[0] == 2
+
+    def test_persistence(self):
+        """ Tests reopening an index.
+        """
+
+        with index_manager() as test_index:
+            test_index(build_torrent())
+            test_index.close()
+            with LocalIndex(test_index.path) as reopened_index:
+                assert len(reopened_index.search('linux')) == 1
@@ -0,0 +1,159 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import io
+import queue
+import logging
+import contextlib
+
+from torvend import (const, meta,)
+from torvend.meta import (logqueue,)
+
+
+class CountingStream(io.StringIO):
+    """ A string stream counting its flushes.
+    """
+
+    flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+class SampledLoggable(meta.Loggable):
+    """ A loggable object with sampled logs.
+    """
+
+    pass
+
+
+@contextlib.contextmanager
+def listener_manager(*handlers, **kwargs):
+    """ A context manager for a started queue listener.
+    """
+
+    listener = logqueue.QueueListener(queue.SimpleQueue(), *handlers, **kwargs)
+    listener.start()
+    try:
+        yield listener
+    finally:
+        listener.stop()
+
+
+def build_logger(name, listener, target):
+    """ Builds a logger enqueueing records for a target handler.
+    """
+
+    logger = logging.getLogger(('torvend-test.{name}').format(**locals()))
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = [logqueue.QueueHandler(listener.queue, target)]
+    return logger
+
+
+class TestLogQueue(object):
+    """ A collection of queued logging testcases.
+    """
+
+    def test_batched_flush(self):
+        """ Tests batched handlers flush once per batch.
+        """
+
+        stream = CountingStream()
+        handler = logqueue.BatchedStreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.handle_batch([
+            logging.makeLogRecord({'msg': 'record %d', 'args': (idx,)})
+            for idx in range(10)
+        ])
+        assert stream.getvalue().splitlines() == [
+            ('record {idx}').format(**locals())
+            for idx in range(10)
+        ]
+        assert stream.flushes == 1
+
+        handler.handle(logging.makeLogRecord({'msg': 'single'}))
+        assert stream.flushes == 2
+
+    def test_listener(self):
+        """ Tests records are written by the listener in batches.
+        """
+
+        (high_stream, low_stream,) = (CountingStream(), CountingStream(),)
+        (high_handler, low_handler,) = (
+            logqueue.BatchedStreamHandler(high_stream),
+            logqueue.BatchedStreamHandler(low_stream),
+        )
+        with listener_manager(
+            high_handler, low_handler, batch_size=50
+        ) as listener:
+            assert listener.running
+            (high_logger, low_logger,) = (
+                build_logger('high', listener, high_handler),
+                build_logger('low', listener, low_handler),
+            )
+            # NOTE: the listener is blocked until the records are enqueued
+            with low_handler.lock:
+                for idx in range(200):
+                    low_logger.debug('low %d', idx)
+                high_logger.warning('high %s', 'warning')
+        assert not listener.running
+        listener.stop()
+
+        assert low_stream.getvalue().splitlines() == [
+            ('low {idx}').format(**locals())
+            for idx in range(200)
+        ]
+        assert high_stream.getvalue() == 'high warning\n'
+        assert low_stream.flushes <= 5
+        assert high_stream.flushes <= 2
+
+    def test_prepare(self):
+        """ Tests records are merged with their arguments before enqueuing.
+        """
+
+        handler = logqueue.QueueHandler(queue.SimpleQueue(), None)
+        arguments = {'key': 'value'}
+        handler.handle(logging.makeLogRecord({
+            'msg': 'argument %s', 'args': (arguments,),
+        }))
+        arguments['key'] = 'changed'
+        (target, record,) = handler.queue.get_nowait()
+        assert target is None
+        assert (record.msg, record.args,) == (
+            "argument {'key': 'value'}", None,
+        )
+        assert record.getMessage() == record.msg
+
+    def test_verbose(self):
+        """ Tests debug records are only created when verbose.
+        """
+
+        verbose = const.verbose
+        loggable = SampledLoggable()
+        try:
+            const.verbose = False
+            assert not loggable.log.isEnabledFor(logging.DEBUG)
+            assert loggable.log.isEnabledFor(logging.INFO)
+            const.verbose = True
+            assert loggable.log.isEnabledFor(logging.DEBUG)
+        finally:
+            const.verbose = verbose
+            const.flush_log()
+
+    def test_sample_log(self):
+        """ Tests sampled logs only log the first and every n-th record.
+        """
+
+        sample_rate = const.log_sample_rate
+        loggable = SampledLoggable()
+        try:
+            const.log_sample_rate = 10
+            assert [
+                idx for idx in range(35)
+                if loggable.sample_log('item')
+            ] == [0, 10, 20, 30]
+            assert loggable.sample_log('other')
+        finally:
+            const.log_sample_rate = sample_rate
@@ -0,0 +1,164 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import pickle
+import tempfile
+import unittest.mock
+
+from torvend import (metrics, stats,)
+
+import pytest
+
+
+def build_spider(name='test'):
+    """ Builds a mock spider with crawler stats.
+    """
+
+    spider = unittest.mock.Mock()
+    spider.name = name
+    spider.crawler.stats.get_value.side_effect = (
+        lambda key, default=None: {
+            'downloader/response_bytes': 2048,
+            'dupefilter/filtered': 3,
+            'pool/connections_new': 1,
+            'pool/connections_reused': 4,
+            'pool/tls_handshakes': 3,
+            'pool/tls_sessions_offered': 2,
+        }.get(key, default)
+    )
+    return spider
+
+
+class TestMetricsRegistry(object):
+    """ A collection of metrics registry testcases.
+    """
+
+    def test_counters(self):
+        """ Tests counters and gauges are incremented and set.
+        """
+
+        registry = metrics.MetricsRegistry()
+        registry.inc('torvend_requests_total', spider='a', status=200)
+        registry.inc('torvend_requests_total', 2, spider='a', status=200)
+        registry.inc('torvend_requests_total', spider='a', status=404)
+        assert registry.get_value(
+            'torvend_requests_total', spider='a', status=200
+        ) == 3
+        assert registry.get_value(
+            'torvend_requests_total', spider='b', status=200
+        ) is None
+
+        registry.inc('torvend_crawls_in_flight')
+        registry.dec('torvend_crawls_in_flight')
+        assert registry.get_value('torvend_crawls_in_flight') == 0
+        registry.set('torvend_crawls_in_flight', 4)
+        assert registry.get_value('torvend_crawls_in_flight') == 4
+
+        with pytest.raises(ValueError):
+            registry.inc('torvend_requests_total', spider='a')
+        with pytest.raises(AssertionError):
+            registry.inc('torvend_requests_total', -1, spider='a', status=1)
+        with pytest.raises(AssertionError):
+            registry.set('torvend_items_scraped_total', 1, spider='a')
+        with pytest.raises(ValueError):
+            registry.register('gauge', 'torvend_crawls_in_flight', '')
+
+    def test_render(self):
+        """ Tests metrics are rendered in the text exposition format.
+        """
+
+        registry = metrics.MetricsRegistry()
+        registry.inc('torvend_items_scraped_total', spider='a "b"\n')
+        registry.observe('torvend_parse_seconds', 0.0003, spider='a')
+        registry.observe('torvend_parse_seconds', 100.0, spider='a')
+        lines = registry.render().splitlines()
+
+        assert '# TYPE torvend_parse_seconds histogram' in lines
+        assert '# HELP torvend_crawls_in_flight Currently running crawls.' \
+            in lines
+        assert 'torvend_items_scraped_total{spider="a \\"b\\"\\n"} 1' in lines
+        assert 'torvend_parse_seconds_bucket{spider="a",le="0.0001"} 0' \
+            in lines
+        assert 'torvend_parse_seconds_bucket{spider="a",le="0.0004"} 1' \
+            in lines
+        assert 'torvend_parse_seconds_bucket{spider="a",le="+Inf"} 2' in lines
+        assert 'torvend_parse_seconds_sum{spider="a"} 100.0003' in lines
+        assert 'torvend_parse_seconds_count{spider="a"} 2' in lines
+
+    def test_merge(self):
+        """ Tests registries are merged and pickled.
+        """
+
+        (first, second,) = (
+            metrics.MetricsRegistry(), metrics.MetricsRegistry(),
+        )
+        first.inc('torvend_items_scraped_total', spider='a')
+        first.observe('torvend_parse_seconds', 0.5, spider='a')
+        second.inc('torvend_items_scraped_total', 2, spider='a')
+        second.inc('torvend_crawls_in_flight')
+        second.observe('torvend_parse_seconds', 0.25, spider='a')
+        second.register('counter', 'custom_total', 'A custom counter.')
+        second.inc('custom_total')
+
+        first.merge(pickle.loads(pickle.dumps(second)))
+        assert first.get_value('torvend_items_scraped_total', spider='a') == 3
+        assert first.get_value('torvend_crawls_in_flight') == 1
+        assert first.get_value(
+            'torvend_parse_seconds', spider='a'
+        ).count == 2
+        assert first.get_value('custom_total') == 1
+
+    def test_write(self):
+        """ Tests metrics are written to a file.
+        """
+
+        registry = metrics.MetricsRegistry()
+        registry.inc('torvend_crawls_total', mode='started')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, 'torvend.prom')
+            registry.write(filepath)
+            with open(filepath, 'r') as fp:
+                assert fp.read() == registry.render()
+            assert os.listdir(temp_dir) == ['torvend.prom']
+
+    def test_signals(self):
+        """ Tests crawler signals and stats are recorded.
+        """
+
+        registry = metrics.MetricsRegistry()
+        crawler = unittest.mock.Mock()
+        registry.connect(crawler)
+        assert stats.response_parsed in [
+            call[0][1] for call in crawler.signals.connect.call_args_list
+        ]
+
+        (spider, response,) = (build_spider(), unittest.mock.Mock(),)
+        response.status = 200
+        registry._response_received(response, None, spider)
+        registry._response_parsed(spider, 0.01)
+        registry._item_dropped({}, spider, exception=None)
+        registry._spider_closed(spider, 'finished')
+
+        assert registry.get_value(
+            'torvend_requests_total', spider='test', status=200
+        ) == 1
+        assert registry.get_value(
+            'torvend_parse_seconds', spider='test'
+        ).count == 1
+        for (name, value,) in (
+            ('torvend_items_dropped_total', 1,),
+            ('torvend_response_bytes_total', 2048,),
+            ('torvend_duplicates_filtered_total', 3,),
+        ):
+            assert registry.get_value(name, spider='test') == value
+        assert registry.get_value(
+            'torvend_spiders_closed_total', spider='test', reason='finished'
+        ) == 1
+        for (name, labels, value,) in (
+            ('torvend_connections_total', {'result': 'new'}, 1,),
+            ('torvend_connections_total', {'result': 'reused'}, 4,),
+            ('torvend_tls_handshakes_total', {'session': 'new'}, 1,),
+            ('torvend_tls_handshakes_total', {'session': 'offered'}, 2,),
+        ):
+            assert registry.get_value(name, spider='test', **labels) == value
@@ -0,0 +1,154 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import contextlib
+
+import torvend.spiders
+
+import twisted.web.server
+from twisted.internet.task import (Clock,)
+from twisted.web.test.requesthelper import (DummyRequest,)
+
+from .mocksite import (MockSite, CHUNK_INTERVAL, get_query_pattern,)
+
+
+@contextlib.contextmanager
+def site_manager(*args, **kwargs):
+    """ A context manager for mock site initialization.
+    """
+
+    site = MockSite(*args, clock=Clock(), **kwargs)
+    try:
+        yield site
+    finally:
+        site.stop()
+
+
+def build_request(uri):
+    """ Builds a dummy request of an uri.
+    """
+
+    request = DummyRequest(uri.lstrip('/').encode('utf-8').split(b'/'))
+    request.uri = uri.encode('utf-8')
+    return request
+
+
+def render(resource, uri):
+    """ Renders a dummy request of an uri.
+    """
+
+    request = build_request(uri)
+    rendered = resource.render_GET(request)
+    if rendered != twisted.web.server.NOT_DONE_YET:
+        request.write(rendered)
+        request.finish()
+    return request
+
+
+class TestMockSite(object):
+    """ A collection of mock site testcases.
+    """
+
+    def test_get_query_pattern(self):
+        """ Tests query paths are turned into patterns.
+        """
+
+        pattern = get_query_pattern(torvend.spiders.ThePirateBaySpider)
+        assert pattern.match('search/ubuntu%20desktop/0').group('query') == \
+            'ubuntu%20desktop'
+        assert pattern.match('search/ubuntu/0/99/200')
+        assert not pattern.match('torrent/1234/ubuntu')
+
+        pattern = get_query_pattern(torvend.spiders.Torrentz2Spider)
+        assert pattern.match('search/?f=ubuntu&p=1')
+
+    def test_routing(self):
+        """ Tests listing, detail and missing pages are routed.
+        """
+
+        with site_manager() as site:
+            resource = site.get_resource(torvend.spiders.LimeTorrentsSpider)
+            listing = render(resource, '/search/all/ubuntu/seeds/1/')
+            detail = render(resource, '/ubuntu-torrent-1234.html')
+            site.clock.advance(0)
+            assert b''.join(listing.written) == resource.listing
+            assert b''.join(detail.written) == resource.detail
+
+            resource = site.get_resource(torvend.spiders.ThePirateBaySpider)
+            missing = render(resource, '/torrent/1234')
+            assert missing.responseCode == 404
+            assert (site.requests, site.served,) == (3, 2,)
+
+    def test_latency(self):
+        """ Tests responses are delayed by the latency and jitter.
+        """
+
+        with site_manager(latency=1.0, jitter=0.5, seed=0) as site:
+            resource = site.get_resource(torvend.spiders.ThePirateBaySpider)
+            requests = [
+                render(resource, '/search/ubuntu/0')
+                for _ in range(10)
+            ]
+            site.clock.advance(0.49)
+            assert not any(request.finished for request in requests)
+            site.clock.advance(1.02)
+            assert all(request.finished for request in requests)
+
+    def test_error_rate(self):
+        """ Tests requests fail at the error rate.
+        """
+
+        with site_manager(error_rate=0.5, seed=0) as site:
+            resource = site.get_resource(torvend.spiders.ThePirateBaySpider)
+            requests = [
+                render(resource, '/search/ubuntu/0')
+                for _ in range(200)
+            ]
+            site.clock.advance(0)
+            failed = [
+                request for request in requests
+                if request.responseCode == 503
+            ]
+            assert 50 < len(failed) < 150
+            assert site.errors == len(failed)
+            assert site.served == (len(requests) - len(failed))
+
+        with site_manager(error_rate=1.0) as site:
+            resource = site.get_resource(torvend.spiders.ThePirateBaySpider)
+            assert render(resource, '/search/ubuntu/0').responseCode == 503
+
+    def test_bandwidth(self):
+        """ Tests pages are written in chunks of the bandwidth cap.
+        """
+
+        with site_manager(bandwidth=100000) as site:
+            resource = site.get_resource(torvend.spiders.ThePirateBaySpider)
+            request = render(resource, '/search/ubuntu/0')
+            chunk_size = int(100000 * CHUNK_INTERVAL)
+            site.clock.advance(0)
+            assert request.written == [resource.listing[:chunk_size]]
+
+            site.clock.pump([CHUNK_INTERVAL] * (
+                len(resource.listing) // chunk_size
+            ))
+            assert request.finished
+            assert b''.join(request.written) == resource.listing
+            assert all(
+                len(chunk) <= chunk_size
+                for chunk in request.written
+            )
+
+    def test_synthetic(self):
+        """ Tests synthetic listing pages are served instead of recorded ones.
+        """
+
+        with site_manager(rows=200, seed=0) as site:
+            resource = site.get_resource(torvend.spiders.ThePirateBaySpider)
+            assert resource.listing.count(b'class="detLink"') == 200
+            assert resource.detail is None
+
+            resource = site.get_resource(torvend.spiders.TorlockSpider)
+            request = render(resource, '/torrent/1234/ubuntu.html')
+            site.clock.advance(0)
+            assert b''.join(request.written) == resource.detail
+            assert b'INFOHASH' in resource.detail
@@ -0,0 +1,280 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import ssl
+import sys
+import datetime
+import tempfile
+import contextlib
+import subprocess
+import http.server
+import threading
+
+from torvend import (stats,)
+from torvend.pool import (PoolPolicy, TLSSessionCache,)
+
+from .test_client import (MockRequestHandler,)
+
+import OpenSSL.SSL
+import scrapy.settings
+
+POOLED_SEARCH = """
+import sys
+import asyncio
+
+async def search(secure):
+    from torvend.client import (TorvendClient, start_asyncio_reactor,)
+    start_asyncio_reactor()
+    from torvend.stats import (SearchStats,)
+    from tests.test_client import (MockSpider,)
+    from tests.test_pool import (pooled_site,)
+
+    with pooled_site(secure=secure) as (mock_url, reused,):
+        test_client = TorvendClient(
+            settings={
+                'MOCK_URL': mock_url,
+                # NOTE: every request of secure searches needs a handshake
+                'TORVEND_POOL_KEEPALIVE': (not secure),
+            },
+            allowed=[MockSpider]
+        )
+        search_stats = SearchStats()
+        for query in ('alpha', 'beta', 'gamma',):
+            await test_client.search_async(query, search_stats=search_stats)
+    counts = search_stats.connections['mock']
+    print(
+        counts['new'], counts['reused'] > 0,
+        counts['tls_handshakes'] == (counts['tls_sessions_offered'] + 1),
+        any(reused),
+    )
+
+asyncio.run(search(sys.argv[1] == 'secure'))
+"""
+
+CLOSED_SEARCH = """
+from torvend.client import (TorvendClient,)
+from torvend.pool import (PooledDownloadHandler,)
+from tests.test_client import (MockSpider,)
+from tests.test_pool import (pooled_site,)
+
+with pooled_site() as (mock_url, _,):
+    test_client = TorvendClient(
+        settings={'MOCK_URL': mock_url}, allowed=[MockSpider]
+    )
+    pools = []
+
+    def _torrent_callback(item, **kwargs):
+        pools.extend(PooledDownloadHandler._pools.values())
+
+    test_client.search('alpha', _torrent_callback)
+print(
+    len(set(pools)), len(PooledDownloadHandler._pools),
+    sum(len(connections) for connections in pools[0]._connections.values())
+)
+"""
+
+
+class KeepAliveRequestHandler(MockRequestHandler):
+    """ A request handler which keeps connections open between requests.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+
+def build_certificate(directory):
+    """ Builds a self-signed certificate for localhost.
+
+    :returns: The paths of the certificate and its key
+    """
+
+    # NOTE: local import to speed up module loading
+    from cryptography import x509
+    from cryptography.x509.oid import (NameOID,)
+    from cryptography.hazmat.primitives import (hashes, serialization,)
+    from cryptography.hazmat.primitives.asymmetric import (ec,)
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, '127.0.0.1')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(
+        name
+    ).public_key(key.public_key()).serial_number(
+        x509.random_serial_number()
+    ).not_valid_before(now).not_valid_after(
+        now + datetime.timedelta(days=1)
+    ).sign(key, hashes.SHA256())
+
+    (certificate_path, key_path,) = (
+        os.path.join(directory, 'certificate.pem'),
+        os.path.join(directory, 'key.pem'),
+    )
+    with open(certificate_path, 'wb') as fp:
+        fp.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as fp:
+        fp.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return (certificate_path, key_path,)
+
+
+class TLSServer(http.server.ThreadingHTTPServer):
+    """ A server wrapping connections in TLS and recording resumptions.
+    """
+
+    def __init__(self, address, handler_class, context):
+        super().__init__(address, handler_class)
+        (self.context, self.reused,) = (context, [],)
+
+    def get_request(self):
+        (sock, address,) = super().get_request()
+        return (self.context.wrap_socket(
+            sock, server_side=True, do_handshake_on_connect=False
+        ), address,)
+
+    def finish_request(self, request, client_address):
+        request.do_handshake()
+        self.reused.append(request.session_reused)
+        super().finish_request(request, client_address)
+
+
+@contextlib.contextmanager
+def pooled_site(secure=False):
+    """ A context manager for a local mock site keeping connections alive.
+
+    :returns: The url of the site and the session reuse of every TLS
+        connection
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        if secure:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*build_certificate(directory))
+            server = TLSServer(
+                ('127.0.0.1', 0,), KeepAliveRequestHandler, context
+            )
+        else:
+            server = http.server.ThreadingHTTPServer(
+                ('127.0.0.1', 0,), KeepAliveRequestHandler
+            )
+            server.reused = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            yield ((
+                '{scheme}://127.0.0.1:{server.server_address[1]}'
+            ).format(
+                scheme=('https' if secure else 'http'), **locals()
+            ), server.reused,)
+        finally:
+            server.shutdown()
+
+
+class MockConnection(object):
+    """ A TLS connection with a session once its handshake completed.
+    """
+
+    def __init__(self, session=None, error=False):
+        (self.session, self.error, self.offered,) = (session, error, None,)
+
+    def get_session(self):
+        return self.session
+
+    def set_session(self, session):
+        if self.error:
+            raise OpenSSL.SSL.Error()
+        self.offered = session
+
+
+class TestConnectionPool(object):
+    """ A collection of connection pool testcases.
+    """
+
+    def test_policy(self):
+        """ Tests pool policies are read from crawler settings.
+        """
+
+        settings = scrapy.settings.Settings({
+            'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+        })
+        assert PoolPolicy.from_settings(settings) == (True, 4, 240.0, True,)
+        settings.set('TORVEND_POOL_MAXSIZE', 2)
+        settings.set('TORVEND_TLS_SESSIONS', False)
+        policy = PoolPolicy.from_settings(settings)
+        assert (policy.maxsize, policy.tls_sessions,) == (2, False,)
+
+    def test_session_cache(self):
+        """ Tests sessions of completed handshakes are offered to new ones.
+        """
+
+        session_cache = TLSSessionCache(maxsize=1)
+        first = MockConnection()
+        assert not session_cache.offer('a', first)
+
+        # sessions are only collected once the handshake completed
+        second = MockConnection()
+        assert not session_cache.offer('a', second)
+        first.session = 'first'
+        third = MockConnection()
+        assert session_cache.offer('a', third)
+        assert third.offered == 'first'
+
+        # failing sessions are dropped
+        assert not session_cache.offer('a', MockConnection(error=True))
+        assert len(session_cache) == 0
+
+        # the least recently collected hosts are dropped
+        (second.session, other,) = ('second', MockConnection('other'),)
+        session_cache.offer('b', other)
+        session_cache.offer('b', MockConnection())
+        assert len(session_cache) == 1
+        fourth = MockConnection()
+        assert session_cache.offer('a', fourth)
+        assert fourth.offered == 'second'
+        assert len(session_cache) == 1
+
+    def test_reuse_ratio(self):
+        """ Tests connection counts are merged and exported.
+        """
+
+        (first, second,) = (stats.SearchStats(), stats.SearchStats(),)
+        assert first.get_reuse_ratio() is None
+        first.connections['a'] = {'new': 1, 'reused': 3}
+        second.connections['a'] = {
+            'new': 2, 'reused': 2,
+            'tls_handshakes': 2, 'tls_sessions_offered': 1,
+        }
+        first.merge(second)
+        assert first.get_reuse_ratio() == 0.625
+        assert first.get_reuse_ratio('a', tls=True) == 0.5
+        assert first.get_reuse_ratio('b') is None
+        assert first.to_dict()['a']['connections']['reused'] == 5
+
+    def test_pooled_search(self):
+        """ Tests connections are reused across searches.
+        """
+
+        for (argument, expected,) in (
+            ('plain', b'1 True False False',),
+            ('secure', b'3 False True True',),
+        ):
+            process = subprocess.run(
+                [sys.executable, '-c', POOLED_SEARCH, argument],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(
+                    __file__
+                ))),
+                stdout=subprocess.PIPE, check=True, timeout=60
+            )
+            assert process.stdout.strip() == expected
+
+    def test_close_pools(self):
+        """ Tests cached connections are closed once the reactor shuts down.
+        """
+
+        process = subprocess.run(
+            [sys.executable, '-c', CLOSED_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == b'1 0 0'
@@ -0,0 +1,132 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import json
+import time
+import pickle
+import tempfile
+import threading
+
+from torvend.profiler import (SamplingProfiler, SPEEDSCOPE_SCHEMA,)
+
+
+def busy_loop(seconds):
+    """ Keeps the calling thread busy.
+    """
+
+    started = time.perf_counter()
+    while (time.perf_counter() - started) < seconds:
+        pass
+
+
+class TestSamplingProfiler(object):
+    """ A collection of sampling profiler testcases.
+    """
+
+    def test_sample(self):
+        """ Tests stacks are sampled from other threads.
+        """
+
+        profiler = SamplingProfiler(interval=0.001)
+        with profiler:
+            assert profiler.running
+            busy_loop(0.2)
+        assert not profiler.running
+        assert profiler.sample_count > 0
+
+        stacks = [
+            stack for stack in profiler.samples
+            if stack[1][0] == threading.current_thread().name
+        ]
+        assert stacks
+        assert any(
+            frame[0] == 'busy_loop'
+            for stack in stacks
+            for frame in stack
+        )
+        assert all(
+            frame[0] != '_run'
+            for stack in profiler.samples
+            for frame in stack[2:]
+        )
+
+        profiler.start()
+        profiler.stop()
+        profiler.stop()
+
+    def test_collapsed(self):
+        """ Tests samples are exported as collapsed stacks.
+        """
+
+        profiler = SamplingProfiler()
+        profiler.sample('MainProcess')
+        profiler.sample('MainProcess')
+        lines = profiler.to_collapsed().splitlines()
+        assert lines
+        for line in lines:
+            (stack, count,) = line.rsplit(' ', 1)
+            assert int(count) >= 1
+            assert stack.startswith('MainProcess;')
+        assert any(
+            'test_collapsed (tests/test_profiler.py:' in line
+            or 'test_collapsed (test_profiler.py:' in line
+            for line in lines
+        )
+
+    def test_speedscope(self):
+        """ Tests samples are exported as speedscope documents.
+        """
+
+        profiler = SamplingProfiler(interval=0.01)
+        for _ in range(3):
+            profiler.sample('MainProcess')
+        document = profiler.to_speedscope(name='test')
+        assert document['$schema'] == SPEEDSCOPE_SCHEMA
+        frame_count = len(document['shared']['frames'])
+        for profile in document['profiles']:
+            assert profile['type'] == 'sampled'
+            assert profile['name'].startswith('MainProcess ')
+            assert len(profile['samples']) == len(profile['weights'])
+            assert abs(
+                profile['endValue'] - sum(profile['weights'])
+            ) < 1e-9
+            assert all(
+                0 <= index < frame_count
+                for sample in profile['samples']
+                for index in sample
+            )
+        assert abs(sum(
+            profile['endValue'] for profile in document['profiles']
+        ) - (profiler.sample_count * 0.01)) < 1e-9
+
+    def test_merge(self):
+        """ Tests profilers are pickled and merged.
+        """
+
+        (first, second,) = (SamplingProfiler(), SamplingProfiler(),)
+        first.sample('MainProcess')
+        second.sample('SpawnProcess-1')
+        second.start()
+        second.stop()
+        first.merge(pickle.loads(pickle.dumps(second)))
+        assert {stack[0][0] for stack in first.samples} >= \
+            {'MainProcess', 'SpawnProcess-1'}
+
+    def test_write(self):
+        """ Tests the file format is chosen by the file extension.
+        """
+
+        profiler = SamplingProfiler()
+        profiler.sample('MainProcess')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (speedscope, collapsed,) = (
+                os.path.join(temp_dir, 'profile.json'),
+                os.path.join(temp_dir, 'profile.folded'),
+            )
+            profiler.write(speedscope)
+            profiler.write(collapsed)
+            with open(speedscope, 'r') as fp:
+                assert json.load(fp)['name'] == 'profile.json'
+            with open(collapsed, 'r') as fp:
+                assert fp.read() == profiler.to_collapsed()
@@ -0,0 +1,51 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import contextlib
+
+from torvend.ratelimit import (TokenBuckets,)
+
+import pytest
+
+
+@contextlib.contextmanager
+def buckets_manager(*args, **kwargs):
+    """ A context manager for token buckets initialization.
+    """
+
+    buckets = TokenBuckets(*args, **kwargs)
+    try:
+        yield buckets
+    finally:
+        del buckets
+
+
+class TestTokenBuckets(object):
+    """ A collection of token bucket testcases.
+    """
+
+    def test_invalid_rate(self):
+        """ Tests initialization with an invalid rate.
+        """
+
+        with pytest.raises(AssertionError):
+            with buckets_manager(['example.com'], 0):
+                pass
+
+    def test_reserve(self):
+        """ Tests reserving tokens delays requests past the burst.
+        """
+
+        with buckets_manager(['example.com'], 10, burst=2) as test_buckets:
+            assert test_buckets.reserve('example.com') == 0.0
+            assert test_buckets.reserve('www.example.com') == 0.0
+            assert test_buckets.reserve('example.com') > 0.0
+            assert test_buckets.reserve('example.com') > 0.1
+
+    def test_unlimited_host(self):
+        """ Tests reserving tokens for hosts which are not limited.
+        """
+
+        with buckets_manager(['example.com'], 1) as test_buckets:
+            for _ in range(10):
+                assert test_buckets.reserve('example.org') == 0.0
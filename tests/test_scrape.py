@@ -0,0 +1,196 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import time
+import socket
+import threading
+import contextlib
+
+from torvend import (scrape,)
+from torvend.items import (Torrent,)
+
+
+class MockTracker(object):
+    """ A local stand-in for a UDP tracker (BEP 15).
+    """
+
+    def __init__(self, counts, error=None, silent=False):
+        """ Initializes the tracker.
+
+        :param dict counts: The (seeders, completed, leechers) of hex hashes
+        :param str error: The error message to respond to scrapes with
+        :param bool silent: True if requests are never answered
+        """
+
+        (self.counts, self.error, self.silent,) = (counts, error, silent,)
+        (self.connects, self.scrapes, self.received,) = ([], [], 0,)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.settimeout(0.05)
+        self.port = self.socket.getsockname()[-1]
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _respond(self, data):
+        """ Builds the response to a request.
+        """
+
+        (connection_id, action, transaction_id,) = \
+            scrape.SCRAPE_REQUEST.unpack_from(data)
+        if action == scrape.ACTION_CONNECT:
+            assert connection_id == scrape.PROTOCOL_ID
+            self.connects.append(transaction_id)
+            return scrape.CONNECT_RESPONSE.pack(
+                scrape.ACTION_CONNECT, transaction_id, 1337
+            )
+
+        assert connection_id == 1337
+        hashes = [
+            data[offset:(offset + 20)].hex()
+            for offset in range(16, len(data), 20)
+        ]
+        self.scrapes.append(hashes)
+        if self.error is not None:
+            return b''.join([
+                scrape.RESPONSE_HEADER.pack(
+                    scrape.ACTION_ERROR, transaction_id
+                ),
+                self.error.encode('utf-8'),
+            ])
+        return b''.join([
+            scrape.RESPONSE_HEADER.pack(scrape.ACTION_SCRAPE, transaction_id),
+        ] + [
+            scrape.SCRAPE_ENTRY.pack(*self.counts.get(info_hash, (0, 0, 0,)))
+            for info_hash in hashes
+        ])
+
+    def _serve(self):
+        """ Serves requests until stopped.
+        """
+
+        while not self._stopped.is_set():
+            try:
+                (data, address,) = self.socket.recvfrom(2048)
+            except socket.timeout:
+                continue
+            self.received += 1
+            if not self.silent:
+                self.socket.sendto(self._respond(data), address)
+
+    def close(self):
+        """ Stops the tracker.
+        """
+
+        self._stopped.set()
+        self._thread.join()
+        self.socket.close()
+
+
+@contextlib.contextmanager
+def tracker_manager(*args, **kwargs):
+    """ A context manager for mock tracker initialization.
+    """
+
+    tracker = MockTracker(*args, **kwargs)
+    try:
+        yield tracker
+    finally:
+        tracker.close()
+
+
+def build_torrent(info_hash, *ports):
+    """ Builds a torrent item announced to local trackers.
+    """
+
+    return Torrent(
+        hash=info_hash, seeders=1, leechers=0,
+        magnet=('magnet:?xt=urn:btih:{info_hash}&{trackers}').format(
+            trackers='&'.join(
+                ('tr=udp://127.0.0.1:{port}/announce').format(port=port)
+                for port in ports
+            ),
+            **locals()
+        )
+    )
+
+
+class TestTrackerScraper(object):
+    """ A collection of tracker scraper testcases.
+    """
+
+    def test_get_trackers(self):
+        """ Tests only UDP trackers of magnets are scraped.
+        """
+
+        assert scrape.get_trackers((
+            'magnet:?xt=urn:btih:abc'
+            '&tr=udp%3A%2F%2FTracker.example.com%3A1337%2Fannounce'
+            '&tr=http://tracker.example.com/announce'
+            '&tr=udp://tracker.example.com:port/announce'
+        )) == [('tracker.example.com', 1337,)]
+        assert scrape.get_trackers(None) == []
+
+    def test_batching(self):
+        """ Tests info hashes are batched into requests of 74 hashes.
+        """
+
+        hashes = [('{idx:040x}').format(idx=idx) for idx in range(1, 101)]
+        with tracker_manager({
+            info_hash: (idx, 0, idx,)
+            for (idx, info_hash,) in enumerate(hashes, start=1)
+        }) as tracker:
+            scraper = scrape.TrackerScraper(timeout=1.0)
+            counts = scraper.scrape({('127.0.0.1', tracker.port,): hashes})
+            assert len(tracker.connects) == 1
+            assert sorted(len(batch) for batch in tracker.scrapes) == [26, 74]
+            assert len(counts) == 100
+            assert counts[hashes[-1]] == (100, 100,)
+
+    def test_refresh(self):
+        """ Tests refreshing torrents keeps the counts of the best tracker.
+        """
+
+        (first, second,) = (('a' * 40), ('b' * 40),)
+        with tracker_manager({first: (5, 1, 7,)}) as low_tracker, \
+                tracker_manager({first: (9, 1, 3,)}) as high_tracker:
+            torrents = [
+                build_torrent(first, low_tracker.port, high_tracker.port),
+                build_torrent(second, low_tracker.port),
+            ]
+            scraper = scrape.TrackerScraper(timeout=1.0)
+            assert scraper.refresh(torrents) == 1
+            assert (torrents[0]['seeders'], torrents[0]['leechers'],) == \
+                (9, 3,)
+            # NOTE: unknown torrents (reported as zeros) are not updated
+            assert (torrents[1]['seeders'], torrents[1]['leechers'],) == \
+                (1, 0,)
+
+    def test_timeout(self):
+        """ Tests unresponsive trackers time out.
+        """
+
+        with tracker_manager({}, silent=True) as tracker:
+            scraper = scrape.TrackerScraper(timeout=0.05, retries=1)
+            started = time.monotonic()
+            counts = scraper.scrape({
+                ('127.0.0.1', tracker.port,): [('a' * 40)],
+            })
+            assert counts == {}
+            assert (time.monotonic() - started) < 1.0
+            # NOTE: the connect request is resent once
+            assert tracker.received == 2
+
+    def test_error(self):
+        """ Tests tracker errors are handled.
+        """
+
+        with tracker_manager({}, error='scrape disabled') as tracker:
+            scraper = scrape.TrackerScraper(timeout=1.0)
+            started = time.monotonic()
+            counts = scraper.scrape({
+                ('127.0.0.1', tracker.port,): [('a' * 40)],
+            })
+            assert counts == {}
+            assert len(tracker.scrapes) == 1
+            assert (time.monotonic() - started) < 1.0
@@ -0,0 +1,349 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import json
+import contextlib
+
+import torvend.spiders
+from torvend.items import (Torrent, TorrentCategory,)
+from torvend.service import (SearchService,)
+
+import twisted.internet.defer
+import twisted.web.server
+from twisted.web.test.requesthelper import (DummyRequest,)
+
+from .test_client import (MockCrawlClient,)
+
+
+@contextlib.contextmanager
+def service_manager(*args, **kwargs):
+    """ A context manager for search service initialization.
+    """
+
+    service = SearchService(
+        MockCrawlClient(allowed=[torvend.spiders.ThePirateBaySpider]),
+        *args, **kwargs
+    )
+    try:
+        yield service
+    finally:
+        del service
+
+
+class StreamingRequest(DummyRequest):
+    """ A dummy request recording (rather than running) its producer.
+    """
+
+    producer = None
+
+    def registerProducer(self, producer, streaming):
+        self.producer = producer
+
+    def unregisterProducer(self):
+        self.producer = None
+
+
+def build_request(**args):
+    """ Builds a dummy search request.
+    """
+
+    request = StreamingRequest([b'search'])
+    request.args = {
+        key.encode('utf-8'): [value.encode('utf-8')]
+        for (key, value,) in args.items()
+    }
+    return request
+
+
+def build_torrent(name):
+    """ Builds a torrent item.
+    """
+
+    return Torrent(
+        spider='tests', name=name, hash=name,
+        categories=[TorrentCategory.Unknown], seeders=1, leechers=0
+    )
+
+
+def read_lines(request):
+    """ Reads the NDJSON lines written to a dummy request.
+    """
+
+    return [
+        json.loads(line)
+        for line in b''.join(request.written).decode('utf-8').splitlines()
+    ]
+
+
+class TestSearchService(object):
+    """ A collection of search service testcases.
+    """
+
+    def test_missing_query(self):
+        """ Tests searching without a query.
+        """
+
+        with service_manager() as test_service:
+            request = build_request()
+            test_service.render_search(request)
+            assert request.responseCode == 400
+
+    def test_coalescing(self):
+        """ Tests identical searches share a single crawl.
+        """
+
+        with service_manager() as test_service:
+            first = build_request(q='Query')
+            assert test_service.render_search(first) == \
+                twisted.web.server.NOT_DONE_YET
+            runner = test_service.client.runners[0]
+            runner.callback(build_torrent('first'))
+
+            second = build_request(q='query ')
+            test_service.render_search(second)
+            assert len(test_service.client.runners) == 1
+            runner.callback(build_torrent('second'))
+            runner.delay.callback(None)
+
+            for request in (first, second,):
+                assert request.finished
+                assert [
+                    torrent['name'] for torrent in read_lines(request)
+                ] == ['first', 'second']
+
+            # finished searches are served from the cache
+            third = build_request(q='query')
+            test_service.render_search(third)
+            assert len(test_service.client.runners) == 1
+            assert len(read_lines(third)) == 2
+
+    def test_admission_control(self):
+        """ Tests searches beyond the maximum concurrency are rejected.
+        """
+
+        with service_manager(max_concurrency=1) as test_service:
+            test_service.render_search(build_request(q='first'))
+            request = build_request(q='second')
+            test_service.render_search(request)
+            assert request.responseCode == 503
+            assert len(test_service.client.runners) == 1
+
+    def test_admission_control_replaced(self):
+        """ Tests crawls which can no longer be joined count as running.
+        """
+
+        with service_manager(max_concurrency=2) as test_service:
+            test_service.client.settings = {'TORVEND_MAX_REPLAYED_ITEMS': 2}
+            test_service.render_search(build_request(q='query'))
+            for name in ('a', 'b', 'c',):
+                test_service.client.runners[0].callback(
+                    item=build_torrent(name)
+                )
+
+            # the running crawl of the same search is replaced
+            test_service.render_search(build_request(q='query'))
+            assert len(test_service.client.runners) == 2
+            assert len(test_service.client.in_flight) == 1
+            request = build_request(q='other')
+            test_service.render_search(request)
+            assert request.responseCode == 503
+            assert len(test_service.client.runners) == 2
+            health = json.loads(test_service.render_health(build_request()))
+            assert health['in_flight'] == 2
+
+            test_service.client.runners[0].delay.callback(None)
+            request = build_request(q='other')
+            test_service.render_search(request)
+            assert request.responseCode != 503
+            assert len(test_service.client.runners) == 3
+
+    def test_search_failed(self, monkeypatch):
+        """ Tests searches failing to start are answered with an error.
+        """
+
+        def _build_runner(*args, **kwargs):
+            raise ValueError('failed')
+
+        with service_manager() as test_service:
+            monkeypatch.setattr(
+                test_service.client, '_build_runner', _build_runner
+            )
+            request = build_request(q='query')
+            response = test_service.render_search(request)
+            assert request.responseCode == 500
+            assert json.loads(response) == {'error': 'search failed'}
+            assert len(test_service.client.running) == 0
+
+    def test_health(self):
+        """ Tests the health endpoint.
+        """
+
+        with service_manager() as test_service:
+            test_service.render_search(build_request(q='query'))
+            health = json.loads(test_service.render_health(build_request()))
+            assert health['in_flight'] == 1
+
+    def test_metrics(self):
+        """ Tests crawls and cache lookups are exposed as metrics.
+        """
+
+        # NOTE: local import to avoid loading metrics for other testcases
+        from torvend.metrics import (MetricsRegistry,)
+
+        with service_manager() as test_service:
+            request = build_request()
+            test_service.render_metrics(request)
+            assert request.responseCode == 404
+
+            test_service.client.metrics = MetricsRegistry()
+            test_service.render_search(build_request(q='query'))
+            test_service.render_search(build_request(q='query'))
+            test_service.client.runners[0].delay.callback(None)
+            test_service.render_search(build_request(q='query'))
+
+            request = build_request()
+            lines = test_service.render_metrics(
+                request
+            ).decode('utf-8').splitlines()
+            assert request.responseHeaders.getRawHeaders(
+                b'Content-Type'
+            )[0].startswith(b'text/plain; version=0.0.4')
+            for line in (
+                'torvend_crawls_total{mode="started"} 1',
+                'torvend_crawls_total{mode="joined"} 1',
+                'torvend_crawls_in_flight 0',
+                'torvend_cache_requests_total{result="miss"} 2',
+                'torvend_cache_requests_total{result="hit"} 1',
+            ):
+                assert line in lines
+
+    def test_refresh_stale(self):
+        """ Tests stale cached searches are renewed with scraped counts.
+        """
+
+        # NOTE: local import to avoid loading the scraper for other testcases
+        from torvend.cache import (ResultCache,)
+        from torvend.scrape import (TrackerScraper,)
+
+        with service_manager(
+            result_cache=ResultCache(ttl=0.0, stale_ttl=60.0),
+            scraper=TrackerScraper()
+        ) as test_service:
+            key = test_service.client.get_search_key('query', results=25)
+            torrents = [build_torrent('first'), build_torrent('second')]
+            test_service.result_cache.set(key, torrents)
+            assert test_service.result_cache.is_stale(key)
+
+            test_service.result_cache.ttl = 60.0
+            test_service._renew_cached({'first': (9, 3,)}, key, torrents)
+            assert not test_service.result_cache.is_stale(key)
+            assert (torrents[0]['seeders'], torrents[0]['leechers'],) == \
+                (9, 3,)
+            assert torrents[1]['seeders'] == 1
+
+            request = build_request(q='query')
+            test_service.render_search(request)
+            assert len(test_service.client.runners) == 0
+            assert read_lines(request)[0]['seeders'] == 9
+
+    def test_refresh_stale_coalesced(self, monkeypatch):
+        """ Tests stale searches are served right away and refreshed once.
+        """
+
+        # NOTE: local import to avoid loading the scraper for other testcases
+        import twisted.internet.threads
+        from torvend.cache import (ResultCache,)
+        from torvend.scrape import (TrackerScraper,)
+
+        scrapes = []
+
+        def _defer_to_thread(function, *args):
+            scrapes.append(twisted.internet.defer.Deferred())
+            return scrapes[-1]
+
+        monkeypatch.setattr(
+            twisted.internet.threads, 'deferToThread', _defer_to_thread
+        )
+        with service_manager(
+            result_cache=ResultCache(ttl=0.0, stale_ttl=60.0),
+            scraper=TrackerScraper()
+        ) as test_service:
+            test_service.scraper.build_requests = lambda torrents: []
+            key = test_service.client.get_search_key('query', results=25)
+            torrents = [build_torrent('first')]
+            test_service.result_cache.set(key, torrents)
+
+            requests = [build_request(q='query') for _ in range(3)]
+            for request in requests:
+                test_service.render_search(request)
+                assert request.finished
+                assert read_lines(request)[0]['seeders'] == 1
+            assert len(scrapes) == 1
+
+            test_service.result_cache.ttl = 60.0
+            scrapes[0].callback({'first': (9, 3,)})
+            assert not test_service.result_cache.is_stale(key)
+            assert torrents[0]['seeders'] == 9
+
+            # failed refreshes can be retried
+            test_service.result_cache.ttl = 0.0
+            test_service.result_cache.set(key, torrents)
+            test_service.render_search(build_request(q='query'))
+            scrapes[1].errback(Exception('timeout'))
+            test_service.render_search(build_request(q='query'))
+            assert len(scrapes) == 3
+
+    def test_replay_bounded(self):
+        """ Tests paused clients do not keep more than the replayed items.
+        """
+
+        with service_manager() as test_service:
+            test_service.client.settings = {'TORVEND_MAX_REPLAYED_ITEMS': 2}
+            first = build_request(q='query')
+            test_service.render_search(first)
+            first.producer.pauseProducing()
+            (in_flight,) = test_service.client.in_flight.values()
+            for name in ('a', 'b', 'c', 'd',):
+                test_service.client.runners[0].callback(
+                    item=build_torrent(name)
+                )
+            assert in_flight.torrents is None and in_flight.count == 4
+
+            # crawls without a complete replay are not joined (or cached)
+            second = build_request(q='query')
+            test_service.render_search(second)
+            assert len(test_service.client.runners) == 2
+            test_service.client.runners[0].delay.callback(None)
+            assert len(read_lines(first)) == 4
+            assert len(test_service.result_cache) == 0
+            test_service.client.runners[1].delay.callback(None)
+            assert len(test_service.client.in_flight) == 0
+            assert len(test_service.result_cache) == 1
+
+    def test_backpressure(self):
+        """ Tests slow clients pause the crawl of their search.
+        """
+
+        with service_manager() as test_service:
+            (first, second,) = (
+                build_request(q='query'), build_request(q='query'),
+            )
+            for request in (first, second,):
+                test_service.render_search(request)
+            (in_flight,) = test_service.client.in_flight.values()
+            backpressure = in_flight.backpressure
+
+            # the crawl is paused while any client is paused
+            first.producer.pauseProducing()
+            second.producer.pauseProducing()
+            assert backpressure.paused
+            first.producer.resumeProducing()
+            assert backpressure.paused
+            second.processingFailed(Exception('disconnected'))
+            assert not backpressure.paused
+            assert backpressure.pauses == 1
+
+            first.producer.pauseProducing()
+            test_service.client.runners[0].delay.callback(None)
+            assert not backpressure.paused
+            assert first.finished and first.producer is None
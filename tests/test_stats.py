@@ -0,0 +1,160 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import pickle
+import asyncio
+import unittest.mock
+
+from torvend import (stats,)
+
+
+class TestSearchStats(object):
+    """ A collection of search stats testcases.
+    """
+
+    def test_histogram(self):
+        """ Tests histograms record durations into buckets.
+        """
+
+        histogram = stats.Histogram()
+        assert (histogram.mean, histogram.get_percentile(50),) == (0.0, 0.0,)
+        for seconds in (0.00005, 0.001, 0.001, 0.01, 100.0,):
+            histogram.record(seconds)
+        assert histogram.count == 5
+        assert (histogram.minimum, histogram.maximum,) == (0.00005, 100.0,)
+        assert abs(histogram.mean - (100.01205 / 5)) < 1e-9
+        assert histogram.get_percentile(0) == stats.BUCKETS[0]
+        assert 0.001 <= histogram.get_percentile(50) < 0.002
+        assert histogram.get_percentile(100) == 100.0
+
+        exported = histogram.to_dict()
+        assert exported['count'] == 5
+        assert exported['buckets'][-1] == [None, 5]
+        assert [
+            count for (_, count,) in exported['buckets']
+        ] == sorted(count for (_, count,) in exported['buckets'])
+
+    def test_histogram_merge(self):
+        """ Tests histograms are merged.
+        """
+
+        (first, second,) = (stats.Histogram(), stats.Histogram(),)
+        first.record(0.5)
+        second.record(0.25)
+        second.record(2.0)
+        first.merge(second)
+        assert (first.count, first.total,) == (3, 2.75,)
+        assert (first.minimum, first.maximum,) == (0.25, 2.0,)
+        assert sum(first.counts) == 3
+
+        empty = stats.Histogram()
+        empty.merge(stats.Histogram())
+        assert (empty.minimum, empty.maximum,) == (None, None,)
+
+    def test_timer(self):
+        """ Tests timers record the duration of their block.
+        """
+
+        search_stats = stats.SearchStats()
+        with search_stats.timer('test', 'parse'):
+            pass
+        try:
+            with search_stats.timer('test', 'parse'):
+                raise ValueError()
+        except ValueError:
+            pass
+        assert search_stats.get_histogram('test', 'parse').count == 2
+        assert search_stats.get_histogram('test', 'soup') is None
+        assert search_stats.spiders == ['test']
+
+    def test_merge(self):
+        """ Tests search stats are merged and pickled.
+        """
+
+        (first, second,) = (stats.SearchStats(), stats.SearchStats(),)
+        first.record('a', 'download', 0.5)
+        first.items['a'] = 2
+        second.record('a', 'download', 0.25)
+        second.record('b', 'parse', 0.1)
+        second.items.update({'a': 1, 'b': 3})
+        first.merge(pickle.loads(pickle.dumps(second)))
+        assert first.get_histogram('a', 'download').count == 2
+        assert first.get_histogram('b', 'parse').count == 1
+        assert first.items == {'a': 3, 'b': 3}
+        assert first.spiders == ['a', 'b']
+
+    def test_get_report(self):
+        """ Tests reports are ordered by spider and pipeline stage.
+        """
+
+        search_stats = stats.SearchStats()
+        for (spider_name, stage,) in (
+            (stats.CLIENT, 'search',), ('b', 'parse',), ('b', 'download',),
+            ('a', 'size',), ('a', 'queue',),
+        ):
+            search_stats.record(spider_name, stage, 0.1)
+        assert [
+            (spider_name, stage,)
+            for (spider_name, stage, _,) in search_stats.get_report()
+        ] == [
+            ('a', 'queue',), ('a', 'size',),
+            ('b', 'download',), ('b', 'parse',),
+            (stats.CLIENT, 'search',),
+        ]
+        exported = search_stats.to_dict()
+        assert sorted(exported) == ['a', 'b', stats.CLIENT]
+        assert sorted(exported['a']['stages']) == ['queue', 'size']
+
+    def test_signals(self):
+        """ Tests crawler signals record queueing, downloads and items.
+        """
+
+        search_stats = stats.SearchStats()
+        (spider, request,) = (unittest.mock.Mock(), unittest.mock.Mock(),)
+        spider.name = 'test'
+        request.meta = {}
+        search_stats._request_scheduled(request, spider=spider)
+        assert stats.SCHEDULED_KEY in request.meta
+        request.meta['download_latency'] = 0.0
+        search_stats._response_received(None, request, spider)
+        request.meta['torrent'] = {}
+        search_stats._response_received(None, request, spider)
+        search_stats._item_scraped({}, spider)
+        assert search_stats.get_histogram('test', 'download').count == 1
+        assert search_stats.get_histogram('test', 'detail').count == 1
+        assert search_stats.get_histogram('test', 'queue').count == 2
+        assert search_stats.items == {'test': 1}
+
+    def test_middleware(self):
+        """ Tests the timing middleware records callback durations.
+        """
+
+        crawler = unittest.mock.Mock()
+        crawler.spider.name = 'test'
+        crawler.spider.search_stats = stats.SearchStats()
+        middleware = stats.TimingMiddleware.from_crawler(crawler)
+        assert list(
+            middleware.process_spider_output(None, iter([1, 2, 3]))
+        ) == [1, 2, 3]
+
+        async def _results():
+            for entry in (4, 5,):
+                yield entry
+
+        async def _consume():
+            return [
+                entry
+                async for entry in middleware.process_spider_output_async(
+                    None, _results()
+                )
+            ]
+
+        assert asyncio.run(_consume()) == [4, 5]
+        assert crawler.spider.search_stats.get_histogram(
+            'test', 'parse'
+        ).count == 2
+
+        crawler.spider.search_stats = None
+        assert list(
+            middleware.process_spider_output(None, iter([1]))
+        ) == [1]
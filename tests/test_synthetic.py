@@ -0,0 +1,93 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import torvend.spiders
+from torvend.items import (Torrent,)
+from torvend.spiders.rarbg import (RarbgSpider,)
+
+import pytest
+import scrapy.http
+
+from . import (synthetic,)
+
+SPIDER_CLASSES = [
+    torvend.spiders.ThePirateBaySpider,
+    torvend.spiders.IDopeSpider,
+    torvend.spiders.LimeTorrentsSpider,
+    torvend.spiders.OneThreeThreeSevenXSpider,
+    RarbgSpider,
+    torvend.spiders.TorlockSpider,
+    torvend.spiders.SkyTorrentsSpider,
+    torvend.spiders.Torrentz2Spider,
+]
+
+
+def build_response(spider, body, request=None):
+    """ Builds a response of a synthetic page for a spider.
+    """
+
+    if request is None:
+        request = scrapy.http.Request(
+            spider.get_url(spider.query, spider.paging_index)
+        )
+    return scrapy.http.TextResponse(
+        url=request.url, request=request, body=body, encoding='utf-8'
+    )
+
+
+class TestSynthetic(object):
+    """ A collection of synthetic page testcases.
+    """
+
+    def test_generate_rows(self):
+        """ Tests generated rows are seeded, unique and ordered.
+        """
+
+        rows = synthetic.generate_rows(500, seed=1)
+        assert rows == synthetic.generate_rows(500, seed=1)
+        assert rows != synthetic.generate_rows(500, seed=2)
+        assert len(set(row['hash'] for row in rows)) == 500
+        assert len(set(row['kind'] for row in rows)) == len(synthetic.KINDS)
+        assert [row['seeders'] for row in rows] == sorted(
+            (row['seeders'] for row in rows), reverse=True
+        )
+        assert all(row['seeders'] >= 0 for row in rows)
+
+        # NOTE: sizes are spread around the median of their kind
+        movie_sizes = sorted(
+            row['size'] for row in rows
+            if row['kind'] == 'movie'
+        )
+        book_sizes = sorted(
+            row['size'] for row in rows
+            if row['kind'] == 'book'
+        )
+        assert movie_sizes[0] < movie_sizes[-1]
+        assert book_sizes[len(book_sizes) // 2] < \
+            movie_sizes[len(movie_sizes) // 2]
+
+    @pytest.mark.parametrize(
+        'spider_class', SPIDER_CLASSES,
+        ids=[spider_class.name for spider_class in SPIDER_CLASSES]
+    )
+    def test_parse(self, spider_class):
+        """ Tests synthetic pages are parsed by their spider.
+        """
+
+        spider = spider_class(query='test')
+        # NOTE: avoid resolving the spider's domains
+        spider._active_domains = list(spider.allowed_domains)
+        results = list(spider.parse(build_response(
+            spider, synthetic.build_listing(spider_class.name, 25)
+        )))
+        assert len(results) == 25
+
+        detail = synthetic.build_detail(spider_class.name)
+        if detail is None:
+            assert all(isinstance(result, Torrent) for result in results)
+            return
+        (torrent,) = spider._parse_torrent(
+            build_response(spider, detail, request=results[0])
+        )
+        assert isinstance(torrent, Torrent)
+        assert len(torrent['hash']) == 40
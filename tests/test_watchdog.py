@@ -0,0 +1,168 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import sys
+import time
+import pickle
+import subprocess
+
+from torvend.metrics import (MetricsRegistry,)
+from torvend.watchdog import (UNKNOWN, StallWatchdog,)
+
+from .test_client import (MockSpider,)
+
+import scrapy
+
+STALLED_SEARCH = """
+import asyncio
+
+async def search():
+    from torvend.client import (TorvendClient, start_asyncio_reactor,)
+    start_asyncio_reactor()
+    from torvend.metrics import (MetricsRegistry,)
+    from torvend.watchdog import (StallWatchdog,)
+    from tests.test_client import (mock_site,)
+    from tests.test_watchdog import (StallingSpider,)
+
+    stall_watchdog = StallWatchdog(threshold=0.1)
+    with mock_site() as mock_url:
+        test_client = TorvendClient(
+            settings={'MOCK_URL': mock_url, 'LOG_ENABLED': False},
+            allowed=[StallingSpider], metrics=MetricsRegistry(),
+            stall_watchdog=stall_watchdog
+        )
+        discovered = await test_client.search_async('alpha')
+    # NOTE: first imports of modules may stall the reactor too
+    stalls = [
+        stall
+        for stall in stall_watchdog.stalls
+        if stall.callback == 'parse'
+    ]
+    histogram = test_client.metrics.families[
+        'torvend_reactor_stall_seconds'
+    ].values[('stalling', 'parse',)]
+    print(
+        len(discovered), len(stalls), stalls[0].seconds >= 0.3,
+        stalls[0].spider, stalls[0].stack[-1][-1],
+        histogram.count >= 1
+    )
+
+asyncio.run(search())
+"""
+
+
+class StallingSpider(MockSpider):
+    """ A spider which blocks the reactor thread while parsing.
+    """
+
+    name = 'stalling'
+
+    def _block(self):
+        time.sleep(0.4)
+
+    def parse(self, response):
+        self._block()
+        return super().parse(response)
+
+
+class WatchedSpider(scrapy.Spider):
+    """ A spider whose callback attributes its own stack.
+    """
+
+    name = 'watched'
+
+    def parse(self, stall_watchdog):
+        return _attribute(stall_watchdog)
+
+
+class InheritingSpider(WatchedSpider):
+    """ A spider calling the callback of the spider it inherits from.
+    """
+
+    name = 'inheriting'
+
+    def watch(self, stall_watchdog):
+        return self.parse(stall_watchdog)
+
+
+def _attribute(stall_watchdog):
+    return stall_watchdog.attribute(sys._getframe())
+
+
+class TestStallWatchdog(object):
+    """ A collection of reactor stall watchdog testcases.
+    """
+
+    def test_attribute(self):
+        """ Tests stacks are attributed to the outermost spider callback.
+        """
+
+        stall_watchdog = StallWatchdog(stack_limit=2)
+        (spider, callback, stack,) = WatchedSpider().parse(stall_watchdog)
+        assert (spider, callback,) == ('watched', 'parse',)
+        assert [name for (_, _, name,) in stack] == ['parse', '_attribute']
+
+        (spider, callback, _,) = _attribute(stall_watchdog)
+        assert (spider, callback,) == (UNKNOWN, UNKNOWN,)
+
+        # methods are attributed by their code (rather than their instance)
+        (spider, callback, _,) = InheritingSpider().watch(stall_watchdog)
+        assert (spider, callback,) == ('inheriting', 'watch',)
+        assert len(stall_watchdog.get_spiders(
+            scrapy.Spider.__init__.__code__
+        )) > 2
+
+    def test_beat(self):
+        """ Tests overdue heartbeats are recorded as attributed stalls.
+        """
+
+        stall_watchdog = StallWatchdog(
+            threshold=0.1, metrics=MetricsRegistry()
+        )
+        stall_watchdog._last_beat = time.monotonic()
+        stall_watchdog._beat()
+        assert len(stall_watchdog.stalls) == 0
+
+        stall_watchdog._last_beat = (time.monotonic() - 1.0)
+        stall_watchdog._samples = [
+            ('a', 'parse', (('first.py', 1, 'first',),),),
+            ('b', 'parse', (('second.py', 1, 'second',),),),
+            ('a', 'parse', (('third.py', 1, 'third',),),),
+        ]
+        stall_watchdog._beat()
+        (stall,) = stall_watchdog.stalls
+        assert (stall.spider, stall.callback, stall.stack,) == \
+            ('a', 'parse', (('third.py', 1, 'third',),),)
+        assert 0.9 <= stall.seconds <= 1.0
+        assert len(stall_watchdog._samples) == 0
+
+        # stalls which were never sampled are not attributed
+        stall_watchdog._last_beat = (time.monotonic() - 1.0)
+        stall_watchdog._beat()
+        assert stall_watchdog.stalls[-1][1:] == (UNKNOWN, UNKNOWN, (),)
+        assert sorted(stall_watchdog.metrics.families[
+            'torvend_reactor_stall_seconds'
+        ].values) == [('a', 'parse',), (UNKNOWN, UNKNOWN,)]
+
+    def test_pickle(self):
+        """ Tests watchdogs are pickled without their monitoring state.
+        """
+
+        stall_watchdog = StallWatchdog(threshold=0.5)
+        (stall_watchdog.reactor_thread, stall_watchdog._samples,) = \
+            (1, [('a', 'parse', (),)],)
+        loaded = pickle.loads(pickle.dumps(stall_watchdog))
+        assert (loaded.threshold, loaded.running, loaded._samples,) == \
+            (0.5, False, [],)
+
+    def test_search_stalled(self):
+        """ Tests stalls of a search are attributed to the blocking spider.
+        """
+
+        process = subprocess.run(
+            [sys.executable, '-c', STALLED_SEARCH],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, check=True, timeout=60
+        )
+        assert process.stdout.strip() == b'3 1 True stalling _block True'
@@ -0,0 +1,383 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import collections
+
+from . import (meta,)
+
+
+class Backpressure(meta.Loggable):
+    """ Pauses the engines of a crawl while any of its consumers is full.
+
+    Consumers hold the crawl paused (see
+    :func:`~torvend.backpressure.Backpressure.pause`) until they release it
+    again, so the crawl only continues once every consumer caught up.
+    Paused engines stop sending scheduled requests and requests already
+    sent to the downloader are held until resumed (see
+    :class:`~torvend.pool.PooledDownloadHandler`), so only the responses
+    already being downloaded still produce items.
+    """
+
+    def __init__(self, crawlers=(), metrics=None):
+        """ Initializes the backpressure.
+
+        :param crawlers: The crawlers of the crawl
+        :type crawlers: list[scrapy.crawler.Crawler]
+        :param metrics: The registry to count pauses in
+        :type metrics: torvend.metrics.MetricsRegistry
+        """
+
+        (self.crawlers, self.metrics,) = (list(crawlers), metrics,)
+        # NOTE: the consumers holding the crawl paused
+        (self.holders, self.pauses, self._waiters,) = (set(), 0, [],)
+        for crawler in self.crawlers:
+            crawler.backpressure = self
+
+    def __repr__(self):
+        """ Returns a string representation of the backpressure.
+
+        :returns: A string representation of the backpressure
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} paused={self.paused} '
+            'pauses={self.pauses}>'
+        ).format(**locals())
+
+    @property
+    def paused(self):
+        """ Indicates if the crawl is paused.
+
+        :getter: Returns True if any consumer holds the crawl paused
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return len(self.holders) > 0
+
+    @property
+    def engines(self):
+        """ The engines of the crawl's started crawlers.
+
+        :getter: Returns the engines of the started crawlers
+        :setter: Does not allow setting
+        :rtype: list[scrapy.core.engine.ExecutionEngine]
+        """
+
+        return [
+            crawler.engine
+            for crawler in self.crawlers
+            if getattr(crawler, 'engine', None) is not None
+        ]
+
+    def pause(self, holder):
+        """ Pauses the crawl until the holder resumes it.
+
+        :param holder: The consumer holding the crawl paused
+        :rtype: None
+        """
+
+        if holder in self.holders:
+            return
+        self.holders.add(holder)
+        if len(self.holders) > 1:
+            return
+
+        self.pauses += 1
+        if self.metrics is not None:
+            self.metrics.inc('torvend_crawl_pauses_total')
+        self.log.debug((
+            'pausing crawl for consumer `{holder}`'
+        ).format(**locals()))
+        for engine in self.engines:
+            engine.pause()
+
+    def resume(self, holder):
+        """ Resumes the crawl if no other consumer holds it paused.
+
+        :param holder: The consumer which held the crawl paused
+        :rtype: None
+        """
+
+        if holder not in self.holders:
+            return
+        self.holders.discard(holder)
+        if self.paused:
+            return
+
+        self.log.debug((
+            'resuming crawl for consumer `{holder}`'
+        ).format(**locals()))
+        for engine in self.engines:
+            engine.unpause()
+            # NOTE: unpaused engines otherwise wait for their heartbeat
+            slot = getattr(engine, '_slot', None)
+            if slot is not None:
+                slot.nextcall.schedule()
+        (waiters, self._waiters,) = (self._waiters, [],)
+        for delay in waiters:
+            delay.callback(None)
+
+    def wait(self):
+        """ Waits for the crawl to be resumed.
+
+        :returns: A deferred which fires once the crawl is not paused
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.defer
+
+        if not self.paused:
+            return twisted.internet.defer.succeed(None)
+        delay = twisted.internet.defer.Deferred()
+        self._waiters.append(delay)
+        return delay
+
+
+class ItemQueue(meta.Loggable):
+    """ A bounded queue of discovered items between a crawl and a consumer.
+
+    The crawl is paused once the queue holds ``maxsize`` items and resumed
+    once the consumer has drained it to ``low_water`` items, so the memory
+    of slow consumers stays bounded.
+    """
+
+    def __init__(self, maxsize=1000, low_water=None, backpressure=None):
+        """ Initializes the item queue.
+
+        :param int maxsize: The number of queued items pausing the crawl
+        :param int low_water: The number of queued items resuming the crawl
+            (default: half of ``maxsize``)
+        :param Backpressure backpressure: The backpressure of the crawl
+        """
+
+        self.maxsize = max(1, maxsize)
+        self.low_water = (
+            (self.maxsize // 2)
+            if low_water is None else
+            min(low_water, (self.maxsize - 1))
+        )
+        (self.items, self.backpressure, self._waiters,) = \
+            (collections.deque(), None, [],)
+        (self.finished, self.closed,) = (False, False,)
+        if backpressure is not None:
+            self.attach(backpressure)
+
+    def __repr__(self):
+        """ Returns a string representation of the item queue.
+
+        :returns: A string representation of the item queue
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} ({size}/{self.maxsize})>'
+        ).format(size=len(self), **locals())
+
+    def __len__(self):
+        """ Returns the number of queued items.
+
+        :returns: The number of queued items
+        :rtype: int
+        """
+
+        return len(self.items)
+
+    @property
+    def full(self):
+        """ Indicates if the queue should pause the crawl.
+
+        :getter: Returns True if the queue holds ``maxsize`` items
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return len(self.items) >= self.maxsize
+
+    def attach(self, backpressure):
+        """ Attaches the queue to the backpressure of a crawl.
+
+        :param Backpressure backpressure: The backpressure of the crawl
+        :rtype: None
+        """
+
+        self.backpressure = backpressure
+        if self.full and not self.closed:
+            self.backpressure.pause(self)
+
+    def _wake(self):
+        """ Fires the deferreds of all waiting consumers.
+
+        :rtype: None
+        """
+
+        (waiters, self._waiters,) = (self._waiters, [],)
+        for delay in waiters:
+            delay.callback(None)
+
+    def put(self, item, **kwargs):
+        """ Queues a discovered item (an item callback of the crawl).
+
+        :param torvend.items.Torrent item: The discovered torrent item
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        if self.closed:
+            return
+        self.items.append(item)
+        if self.full and self.backpressure is not None:
+            self.backpressure.pause(self)
+        if self._waiters:
+            self._wake()
+
+    def pop(self):
+        """ Takes the oldest queued item.
+
+        :raises IndexError: If the queue is empty
+        :returns: The oldest queued item
+        :rtype: torvend.items.Torrent
+        """
+
+        item = self.items.popleft()
+        if len(self.items) <= self.low_water and \
+                self.backpressure is not None:
+            self.backpressure.resume(self)
+        return item
+
+    def wait(self):
+        """ Waits for queued items (or the end of the crawl).
+
+        :returns: A deferred which fires once items are queued or the crawl
+            has finished
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.defer
+
+        if len(self.items) > 0 or self.finished:
+            return twisted.internet.defer.succeed(None)
+        delay = twisted.internet.defer.Deferred()
+        self._waiters.append(delay)
+        return delay
+
+    def finish(self, result=None):
+        """ Marks the crawl as finished.
+
+        :param result: The result of the crawl deferred
+        :returns: The given result
+        """
+
+        self.finished = True
+        self._wake()
+        return result
+
+    def close(self):
+        """ Drops queued items and stops queueing (for example when the
+        consumer stopped early).
+
+        :rtype: None
+        """
+
+        self.closed = True
+        self.items.clear()
+        if self.backpressure is not None:
+            self.backpressure.resume(self)
+
+
+class ShardQueue(meta.Loggable):
+    """ Puts the items of a sharded worker on a queue of the parent process.
+
+    The parent counts the items of each shard it passed to its callback
+    (items of later shards are buffered until earlier shards finished), so
+    the worker's crawl is paused while ``maxsize`` of its items are still
+    queued or buffered by the parent.
+    """
+
+    def __init__(
+        self, shard_index, result_queue, consumed,
+        maxsize=1000, interval=0.1, clock=None
+    ):
+        """ Initializes the shard queue.
+
+        :param int shard_index: The index of the worker's shard
+        :param multiprocessing.Queue result_queue: The queue to put items on
+        :param consumed: The number of items of every shard passed to the
+            parent's callback
+        :type consumed: multiprocessing.sharedctypes.RawArray
+        :param int maxsize: The number of unconsumed items pausing the crawl
+        :param float interval: The seconds between checking if the parent
+            consumed enough items to resume a paused crawl
+        :param clock: The clock to check the parent on (default: the reactor)
+        :type clock: twisted.internet.interfaces.IReactorTime
+        """
+
+        (self.shard_index, self.result_queue, self.consumed,) = \
+            (shard_index, result_queue, consumed,)
+        (self.maxsize, self.interval, self.clock,) = \
+            (max(1, maxsize), interval, clock,)
+        (self.produced, self.backpressure, self._checking,) = (0, None, None,)
+
+    def __repr__(self):
+        """ Returns a string representation of the shard queue.
+
+        :returns: A string representation of the shard queue
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} shard={self.shard_index} '
+            '({pending}/{self.maxsize})>'
+        ).format(pending=self.pending, **locals())
+
+    @property
+    def pending(self):
+        """ The number of items the parent has not consumed yet.
+
+        :getter: Returns the number of unconsumed items
+        :setter: Does not allow setting
+        :rtype: int
+        """
+
+        return (self.produced - self.consumed[self.shard_index])
+
+    def put(self, item, **kwargs):
+        """ Puts a discovered item on the parent's queue (an item callback
+        of the crawl).
+
+        :param torvend.items.Torrent item: The discovered torrent item
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        self.result_queue.put((self.shard_index, item,))
+        self.produced += 1
+        if self.pending < self.maxsize or self.backpressure is None or \
+                self._checking is not None:
+            return
+
+        # NOTE: local import to speed up module loading (installs reactor)
+        import twisted.internet.task
+
+        self.backpressure.pause(self)
+        self._checking = twisted.internet.task.LoopingCall(self._check)
+        if self.clock is not None:
+            self._checking.clock = self.clock
+        self._checking.start(self.interval, now=False)
+
+    def _check(self):
+        """ Resumes the crawl once the parent consumed half of its items.
+
+        :rtype: None
+        """
+
+        if self.pending > (self.maxsize // 2):
+            return
+        self._checking.stop()
+        self._checking = None
+        self.backpressure.resume(self)
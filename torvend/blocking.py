@@ -0,0 +1,138 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import sys
+import threading
+
+from . import (meta,)
+
+# NOTE: the audit events of calls blocking the calling thread
+BLOCKING_EVENTS = frozenset([
+    'time.sleep',
+    'socket.gethostbyname',
+    'socket.gethostbyaddr',
+    'socket.getaddrinfo',
+    'socket.getnameinfo',
+    'socket.connect',
+    'subprocess.Popen',
+    'os.system',
+    'urllib.Request',
+])
+
+
+class BlockingCallDetector(meta.Loggable):
+    """ Detects (and logs) blocking calls made on the reactor thread.
+
+    Blocking calls are detected with an audit hook (see :pep:`578`), so any
+    ``time.sleep``, name resolution, blocking ``socket.connect`` or
+    subprocess made on the reactor thread is logged once per event and
+    calling location, along with the stack of the call.
+    Audit hooks can not be removed, so the detector only checks calls once
+    started and ignores all calls once stopped.
+    """
+
+    def __init__(self, stack_limit=8):
+        """ Initializes the detector.
+
+        :param int stack_limit: The number of frames of logged stacks
+        """
+
+        self.stack_limit = stack_limit
+        # NOTE: the identifier of the reactor thread (None if stopped)
+        (self.reactor_thread, self.installed, self.seen,) = (None, False, {},)
+
+    def __repr__(self):
+        """ Returns a string representation of the detector.
+
+        :returns: A string representation of the detector
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} running={self.running} '
+            'detected={detected}>'
+        ).format(detected=sum(self.seen.values()), **locals())
+
+    @property
+    def running(self):
+        """ Indicates if the detector checks calls.
+
+        :getter: Returns True if the detector checks calls
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return self.reactor_thread is not None
+
+    def start(self, reactor_thread=None):
+        """ Starts checking calls of the reactor thread.
+
+        :param int reactor_thread: The identifier of the reactor thread
+            (default: the calling thread)
+        :rtype: None
+        """
+
+        if reactor_thread is None:
+            reactor_thread = threading.get_ident()
+        if not self.installed:
+            sys.addaudithook(self.audit)
+            self.installed = True
+        self.reactor_thread = reactor_thread
+
+    def stop(self):
+        """ Stops checking calls.
+
+        :rtype: None
+        """
+
+        self.reactor_thread = None
+
+    def is_blocking(self, event, args):
+        """ Checks if an audit event is a blocking call.
+
+        :param str event: The name of the audit event
+        :param tuple args: The arguments of the audit event
+        :returns: True if the event blocks the calling thread
+        :rtype: bool
+        """
+
+        if event not in BLOCKING_EVENTS:
+            return False
+        if event == 'socket.connect':
+            # NOTE: the reactor only connects non-blocking sockets
+            return args[0].gettimeout() != 0
+        return True
+
+    def audit(self, event, args):
+        """ Logs an audit event if it is a blocking call of the reactor.
+
+        :param str event: The name of the audit event
+        :param tuple args: The arguments of the audit event
+        :rtype: None
+        """
+
+        if self.reactor_thread != threading.get_ident() or \
+                not self.is_blocking(event, args):
+            return
+
+        # NOTE: local import to speed up module loading
+        import traceback
+
+        # NOTE: skips the frames of the detector
+        stack = traceback.extract_stack(sys._getframe(1))[-self.stack_limit:]
+        caller = (
+            (stack[-1].filename, stack[-1].lineno,)
+            if stack else
+            None
+        )
+        key = (event, caller,)
+        self.seen[key] = self.seen.get(key, 0) + 1
+        if self.seen[key] > 1:
+            return
+        self.log.debug((
+            'blocking call `{event}` on the reactor thread\n{formatted}'
+        ).format(formatted=''.join(traceback.format_list(stack)), **locals()))
+
+
+# NOTE: blocking calls are detected by a single detector per process
+detector = BlockingCallDetector()
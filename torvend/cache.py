@@ -0,0 +1,129 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import time
+import collections
+
+from . import (meta,)
+
+
+class ResultCache(meta.Loggable):
+    """ A bounded in-memory cache of search results which expire over time.
+
+    Expired results can be kept as stale for a while, which allows their
+    seeders and leechers to be refreshed (for example by scraping trackers)
+    and the results renewed without crawling again.
+    """
+
+    def __init__(self, ttl=300, maxsize=256, stale_ttl=0):
+        """ Initializes the cache.
+
+        :param float ttl: The number of seconds results stay valid
+        :param int maxsize: The maximum number of cached searches
+        :param float stale_ttl: The number of seconds expired results are
+            kept as stale (and can be renewed) before they are removed
+        """
+
+        (self.ttl, self.maxsize, self.stale_ttl,) = (ttl, maxsize, stale_ttl,)
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        """ Returns the number of cached searches.
+
+        :returns: The number of cached searches
+        :rtype: int
+        """
+
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """ Checks if unexpired results for a key are cached.
+
+        :param tuple key: The key of the search
+        :returns: True if unexpired results are cached
+        :rtype: bool
+        """
+
+        return self.get(key) is not None
+
+    def get(self, key, stale=False):
+        """ Gets the cached results of a key.
+
+        :param tuple key: The key of the search
+        :param bool stale: True if stale results may be returned
+        :returns: The cached torrent items or None if not cached
+        :rtype: list[torvend.items.Torrent]
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        (expires, removes, torrents,) = entry
+        now = time.monotonic()
+        if removes <= now:
+            del self._entries[key]
+            return
+        if expires <= now and not stale:
+            return
+
+        self._entries.move_to_end(key)
+        return torrents
+
+    def is_stale(self, key):
+        """ Checks if the cached results of a key are expired but kept.
+
+        :param tuple key: The key of the search
+        :returns: True if the cached results are stale
+        :rtype: bool
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        (expires, removes, _,) = entry
+        return expires <= time.monotonic() < removes
+
+    def renew(self, key):
+        """ Renews the (refreshed) cached results of a key.
+
+        .. note:: Results are never renewed past the time they would have been
+            removed as stale, so searches are eventually crawled again.
+
+        :param tuple key: The key of the search
+        :returns: True if the cached results were renewed
+        :rtype: bool
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        entry[0] = min((time.monotonic() + self.ttl), entry[1])
+        return True
+
+    def set(self, key, torrents):
+        """ Caches the results of a key.
+
+        :param tuple key: The key of the search
+        :param torrents: The torrent items to cache
+        :type torrents: list[torvend.items.Torrent]
+        :rtype: None
+        """
+
+        expires = time.monotonic() + self.ttl
+        self._entries[key] = [
+            expires, (expires + self.stale_ttl), list(torrents),
+        ]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            (evicted, _,) = self._entries.popitem(last=False)
+            self.log.debug((
+                'evicted cached results for `{evicted}`'
+            ).format(**locals()))
+
+    def clear(self):
+        """ Clears all cached results.
+
+        :rtype: None
+        """
+
+        self._entries.clear()
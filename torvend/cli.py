@@ -3,25 +3,22 @@
 
 import os
 import sys
-import inspect
-import platform
-import webbrowser
-import subprocess
 import contextlib
 
 from . import (__version__, const,)
 
-import furl
 import click
-import yaspin
-import yaspin.spinners
-import pyperclip
 from colored import (fore, back, style,)
 
 COLORED = {'fore': fore, 'back': back, 'style': style}
 CONTEXT_SETTINGS = dict(
     help_option_names=['-h', '--help']
 )
+# NOTE: mirrors the values of TorrentCategory to avoid importing scrapy
+CATEGORIES = [
+    'unknown', 'audio', 'video', 'image', 'application', 'game', 'book',
+    'adult',
+]
 
 
 def _expand_ranges(ranges_text, delimiter=',', indicator='-'):
@@ -67,6 +64,11 @@ def _open_magnet(ctx, link):
     :rtype: None
     """
 
+    # NOTE: local import to speed up cli response
+    import platform
+    import webbrowser
+    import subprocess
+
     system = platform.system().lower()
     if system == 'darwin':
         webbrowser.open(link)
@@ -88,6 +90,10 @@ def _build_spinner(ctx, text):
         # NOTE: ExitStack is essentially a null context manager
         return contextlib.ExitStack()
 
+    # NOTE: local import to speed up cli response
+    import yaspin
+    import yaspin.spinners
+
     return yaspin.yaspin(
         spinner=getattr(
             yaspin.spinners.Spinners,
@@ -100,22 +106,24 @@ def _build_spinner(ctx, text):
 def _list_spiders(ctx):
     """ List available spiders.
 
+    .. note:: Spiders are listed from the static spider registry and the
+        ``torvend.spiders`` entry points, which avoids importing any spider
+        code.
+
     :param click.Context ctx: The calling clicks current context
     """
 
-    with _build_spinner(ctx, (
-        '{style.BOLD} getting {fore.MAGENTA}'
-        'torvend{style.RESET}{style.BOLD} spiders '
-        '{style.RESET} ...'
-    ).format(**COLORED, **locals())):
-        from . import (spiders,)
+    # NOTE: local import to speed up cli response
+    from .spiders import (registry,)
 
-    for (_, spider_class,) in inspect.getmembers(
-        spiders,
-        predicate=inspect.isclass
-    ):
-        spider_name = spider_class.name.lower()
-        domains = ', '.join(spider_class.allowed_domains)
+    for spider_info in registry.get_spiders():
+        spider_name = spider_info.name
+        # NOTE: the domains of entry point spiders are unknown until imported
+        domains = (
+            ', '.join(spider_info.domains)
+            if spider_info.domains else
+            spider_info.target
+        )
         print((
             '{fore.CYAN}{style.BOLD}{spider_name}{style.RESET} ({domains})'
         ).format(**COLORED, **locals()))
@@ -136,25 +144,18 @@ def _build_client(ctx, allowed, ignored):
         ]))
 
     # NOTE: local import to speed up cli tool
-    from . import (spiders,)
+    from .spiders import (registry,)
     from .client import (TorvendClient,)
 
     (allowed, ignored,) = (
         parse_spiders(allowed),
         parse_spiders(ignored),
     )
-    (allowed_spiders, ignored_spiders,) = ([], [],)
-
-    for (_, spider_class,) in inspect.getmembers(
-        spiders,
-        predicate=inspect.isclass
-    ):
-        spider_name = spider_class.name.lower()
-
-        if spider_name in allowed:
-            allowed_spiders.append(spider_class)
-        if spider_name in ignored:
-            ignored_spiders.append(spider_class)
+    # NOTE: spiders are passed by name so only searched spiders are imported
+    (allowed_spiders, ignored_spiders,) = (
+        [name for name in allowed if registry.get_spider_info(name)],
+        [name for name in ignored if registry.get_spider_info(name)],
+    )
 
     if len(allowed_spiders) > 0 and len(ignored_spiders) > 0:
         print((
@@ -167,10 +168,38 @@ def _build_client(ctx, allowed, ignored):
     return TorvendClient(
         allowed=allowed_spiders,
         ignored=ignored_spiders,
-        verbose=ctx.obj.get('verbose', False)
+        verbose=ctx.obj.get('verbose', False),
+        metrics=ctx.meta.get('metrics'),
+        stall_watchdog=ctx.meta.get('watchdog')
     )
 
 
+def _build_metrics(ctx, always=False):
+    """ Builds the metrics registry if metrics are enabled.
+
+    When the ``metrics`` option is given, the metrics are written to its
+    path once the command exits.
+
+    :param click.Context ctx: The calling clicks current context
+    :param bool always: True if metrics are enabled without the option
+        (for example when serving)
+    :returns: The metrics registry or None if not enabled
+    :rtype: torvend.metrics.MetricsRegistry
+    """
+
+    filepath = ctx.params.get('metrics')
+    if filepath is None and not always:
+        return
+
+    # NOTE: local import to speed up cli response
+    from .metrics import (MetricsRegistry,)
+
+    ctx.meta['metrics'] = MetricsRegistry()
+    if filepath is not None:
+        ctx.call_on_close(lambda: ctx.meta['metrics'].write(filepath))
+    return ctx.meta['metrics']
+
+
 def _sort_torrents(ctx, torrent_list, sort_type):
     """ Sorts torrents by a specific sort pattern.
 
@@ -186,6 +215,346 @@ def _sort_torrents(ctx, torrent_list, sort_type):
         return sorted(torrent_list, key=lambda t: t['seeders'], reverse=True)
 
 
+def _build_index(ctx):
+    """ Builds the local index if any of the index options are given.
+
+    :param click.Context ctx: The calling clicks current context
+    :returns: The local index or None if not enabled
+    :rtype: torvend.index.LocalIndex
+    """
+
+    if not any([
+        ctx.params.get(option, False)
+        for option in ('index', 'local', 'hybrid',)
+    ]):
+        return
+
+    # NOTE: local import to speed up cli response
+    from .index import (LocalIndex,)
+    return LocalIndex()
+
+
+def _get_filters(ctx):
+    """ Gets the named torrent filter arguments of the given filter options.
+
+    :param click.Context ctx: The calling clicks current context
+    :returns: The named arguments of a torrent filter
+    :rtype: dict[str,....]
+    """
+
+    return dict(
+        categories=(ctx.params.get('category') or None),
+        min_size=ctx.params.get('min_size'),
+        max_size=ctx.params.get('max_size'),
+        min_seeders=ctx.params.get('min_seeders'),
+    )
+
+
+def _search_index(ctx, local_index, query):
+    """ Searches the local index for torrents accepted by the filter options.
+
+    :param click.Context ctx: The calling clicks current context
+    :param torvend.index.LocalIndex local_index: The local index to search
+    :param str query: The query to search for
+    :returns: A list of accepted torrent items sorted by seeders
+    :rtype: list[torvend.items.Torrent]
+    """
+
+    # NOTE: local import to speed up cli response
+    from .filters import (TorrentFilter,)
+
+    torrent_filter = TorrentFilter(**_get_filters(ctx))
+    return [
+        torrent
+        for torrent in local_index.search(
+            query, results=ctx.params.get('results', 25)
+        )
+        if torrent_filter.accepts(torrent)
+    ]
+
+
+def _build_clusterer(ctx):
+    """ Builds a release clusterer if clustering is enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :returns: The release clusterer or None if not enabled
+    :rtype: torvend.cluster.ReleaseClusterer
+    """
+
+    if not ctx.params.get('cluster', False):
+        return
+
+    # NOTE: local import to speed up cli response
+    from .cluster import (ReleaseClusterer,)
+    return ReleaseClusterer()
+
+
+def _cluster_torrents(ctx, torrent_iterator):
+    """ Collapses near-duplicate torrents if clustering is enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :param torrent_iterator: The iterator of torrents
+    :type torrent_iterator: list[torvend.items.Torrent]
+    :returns: Yields the first torrent of each cluster
+    :rtype: list[torvend.items.Torrent]
+    """
+
+    clusterer = _build_clusterer(ctx)
+    for torrent in torrent_iterator:
+        if clusterer is None or clusterer.add(torrent)[-1]:
+            yield torrent
+
+
+def _merge_trackers(torrents):
+    """ Merges the magnet trackers of torrents with the same hash.
+
+    :param torrents: The torrents to merge trackers of
+    :type torrents: set[torvend.items.Torrent]
+    :returns: The torrents with merged magnet trackers
+    :rtype: set[torvend.items.Torrent]
+    """
+
+    # NOTE: local import to speed up cli response
+    import furl
+
+    # create mappings dictionary of hashes and trackers
+    (mappings, merged,) = ({}, set(),)
+    for torrent in torrents:
+        if torrent['hash'] not in mappings:
+            mappings[torrent['hash']] = set()
+        for tracker in furl.furl(torrent['magnet']).args.getlist('tr'):
+            mappings[torrent['hash']].add(tracker)
+
+    # update torrent item magnets with full mappings dictionary
+    for torrent in torrents:
+        if torrent['hash'] in mappings:
+            merged_trackers = furl.furl(torrent['magnet'])\
+                .remove('tr')\
+                .add({'tr': list(mappings[torrent['hash']])}).url
+            torrent['magnet'] = (
+                'magnet:{merged_trackers}'
+            ).format(**locals())
+            merged.add(torrent)
+    return merged
+
+
+def _refresh_torrents(ctx, torrents):
+    """ Refreshes seeders and leechers from trackers if scraping is enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :param torrents: The torrents to refresh
+    :type torrents: list[torvend.items.Torrent]
+    :returns: The (refreshed) torrents
+    :rtype: list[torvend.items.Torrent]
+    """
+
+    torrents = list(torrents)
+    if not ctx.params.get('scrape', False):
+        return torrents
+
+    # NOTE: local import to speed up cli response
+    from .scrape import (TrackerScraper,)
+    with _build_spinner(ctx, (
+        '{style.BOLD} scraping trackers for {fore.GREEN}{torrent_count}'
+        '{style.RESET} {style.BOLD}results{style.RESET} ...'
+    ).format(torrent_count=len(torrents), **COLORED)):
+        TrackerScraper().refresh(torrents)
+    return torrents
+
+
+def _build_stats(ctx):
+    """ Builds the search stats if timings are enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :returns: The search stats or None if not enabled
+    :rtype: torvend.stats.SearchStats
+    """
+
+    if not ctx.params.get('timings', False):
+        return
+
+    # NOTE: local import to speed up cli response
+    from .stats import (SearchStats,)
+    ctx.meta['search_stats'] = SearchStats()
+    return ctx.meta['search_stats']
+
+
+def _record_stats(ctx, search_stats):
+    """ Records the stats of a client search if timings are enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :param torvend.stats.SearchStats search_stats: The stats of the search
+    :rtype: None
+    """
+
+    if ctx.meta.get('search_stats') is not None:
+        ctx.meta['search_stats'].merge(search_stats)
+
+
+def _get_timer(ctx, stage):
+    """ Gets a context manager recording a client stage if timings are enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :param str stage: The stage of the search
+    :returns: A context manager recording the duration of its block
+    """
+
+    search_stats = ctx.meta.get('search_stats')
+    if search_stats is None:
+        # NOTE: ExitStack is essentially a null context manager
+        return contextlib.ExitStack()
+
+    # NOTE: local import to speed up cli response
+    from .stats import (CLIENT,)
+    return search_stats.timer(CLIENT, stage)
+
+
+def _print_connections(search_stats, spider_name):
+    """ Prints the connection reuse ratios of a spider.
+
+    :param torvend.stats.SearchStats search_stats: The search stats
+    :param str spider_name: The name of the spider
+    :rtype: None
+    """
+
+    counts = search_stats.connections.get(spider_name)
+    reuse_ratio = search_stats.get_reuse_ratio(spider_name)
+    if reuse_ratio is None:
+        return
+    click.echo((
+        '{blank:<14}{reused}/{total} connections reused ({reuse_ratio:.0%})'
+    ).format(
+        blank='', reused=counts.get('reused', 0),
+        total=(counts.get('reused', 0) + counts.get('new', 0)), **locals()
+    ), err=True)
+    tls_ratio = search_stats.get_reuse_ratio(spider_name, tls=True)
+    if tls_ratio is not None:
+        click.echo((
+            '{blank:<14}{offered}/{handshakes} tls sessions offered '
+            '({tls_ratio:.0%})'
+        ).format(
+            blank='', offered=counts.get('tls_sessions_offered', 0),
+            handshakes=counts.get('tls_handshakes', 0), **locals()
+        ), err=True)
+
+
+def _print_timings(ctx):
+    """ Prints the per-spider and per-stage timings if timings are enabled.
+
+    :param click.Context ctx: The calling clicks current context
+    :rtype: None
+    """
+
+    search_stats = ctx.meta.get('search_stats')
+    if search_stats is None:
+        return
+
+    click.echo((
+        '{style.BOLD}{spider:<14}{stage:<10}{count:>7}{total:>10}{mean:>10}'
+        '{p50:>10}{p90:>10}{max:>10}{style.RESET}'
+    ).format(
+        spider='spider', stage='stage', count='count', total='total',
+        mean='mean', p50='p50', p90='p90', max='max', **COLORED
+    ), err=True)
+    previous = None
+    for (spider_name, stage, histogram,) in search_stats.get_report():
+        if spider_name != previous:
+            click.echo((
+                '{fore.CYAN}{style.BOLD}{spider_name:<14}{style.RESET}'
+                '{items} items'
+            ).format(
+                items=search_stats.items.get(spider_name, 0),
+                **COLORED, **locals()
+            ), err=True)
+            previous = spider_name
+            _print_connections(search_stats, spider_name)
+        click.echo((
+            '{blank:<14}{stage:<10}{histogram.count:>7}{total:>10}{mean:>10}'
+            '{p50:>10}{p90:>10}{maximum:>10}'
+        ).format(blank='', total=(
+            '{0:.1f}ms'.format(histogram.total * 1000)
+        ), **dict(
+            (key, '{0:.1f}ms'.format(value * 1000),)
+            for (key, value,) in (
+                ('mean', histogram.mean,),
+                ('p50', histogram.get_percentile(50),),
+                ('p90', histogram.get_percentile(90),),
+                ('maximum', histogram.maximum,),
+            )
+        ), **locals()), err=True)
+
+
+def _build_profiler(ctx):
+    """ Builds the sampling profiler if profiling is enabled.
+
+    The samples are written to the path of the ``profile`` option once the
+    command exits.
+
+    :param click.Context ctx: The calling clicks current context
+    :returns: The sampling profiler or None if not enabled
+    :rtype: torvend.profiler.SamplingProfiler
+    """
+
+    filepath = ctx.params.get('profile')
+    if filepath is None:
+        return
+
+    # NOTE: local import to speed up cli response
+    from .profiler import (SamplingProfiler,)
+    ctx.meta['profiler'] = SamplingProfiler()
+    ctx.call_on_close(lambda: ctx.meta['profiler'].write(filepath))
+    return ctx.meta['profiler']
+
+
+def _build_watchdog(ctx):
+    """ Builds the reactor stall watchdog if stalls are reported.
+
+    :param click.Context ctx: The calling clicks current context
+    :returns: The stall watchdog or None if not enabled
+    :rtype: torvend.watchdog.StallWatchdog
+    """
+
+    threshold = ctx.params.get('stall_threshold')
+    if threshold is None:
+        return
+
+    # NOTE: local import to speed up cli response
+    from .watchdog import (StallWatchdog,)
+    ctx.meta['watchdog'] = StallWatchdog(threshold=threshold)
+    return ctx.meta['watchdog']
+
+
+def _print_indexed(ctx, torrent_list):
+    """ Prints indexed torrents of hybrid interactive searches before the
+    crawl refreshes them.
+
+    .. note:: Exported (or best) results are sorted, so indexed torrents
+        are only included once the crawl has finished.
+
+    :param click.Context ctx: The calling clicks current context
+    :param torrent_list: The indexed torrent items
+    :type torrent_list: list[torvend.items.Torrent]
+    :rtype: None
+    """
+
+    if len(torrent_list) <= 0 or any([
+        ctx.params.get('export') is not None,
+        ctx.params.get('output') is not None,
+        ctx.params.get('to_json'),
+        ctx.params.get('select_best'),
+    ]):
+        return
+
+    print((
+        '{style.BOLD}{fore.WHITE}{indexed_count} indexed results '
+        '(refreshing){style.RESET}'
+    ).format(indexed_count=len(torrent_list), **COLORED))
+    for (torrent, rendered,) in _render_torrents(
+        ctx, iter(torrent_list), ctx.params.get('format')
+    ):
+        print('  ' + rendered)
+
+
 def _search_torrents(ctx, client, query):
     """ Start the torrent search with a given client.
 
@@ -197,48 +566,152 @@ def _search_torrents(ctx, client, query):
     """
 
     result_count = ctx.params.get('results', 25)
-    (discovered, merged,) = (set(), set(),)
+    discovered = set()
+    local_index = _build_index(ctx)
+
+    if ctx.params.get('local', False):
+        with local_index:
+            for torrent in _sort_torrents(
+                ctx, _refresh_torrents(
+                    ctx, _search_index(ctx, local_index, query)
+                ),
+                ctx.params.get('sort', 'seeders')
+            ):
+                yield torrent
+        return
 
     def _torrent_callback(item, **kwargs):
         discovered.add(item)
+        if local_index is not None:
+            local_index.add(item)
+
+    indexed = []
+    if local_index is not None and ctx.params.get('hybrid', False):
+        # NOTE: indexed results are looked up (and shown) before crawling
+        indexed = _search_index(ctx, local_index, query)
+        _print_indexed(ctx, indexed)
 
     with _build_spinner(ctx, (
         '{style.BOLD} searching for '
         '{fore.GREEN}{query}{style.RESET} ...'
     ).format(**COLORED, **locals())):
         # perform the actual search
-        client.search(query, _torrent_callback, results=result_count)
+        _record_stats(ctx, client.search(
+            query, _torrent_callback,
+            results=result_count,
+            sampling_profiler=ctx.meta.get('profiler'),
+            **_get_filters(ctx)
+        ))
+
+    if local_index is not None:
+        with local_index:
+            # NOTE: include previously seen torrents the crawl missed
+            refreshed = set(
+                torrent['hash'].lower() for torrent in discovered
+            )
+            discovered.update(
+                torrent
+                for torrent in indexed
+                if torrent['hash'] not in refreshed
+            )
 
     with _build_spinner(ctx, (
         '{style.BOLD} merging trackers for {fore.GREEN}{discovered_count}'
         '{style.RESET} {style.BOLD}results{style.RESET} ...'
     ).format(discovered_count=len(discovered), **COLORED, **locals())):
-        # create mappings dictionary of hashes and trackers
-        mappings = {}
-        for torrent in discovered:
-            if torrent['hash'] not in mappings:
-                mappings[torrent['hash']] = set()
-            for tracker in furl.furl(torrent['magnet']).args.getlist('tr'):
-                mappings[torrent['hash']].add(tracker)
-
-        # update torrent item magnets with full mappings dictionary
-        for torrent in discovered:
-            if torrent['hash'] in mappings:
-                merged_trackers = furl.furl(torrent['magnet'])\
-                    .remove('tr')\
-                    .add({'tr': list(mappings[torrent['hash']])}).url
-                torrent['magnet'] = (
-                    'magnet:{merged_trackers}'
-                ).format(**locals())
-                merged.add(torrent)
-
-    for torrent in _sort_torrents(
-        ctx, list(merged),
+        with _get_timer(ctx, 'merge'):
+            merged = _merge_trackers(discovered)
+
+    for torrent in _cluster_torrents(ctx, _sort_torrents(
+        ctx, _refresh_torrents(ctx, merged),
         ctx.params.get('sort', 'seeders')
-    ):
+    )):
         yield torrent
 
 
+def _export_torrents(ctx, torrent_iterator, export='json', output=None):
+    """ Exports torrents to stdout or to a columnar file.
+
+    :param click.Context ctx: The calling clicks current context
+    :param torrent_iterator: The iterator of torrents
+    :type torrent_iterator: list[torvend.items.Torrent]
+    :param str export: The name of the exporter to write stdout with
+    :param str output: The path of the columnar file to write (format given
+        by its extension), takes priority over writing to stdout
+    :rtype: None
+    """
+
+    # NOTE: local import to speed up cli response
+    from . import (exporters, columnar,)
+
+    if output is not None:
+        with columnar.ColumnarSink(output) as torrent_sink:
+            for torrent in torrent_iterator:
+                with _get_timer(ctx, 'render'):
+                    torrent_sink.append(torrent)
+        return
+
+    torrent_exporter = exporters.get_exporter(export, sys.stdout.buffer)
+    torrent_exporter.start_exporting()
+    for torrent in torrent_iterator:
+        with _get_timer(ctx, 'render'):
+            torrent_exporter.export_item(torrent)
+    torrent_exporter.finish_exporting()
+
+
+def _stream_torrents(ctx, client, query, torrent_exporter):
+    """ Exports torrents as they are discovered with a given client.
+
+    .. note:: Streamed torrents are neither sorted nor tracker merged.
+        When clustering, the first discovered torrent represents its cluster.
+        In hybrid mode, local results are written first and may be written
+        again (refreshed) once the live crawl rediscovers them.
+
+    :param click.Context ctx: The calling clicks current context
+    :param Client client: The client to use for searching
+    :param str query: The query to search for
+    :param torvend.exporters.TorrentExporter torrent_exporter: The exporter
+        to write discovered torrents with
+    :rtype: None
+    """
+
+    show_duplicates = ctx.params.get('duplicates', False)
+    result_count = ctx.params.get('results', 25)
+    (seen, streamed,) = (set(), [0],)
+    (local_index, clusterer,) = (_build_index(ctx), _build_clusterer(ctx),)
+
+    def _torrent_callback(item, **kwargs):
+        if local_index is not None:
+            local_index.add(item)
+        if streamed[0] >= result_count:
+            return
+        if not show_duplicates:
+            if item['hash'] in seen:
+                return
+            seen.add(item['hash'])
+        if clusterer is not None and not clusterer.add(item)[-1]:
+            return
+        torrent_exporter.export_item(item)
+        streamed[0] += 1
+
+    torrent_exporter.start_exporting()
+    with contextlib.ExitStack() as stack:
+        if local_index is not None:
+            stack.enter_context(local_index)
+            if ctx.params.get('local') or ctx.params.get('hybrid'):
+                # NOTE: local results are written before any live results
+                for torrent in _search_index(ctx, local_index, query):
+                    torrent_exporter.export_item(torrent)
+        if not ctx.params.get('local', False):
+            _record_stats(ctx, client.search(
+                query, _torrent_callback,
+                results=result_count,
+                sampling_profiler=ctx.meta.get('profiler'),
+                **_get_filters(ctx)
+            ))
+    torrent_exporter.finish_exporting()
+
+
 def _render_torrents(ctx, torrent_iterator, format):
     """ Handles rendering torrents given a format.
 
@@ -256,7 +729,8 @@ def _render_torrents(ctx, torrent_iterator, format):
         try:
             torrent = next(torrent_iterator)
             if torrent['hash'] not in seen:
-                rendered = format.format(**COLORED, **torrent)
+                with _get_timer(ctx, 'render'):
+                    rendered = format.format(**COLORED, **torrent)
                 if not show_duplicates:
                     seen.add(torrent['hash'])
 
@@ -326,6 +800,9 @@ def _validate_spinner(ctx, param, value):
     :rtype: str
     """
 
+    # NOTE: local import to speed up cli response
+    import yaspin.spinners
+
     spinner_names = list(yaspin.spinners.Spinners._asdict().keys())
     if value not in spinner_names:
         raise click.BadParameter((
@@ -334,6 +811,31 @@ def _validate_spinner(ctx, param, value):
     return value
 
 
+def _validate_size(ctx, param, value):
+    """ Callback handler for human readable sizes.
+
+    :param click.Context ctx: The calling clicks current context
+    :param str param: The parameter name
+    :param str value: The given value of the parameter
+    :raises click.BadParameter:
+        - when the size value is not a valid size
+    :returns: The size in bytes
+    :rtype: int
+    """
+
+    if value is None:
+        return
+
+    # NOTE: local import to speed up cli response
+    import humanfriendly
+    try:
+        return humanfriendly.parse_size(value)
+    except humanfriendly.InvalidSize:
+        raise click.BadParameter((
+            "size '{value}' is not a valid size (e.g. 700MB, 1.5GiB)"
+        ).format(**locals()))
+
+
 @click.group(invoke_without_command=True, context_settings=CONTEXT_SETTINGS)
 @click.option(
     '--color/--no-color',
@@ -363,6 +865,8 @@ def cli(
     \b
         torvend list           - (lists available spiders)
         torvend search "query" - (uses spiders to search for torrents)
+        torvend batch FILE     - (searches for every query in a file)
+        torvend serve          - (serves searches over HTTP)
     """
 
     if ctx.invoked_subcommand is None:
@@ -449,10 +953,69 @@ def cli_list(ctx):
     ),
     help='Customize torrent render'
 )
+@click.option(
+    '--category',
+    type=click.Choice(CATEGORIES), multiple=True,
+    help='Only include torrents of a category (repeatable)'
+)
+@click.option(
+    '--min-size',
+    type=str, default=None, callback=_validate_size,
+    help='Only include torrents of at least a size (e.g. 700MB)'
+)
+@click.option(
+    '--max-size',
+    type=str, default=None, callback=_validate_size,
+    help='Only include torrents of at most a size (e.g. 4GiB)'
+)
+@click.option(
+    '--min-seeders',
+    type=int, default=None,
+    help='Only include torrents of at least a number of seeders'
+)
 @click.option(
     '-j', '--json', 'to_json',
     is_flag=True, default=False,
-    help='Write results to stdout as json (disable selection)'
+    help='Write results to stdout as json (same as "--export json")'
+)
+@click.option(
+    '-e', '--export',
+    type=click.Choice(['json', 'ndjson', 'msgpack']), default=None,
+    help='Write results to stdout in a format (disable selection)'
+)
+@click.option(
+    '-o', '--output',
+    type=click.Path(dir_okay=False, writable=True), default=None,
+    help='Write results to a .arrow, .parquet or .csv file'
+)
+@click.option(
+    '--index',
+    is_flag=True, default=False,
+    help='Record results in the local index'
+)
+@click.option(
+    '--local',
+    is_flag=True, default=False,
+    help='Search only the local index (no crawl)'
+)
+@click.option(
+    '--hybrid',
+    is_flag=True, default=False,
+    help=(
+        'Show local index results before the crawl refreshes them '
+        '(exports include them once the crawl finished, except ndjson and '
+        'msgpack which write them first)'
+    )
+)
+@click.option(
+    '--cluster',
+    is_flag=True, default=False,
+    help='Collapse near-duplicate releases into their best torrent'
+)
+@click.option(
+    '--scrape',
+    is_flag=True, default=False,
+    help='Refresh seeders and leechers from UDP trackers (not streamed)'
 )
 @click.option(
     '-s', '--sort',
@@ -464,24 +1027,72 @@ def cli_list(ctx):
     is_flag=True, default=False,
     help='Automatically write best magnet to stdout',
 )
+@click.option(
+    '--timings',
+    is_flag=True, default=False,
+    help='Print per-spider and per-stage timings to stderr'
+)
+@click.option(
+    '--metrics',
+    type=click.Path(dir_okay=False, writable=True), default=None,
+    help='Write Prometheus metrics to a file at exit'
+)
+@click.option(
+    '--profile',
+    type=click.Path(dir_okay=False, writable=True), default=None,
+    help=(
+        'Write a sampling profile to a file at exit '
+        '(speedscope for .json, otherwise collapsed stacks)'
+    )
+)
+@click.option(
+    '--stall-threshold',
+    type=float, default=None,
+    help='Log reactor stalls longer than the given seconds with their stack'
+)
 @click.pass_context
 def cli_search(
     ctx,
     allowed=None, ignored=None, spinner=None, fancy=None,
     copy=None, duplicates=None,
-    results=None, format=None, to_json=None, sort=None,
-    select_best=None,
-    query=None
+    results=None, format=None, category=None, min_size=None, max_size=None,
+    min_seeders=None, to_json=None, export=None, output=None,
+    index=None, local=None, hybrid=None, cluster=None, scrape=None,
+    sort=None, select_best=None, timings=None, metrics=None, profile=None,
+    stall_threshold=None, query=None
 ):
     """ Search for torrents:
 
     \b
     torvend search "query"
+    torvend search "query" --export ndjson
+    torvend search "query" --local
+    torvend search "query" --category video --min-size 700MB
+    torvend search "query" --timings
+    torvend search "query" --metrics torvend.prom
+    torvend search "query" --profile search.speedscope.json
+    torvend search "query" --stall-threshold 0.1
     """
 
     if fancy:
         click.echo(__version__.__fancy__)
+    if to_json and export is None:
+        export = 'json'
+    _build_stats(ctx)
+    _build_metrics(ctx)
+    _build_profiler(ctx)
+    _build_watchdog(ctx)
     try:
+        if export in ('ndjson', 'msgpack',) and output is None:
+            # NOTE: local import to speed up cli response
+            from . import (exporters,)
+            _stream_torrents(
+                ctx, (None if local else _build_client(ctx, allowed, ignored)),
+                query, exporters.get_exporter(export, sys.stdout.buffer)
+            )
+            _print_timings(ctx)
+            return
+
         # build search client
         client = None
         with _build_spinner(ctx, (
@@ -489,7 +1100,8 @@ def cli_search(
             'torvend{style.RESET}{style.BOLD} client '
             '{style.RESET} ...'
         ).format(**COLORED, **locals())):
-            client = _build_client(ctx, allowed, ignored)
+            # NOTE: local searches do not need a client (or scrapy)
+            client = None if local else _build_client(ctx, allowed, ignored)
 
         # render discovered torrents (lazy)
         render_iterator = _render_torrents(
@@ -500,15 +1112,11 @@ def cli_search(
 
         if select_best:
             sys.stdout.write(next(render_iterator)[0]['magnet'])
-        elif to_json:
-            # NOTE: local import to speed up cli response
-            from scrapy.exporters import JsonItemExporter
-            torrent_exporter = JsonItemExporter(
-                sys.stdout.buffer,
-                encoding='utf-8'
+        elif export == 'json' or output is not None:
+            _export_torrents(
+                ctx, (torrent for (torrent, _,) in render_iterator),
+                export='json', output=output
             )
-            for (torrent, _,) in render_iterator:
-                torrent_exporter.export_item(torrent)
         else:
             selected = _select_torrent(ctx, render_iterator)
             if copy:
@@ -525,6 +1133,8 @@ def cli_search(
                     print((
                         '{fore.GREEN}{style.BOLD}✔{style.RESET}'
                     ).format(**COLORED))
+                # NOTE: local import to speed up cli response
+                import pyperclip
                 pyperclip.copy('\n'.join(to_copy))
             else:
                 for selected_torrent in selected:
@@ -538,6 +1148,7 @@ def cli_search(
                     print((
                         '{fore.GREEN}{style.BOLD}✔{style.RESET}'
                     ).format(**COLORED))
+        _print_timings(ctx)
 
     except (KeyboardInterrupt, EOFError):
         pass
@@ -550,9 +1161,299 @@ def cli_search(
         sys.exit(0)
 
 
+@click.command(
+    'batch',
+    short_help='Searches for torrents of many queries',
+    context_settings={
+        'ignore_unknown_options': True
+    }
+)
+@click.argument('queries', type=click.File('r'), default='-')
+@click.option(
+    '--allowed',
+    type=str, default='',
+    help='List of allowed spiders (no spaces; delimiter ",")'
+)
+@click.option(
+    '--ignored',
+    type=str, default='',
+    help='List of ignored spiders (no spaces; delimiter ",")'
+)
+@click.option(
+    '--duplicates',
+    is_flag=True, default=False,
+    help='Allow duplicate torrents of a query to be written',
+    show_default=True
+)
+@click.option(
+    '-r', '--results',
+    type=int, default=25, help='Number of results per spider and query',
+    show_default=True
+)
+@click.option(
+    '-c', '--concurrency',
+    type=int, default=32, help='Maximum number of concurrent requests',
+    show_default=True
+)
+@click.option(
+    '--per-domain',
+    type=int, default=4,
+    help='Maximum number of concurrent requests per domain',
+    show_default=True
+)
+@click.option(
+    '--delay',
+    type=float, default=0.0,
+    help='Delay in seconds between requests to the same domain',
+    show_default=True
+)
+@click.option(
+    '-w', '--workers',
+    type=int, default=1,
+    help='Number of processes to shard queries across',
+    show_default=True
+)
+@click.option(
+    '--rate',
+    type=float, default=None,
+    help='Maximum requests per second to the same domain (all workers)'
+)
+@click.option(
+    '--category',
+    type=click.Choice(CATEGORIES), multiple=True,
+    help='Only include torrents of a category (repeatable)'
+)
+@click.option(
+    '--min-size',
+    type=str, default=None, callback=_validate_size,
+    help='Only include torrents of at least a size (e.g. 700MB)'
+)
+@click.option(
+    '--max-size',
+    type=str, default=None, callback=_validate_size,
+    help='Only include torrents of at most a size (e.g. 4GiB)'
+)
+@click.option(
+    '--min-seeders',
+    type=int, default=None,
+    help='Only include torrents of at least a number of seeders'
+)
+@click.option(
+    '-e', '--export',
+    type=click.Choice(['ndjson', 'msgpack']), default='ndjson',
+    help='Format to write results to stdout in', show_default=True
+)
+@click.option(
+    '-o', '--output',
+    type=click.Path(dir_okay=False, writable=True), default=None,
+    help='Write results to a .arrow, .parquet or .csv file'
+)
+@click.option(
+    '--index',
+    is_flag=True, default=False,
+    help='Record results in the local index'
+)
+@click.option(
+    '--timings',
+    is_flag=True, default=False,
+    help='Print per-spider and per-stage timings to stderr'
+)
+@click.option(
+    '--metrics',
+    type=click.Path(dir_okay=False, writable=True), default=None,
+    help='Write Prometheus metrics to a file at exit'
+)
+@click.option(
+    '--profile',
+    type=click.Path(dir_okay=False, writable=True), default=None,
+    help=(
+        'Write a sampling profile to a file at exit '
+        '(speedscope for .json, otherwise collapsed stacks)'
+    )
+)
+@click.option(
+    '--stall-threshold',
+    type=float, default=None,
+    help='Log reactor stalls longer than the given seconds with their stack'
+)
+@click.pass_context
+def cli_batch(
+    ctx,
+    allowed=None, ignored=None, duplicates=None,
+    results=None, concurrency=None, per_domain=None, delay=None,
+    workers=None, rate=None, category=None, min_size=None, max_size=None,
+    min_seeders=None, export=None, output=None, index=None, timings=None,
+    metrics=None, profile=None, stall_threshold=None, queries=None
+):
+    """ Search for torrents of many queries (one per line):
+
+    \b
+    torvend batch queries.txt
+    torvend batch queries.txt --output results.parquet
+    cat queries.txt | torvend batch
+    """
+
+    _build_stats(ctx)
+    _build_metrics(ctx)
+    _build_profiler(ctx)
+    _build_watchdog(ctx)
+    try:
+        client = _build_client(ctx, allowed, ignored)
+
+        # NOTE: local import to speed up cli response
+        from . import (exporters, columnar,)
+        with contextlib.ExitStack() as stack:
+            if output is not None:
+                write_torrent = stack.enter_context(
+                    columnar.ColumnarSink(output)
+                ).append
+            else:
+                write_torrent = exporters.get_exporter(
+                    export, sys.stdout.buffer
+                ).export_item
+            local_index = _build_index(ctx)
+            if local_index is not None:
+                stack.enter_context(local_index)
+            seen = set()
+
+            def _torrent_callback(item, **kwargs):
+                if local_index is not None:
+                    local_index.add(item)
+                if not duplicates:
+                    if (item['query'], item['hash'],) in seen:
+                        return
+                    seen.add((item['query'], item['hash'],))
+                write_torrent(item)
+
+            _record_stats(ctx, client.search_many(
+                queries.read().splitlines(), _torrent_callback,
+                results=results,
+                concurrency=concurrency,
+                per_domain=per_domain,
+                delay=delay,
+                workers=workers,
+                rate=rate,
+                sampling_profiler=ctx.meta.get('profiler'),
+                **_get_filters(ctx)
+            ))
+        _print_timings(ctx)
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        print((
+            '{fore.RED}{style.BOLD}ERROR{style.RESET}{fore.RED}: '
+            'view log ({const.log_dir}{sep}{const.module_name}.log)'
+            '{style.RESET}'
+        ).format(sep=os.sep, const=const, **COLORED,), file=sys.stderr)
+        sys.exit(1)
+
+
+@click.command(
+    'serve',
+    short_help='Serves searches over HTTP',
+    context_settings={
+        'ignore_unknown_options': True
+    }
+)
+@click.option(
+    '--allowed',
+    type=str, default='',
+    help='List of allowed spiders (no spaces; delimiter ",")'
+)
+@click.option(
+    '--ignored',
+    type=str, default='',
+    help='List of ignored spiders (no spaces; delimiter ",")'
+)
+@click.option(
+    '--host',
+    type=str, default='127.0.0.1', help='Interface to listen on',
+    show_default=True
+)
+@click.option(
+    '-p', '--port',
+    type=int, default=8080, help='Port to listen on',
+    show_default=True
+)
+@click.option(
+    '-r', '--results',
+    type=int, default=25, help='Default number of results per spider',
+    show_default=True
+)
+@click.option(
+    '--max-concurrency',
+    type=int, default=4, help='Maximum number of concurrent searches',
+    show_default=True
+)
+@click.option(
+    '--cache-ttl',
+    type=float, default=300.0,
+    help='Seconds to cache finished searches for',
+    show_default=True
+)
+@click.option(
+    '--scrape',
+    is_flag=True, default=False,
+    help='Refresh expired searches from UDP trackers instead of crawling'
+)
+@click.option(
+    '--stale-ttl',
+    type=float, default=3600.0,
+    help='Seconds expired searches can be refreshed for (with --scrape)',
+    show_default=True
+)
+@click.option(
+    '--stall-threshold',
+    type=float, default=None,
+    help='Log reactor stalls longer than the given seconds with their stack'
+)
+@click.pass_context
+def cli_serve(
+    ctx,
+    allowed=None, ignored=None, host=None, port=None,
+    results=None, max_concurrency=None, cache_ttl=None,
+    scrape=None, stale_ttl=None, stall_threshold=None
+):
+    """ Serve searches over a local HTTP/JSON API:
+
+    \b
+    torvend serve --port 8080
+    curl "http://127.0.0.1:8080/search?q=query"
+    curl "http://127.0.0.1:8080/metrics"
+    """
+
+    # NOTE: local import to speed up cli response
+    import twisted.internet.reactor
+    from .cache import (ResultCache,)
+    from .scrape import (TrackerScraper,)
+    from .service import (SearchService,)
+
+    _build_metrics(ctx, always=True)
+    _build_watchdog(ctx)
+    client = _build_client(ctx, allowed, ignored)
+    service = SearchService(
+        client,
+        results=results,
+        max_concurrency=max_concurrency,
+        result_cache=ResultCache(
+            ttl=cache_ttl, stale_ttl=(stale_ttl if scrape else 0)
+        ),
+        scraper=(TrackerScraper() if scrape else None)
+    )
+    service.listen(port=port, host=host)
+    print((
+        '{style.BOLD}serving {fore.MAGENTA}torvend{style.RESET}'
+        '{style.BOLD} searches at {fore.GREEN}http://{host}:{port}/search'
+        '{style.RESET}'
+    ).format(**COLORED, **locals()))
+    twisted.internet.reactor.run()
+
+
 # add click commands to cli group
 cli.add_command(cli_search)
 cli.add_command(cli_list)
+cli.add_command(cli_batch)
+cli.add_command(cli_serve)
 
 
 if __name__ == '__main__':
@@ -2,27 +2,215 @@
 # MIT License <https://opensource.org/licenses/MIT>
 
 import inspect
+import logging
+import threading
+import contextlib
 
-from . import (const, meta, spiders,)
+from . import (
+    const, meta, spiders, stats, metrics, profiler, filters, ratelimit,
+    blocking, watchdog, backpressure,
+)
+
+from .spiders import (_common,)
 
 import scrapy.crawler
 import scrapy.signals
 
 
+def _is_spider(entry):
+    """ Checks if an entry is a spider class or the name of a known spider.
+
+    :param entry: A spider class or the name of a registered spider
+    :type entry: torvend.spiders._common.BaseSpider or str
+    :returns: True if the entry is a spider
+    :rtype: bool
+    """
+
+    if isinstance(entry, str):
+        return spiders.registry.get_spider_info(entry) is not None
+    return inspect.isclass(entry) and issubclass(entry, _common.BaseSpider)
+
+
+def _get_spider_name(entry):
+    """ Gets the name of a spider class or spider name.
+
+    :param entry: A spider class or the name of a registered spider
+    :type entry: torvend.spiders._common.BaseSpider or str
+    :returns: The name of the spider
+    :rtype: str
+    """
+
+    if isinstance(entry, str):
+        return entry.strip().lower()
+    return entry.name
+
+
+def _build_daemon_thread(*args, **kwargs):
+    """ Builds a daemon thread.
+
+    :param args: Any positional arguments of the thread
+    :param kwargs: Any named arguments of the thread
+    :returns: A thread which does not keep the interpreter alive
+    :rtype: threading.Thread
+    """
+
+    return threading.Thread(*args, daemon=True, **kwargs)
+
+
+def start_asyncio_reactor():
+    """ Starts the reactor on the running asyncio event loop.
+
+    The asyncio reactor is installed on the running event loop (unless it is
+    already installed) and started without running the event loop, which is
+    left to the application.
+    The reactor is never stopped (as stopping it stops its event loop), so
+    the threads of its thread pool (used for resolving hostnames) are
+    daemon threads.
+
+    .. note:: This must be called before anything installs the default
+        reactor (by importing ``twisted.internet.reactor``).
+
+    :raises RuntimeError:
+        - when there is no running event loop
+        - when another reactor or an asyncio reactor on another event loop
+          is already installed
+    :returns: The running reactor
+    :rtype: twisted.internet.asyncioreactor.AsyncioSelectorReactor
+    """
+
+    # NOTE: local import to speed up module loading
+    import sys
+    import asyncio
+    from twisted.internet import (asyncioreactor,)
+
+    loop = asyncio.get_running_loop()
+    if 'twisted.internet.reactor' not in sys.modules:
+        asyncioreactor.install(eventloop=loop)
+
+    import twisted.internet.reactor
+
+    reactor = twisted.internet.reactor
+    # NOTE: twisted does not expose the event loop of asyncio reactors
+    if getattr(reactor, '_asyncioEventloop', None) is not loop:
+        raise RuntimeError((
+            "reactor `{reactor}` is not an asyncio reactor running on the "
+            "event loop `{loop}`, start_asyncio_reactor must be called "
+            "before anything installs a reactor"
+        ).format(**locals()))
+    if not reactor.running:
+        reactor.startRunning(installSignalHandlers=False)
+        reactor.getThreadPool().threadFactory = _build_daemon_thread
+    return reactor
+
+
+class _InFlightCrawl(object):
+    """ A running crawl which identical searches can subscribe to.
+
+    Discovered items are kept to be replayed to late subscribers until more
+    than ``replay_size`` items were discovered, the replay is then dropped
+    and the crawl can no longer be joined (so memory stays bounded).
+    """
+
+    def __init__(self, key, replay_size=None):
+        """ Initializes the in-flight crawl.
+
+        :param tuple key: The search key of the crawl
+        :param int replay_size: The maximum number of items kept for late
+            subscribers (unbounded if None)
+        """
+
+        (self.key, self.torrents, self.subscribers, self.deferreds,) = \
+            (key, [], [], [],)
+        # NOTE: the number of discovered torrent items
+        (self.replay_size, self.count,) = (replay_size, 0,)
+        # NOTE: the backpressure of the crawl's crawlers (once started)
+        self.backpressure = None
+
+    @property
+    def joinable(self):
+        """ Indicates if late subscribers can still join the crawl.
+
+        :getter: Returns True if all discovered items can be replayed
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return self.torrents is not None
+
+    def subscribe(self, callback):
+        """ Subscribes to the crawl, replaying already discovered items.
+
+        :param callable callback: A callback which receives torrent items
+        :returns: A deferred which fires once the crawl has finished
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.defer
+
+        for torrent in self.torrents:
+            callback(item=torrent)
+        self.subscribers.append(callback)
+
+        delay = twisted.internet.defer.Deferred()
+        self.deferreds.append(delay)
+        return delay
+
+    def publish(self, item, **kwargs):
+        """ Publishes a discovered torrent item to all subscribers.
+
+        :param torvend.items.Torrent item: The discovered torrent item
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        self.count += 1
+        if self.joinable:
+            self.torrents.append(item)
+            if self.replay_size is not None and \
+                    len(self.torrents) > self.replay_size:
+                self.torrents = None
+        for callback in self.subscribers:
+            callback(item=item, **kwargs)
+
+    def finish(self, result):
+        """ Fires the deferreds of all subscribers.
+
+        :param result: The result of the crawl deferred
+        :rtype: None
+        """
+
+        (deferreds, self.subscribers, self.deferreds,) = \
+            (self.deferreds, [], [],)
+        for delay in deferreds:
+            delay.callback(result)
+
+
 class TorvendClient(meta.Loggable):
     """ The client for discovering torrents.
     """
 
-    def __init__(self, settings={}, ignored=[], allowed=[], verbose=False):
+    def __init__(
+        self, settings={}, ignored=[], allowed=[], verbose=False,
+        base_urls={}, metrics=None, stall_watchdog=None
+    ):
         """ Initializes the client.
 
         :param settings: Any additional settings for the scrapy crawler
         :type settings: dict[str,....]
-        :param ignored: Any ignored spiders
-        :type ignored: list[torvend.spiders._common.BaseSpider]
-        :param allowed: Any allowed spiders
-        :type allowed: list[torvend.spiders._common.BaseSpider]
+        :param ignored: Any ignored spiders (classes or names)
+        :type ignored: list[torvend.spiders._common.BaseSpider or str]
+        :param allowed: Any allowed spiders (classes or names)
+        :type allowed: list[torvend.spiders._common.BaseSpider or str]
         :param bool verbose: A flag to indicate if verbose logging is enabled
+        :param base_urls: Any urls spiders should query instead of their
+            domains (by spider name)
+        :type base_urls: dict[str,str]
+        :param metrics: The registry to record engine metrics in
+        :type metrics: torvend.metrics.MetricsRegistry
+        :param stall_watchdog: The watchdog to report reactor stalls with
+        :type stall_watchdog: torvend.watchdog.StallWatchdog
         """
 
         if len(ignored) > 0 and len(allowed) > 0:
@@ -31,8 +219,54 @@ class TorvendClient(meta.Loggable):
                 "is not supported"
             ).format(**locals()))
 
-        (self.settings, self.ignored, self.allowed, self.verbose,) = \
-            (settings, ignored, allowed, verbose,)
+        (
+            self.settings, self.ignored, self.allowed, self.verbose,
+            self.base_urls, self.metrics, self.stall_watchdog,
+        ) = (
+            settings, ignored, allowed, verbose, base_urls, metrics,
+            stall_watchdog,
+        )
+
+    @property
+    def in_flight(self):
+        """ The currently running crawls of the client.
+
+        :getter: Returns a dictionary of search keys to in-flight crawls
+        :setter: Does not allow setting
+        :rtype: dict[tuple,_InFlightCrawl]
+        """
+
+        if not hasattr(self, '_in_flight'):
+            self._in_flight = {}
+        return self._in_flight
+
+    @property
+    def running(self):
+        """ All running crawls of the client.
+
+        Unlike :attr:`~torvend.client.TorvendClient.in_flight` this includes
+        crawls which can no longer be joined (and were replaced by a new
+        crawl of the same search).
+
+        :getter: Returns the set of running in-flight crawls
+        :setter: Does not allow setting
+        :rtype: set[_InFlightCrawl]
+        """
+
+        if not hasattr(self, '_running'):
+            self._running = set()
+        return self._running
+
+    @property
+    def replay_size(self):
+        """ The maximum number of items replayed to late joiners of a crawl.
+
+        :getter: Returns the ``TORVEND_MAX_REPLAYED_ITEMS`` setting
+        :setter: Does not allow setting
+        :rtype: int
+        """
+
+        return self._build_settings()['TORVEND_MAX_REPLAYED_ITEMS']
 
     @property
     def settings(self):
@@ -63,11 +297,11 @@ class TorvendClient(meta.Loggable):
 
     @property
     def ignored(self):
-        """ A list of ignored spider classes.
+        """ A list of ignored spider classes (or spider names).
 
-        :getter: Returns a list of ignored spider classes
-        :setter: Sets the list of ignored spider classes
-        :rtype: list[torvend.spiders._common.BaseSpider]
+        :getter: Returns a list of ignored spider classes (or spider names)
+        :setter: Sets the list of ignored spider classes (or spider names)
+        :rtype: list[torvend.spiders._common.BaseSpider or str]
         """
 
         if not hasattr(self, '_ignored'):
@@ -78,20 +312,21 @@ class TorvendClient(meta.Loggable):
     def ignored(self, ignored):
         """ Sets the list of ignored spider classes.
 
-        :param ignored: A list of ignored spider classes
-        :type ignored: list[torvend.spiders._common.BaseSpider]
+        Spiders given by name are looked up in the spider registry (which
+        includes spiders registered as ``torvend.spiders`` entry points) and
+        are only imported once searched with.
+
+        :param ignored: A list of ignored spider classes or spider names
+        :type ignored: list[torvend.spiders._common.BaseSpider or str]
         :rtype: None
         """
 
         if ignored:
             assert isinstance(ignored, list) and all(
-                inspect.isclass(entry)
-                for entry in ignored
-            ) and all(
-                issubclass(entry, spiders._common.BaseSpider)
+                _is_spider(entry)
                 for entry in ignored
             ), (
-                "ignored must be a list of spider classes, "
+                "ignored must be a list of spider classes or spider names, "
                 "received '{ignored}'"
             ).format(**locals())
             if hasattr(self, '_allowed') and len(self._allowed) > 0:
@@ -104,11 +339,11 @@ class TorvendClient(meta.Loggable):
 
     @property
     def allowed(self):
-        """ A list of allowed spider classes.
+        """ A list of allowed spider classes (or spider names).
 
-        :getter: Returns a list of allowed spider classes
-        :setter: Sets the list of allowed spider classes
-        :rtype: list[torvend.spiders._common.BaseSpider]
+        :getter: Returns a list of allowed spider classes (or spider names)
+        :setter: Sets the list of allowed spider classes (or spider names)
+        :rtype: list[torvend.spiders._common.BaseSpider or str]
         """
 
         if not hasattr(self, '_allowed'):
@@ -119,20 +354,21 @@ class TorvendClient(meta.Loggable):
     def allowed(self, allowed):
         """ Sets the list of allowed spider classes.
 
-        :param allowed: A list of allowed spider classes
-        :type allowed: list[torvend.spiders._common.BaseSpider]
+        Spiders given by name are looked up in the spider registry (which
+        includes spiders registered as ``torvend.spiders`` entry points) and
+        are only imported once searched with.
+
+        :param allowed: A list of allowed spider classes or spider names
+        :type allowed: list[torvend.spiders._common.BaseSpider or str]
         :rtype: None
         """
 
         if allowed:
             assert isinstance(allowed, list) and all(
-                inspect.isclass(entry)
-                for entry in allowed
-            ) and all(
-                issubclass(entry, spiders._common.BaseSpider)
+                _is_spider(entry)
                 for entry in allowed
             ), (
-                "allowed must be a list of spider classes, "
+                "allowed must be a list of spider classes or spider names, "
                 "received '{allowed}'"
             ).format(**locals())
             if hasattr(self, '_ignored') and len(self._ignored) > 0:
@@ -170,55 +406,130 @@ class TorvendClient(meta.Loggable):
         self._verbose = verbose
         const.verbose = verbose
 
-    def _item_callback(self, item, **kwargs):
-        """ An item callback for logging purposes.
+    @property
+    def base_urls(self):
+        """ A dictionary of spider names to the urls they should query.
+
+        Spiders with a base url query it (for example a local mock site)
+        instead of their ``allowed_domains``.
+
+        :getter: Returns a dictionary of spider names to base urls
+        :setter: Sets the dictionary of spider names to base urls
+        :rtype: dict[str,str]
+        """
+
+        if not hasattr(self, '_base_urls'):
+            self._base_urls = {}
+        return self._base_urls
+
+    @base_urls.setter
+    def base_urls(self, base_urls):
+        """ Sets the dictionary of spider names to base urls.
+
+        :param base_urls: The new dictionary of spider names to base urls
+        :type base_urls: dict[str,str]
+        :rtype: None
+        """
+
+        assert isinstance(base_urls, dict), (
+            "base_urls must be a dictionary, received '{base_urls}'"
+        ).format(**locals())
+        self._base_urls = base_urls
+
+    @property
+    def metrics(self):
+        """ The registry engine metrics are recorded in.
+
+        :getter: Returns the metrics registry (None if not recorded)
+        :setter: Sets the metrics registry
+        :rtype: torvend.metrics.MetricsRegistry
+        """
+
+        if not hasattr(self, '_metrics'):
+            self._metrics = None
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics_registry):
+        """ Sets the registry engine metrics are recorded in.
+
+        :param metrics_registry: The new metrics registry (None to disable)
+        :type metrics_registry: torvend.metrics.MetricsRegistry
+        :rtype: None
+        """
+
+        assert metrics_registry is None or isinstance(
+            metrics_registry, metrics.MetricsRegistry
+        ), (
+            "metrics must be a metrics registry, received '{metrics_registry}'"
+        ).format(**locals())
+        self._metrics = metrics_registry
+
+    def _item_callback(self, item, spider=None, **kwargs):
+        """ An item callback for logging and metrics purposes.
 
         :param item: The yielded item
+        :param scrapy.Spider spider: The spider which yielded the item
         :param kwargs: Any additional named arguments
         :type kwargs: dict[str,....]
         :rtype: None
         """
 
-        self.log.debug((
-            'client `{self}` received item `{item}`, {kwargs}'
-        ).format(**locals()))
+        if self.metrics is not None and spider is not None:
+            self.metrics.inc('torvend_items_scraped_total', spider=spider.name)
+        # NOTE: per item records are level-guarded and sampled
+        if self.log.isEnabledFor(logging.DEBUG) and self.sample_log('item'):
+            sample_rate = const.log_sample_rate
+            self.log.debug((
+                'client `{self}` received item `{item}` from `{spider}` '
+                '(sampled 1 in {sample_rate}), {kwargs}'
+            ).format(**locals()))
 
     def get_spiders(self):
         """ Returns a list of spider classes.
 
+        Only the spiders which are searched with are imported.
+
         :returns: A list of spider classes
         :rtype: list[torvend.spiders._common.BaseSpider]
         """
 
         # NOTE: assuming allowed > 0 and ignored > 0 is not a case
-        compare_allowed = len(self.allowed) > 0
-        for (_, spider_class,) in inspect.getmembers(
-            spiders,
-            predicate=inspect.isclass
-        ):
-            if compare_allowed:
-                if spider_class in self.allowed:
-                    yield spider_class
-            else:
-                if spider_class not in self.ignored:
-                    yield spider_class
+        if len(self.allowed) > 0:
+            # NOTE: allowed spiders do not need to be included spiders
+            for entry in self.allowed:
+                if isinstance(entry, str):
+                    entry = spiders.registry.get_spider_info(entry).load()
+                yield entry
+            return
 
-    def search(self, query, callback, results=30):
-        """ Starts the search process for a given query.
+        # NOTE: ignored spiders are skipped by name before being imported
+        ignored = set(_get_spider_name(entry) for entry in self.ignored)
+        for spider_info in spiders.registry.get_spiders():
+            if spider_info.name in ignored:
+                continue
+            try:
+                spider_class = spider_info.load()
+            except (ImportError, AttributeError) as exc:
+                # NOTE: broken plugins should not break searching entirely
+                if spider_info in spiders.registry.SPIDERS:
+                    raise
+                self.log.warning((
+                    'failed to load spider `{spider_info.name}` from '
+                    '`{spider_info.target}`, {exc!r}'
+                ).format(**locals()))
+                continue
+            yield spider_class
 
-        .. note:: The callback method must accept at least a positional
-            argument named ``item``.
-            This is the discovered torrent item.
+    def _build_settings(self, **overrides):
+        """ Builds the scrapy settings for a crawl runner.
 
-        :param str query: The query text to search with
-        :param callable callback: A callback which receives torrent items
-        :param int results: The minimum number of results for each spider to
-            return
+        :param overrides: Any setting overrides for this crawl
+        :type overrides: dict[str,....]
+        :returns: The scrapy settings dictionary
+        :rtype: dict[str,....]
         """
 
-        # NOTE: local import to speed up module loading
-        import twisted.internet
-
         crawler_settings = {
             'BOT_NAME': const.module_name,
             'USER_AGENT': (
@@ -228,9 +539,69 @@ class TorvendClient(meta.Loggable):
             'LOG_ENABLED': self.verbose,
             'DNS_TIMEOUT': 5.0,
             'DOWNLOAD_TIMEOUT': 5.0,
+            'DOWNLOADER_MIDDLEWARES': {
+                'torvend.ratelimit.RateLimitMiddleware': 50,
+            },
+            'SPIDER_MIDDLEWARES': {
+                'torvend.stats.TimingMiddleware': 950,
+            },
+            'ITEM_PIPELINES': {
+                'torvend.filters.FilterPipeline': 100,
+            },
+            # NOTE: connections and TLS sessions are shared across crawls
+            'DOWNLOAD_HANDLERS': {
+                'http': 'torvend.pool.PooledDownloadHandler',
+                'https': 'torvend.pool.PooledDownloadHandler',
+            },
+            'TORVEND_POOL_KEEPALIVE': True,
+            'TORVEND_POOL_TIMEOUT': 240.0,
+            'TORVEND_TLS_SESSIONS': True,
+            # NOTE: crawls pause while consumers have this many items queued
+            'TORVEND_MAX_QUEUED_ITEMS': 1000,
+            # NOTE: crawls can be joined until they discovered this many items
+            'TORVEND_MAX_REPLAYED_ITEMS': 1000,
+            # NOTE: crawl on whatever reactor is already installed
+            'TWISTED_REACTOR': None,
         }
+        crawler_settings.update(overrides)
         crawler_settings.update(self.settings)
-        crawl_runner = scrapy.crawler.CrawlerRunner(crawler_settings)
+        return crawler_settings
+
+    def _build_runner(
+        self, queries, callback, results=30, settings={},
+        search_stats=None, **kwargs
+    ):
+        """ Builds a crawl runner with a crawler for each client spider.
+
+        :param queries: The queries each spider should search for
+        :type queries: list[str]
+        :param callable callback: A callback which receives torrent items
+        :param int results: The minimum number of results for each spider to
+            return (per query)
+        :param settings: Any setting overrides for this crawl
+        :type settings: dict[str,....]
+        :param torvend.stats.SearchStats search_stats: The stats to record
+            the crawl's timings in
+        :param kwargs: Any additional named arguments for the spiders
+        :type kwargs: dict[str,....]
+        :returns: A crawl runner with registered crawlers
+        :rtype: scrapy.crawler.CrawlerRunner
+        """
+
+        # NOTE: local import to speed up module loading (installs reactor)
+        import twisted.internet.reactor
+
+        crawl_runner = scrapy.crawler.CrawlerRunner(
+            self._build_settings(**settings)
+        )
+        if self.verbose and not blocking.detector.running:
+            # NOTE: called right away if the reactor is already running
+            twisted.internet.reactor.callWhenRunning(blocking.detector.start)
+        if self.stall_watchdog is not None and \
+                not self.stall_watchdog.running:
+            twisted.internet.reactor.callWhenRunning(
+                self.stall_watchdog.start, metrics=self.metrics
+            )
 
         # register client available spiders
         for spider_class in self.get_spiders():
@@ -238,12 +609,12 @@ class TorvendClient(meta.Loggable):
                 'registering spider `{spider_class.__name__}` to '
                 'crawl runner `{crawl_runner}`'
             ).format(**locals()))
-            crawl_runner.crawl(
-                spider_class,
-                query=query, results=results
-            )
-
-        for crawler in crawl_runner.crawlers:
+            # NOTE: signals are connected before crawling starts scheduling
+            crawler = crawl_runner.create_crawler(spider_class)
+            if search_stats is not None:
+                search_stats.connect(crawler)
+            if self.metrics is not None:
+                self.metrics.connect(crawler)
             # subscribe crawler item scraped signal to client callback
             crawler.signals.connect(
                 self._item_callback,
@@ -258,12 +629,677 @@ class TorvendClient(meta.Loggable):
                 callback,
                 scrapy.signals.item_scraped
             )
+            crawl_runner.crawl(
+                crawler,
+                queries=queries, results=results,
+                base_url=self.base_urls.get(spider_class.name),
+                search_stats=search_stats,
+                **kwargs
+            )
+        return crawl_runner
+
+    def _run(self, delay):
+        """ Runs the reactor until a crawl deferred fires.
+
+        :param delay: The deferred of a crawl (see ``CrawlerRunner.join``)
+        :type delay: twisted.internet.defer.Deferred
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.reactor
+
+        reactor = twisted.internet.reactor
+        # NOTE: crawlers may finish (or fail) before the reactor is running
+        delay.addBoth(lambda _: reactor.callWhenRunning(reactor.stop))
+        reactor.run()
+
+    def _get_profiling(self, sampling_profiler=None):
+        """ Gets a context manager sampling its block with a profiler.
+
+        :param sampling_profiler: The profiler to sample with (None to not
+            profile)
+        :type sampling_profiler: torvend.profiler.SamplingProfiler
+        :returns: A context manager starting and stopping the profiler
+        """
+
+        if sampling_profiler is None:
+            # NOTE: ExitStack is essentially a null context manager
+            return contextlib.ExitStack()
+        return sampling_profiler
+
+    def search(
+        self, query, callback, results=30, sampling_profiler=None,
+        **torrent_filters
+    ):
+        """ Starts the search process for a given query.
+
+        .. note:: The callback method must accept at least a positional
+            argument named ``item``.
+            This is the discovered torrent item.
+
+        :param str query: The query text to search with
+        :param callable callback: A callback which receives torrent items
+        :param int results: The minimum number of results for each spider to
+            return
+        :param sampling_profiler: The profiler to sample the search with
+        :type sampling_profiler: torvend.profiler.SamplingProfiler
+        :param torrent_filters: Any filters of discovered torrents
+            (``categories``, ``min_size``, ``max_size`` and ``min_seeders``,
+            see :class:`~torvend.filters.TorrentFilter`)
+        :type torrent_filters: dict[str,....]
+        :returns: The per-spider and per-stage timings of the search
+        :rtype: torvend.stats.SearchStats
+        """
+
+        search_stats = stats.SearchStats()
+        with self._get_profiling(sampling_profiler), \
+                search_stats.timer(stats.CLIENT, 'search'):
+            self._run(self.crawl(
+                query, callback, results=results,
+                search_stats=search_stats, **torrent_filters
+            ))
+        return search_stats
+
+    def get_search_key(self, query, results=30, **torrent_filters):
+        """ Builds the key identifying a search of the client.
+
+        :param str query: The query text of the search
+        :param int results: The minimum number of results of the search
+        :param torrent_filters: Any filters of the search
+        :type torrent_filters: dict[str,....]
+        :returns: A hashable key for the search
+        :rtype: tuple
+        """
+
+        return (
+            ' '.join(query.lower().split()),
+            tuple(sorted(
+                spider_class.name
+                for spider_class in self.get_spiders()
+            )),
+            results,
+            filters.TorrentFilter(**torrent_filters).key,
+        )
+
+    def _finish_crawl(self, result, in_flight):
+        """ Handles a finished in-flight crawl.
+
+        :param result: The result of the crawl deferred
+        :param _InFlightCrawl in_flight: The finished in-flight crawl
+        :rtype: None
+        """
+
+        # NOTE: crawls which can not be joined may have been replaced
+        if self.in_flight.get(in_flight.key) is in_flight:
+            del self.in_flight[in_flight.key]
+        self.running.discard(in_flight)
+        if self.metrics is not None:
+            self.metrics.dec('torvend_crawls_in_flight')
+        in_flight.finish(result)
+
+    def crawl(
+        self, query, callback, results=30, search_stats=None,
+        **torrent_filters
+    ):
+        """ Starts the search process for a given query on a running reactor.
+
+        Unlike :func:`~torvend.client.TorvendClient.search` this does not
+        start (or stop) the reactor, which allows long running applications
+        to pay for the reactor and spider setup only once.
+        Concurrent crawls for the same search (see
+        :func:`~torvend.client.TorvendClient.get_search_key`) share a single
+        in-flight crawl, callers joining late first receive the items which
+        were already discovered.
+        Crawls which discovered more than ``TORVEND_MAX_REPLAYED_ITEMS``
+        items are no longer joined, identical searches start a new crawl.
+        Slow callers can pause the in-flight crawl through its
+        :class:`~torvend.backpressure.Backpressure`.
+
+        .. note:: The callback method must accept at least a positional
+            argument named ``item``.
+            This is the discovered torrent item.
+
+        :param str query: The query text to search with
+        :param callable callback: A callback which receives torrent items
+        :param int results: The minimum number of results for each spider to
+            return
+        :param torvend.stats.SearchStats search_stats: The stats to record
+            the crawl's timings in (not recorded when joining an in-flight
+            crawl)
+        :param torrent_filters: Any filters of discovered torrents
+            (see :func:`~torvend.client.TorvendClient.search`)
+        :type torrent_filters: dict[str,....]
+        :returns: A deferred which fires once all crawlers have finished
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        key = self.get_search_key(query, results=results, **torrent_filters)
+        in_flight = self.in_flight.get(key)
+        if in_flight is not None and in_flight.joinable:
+            self.log.debug((
+                'joining in-flight crawl for `{key}` with '
+                '`{in_flight.count}` discovered items'
+            ).format(**locals()))
+            if self.metrics is not None:
+                self.metrics.inc('torvend_crawls_total', mode='joined')
+            return in_flight.subscribe(callback)
+
+        in_flight = _InFlightCrawl(key, replay_size=self.replay_size)
+        self.in_flight[key] = in_flight
+        self.running.add(in_flight)
+        if self.metrics is not None:
+            self.metrics.inc('torvend_crawls_total', mode='started')
+            self.metrics.inc('torvend_crawls_in_flight')
+        # NOTE: subscribe before crawling as crawls may finish synchronously
+        delay = in_flight.subscribe(callback)
+
+        try:
+            crawl_runner = self._build_runner(
+                [query], in_flight.publish,
+                results=results, search_stats=search_stats,
+                torrent_filter=filters.TorrentFilter(**torrent_filters)
+            )
+            in_flight.backpressure = backpressure.Backpressure(
+                crawl_runner.crawlers, metrics=self.metrics
+            )
+        except Exception:
+            # NOTE: local import to speed up module loading
+            import twisted.python.failure
+
+            # NOTE: crawls which failed to start must not be joined, the
+            # caller receives the raised exception instead of its deferred
+            self._finish_crawl(twisted.python.failure.Failure(), in_flight)
+            delay.addErrback(lambda failure: None)
+            raise
 
         # begin domain parallel crawling process
         self.log.info((
             'starting crawl for query `{query}` with `{crawler_count}` '
             'different crawlers'
         ).format(crawler_count=len(crawl_runner.crawlers), **locals()))
-        delay = crawl_runner.join()
-        delay.addBoth(lambda _: twisted.internet.reactor.stop())
-        twisted.internet.reactor.run()
+        crawl_runner.join().addBoth(self._finish_crawl, in_flight)
+        return delay
+
+    async def iter_search_async(
+        self, query, results=30, search_stats=None, **torrent_filters
+    ):
+        """ Searches for a given query on the running asyncio event loop.
+
+        The crawl shares the application's event loop (see
+        :func:`~torvend.client.start_asyncio_reactor`), so no threads or
+        processes are needed to embed searching in asyncio applications.
+        Items are queued until they are consumed, the crawl is paused while
+        ``TORVEND_MAX_QUEUED_ITEMS`` items are queued (see
+        :class:`~torvend.backpressure.ItemQueue`).
+
+        .. note:: Exiting the iteration early does not stop the crawl, which
+            can still be joined by identical searches.
+
+        :param str query: The query text to search with
+        :param int results: The minimum number of results for each spider to
+            return
+        :param torvend.stats.SearchStats search_stats: The stats to record
+            the crawl's timings in
+        :param torrent_filters: Any filters of discovered torrents
+            (see :func:`~torvend.client.TorvendClient.search`)
+        :type torrent_filters: dict[str,....]
+        :returns: An asynchronous iterator of torrent items as they are
+            discovered
+        :rtype: AsyncIterator[torvend.items.Torrent]
+        """
+
+        # NOTE: local import to speed up module loading
+        import asyncio
+
+        start_asyncio_reactor()
+        loop = asyncio.get_running_loop()
+        item_queue = backpressure.ItemQueue(
+            maxsize=self._build_settings()['TORVEND_MAX_QUEUED_ITEMS']
+        )
+        delay = self.crawl(
+            query, item_queue.put,
+            results=results, search_stats=search_stats, **torrent_filters
+        )
+        # NOTE: crawls may finish synchronously (without backpressure)
+        in_flight = self.in_flight.get(self.get_search_key(
+            query, results=results, **torrent_filters
+        ))
+        if in_flight is not None:
+            item_queue.attach(in_flight.backpressure)
+        # NOTE: the crawl finishes before all of its items are consumed
+        crawled = delay.addBoth(item_queue.finish).asFuture(loop)
+
+        try:
+            while len(item_queue) > 0 or not item_queue.finished:
+                if len(item_queue) <= 0:
+                    await item_queue.wait().asFuture(loop)
+                    continue
+                yield item_queue.pop()
+            await crawled
+        finally:
+            # NOTE: consumers exiting early must not leave the crawl paused
+            item_queue.close()
+            # NOTE: failures of crawls which are no longer awaited are
+            # retrieved (and logged) rather than reported by asyncio
+            crawled.add_done_callback(self._retrieve_crawled)
+
+    def _retrieve_crawled(self, crawled):
+        """ Retrieves the failure of a crawl (which may not be awaited).
+
+        :param asyncio.Future crawled: The future of the crawl
+        :rtype: None
+        """
+
+        if crawled.cancelled() or crawled.exception() is None:
+            return
+        exc = crawled.exception()
+        self.log.debug((
+            'crawl of iterated search failed, {exc!r}'
+        ).format(**locals()))
+
+    async def search_async(self, query, results=30, **torrent_filters):
+        """ Searches for a given query on the running asyncio event loop.
+
+        :param str query: The query text to search with
+        :param int results: The minimum number of results for each spider to
+            return
+        :param torrent_filters: Any filters of discovered torrents
+            (see :func:`~torvend.client.TorvendClient.search`)
+        :type torrent_filters: dict[str,....]
+        :returns: The discovered torrent items
+        :rtype: list[torvend.items.Torrent]
+        """
+
+        return [
+            item
+            async for item in self.iter_search_async(
+                query, results=results, **torrent_filters
+            )
+        ]
+
+    def _build_rate_limiter(self, rate, context=None):
+        """ Builds shared per-domain token buckets for the client spiders.
+
+        :param float rate: The maximum requests per second for each domain
+        :param context: The multiprocessing context to allocate memory from
+        :type context: multiprocessing.context.BaseContext
+        :returns: The token buckets or None if rate is not limited
+        :rtype: torvend.ratelimit.TokenBuckets
+        """
+
+        if not rate:
+            return
+        return ratelimit.TokenBuckets(
+            [
+                domain
+                for spider_class in self.get_spiders()
+                for domain in spider_class.allowed_domains
+            ],
+            rate,
+            context=context
+        )
+
+    def _get_exited_shards(self, processes, finished):
+        """ Gets the shards of workers which exited before finishing.
+
+        :param processes: The worker processes (ordered by shard)
+        :type processes: list[multiprocessing.Process]
+        :param finished: The indexes of already finished shards
+        :type finished: set[int]
+        :returns: The indexes of shards whose worker exited early
+        :rtype: list[int]
+        """
+
+        exited = []
+        for (shard_index, process,) in enumerate(processes):
+            if shard_index not in finished and not process.is_alive():
+                self.log.warning((
+                    'worker `{shard_index}` exited with code '
+                    '`{process.exitcode}` before finishing'
+                ).format(**locals()))
+                exited.append(shard_index)
+        return exited
+
+    def _merge_worker_stats(
+        self, worker_stats, search_stats=None, sampling_profiler=None
+    ):
+        """ Merges the timings or metrics of a sharded worker.
+
+        :param worker_stats: The timings, metrics or samples of the worker
+        :type worker_stats: torvend.stats.SearchStats or
+            torvend.metrics.MetricsRegistry or
+            torvend.profiler.SamplingProfiler
+        :param torvend.stats.SearchStats search_stats: The stats to merge
+            the timings of workers into
+        :param sampling_profiler: The profiler to merge the samples of
+            workers into
+        :type sampling_profiler: torvend.profiler.SamplingProfiler
+        :rtype: None
+        """
+
+        if isinstance(worker_stats, stats.SearchStats):
+            if search_stats is not None:
+                search_stats.merge(worker_stats)
+        elif isinstance(worker_stats, profiler.SamplingProfiler):
+            if sampling_profiler is not None:
+                sampling_profiler.merge(worker_stats)
+        elif self.metrics is not None:
+            self.metrics.merge(worker_stats)
+
+    def _merge_shards(
+        self, result_queue, processes, callback, search_stats=None,
+        sampling_profiler=None, consumed=None
+    ):
+        """ Passes items of sharded workers to a callback in shard order.
+
+        :param multiprocessing.Queue result_queue: The queue workers put
+            ``(shard_index, item)`` tuples on
+        :param processes: The worker processes (ordered by shard)
+        :type processes: list[multiprocessing.Process]
+        :param callable callback: A callback which receives torrent items
+        :param torvend.stats.SearchStats search_stats: The stats to merge
+            the timings of workers into
+        :param sampling_profiler: The profiler to merge the samples of
+            workers into
+        :type sampling_profiler: torvend.profiler.SamplingProfiler
+        :param consumed: The number of items of every shard passed to the
+            callback (see :class:`~torvend.backpressure.ShardQueue`)
+        :type consumed: multiprocessing.sharedctypes.RawArray
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import queue
+
+        (buffered, finished, current,) = (
+            [[] for _ in processes], set(), 0,
+        )
+        while current < len(processes):
+            try:
+                (shard_index, item,) = result_queue.get(timeout=0.5)
+            except queue.Empty:
+                finished.update(self._get_exited_shards(processes, finished))
+            else:
+                if item is None:
+                    finished.add(shard_index)
+                elif isinstance(item, (
+                    stats.SearchStats, metrics.MetricsRegistry,
+                    profiler.SamplingProfiler,
+                )):
+                    self._merge_worker_stats(
+                        item, search_stats=search_stats,
+                        sampling_profiler=sampling_profiler
+                    )
+                elif shard_index <= current:
+                    callback(item=item)
+                    if consumed is not None:
+                        consumed[shard_index] += 1
+                else:
+                    buffered[shard_index].append(item)
+
+            # release buffered items of shards that are now in order
+            while current < len(processes) and current in finished:
+                current += 1
+                if current < len(processes):
+                    for item in buffered[current]:
+                        callback(item=item)
+                    if consumed is not None:
+                        consumed[current] += len(buffered[current])
+                    buffered[current] = []
+
+    def _search_sharded(
+        self, queries, callback, results=30, settings={},
+        workers=2, rate=None, torrent_filter=None, search_stats=None,
+        sampling_profiler=None
+    ):
+        """ Searches for many queries by sharding them across processes.
+
+        Queries are split into contiguous shards, one per worker process.
+        Items of the first unfinished shard are passed to the callback as
+        they arrive while items of later shards are buffered, so the
+        callback receives items grouped by shard in the order of queries.
+        Workers pause their crawl while ``TORVEND_MAX_QUEUED_ITEMS`` of
+        their items are queued or buffered, so buffering stays bounded.
+
+        :param queries: The query texts to search with
+        :type queries: list[str]
+        :param callable callback: A callback which receives torrent items
+        :param int results: The minimum number of results for each spider to
+            return (per query)
+        :param settings: Any setting overrides for the worker crawls
+        :type settings: dict[str,....]
+        :param int workers: The number of worker processes
+        :param float rate: The maximum requests per second for each domain
+            (shared by all workers)
+        :param torvend.filters.TorrentFilter torrent_filter: The filter
+            discovered torrents must be accepted by
+        :param torvend.stats.SearchStats search_stats: The stats to merge
+            the timings of workers into
+        :param sampling_profiler: The profiler to merge the samples of
+            workers into (workers sample at the same interval)
+        :type sampling_profiler: torvend.profiler.SamplingProfiler
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import multiprocessing
+
+        context = multiprocessing.get_context('spawn')
+        workers = max(1, min(workers, len(queries)))
+        shard_size = -(-len(queries) // workers)
+        shards = [
+            queries[idx:(idx + shard_size)]
+            for idx in range(0, len(queries), shard_size)
+        ]
+
+        rate_limiter = self._build_rate_limiter(rate, context=context)
+
+        result_queue = context.Queue()
+        # NOTE: workers pause while too many of their items are unconsumed
+        consumed = context.RawArray('q', len(shards))
+        processes = [
+            context.Process(
+                target=_search_worker,
+                args=(
+                    shard_index,
+                    (
+                        self.settings, self.ignored, self.allowed,
+                        self.verbose, self.base_urls,
+                        (
+                            metrics.MetricsRegistry()
+                            if self.metrics is not None else
+                            None
+                        ),
+                        (
+                            watchdog.StallWatchdog(
+                                threshold=self.stall_watchdog.threshold,
+                                interval=self.stall_watchdog.interval
+                            )
+                            if self.stall_watchdog is not None else
+                            None
+                        ),
+                    ),
+                    shard, results, settings,
+                    rate_limiter, torrent_filter, result_queue, consumed,
+                    (
+                        profiler.SamplingProfiler(
+                            interval=sampling_profiler.interval
+                        )
+                        if sampling_profiler is not None else
+                        None
+                    ),
+                ),
+                daemon=True
+            )
+            for (shard_index, shard,) in enumerate(shards)
+        ]
+        for process in processes:
+            process.start()
+
+        self.log.info((
+            'started `{worker_count}` workers for `{query_count}` queries'
+        ).format(worker_count=len(processes), query_count=len(queries)))
+
+        try:
+            self._merge_shards(
+                result_queue, processes, callback,
+                search_stats=search_stats,
+                sampling_profiler=sampling_profiler, consumed=consumed
+            )
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    def search_many(
+        self, queries, callback, results=30,
+        concurrency=32, per_domain=4, delay=0.0,
+        workers=1, rate=None, sampling_profiler=None, **torrent_filters
+    ):
+        """ Starts the search process for many queries in a single crawl.
+
+        Every query is searched by the same set of crawlers (one per spider)
+        so that the reactor and spiders are only started once.
+        Each yielded torrent item has its ``query`` field set to the query
+        that discovered it.
+
+        .. note:: The callback method must accept at least a positional
+            argument named ``item``.
+            This is the discovered torrent item.
+
+        :param queries: The query texts to search with
+        :type queries: list[str]
+        :param callable callback: A callback which receives torrent items
+        :param int results: The minimum number of results for each spider to
+            return (per query)
+        :param int concurrency: The maximum number of concurrent requests
+            across all spiders
+        :param int per_domain: The maximum number of concurrent requests to
+            a single domain
+        :param float delay: The delay in seconds between requests to a
+            single domain
+        :param int workers: The number of processes to shard queries across
+            (see :func:`~torvend.client.TorvendClient._search_sharded`)
+        :param float rate: The maximum requests per second for each domain
+            (shared by all workers)
+        :param sampling_profiler: The profiler to sample the search with
+            (merged across workers)
+        :type sampling_profiler: torvend.profiler.SamplingProfiler
+        :param torrent_filters: Any filters of discovered torrents
+            (see :func:`~torvend.client.TorvendClient.search`)
+        :type torrent_filters: dict[str,....]
+        :returns: The per-spider and per-stage timings of the search
+            (merged across workers)
+        :rtype: torvend.stats.SearchStats
+        """
+
+        search_stats = stats.SearchStats()
+        (unique_queries, seen,) = ([], set(),)
+        for query in queries:
+            query = query.strip()
+            if len(query) > 0 and query not in seen:
+                unique_queries.append(query)
+                seen.add(query)
+        if len(unique_queries) <= 0:
+            return search_stats
+
+        spider_count = max(1, len(list(self.get_spiders())))
+        settings = {
+            'CONCURRENT_REQUESTS': max(
+                1, concurrency // (spider_count * max(1, workers))
+            ),
+            'CONCURRENT_REQUESTS_PER_DOMAIN': per_domain,
+            'DOWNLOAD_DELAY': delay,
+        }
+        torrent_filter = filters.TorrentFilter(**torrent_filters)
+        if workers > 1:
+            with self._get_profiling(sampling_profiler), \
+                    search_stats.timer(stats.CLIENT, 'search'):
+                self._search_sharded(
+                    unique_queries, callback,
+                    results=results, settings=settings,
+                    workers=workers, rate=rate,
+                    torrent_filter=torrent_filter, search_stats=search_stats,
+                    sampling_profiler=sampling_profiler
+                )
+            return search_stats
+
+        crawl_runner = self._build_runner(
+            unique_queries, callback,
+            results=results, settings=settings, search_stats=search_stats,
+            rate_limiter=self._build_rate_limiter(rate),
+            torrent_filter=torrent_filter
+        )
+
+        self.log.info((
+            'starting crawl for `{query_count}` queries with '
+            '`{crawler_count}` different crawlers'
+        ).format(
+            query_count=len(unique_queries),
+            crawler_count=len(crawl_runner.crawlers)
+        ))
+        with self._get_profiling(sampling_profiler), \
+                search_stats.timer(stats.CLIENT, 'search'):
+            self._run(crawl_runner.join())
+        return search_stats
+
+
+def _search_worker(
+    shard_index, client_args, queries, results, settings,
+    rate_limiter, torrent_filter, result_queue, consumed,
+    sampling_profiler=None
+):
+    """ The entry point of a sharded search worker process.
+
+    Puts ``(shard_index, item)`` tuples on the result queue for every
+    discovered torrent item, ``(shard_index, search_stats)`` with the
+    worker's timings, ``(shard_index, metrics)`` with the worker's metrics
+    (if recorded), ``(shard_index, sampling_profiler)`` with the worker's
+    samples (if profiled) and ``(shard_index, None)`` once finished.
+
+    :param int shard_index: The index of the worker's shard
+    :param tuple client_args: The arguments to build the worker client with
+    :param queries: The query texts of the worker's shard
+    :type queries: list[str]
+    :param int results: The minimum number of results for each spider to
+        return (per query)
+    :param settings: Any setting overrides for the worker crawl
+    :type settings: dict[str,....]
+    :param rate_limiter: The token buckets shared by all workers
+    :type rate_limiter: torvend.ratelimit.TokenBuckets
+    :param torvend.filters.TorrentFilter torrent_filter: The filter
+        discovered torrents must be accepted by
+    :param multiprocessing.Queue result_queue: The queue to put items on
+    :param consumed: The number of items of every shard consumed by the
+        parent process
+    :type consumed: multiprocessing.sharedctypes.RawArray
+    :param sampling_profiler: The profiler to sample the worker with
+    :type sampling_profiler: torvend.profiler.SamplingProfiler
+    :rtype: None
+    """
+
+    client = TorvendClient(*client_args)
+    search_stats = stats.SearchStats()
+    shard_queue = backpressure.ShardQueue(
+        shard_index, result_queue, consumed,
+        maxsize=client._build_settings(**settings)['TORVEND_MAX_QUEUED_ITEMS']
+    )
+    with client._get_profiling(sampling_profiler):
+        crawl_runner = client._build_runner(
+            queries, shard_queue.put,
+            results=results, settings=settings, search_stats=search_stats,
+            rate_limiter=rate_limiter, torrent_filter=torrent_filter
+        )
+        shard_queue.backpressure = backpressure.Backpressure(
+            crawl_runner.crawlers, metrics=client.metrics
+        )
+        client._run(crawl_runner.join())
+    result_queue.put((shard_index, search_stats,))
+    for worker_stats in (client.metrics, sampling_profiler,):
+        if worker_stats is not None:
+            result_queue.put((shard_index, worker_stats,))
+    # NOTE: exiting workers skip atexit handlers, so queued records are lost
+    const.flush_log(restart=False)
+    result_queue.put((shard_index, None,))
@@ -0,0 +1,236 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import re
+import random
+import hashlib
+import collections
+
+from . import (meta,)
+
+# NOTE: a mersenne prime larger than any 64-bit token hash
+PRIME = (1 << 61) - 1
+TOKEN_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def tokenize(name):
+    """ Tokenizes a torrent name into a set of lowercase words.
+
+    :param str name: The name of the torrent
+    :returns: A set of lowercase words
+    :rtype: set[str]
+    """
+
+    return set(TOKEN_PATTERN.findall((name or '').lower()))
+
+
+class Cluster(object):
+    """ A group of near-duplicate torrents.
+    """
+
+    def __init__(self, torrent, signature):
+        """ Initializes the cluster.
+
+        :param torvend.items.Torrent torrent: The first torrent of the cluster
+        :param tuple signature: The minhash signature of the first torrent
+        """
+
+        (self.representative, self.members, self.signature,) = \
+            (torrent, [torrent], signature,)
+
+    def __repr__(self):
+        """ Returns a string representation of an object instance.
+
+        :returns: A string representation of an object instance
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} ({count}) "{name}">'
+        ).format(
+            count=len(self.members), name=self.representative.get('name'),
+            **locals()
+        )
+
+    def __len__(self):
+        """ Returns the number of torrents in the cluster.
+
+        :returns: The number of torrents in the cluster
+        :rtype: int
+        """
+
+        return len(self.members)
+
+    def add(self, torrent):
+        """ Adds a torrent to the cluster.
+
+        .. note:: The torrent with the most seeders becomes the representative.
+
+        :param torvend.items.Torrent torrent: The torrent to add
+        :rtype: None
+        """
+
+        self.members.append(torrent)
+        (seeders, best,) = (
+            (torrent.get('seeders') or 0),
+            (self.representative.get('seeders') or 0),
+        )
+        if seeders > best:
+            self.representative = torrent
+
+
+class ReleaseClusterer(meta.Loggable):
+    """ Incrementally clusters near-duplicate torrents by name and size.
+
+    Names are tokenized into words and summarized as minhash signatures which
+    are bucketed by locality sensitive hashing (LSH), so adding a torrent only
+    compares it against the (bounded number of) clusters sharing one of its
+    buckets, keeping clustering linear in the number of torrents.
+    Torrents with the same info hash always share a cluster.
+    """
+
+    def __init__(
+        self,
+        threshold=0.6, size_tolerance=0.1, bands=16, rows=4,
+        max_candidates=8, seed=0
+    ):
+        """ Initializes the clusterer.
+
+        :param float threshold: The minimum estimated name similarity (Jaccard)
+            of torrents in the same cluster
+        :param float size_tolerance: The maximum relative size difference of
+            torrents in the same cluster
+        :param int bands: The number of LSH bands
+        :param int rows: The number of signature rows in each LSH band
+        :param int max_candidates: The maximum number of (most recent)
+            clusters kept in each LSH bucket
+        :param int seed: The seed of the minhash permutations
+        """
+
+        (self.threshold, self.size_tolerance, self.bands, self.rows,) = \
+            (threshold, size_tolerance, bands, rows,)
+        self.max_candidates = max_candidates
+        generator = random.Random(seed)
+        self._permutations = [
+            (generator.randrange(1, PRIME), generator.randrange(0, PRIME),)
+            for _ in range(bands * rows)
+        ]
+        (self.clusters, self._buckets, self._hashes,) = ([], {}, {},)
+
+    def get_signature(self, tokens):
+        """ Computes the minhash signature of a set of tokens.
+
+        :param tokens: The tokens to compute the signature of
+        :type tokens: set[str]
+        :returns: The minhash signature
+        :rtype: tuple[int]
+        """
+
+        if len(tokens) <= 0:
+            return tuple(PRIME for _ in self._permutations)
+
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(),
+                'little'
+            )
+            for token in tokens
+        ]
+        return tuple([
+            min([((a * value) + b) % PRIME for value in hashes])
+            for (a, b,) in self._permutations
+        ])
+
+    def _get_buckets(self, signature):
+        """ Gets the LSH bucket keys of a signature.
+
+        :param tuple signature: The minhash signature
+        :returns: The bucket keys of each band
+        :rtype: list[tuple]
+        """
+
+        return [
+            (band, signature[(band * self.rows):((band + 1) * self.rows)],)
+            for band in range(self.bands)
+        ]
+
+    def _is_similar(self, cluster, signature, size):
+        """ Checks if a torrent belongs to a cluster.
+
+        :param Cluster cluster: The candidate cluster
+        :param tuple signature: The minhash signature of the torrent
+        :param int size: The size of the torrent in bytes
+        :returns: True if the torrent belongs to the cluster
+        :rtype: bool
+        """
+
+        cluster_size = cluster.representative.get('size')
+        if size and cluster_size:
+            difference = abs(size - cluster_size) / max(size, cluster_size)
+            if difference > self.size_tolerance:
+                return False
+
+        agreement = sum(
+            1 for (left, right,) in zip(signature, cluster.signature)
+            if left == right
+        )
+        return (agreement / len(signature)) >= self.threshold
+
+    def add(self, torrent):
+        """ Adds a torrent to its cluster (or a new cluster).
+
+        :param torvend.items.Torrent torrent: The torrent to add
+        :returns: A tuple of the torrent's cluster and True if the cluster was
+            created by the torrent
+        :rtype: tuple[Cluster,bool]
+        """
+
+        info_hash = (torrent.get('hash') or '').lower()
+        if info_hash in self._hashes:
+            cluster = self._hashes[info_hash]
+            cluster.add(torrent)
+            return (cluster, False,)
+
+        signature = self.get_signature(tokenize(torrent.get('name')))
+        buckets = self._get_buckets(signature)
+        (cluster, size,) = (None, torrent.get('size'),)
+        for bucket in buckets:
+            for candidate in self._buckets.get(bucket, ()):
+                if self._is_similar(candidate, signature, size):
+                    cluster = candidate
+                    break
+            if cluster is not None:
+                break
+
+        created = cluster is None
+        if created:
+            cluster = Cluster(torrent, signature)
+            self.clusters.append(cluster)
+            for bucket in buckets:
+                if bucket not in self._buckets:
+                    self._buckets[bucket] = collections.deque(
+                        maxlen=self.max_candidates
+                    )
+                self._buckets[bucket].append(cluster)
+        else:
+            cluster.add(torrent)
+        if info_hash:
+            self._hashes[info_hash] = cluster
+        return (cluster, created,)
+
+
+def cluster_torrents(torrents, **kwargs):
+    """ Clusters near-duplicate torrents.
+
+    :param torrents: The torrents to cluster
+    :type torrents: list[torvend.items.Torrent]
+    :param kwargs: Any named arguments for the :class:`ReleaseClusterer`
+    :type kwargs: dict[str,....]
+    :returns: The clusters in order of their first torrent
+    :rtype: list[Cluster]
+    """
+
+    clusterer = ReleaseClusterer(**kwargs)
+    for torrent in torrents:
+        clusterer.add(torrent)
+    return clusterer.clusters
@@ -0,0 +1,407 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import csv
+import math
+import array
+import base64
+import binascii
+import calendar
+
+from . import (meta, items,)
+
+FORMATS = {
+    '.arrow': 'arrow',
+    '.ipc': 'arrow',
+    '.feather': 'arrow',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.csv': 'csv',
+}
+CATEGORY_BITS = {
+    category: (1 << idx)
+    for (idx, category,) in enumerate(items.TorrentCategory)
+}
+HASH_SIZE = 20
+HEADER = (
+    'name', 'size', 'seeders', 'leechers', 'uploaded',
+    'hash', 'categories', 'spider', 'query',
+)
+
+
+def get_format(path):
+    """ Gets the columnar format of a path from its extension.
+
+    :param str path: The path to get the format of
+    :returns: The name of the format (``csv`` for unknown extensions)
+    :rtype: str
+    """
+
+    return FORMATS.get(os.path.splitext(path)[-1].lower(), 'csv')
+
+
+def encode_hash(info_hash):
+    """ Encodes a hex (or base32) info hash text to bytes.
+
+    :param str info_hash: The info hash text
+    :returns: The info hash bytes (zeroed when the text is not a valid hash)
+    :rtype: bytes
+    """
+
+    try:
+        if len(info_hash) == (HASH_SIZE * 2):
+            return binascii.unhexlify(info_hash)
+        elif len(info_hash) == 32:
+            return base64.b32decode(info_hash.upper())
+    except (TypeError, ValueError, binascii.Error):
+        pass
+    return bytes(HASH_SIZE)
+
+
+def encode_categories(categories):
+    """ Encodes a list of categories to a bitmask.
+
+    :param categories: The categories to encode
+    :type categories: list[torvend.items.TorrentCategory]
+    :returns: The bitmask of the categories
+    :rtype: int
+    """
+
+    bitmask = 0
+    for category in (categories or []):
+        bitmask |= CATEGORY_BITS.get(category, 0)
+    return bitmask
+
+
+def decode_categories(bitmask):
+    """ Decodes a bitmask to a list of categories.
+
+    :param int bitmask: The bitmask to decode
+    :returns: The categories of the bitmask
+    :rtype: list[torvend.items.TorrentCategory]
+    """
+
+    return [
+        category
+        for (category, bit,) in CATEGORY_BITS.items()
+        if bitmask & bit
+    ]
+
+
+class ColumnarSink(meta.Loggable):
+    """ Buffers torrent items into typed columns and writes them in row groups.
+
+    Row groups are written as Arrow IPC or Parquet (requires the optional
+    ``pyarrow`` package) or as CSV.
+    The sink is callable so it can be given directly as a search callback.
+    """
+
+    def __init__(self, path, format=None, row_group_size=65536):
+        """ Initializes the sink.
+
+        :param str path: The path of the file to write
+        :param str format: The format to write (``arrow``, ``parquet`` or
+            ``csv``), defaults to the format of the path's extension
+        :param int row_group_size: The number of rows of each row group
+        :raises ValueError:
+            - when the format is not supported
+        """
+
+        if format is None:
+            format = get_format(path)
+        if format not in set(FORMATS.values()):
+            raise ValueError((
+                "unsupported columnar format '{format}'"
+            ).format(**locals()))
+
+        (self.path, self.format, self.row_group_size,) = \
+            (path, format, max(1, row_group_size),)
+        (self.count, self.closed, self._writer, self._file,) = \
+            (0, False, None, None,)
+        self._spiders = {}
+        self._reset()
+
+    def __enter__(self):
+        """ Enters the sink's context.
+
+        :returns: The sink
+        :rtype: ColumnarSink
+        """
+
+        return self
+
+    def __exit__(self, *args):
+        """ Exits the sink's context, closing the sink.
+
+        :rtype: None
+        """
+
+        self.close()
+
+    def __call__(self, item, **kwargs):
+        """ Appends a torrent item (allows using the sink as a callback).
+
+        :param torvend.items.Torrent item: The torrent item to append
+        :rtype: None
+        """
+
+        self.append(item)
+
+    def __len__(self):
+        """ Returns the number of buffered rows.
+
+        :returns: The number of buffered rows
+        :rtype: int
+        """
+
+        return len(self._columns['name'])
+
+    @property
+    def schema(self):
+        """ The arrow schema of written row groups.
+
+        :getter: Returns the arrow schema of written row groups
+        :setter: Does not allow setting
+        :rtype: pyarrow.Schema
+        """
+
+        if not hasattr(self, '_schema'):
+            # NOTE: local import as pyarrow is an optional dependency
+            import pyarrow
+
+            self._schema = pyarrow.schema([
+                ('name', pyarrow.string()),
+                ('size', pyarrow.int64()),
+                ('seeders', pyarrow.int32()),
+                ('leechers', pyarrow.int32()),
+                ('uploaded', pyarrow.timestamp('s')),
+                ('hash', pyarrow.binary(HASH_SIZE)),
+                ('categories', pyarrow.uint8()),
+                ('spider', pyarrow.dictionary(
+                    pyarrow.uint8(), pyarrow.string()
+                )),
+                ('query', pyarrow.string()),
+            ])
+        return self._schema
+
+    def _reset(self):
+        """ Resets the buffered columns.
+
+        :rtype: None
+        """
+
+        self._columns = {
+            'name': [],
+            'size': array.array('q'),
+            'seeders': array.array('i'),
+            'leechers': array.array('i'),
+            'uploaded': array.array('d'),
+            'hash': bytearray(),
+            'categories': array.array('B'),
+            'spider': array.array('B'),
+            'query': [],
+        }
+
+    def append(self, item):
+        """ Appends a torrent item to the buffered columns.
+
+        :param torvend.items.Torrent item: The torrent item to append
+        :rtype: None
+        """
+
+        spider = item.get('spider')
+        uploaded = item.get('uploaded')
+        # NOTE: values are encoded before appending to keep columns aligned
+        row = (
+            item.get('name'),
+            item.get('size') or 0,
+            item.get('seeders') or 0,
+            item.get('leechers') or 0,
+            (
+                float(calendar.timegm(uploaded.utctimetuple()))
+                if uploaded is not None else
+                math.nan
+            ),
+            encode_hash(item.get('hash') or ''),
+            encode_categories(item.get('categories')),
+            self._spiders.setdefault(spider, len(self._spiders)),
+            item.get('query'),
+        )
+
+        columns = self._columns
+        for (field, value,) in zip(HEADER, row):
+            if field == 'hash':
+                columns[field].extend(value)
+            else:
+                columns[field].append(value)
+
+        self.count += 1
+        if len(self) >= self.row_group_size:
+            self.flush()
+
+    def _build_batch(self):
+        """ Builds an arrow record batch of the buffered columns.
+
+        :returns: An arrow record batch
+        :rtype: pyarrow.RecordBatch
+        """
+
+        # NOTE: local import as pyarrow is an optional dependency
+        import pyarrow
+
+        (columns, rows,) = (self._columns, len(self),)
+        spiders = sorted(self._spiders, key=self._spiders.get)
+
+        def _from_buffer(column, column_type):
+            # NOTE: typed columns are handed to arrow without conversion
+            return pyarrow.Array.from_buffers(
+                column_type, rows, [None, pyarrow.py_buffer(column)]
+            )
+
+        uploaded = pyarrow.array(
+            columns['uploaded'], type=pyarrow.float64(), from_pandas=True
+        )
+        return pyarrow.record_batch([
+            pyarrow.array(columns['name'], type=pyarrow.string()),
+            _from_buffer(columns['size'], pyarrow.int64()),
+            _from_buffer(columns['seeders'], pyarrow.int32()),
+            _from_buffer(columns['leechers'], pyarrow.int32()),
+            uploaded.cast(pyarrow.int64()).cast(pyarrow.timestamp('s')),
+            _from_buffer(columns['hash'], pyarrow.binary(HASH_SIZE)),
+            _from_buffer(columns['categories'], pyarrow.uint8()),
+            pyarrow.DictionaryArray.from_arrays(
+                _from_buffer(columns['spider'], pyarrow.uint8()),
+                pyarrow.array(spiders, type=pyarrow.string())
+            ),
+            pyarrow.array(columns['query'], type=pyarrow.string()),
+        ], schema=self.schema)
+
+    def _open_arrow(self):
+        """ Opens an Arrow IPC file writer.
+
+        :rtype: None
+        """
+
+        # NOTE: local import as pyarrow is an optional dependency
+        import pyarrow.ipc
+
+        # NOTE: dictionary deltas allow new spiders in later row groups
+        self._writer = pyarrow.ipc.new_file(
+            self.path, self.schema,
+            options=pyarrow.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        )
+
+    def _open_parquet(self):
+        """ Opens a Parquet file writer.
+
+        :rtype: None
+        """
+
+        # NOTE: local import as pyarrow is an optional dependency
+        import pyarrow.parquet
+
+        self._writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def _open_csv(self):
+        """ Opens a CSV file writer.
+
+        :rtype: None
+        """
+
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(HEADER)
+
+    def _write_arrow(self):
+        """ Writes the buffered columns as an Arrow IPC record batch.
+
+        :rtype: None
+        """
+
+        self._writer.write_batch(self._build_batch())
+
+    def _write_parquet(self):
+        """ Writes the buffered columns as a Parquet row group.
+
+        :rtype: None
+        """
+
+        # NOTE: local import as pyarrow is an optional dependency
+        import pyarrow
+
+        self._writer.write_table(
+            pyarrow.Table.from_batches([self._build_batch()])
+        )
+
+    def _write_csv(self):
+        """ Writes the buffered columns as CSV rows.
+
+        :rtype: None
+        """
+
+        columns = self._columns
+        spiders = sorted(self._spiders, key=self._spiders.get)
+        hashes = bytes(columns['hash'])
+        self._writer.writerows(
+            (
+                columns['name'][idx],
+                columns['size'][idx],
+                columns['seeders'][idx],
+                columns['leechers'][idx],
+                (
+                    ''
+                    if math.isnan(columns['uploaded'][idx]) else
+                    int(columns['uploaded'][idx])
+                ),
+                hashes[(idx * HASH_SIZE):((idx + 1) * HASH_SIZE)].hex(),
+                columns['categories'][idx],
+                spiders[columns['spider'][idx]],
+                columns['query'][idx],
+            )
+            for idx in range(len(self))
+        )
+        self._file.flush()
+
+    def _open(self):
+        """ Opens the writer of the sink's format if not already opened.
+
+        :rtype: None
+        """
+
+        if self._writer is None:
+            getattr(self, ('_open_{self.format}').format(**locals()))()
+
+    def flush(self):
+        """ Writes the buffered columns as a row group.
+
+        :rtype: None
+        """
+
+        if len(self) <= 0:
+            return
+
+        self._open()
+        rows = len(self)
+        self.log.debug((
+            'writing row group of {rows} rows to `{self.path}`'
+        ).format(**locals()))
+        getattr(self, ('_write_{self.format}').format(**locals()))()
+        self._reset()
+
+    def close(self):
+        """ Writes any buffered rows and closes the written file.
+
+        :rtype: None
+        """
+
+        if self.closed:
+            return
+        self.flush()
+        # NOTE: an empty file (with a header or schema) is written without rows
+        self._open()
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+        self.closed = True
@@ -3,14 +3,11 @@
 
 import os
 import sys
-import logging
 import tempfile
 import traceback
 
 from . import (__version__,)
 
-import pygogo
-
 
 class _const(object):
     """ Modules constant's namespace.
@@ -94,30 +91,121 @@ class _const(object):
             )
         return self._log_dir
 
+    @property
+    def data_dir(self):
+        """ The persistent data directory path of the module.
+
+        .. note:: The directory is only created once something is stored.
+
+        :returns: The persistent data directory path of the module
+        :rtype: str
+        """
+
+        if not hasattr(self, '_data_dir'):
+            self._data_dir = os.path.join(
+                os.environ.get(
+                    'XDG_DATA_HOME',
+                    os.path.join(os.path.expanduser('~'), '.local', 'share')
+                ),
+                self.module_name
+            )
+        return self._data_dir
+
     @property
     def base_logger(self):
         """ The base module logger vendor.
 
+        .. note:: Records are handled by a background thread (see
+            :mod:`torvend.meta.logqueue`) which writes and flushes them in
+            batches, so logging never blocks on disk or terminal writes.
+
         :returns: The base module logger vendor
         :rtype: pygogo.Gogo
         """
 
         if not hasattr(self, '_base_logger'):
-            self._base_logger = pygogo.Gogo(
-                self.module_name,
-                low_hdlr=logging.handlers.TimedRotatingFileHandler(
+            # NOTE: local import to speed up module loading
+            import queue
+            import atexit
+            import pygogo
+            from .meta import (logqueue,)
+
+            (high_handler, low_handler,) = (
+                logqueue.BatchedStreamHandler(sys.stderr),
+                logqueue.BatchedTimedRotatingFileHandler(
                     filename=os.path.join(
                         self.log_dir,
                         ('{self.module_name}.log').format(**locals())
                     ),
                     when='midnight'
                 ),
-                low_formatter=pygogo.formatters.structured_formatter,
-                high_level='info',
-                high_formatter=pygogo.formatters.fixed_formatter
             )
+            high_handler.setFormatter(pygogo.formatters.fixed_formatter)
+            low_handler.setFormatter(
+                pygogo.formatters.structured_formatter
+            )
+
+            log_queue = queue.SimpleQueue()
+            self._log_listener = logqueue.QueueListener(
+                log_queue, high_handler, low_handler
+            )
+            self._base_logger = pygogo.Gogo(
+                self.module_name,
+                high_hdlr=logqueue.QueueHandler(log_queue, high_handler),
+                low_hdlr=logqueue.QueueHandler(log_queue, low_handler),
+                high_level='warning',
+                low_level='info'
+            )
+            self.__apply_verbose()
+            self._log_listener.start()
+            atexit.register(self.flush_log, restart=False)
         return self._base_logger
 
+    @property
+    def log_sample_rate(self):
+        """ The rate hot path debug records are sampled at.
+
+        Only the first and every ``log_sample_rate``-th record of a sampled
+        log call (such as every scraped item) is logged, see
+        :meth:`torvend.meta.Loggable.sample_log`.
+
+        :getter: Returns the rate hot path debug records are sampled at
+        :setter: Sets the rate hot path debug records are sampled at
+        :rtype: int
+        """
+
+        if not hasattr(self, '_log_sample_rate'):
+            self._log_sample_rate = 100
+        return self._log_sample_rate
+
+    @log_sample_rate.setter
+    def log_sample_rate(self, log_sample_rate):
+        """ Sets the rate hot path debug records are sampled at.
+
+        :param int log_sample_rate: The new sample rate (1 logs every record)
+        :raises AssertionError:
+            - when log_sample_rate is not a positive integer
+        :rtype: None
+        """
+
+        assert isinstance(log_sample_rate, int) and log_sample_rate > 0, (
+            "log_sample_rate expects a positive integer, "
+            "received {log_sample_rate}"
+        ).format(**locals())
+        self._log_sample_rate = log_sample_rate
+
+    def flush_log(self, restart=True):
+        """ Writes all queued log records.
+
+        :param bool restart: False to stop the logging thread (when exiting)
+        :rtype: None
+        """
+
+        if hasattr(self, '_log_listener') and self._log_listener.running:
+            self._log_listener.stop()
+            if restart:
+                self._log_listener.start()
+
     @property
     def log(self):
         """ The base module logger.
@@ -156,11 +244,38 @@ class _const(object):
         assert isinstance(verbose, bool), (
             "verbose expects a boolean value, received {verbose}"
         ).format(**locals())
-        if verbose:
-            self.base_logger.levels['high'] = 'DEBUG'
-        else:
-            self.base_logger.levels['high'] = 'WARNING'
         self._verbose = verbose
+        # NOTE: the base logger is only built once something is logged
+        if hasattr(self, '_base_logger'):
+            self.__apply_verbose()
+
+    def __apply_verbose(self):
+        """ Applies the verbose flag to the base logger and its loggers.
+
+        Debug records are only created if verbose logging is enabled.
+
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import logging
+
+        (high_level, low_level,) = (
+            (logging.DEBUG, logging.DEBUG,)
+            if self.verbose else
+            (logging.WARNING, logging.INFO,)
+        )
+        self._base_logger.levels.update(high=high_level, low=low_level)
+        high_handler = self._base_logger.handlers['high'].target
+        for logger_name in self._base_logger.loggers:
+            logger = logging.getLogger(logger_name)
+            logger.setLevel(low_level)
+            for handler in logger.handlers:
+                handler.setLevel(
+                    high_level
+                    if handler.target is high_handler else
+                    low_level
+                )
 
     def __exception_handler(self, exception_type, value, exception_traceback):
         """ A custom exception handler for logging to base loggers.
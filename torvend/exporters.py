@@ -0,0 +1,206 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import json
+
+from . import (meta, items,)
+
+# NOTE: field converters (the serializers of the torrent item's fields) are
+# resolved once rather than per exported item
+_FIELD_CONVERTERS = {
+    name: field['serializer']
+    for (name, field,) in items.Torrent.fields.items()
+    if field.get('serializer') is not None
+}
+
+
+def serialize_torrent(item):
+    """ Converts a torrent item to a dictionary of JSON compatible values.
+
+    :param torvend.items.Torrent item: The torrent item to convert
+    :returns: A dictionary of JSON compatible values
+    :rtype: dict[str,....]
+    """
+
+    serialized = {}
+    for (field, value,) in item.items():
+        if value is not None and field in _FIELD_CONVERTERS:
+            value = _FIELD_CONVERTERS[field](value)
+        serialized[field] = value
+    return serialized
+
+
+def _build_dumps():
+    """ Builds the fastest available JSON dumps function.
+
+    :returns: A function which dumps a dictionary to JSON bytes
+    :rtype: callable
+    """
+
+    try:
+        import orjson
+        return orjson.dumps
+    except ImportError:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':',))
+        return (lambda value: encoder.encode(value).encode('utf-8'))
+
+
+dumps = _build_dumps()
+
+
+class TorrentExporter(meta.Loggable):
+    """ The base exporter which writes torrent items to a binary file.
+    """
+
+    def __init__(self, file, flush=True):
+        """ Initializes the exporter.
+
+        :param file: The binary file to write to
+        :type file: io.BufferedIOBase
+        :param bool flush: True if the file should be flushed after each item
+        """
+
+        (self.file, self.flush, self.count,) = (file, flush, 0,)
+
+    def _write(self, content):
+        """ Writes content to the file.
+
+        :param bytes content: The content to write
+        :rtype: None
+        """
+
+        self.file.write(content)
+        if self.flush:
+            self.file.flush()
+
+    def start_exporting(self):
+        """ Writes any content required before the first item.
+
+        :rtype: None
+        """
+
+        pass
+
+    def export_item(self, item):
+        """ Writes a torrent item.
+
+        :param torvend.items.Torrent item: The torrent item to write
+        :rtype: None
+        """
+
+        raise NotImplementedError()
+
+    def finish_exporting(self):
+        """ Writes any content required after the last item.
+
+        :rtype: None
+        """
+
+        pass
+
+
+class JsonExporter(TorrentExporter):
+    """ Writes torrent items as a single JSON array.
+    """
+
+    def start_exporting(self):
+        """ Writes the start of the JSON array.
+
+        :rtype: None
+        """
+
+        self._write(b'[')
+
+    def export_item(self, item):
+        """ Writes a torrent item as an element of the JSON array.
+
+        :param torvend.items.Torrent item: The torrent item to write
+        :rtype: None
+        """
+
+        self._write(b''.join([
+            (b',\n' if self.count > 0 else b'\n'),
+            dumps(serialize_torrent(item)),
+        ]))
+        self.count += 1
+
+    def finish_exporting(self):
+        """ Writes the end of the JSON array.
+
+        :rtype: None
+        """
+
+        self._write(b'\n]')
+
+
+class NdjsonExporter(TorrentExporter):
+    """ Writes torrent items as newline delimited JSON (one item per line).
+    """
+
+    def export_item(self, item):
+        """ Writes a torrent item as a line of JSON.
+
+        :param torvend.items.Torrent item: The torrent item to write
+        :rtype: None
+        """
+
+        self._write(dumps(serialize_torrent(item)) + b'\n')
+        self.count += 1
+
+
+class MsgpackExporter(TorrentExporter):
+    """ Writes torrent items as a stream of msgpack maps.
+
+    .. note:: Requires the optional ``msgpack`` package.
+    """
+
+    def __init__(self, file, flush=True):
+        """ Initializes the exporter.
+
+        :param file: The binary file to write to
+        :type file: io.BufferedIOBase
+        :param bool flush: True if the file should be flushed after each item
+        """
+
+        # NOTE: local import as msgpack is an optional dependency
+        import msgpack
+
+        super(MsgpackExporter, self).__init__(file, flush=flush)
+        self._packer = msgpack.Packer()
+
+    def export_item(self, item):
+        """ Writes a torrent item as a msgpack map.
+
+        :param torvend.items.Torrent item: The torrent item to write
+        :rtype: None
+        """
+
+        self._write(self._packer.pack(serialize_torrent(item)))
+        self.count += 1
+
+
+EXPORTERS = {
+    'json': JsonExporter,
+    'ndjson': NdjsonExporter,
+    'msgpack': MsgpackExporter,
+}
+
+
+def get_exporter(name, file, flush=True):
+    """ Builds an exporter by name.
+
+    :param str name: The name of the exporter (see ``EXPORTERS``)
+    :param file: The binary file to write to
+    :type file: io.BufferedIOBase
+    :param bool flush: True if the file should be flushed after each item
+    :raises ValueError:
+        - when no exporter with the given name exists
+    :returns: A new exporter instance
+    :rtype: TorrentExporter
+    """
+
+    if name not in EXPORTERS:
+        raise ValueError((
+            "no exporter named '{name}' exists, {names}"
+        ).format(names=sorted(EXPORTERS.keys()), **locals()))
+    return EXPORTERS[name](file, flush=flush)
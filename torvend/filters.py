@@ -0,0 +1,143 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+from . import (meta, items,)
+
+
+class TorrentFilter(object):
+    """ Filters torrents by category, size and seeders.
+
+    Only the fields a torrent already has are checked, which allows spiders
+    to reject torrents from the cheap fields of listing pages before making
+    any additional requests.
+    """
+
+    def __init__(
+        self,
+        categories=None, min_size=None, max_size=None, min_seeders=None
+    ):
+        """ Initializes the filter.
+
+        :param categories: The categories of which a torrent needs at least one
+        :type categories: list[torvend.items.TorrentCategory]
+        :param int min_size: The minimum size in bytes of a torrent
+        :param int max_size: The maximum size in bytes of a torrent
+        :param int min_seeders: The minimum number of seeders of a torrent
+        """
+
+        self.categories = frozenset(
+            items.TorrentCategory(category)
+            for category in (categories or [])
+        )
+        (self.min_size, self.max_size, self.min_seeders,) = \
+            (min_size, max_size, min_seeders,)
+
+    def __repr__(self):
+        """ Returns a string representation of an object instance.
+
+        :returns: A string representation of an object instance
+        :rtype: str
+        """
+
+        return ('<{self.__class__.__name__} {self.key}>').format(**locals())
+
+    def __bool__(self):
+        """ Checks if the filter filters anything.
+
+        :returns: True if any filter is given
+        :rtype: bool
+        """
+
+        return any([
+            len(self.categories) > 0,
+            self.min_size is not None,
+            self.max_size is not None,
+            self.min_seeders is not None,
+        ])
+
+    @property
+    def key(self):
+        """ A hashable key of the filter.
+
+        :getter: Returns a hashable key of the filter
+        :setter: Does not allow setting
+        :rtype: tuple
+        """
+
+        return (
+            tuple(sorted(category.value for category in self.categories)),
+            self.min_size, self.max_size, self.min_seeders,
+        )
+
+    def accepts(self, torrent):
+        """ Checks if a (possibly partially parsed) torrent is accepted.
+
+        :param torvend.items.Torrent torrent: The torrent to check
+        :returns: True if none of the torrent's fields are filtered
+        :rtype: bool
+        """
+
+        categories = torrent.get('categories')
+        if self.categories and categories is not None:
+            if self.categories.isdisjoint(categories):
+                return False
+
+        size = torrent.get('size')
+        if size is not None:
+            if self.min_size is not None and size < self.min_size:
+                return False
+            if self.max_size is not None and size > self.max_size:
+                return False
+
+        seeders = torrent.get('seeders')
+        if self.min_seeders is not None and seeders is not None:
+            if seeders < self.min_seeders:
+                return False
+        return True
+
+
+class FilterPipeline(meta.Loggable):
+    """ An item pipeline which drops torrents rejected by the spider's filter.
+
+    The filter is read from the spider's ``torrent_filter`` attribute.
+    """
+
+    def __init__(self, crawler):
+        """ Initializes the pipeline.
+
+        :param scrapy.crawler.Crawler crawler: The running crawler
+        """
+
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """ Builds the pipeline from a crawler.
+
+        :param scrapy.crawler.Crawler crawler: The running crawler
+        :returns: A new pipeline instance
+        :rtype: FilterPipeline
+        """
+
+        return cls(crawler)
+
+    def process_item(self, item, spider=None):
+        """ Drops torrent items rejected by the spider's filter.
+
+        :param torvend.items.Torrent item: The scraped torrent item
+        :param scrapy.Spider spider: The spider of the item
+        :raises scrapy.exceptions.DropItem:
+            - when the torrent item is rejected by the filter
+        :returns: The torrent item
+        :rtype: torvend.items.Torrent
+        """
+
+        # NOTE: local import to speed up module loading
+        from scrapy.exceptions import (DropItem,)
+
+        torrent_filter = getattr(self.crawler.spider, 'torrent_filter', None)
+        if torrent_filter and not torrent_filter.accepts(item):
+            raise DropItem((
+                'torrent `{name}` rejected by `{torrent_filter}`'
+            ).format(name=item.get('name'), **locals()))
+        return item
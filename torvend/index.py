@@ -0,0 +1,281 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import time
+import sqlite3
+import datetime
+import calendar
+
+from . import (const, meta, items, columnar,)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS torrents (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    size INTEGER,
+    categories INTEGER,
+    uploaded REAL,
+    uploader TEXT,
+    magnet TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sightings (
+    torrent_id INTEGER NOT NULL REFERENCES torrents (id) ON DELETE CASCADE,
+    spider TEXT NOT NULL,
+    source TEXT,
+    seeders INTEGER,
+    leechers INTEGER,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (torrent_id, spider)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS torrents_fts USING fts5(
+    name, content='torrents', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS torrents_insert AFTER INSERT ON torrents BEGIN
+    INSERT INTO torrents_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS torrents_delete AFTER DELETE ON torrents BEGIN
+    INSERT INTO torrents_fts (torrents_fts, rowid, name)
+    VALUES ('delete', old.id, old.name);
+END;
+'''
+UPSERT_TORRENT = '''
+INSERT INTO torrents (
+    hash, name, size, categories, uploaded, uploader, magnet,
+    first_seen, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (hash) DO UPDATE SET
+    size = coalesce(excluded.size, size),
+    categories = (categories | excluded.categories),
+    uploaded = coalesce(excluded.uploaded, uploaded),
+    uploader = coalesce(excluded.uploader, uploader),
+    magnet = coalesce(excluded.magnet, magnet),
+    last_seen = excluded.last_seen
+'''
+UPSERT_SIGHTING = '''
+INSERT INTO sightings (
+    torrent_id, spider, source, seeders, leechers, last_seen
+) VALUES ((SELECT id FROM torrents WHERE hash = ?), ?, ?, ?, ?, ?)
+ON CONFLICT (torrent_id, spider) DO UPDATE SET
+    source = excluded.source,
+    seeders = excluded.seeders,
+    leechers = excluded.leechers,
+    last_seen = excluded.last_seen
+'''
+# NOTE: the bare sighting columns are taken from the row of most seeders
+SELECT_MATCHES = '''
+SELECT
+    torrents.hash, torrents.name, torrents.size, torrents.categories,
+    torrents.uploaded, torrents.uploader, torrents.magnet,
+    sightings.spider, sightings.source,
+    max(sightings.seeders) AS seeders, sightings.leechers
+FROM torrents_fts
+JOIN torrents ON torrents.id = torrents_fts.rowid
+JOIN sightings ON sightings.torrent_id = torrents.id
+WHERE torrents_fts MATCH ? AND torrents.last_seen >= ?
+GROUP BY torrents.id
+ORDER BY seeders DESC
+LIMIT ?
+'''
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def build_match(query):
+    """ Builds a FTS5 match expression matching all terms of a query.
+
+    :param str query: The query text
+    :returns: The FTS5 match expression
+    :rtype: str
+    """
+
+    return ' '.join(
+        ('"{term}"').format(term=term.replace('"', '""'))
+        for term in query.split()
+    )
+
+
+class LocalIndex(meta.Loggable):
+    """ A persistent SQLite full-text index of discovered torrents.
+
+    The index is callable so it can be given directly as a search callback.
+    Every spider's latest seeders and leechers of a torrent are kept
+    alongside the time the torrent was last seen.
+    """
+
+    def __init__(self, path=None, batch_size=256):
+        """ Initializes the index.
+
+        :param str path: The path of the index database, defaults to
+            ``index.sqlite3`` in the module's data directory
+        :param int batch_size: The number of torrents to write per transaction
+        """
+
+        if path is None:
+            path = os.path.join(const.data_dir, 'index.sqlite3')
+        (self.path, self.batch_size,) = (path, max(1, batch_size),)
+        self._pending = []
+
+    def __enter__(self):
+        """ Enters the index's context.
+
+        :returns: The index
+        :rtype: LocalIndex
+        """
+
+        return self
+
+    def __exit__(self, *args):
+        """ Exits the index's context, closing the index.
+
+        :rtype: None
+        """
+
+        self.close()
+
+    def __call__(self, item, **kwargs):
+        """ Adds a torrent item (allows using the index as a callback).
+
+        :param torvend.items.Torrent item: The torrent item to add
+        :rtype: None
+        """
+
+        self.add(item)
+
+    def __len__(self):
+        """ Returns the number of indexed torrents.
+
+        :returns: The number of indexed torrents
+        :rtype: int
+        """
+
+        self.flush()
+        return self.connection.execute(
+            'SELECT count(*) FROM torrents'
+        ).fetchone()[0]
+
+    @property
+    def connection(self):
+        """ The connection to the index database.
+
+        :getter: Returns the connection to the index database
+        :setter: Does not allow setting
+        :rtype: sqlite3.Connection
+        """
+
+        if not hasattr(self, '_connection'):
+            parent_dir = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.isdir(parent_dir):
+                os.makedirs(parent_dir)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute('PRAGMA journal_mode = WAL')
+            self._connection.execute('PRAGMA synchronous = NORMAL')
+            self._connection.execute('PRAGMA foreign_keys = ON')
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def add(self, item):
+        """ Adds a torrent item to the index.
+
+        .. note:: Items are written once ``batch_size`` items are pending.
+
+        :param torvend.items.Torrent item: The torrent item to add
+        :rtype: None
+        """
+
+        if not item.get('hash') or not item.get('name'):
+            return
+        self._pending.append(item)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """ Writes all pending torrent items to the index.
+
+        :rtype: None
+        """
+
+        if len(self._pending) <= 0:
+            return
+
+        (pending, self._pending, now,) = (self._pending, [], time.time(),)
+        (torrents, sightings,) = ([], [],)
+        for item in pending:
+            info_hash = item['hash'].lower()
+            uploaded = item.get('uploaded')
+            torrents.append((
+                info_hash, item['name'], item.get('size'),
+                columnar.encode_categories(item.get('categories')),
+                (
+                    calendar.timegm(uploaded.utctimetuple())
+                    if uploaded is not None else
+                    None
+                ),
+                item.get('uploader'), item.get('magnet'),
+                now, now,
+            ))
+            sightings.append((
+                info_hash, item.get('spider'), item.get('source'),
+                item.get('seeders'), item.get('leechers'),
+                now,
+            ))
+
+        with self.connection:
+            self.connection.executemany(UPSERT_TORRENT, torrents)
+            self.connection.executemany(UPSERT_SIGHTING, sightings)
+        self.log.debug((
+            'indexed {count} torrents in `{self.path}`'
+        ).format(count=len(pending), **locals()))
+
+    def search(self, query, results=25, max_age=None):
+        """ Searches the index for torrents matching all terms of a query.
+
+        :param str query: The query to search for
+        :param int results: The maximum number of torrents to return
+        :param float max_age: The maximum number of seconds since a returned
+            torrent was last seen
+        :returns: A list of torrent items sorted by seeders
+        :rtype: list[torvend.items.Torrent]
+        """
+
+        match = build_match(query)
+        if len(match) <= 0:
+            return []
+
+        self.flush()
+        since = (time.time() - max_age) if max_age is not None else 0.0
+        torrents = []
+        for (
+            info_hash, name, size, categories, uploaded, uploader, magnet,
+            spider, source, seeders, leechers,
+        ) in self.connection.execute(SELECT_MATCHES, (match, since, results,)):
+            torrents.append(items.Torrent(
+                spider=spider, source=source, name=name, size=size,
+                hash=info_hash, magnet=magnet,
+                categories=(
+                    columnar.decode_categories(categories)
+                    if categories else
+                    [items.TorrentCategory.Unknown]
+                ),
+                seeders=seeders, leechers=leechers,
+                uploaded=(
+                    EPOCH + datetime.timedelta(seconds=uploaded)
+                    if uploaded is not None else
+                    None
+                ),
+                uploader=uploader, query=query,
+            ))
+        return torrents
+
+    def close(self):
+        """ Writes all pending torrent items and closes the index.
+
+        :rtype: None
+        """
+
+        self.flush()
+        if hasattr(self, '_connection'):
+            self._connection.close()
+            del self._connection
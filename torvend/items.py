@@ -45,6 +45,7 @@ class Torrent(scrapy.Item):
     :param int leechers: The number of leechers
     :param datetime.datetime uploaded: The datetime to torrent was uploaded
     :param str uploader: The username of the uploader
+    :param str query: The query text which discovered the torrent
     """
 
     def __repr__(self):
@@ -71,3 +72,4 @@ class Torrent(scrapy.Item):
     leechers = scrapy.Field(serializer=int)
     uploaded = scrapy.Field(serializer=str)
     uploader = scrapy.Field()
+    query = scrapy.Field()
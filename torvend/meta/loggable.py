@@ -1,6 +1,8 @@
 # Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
 # MIT License <https://opensource.org/licenses/MIT>
 
+import collections
+
 from .. import (const,)
 
 
@@ -20,3 +22,20 @@ class Loggable(object):
         if not hasattr(self, '_log'):
             self._log = const.base_logger.get_logger(self.__class__.__name__)
         return self._log
+
+    def sample_log(self, key):
+        """ Indicates if a sampled log record should be logged.
+
+        Hot path log calls (such as once per scraped item) are sampled so
+        that only the first and every ``const.log_sample_rate``-th call of
+        the same key are logged.
+
+        :param str key: The key of the sampled log call
+        :returns: True if the record should be logged
+        :rtype: bool
+        """
+
+        if not hasattr(self, '_log_samples'):
+            self._log_samples = collections.Counter()
+        self._log_samples[key] += 1
+        return (self._log_samples[key] - 1) % const.log_sample_rate == 0
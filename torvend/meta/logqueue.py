@@ -0,0 +1,188 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import queue
+import logging.handlers
+
+# NOTE: the maximum number of records written between flushes
+BATCH_SIZE = 256
+
+
+class BatchedFlushMixin(object):
+    """ A mixin for stream handlers which defers flushes to the end of batches.
+    """
+
+    _deferred = False
+
+    def flush(self):
+        """ Flushes the stream unless a batch is being handled.
+
+        :rtype: None
+        """
+
+        if not self._deferred:
+            super().flush()
+
+    def handle_batch(self, records):
+        """ Handles a batch of records with a single flush.
+
+        :param records: The records to handle
+        :type records: list[logging.LogRecord]
+        :rtype: None
+        """
+
+        self._deferred = True
+        try:
+            for record in records:
+                self.handle(record)
+        finally:
+            self._deferred = False
+            self.flush()
+
+
+class BatchedStreamHandler(BatchedFlushMixin, logging.StreamHandler):
+    """ A stream handler flushing once per batch of records.
+    """
+
+    pass
+
+
+class BatchedTimedRotatingFileHandler(
+    BatchedFlushMixin, logging.handlers.TimedRotatingFileHandler
+):
+    """ A timed rotating file handler flushing once per batch of records.
+    """
+
+    pass
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """ A handler which enqueues records for a target handler.
+
+    Records are only merged with their arguments before being enqueued,
+    formatting (such as the structured JSON formatting) and writing is left
+    to the :class:`QueueListener` thread.
+    """
+
+    def __init__(self, queue, target):
+        """ Initializes the handler.
+
+        :param queue.Queue queue: The queue to put records in
+        :param logging.Handler target: The handler which handles the records
+        """
+
+        super().__init__(queue)
+        self.target = target
+
+    def prepare(self, record):
+        """ Prepares a record for being handled in another thread.
+
+        :param logging.LogRecord record: The record to prepare
+        :returns: The record with its message merged
+        :rtype: logging.LogRecord
+        """
+
+        # NOTE: merging is idempotent, so records are not copied for the
+        # queue handlers of both the high and low handler
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        """ Enqueues a record along with its target handler.
+
+        :param logging.LogRecord record: The prepared record
+        :rtype: None
+        """
+
+        self.queue.put_nowait((self.target, record,))
+
+
+class QueueListener(logging.handlers.QueueListener):
+    """ A listener which handles enqueued records in batches.
+
+    Every batch is handled by the target handlers of its records, handlers
+    providing ``handle_batch`` (see :class:`BatchedFlushMixin`) only flush
+    once per batch.
+    """
+
+    def __init__(self, queue, *handlers, batch_size=BATCH_SIZE):
+        """ Initializes the listener.
+
+        :param queue.Queue queue: The queue records are taken from
+        :param handlers: The target handlers (flushed and closed on stop)
+        :type handlers: list[logging.Handler]
+        :param int batch_size: The maximum number of records per batch
+        """
+
+        super().__init__(queue, *handlers)
+        self.batch_size = batch_size
+
+    @property
+    def running(self):
+        """ Indicates if the listener thread is running.
+
+        :getter: Returns True if the listener thread is running
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return self._thread is not None
+
+    def stop(self):
+        """ Handles all enqueued records and stops the listener thread.
+
+        :rtype: None
+        """
+
+        if self.running:
+            super().stop()
+
+    def _dequeue_batch(self):
+        """ Dequeues a batch of records (blocking for the first record).
+
+        :returns: A tuple of the dequeued (target, record) pairs and True if
+            the listener was stopped
+        :rtype: tuple[list[tuple[logging.Handler,logging.LogRecord]],bool]
+        """
+
+        (batch, entry,) = ([], self.dequeue(True),)
+        while entry is not self._sentinel:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                return (batch, False,)
+            try:
+                entry = self.dequeue(False)
+            except queue.Empty:
+                return (batch, False,)
+        return (batch, True,)
+
+    def handle_batch(self, batch):
+        """ Handles a batch of records by their target handlers.
+
+        :param batch: The (target, record) pairs to handle
+        :type batch: list[tuple[logging.Handler,logging.LogRecord]]
+        :rtype: None
+        """
+
+        targets = {}
+        for (target, record,) in batch:
+            targets.setdefault(target, []).append(record)
+        for (target, records,) in targets.items():
+            if hasattr(target, 'handle_batch'):
+                target.handle_batch(records)
+            else:
+                for record in records:
+                    target.handle(record)
+
+    def _monitor(self):
+        """ Handles batches of enqueued records until stopped.
+
+        :rtype: None
+        """
+
+        stopped = False
+        while not stopped:
+            (batch, stopped,) = self._dequeue_batch()
+            if len(batch) > 0:
+                self.handle_batch(batch)
@@ -0,0 +1,518 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import collections
+
+from . import (meta, stats,)
+
+# NOTE: the (kind, name, help, label names) of every registered metric
+METRICS = (
+    (
+        'counter', 'torvend_requests_total',
+        'Responses received by spider and HTTP status.',
+        ('spider', 'status',),
+    ),
+    (
+        'counter', 'torvend_response_bytes_total',
+        'Bytes downloaded by spider.',
+        ('spider',),
+    ),
+    (
+        'histogram', 'torvend_parse_seconds',
+        'Seconds spent producing the results of a response by spider.',
+        ('spider',),
+    ),
+    (
+        'counter', 'torvend_items_scraped_total',
+        'Torrent items scraped by spider.',
+        ('spider',),
+    ),
+    (
+        'counter', 'torvend_items_dropped_total',
+        'Torrent items dropped by item pipelines by spider.',
+        ('spider',),
+    ),
+    (
+        'counter', 'torvend_duplicates_filtered_total',
+        'Duplicate requests filtered by spider.',
+        ('spider',),
+    ),
+    (
+        'counter', 'torvend_connections_total',
+        'HTTP connections by spider and result (new or reused).',
+        ('spider', 'result',),
+    ),
+    (
+        'counter', 'torvend_tls_handshakes_total',
+        'TLS handshakes by spider and session (new or offered).',
+        ('spider', 'session',),
+    ),
+    (
+        'histogram', 'torvend_reactor_stall_seconds',
+        'Seconds the reactor stalled by blocking spider and callback.',
+        ('spider', 'callback',),
+    ),
+    (
+        'counter', 'torvend_spiders_closed_total',
+        'Finished spider runs by spider and close reason.',
+        ('spider', 'reason',),
+    ),
+    (
+        'counter', 'torvend_cache_requests_total',
+        'Result cache lookups by result (hit, stale or miss).',
+        ('result',),
+    ),
+    (
+        'counter', 'torvend_crawls_total',
+        'Crawls by mode (started or joined in-flight).',
+        ('mode',),
+    ),
+    (
+        'counter', 'torvend_crawl_pauses_total',
+        'Crawls paused until their consumers caught up.',
+        (),
+    ),
+    (
+        'gauge', 'torvend_crawls_in_flight',
+        'Currently running crawls.',
+        (),
+    ),
+)
+# NOTE: the content type of the text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labels):
+    """ Formats labels for the text exposition format.
+
+    :param labels: The (name, value) pairs of the labels
+    :type labels: list[tuple[str,str]]
+    :returns: The formatted labels (empty if there are no labels)
+    :rtype: str
+    """
+
+    if len(labels) <= 0:
+        return ''
+    return '{{{0}}}'.format(','.join(
+        '{0}="{1}"'.format(name, str(value).replace(
+            '\\', '\\\\'
+        ).replace('\n', '\\n').replace('"', '\\"'))
+        for (name, value,) in labels
+    ))
+
+
+def _format_value(value):
+    """ Formats a sample value for the text exposition format.
+
+    :param value: The sample value
+    :type value: int or float
+    :returns: The formatted sample value
+    :rtype: str
+    """
+
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricFamily(object):
+    """ The labelled values of a single metric.
+    """
+
+    def __init__(self, kind, name, help_text, labels=()):
+        """ Initializes the metric family.
+
+        :param str kind: The kind of the metric (``counter``, ``gauge`` or
+            ``histogram``)
+        :param str name: The name of the metric
+        :param str help_text: The description of the metric
+        :param labels: The names of the metric's labels
+        :type labels: tuple[str]
+        """
+
+        assert kind in ('counter', 'gauge', 'histogram',), (
+            "unsupported metric kind '{kind}'"
+        ).format(**locals())
+        (self.kind, self.name, self.help_text, self.labels,) = \
+            (kind, name, help_text, tuple(labels),)
+        self.values = collections.OrderedDict()
+
+    def __repr__(self):
+        """ Returns a string representation of the metric family.
+
+        :returns: A string representation of the metric family
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} {self.kind} "{self.name}">'
+        ).format(**locals())
+
+    def get_key(self, labels):
+        """ Gets the key of some label values.
+
+        :param labels: The label values by label name
+        :type labels: dict[str,str]
+        :raises ValueError: If the labels do not match the metric's labels
+        :returns: The label values in the order of the metric's labels
+        :rtype: tuple[str]
+        """
+
+        if set(labels) != set(self.labels):
+            received = tuple(sorted(labels))
+            raise ValueError((
+                "metric '{self.name}' requires labels {self.labels}, "
+                "received {received}"
+            ).format(**locals()))
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        """ Renders the metric family in the text exposition format.
+
+        :returns: The lines of the metric family
+        :rtype: list[str]
+        """
+
+        lines = [
+            '# HELP {self.name} {self.help_text}'.format(**locals()),
+            '# TYPE {self.name} {self.kind}'.format(**locals()),
+        ]
+        for (key, value,) in self.values.items():
+            labels = list(zip(self.labels, key))
+            if self.kind != 'histogram':
+                lines.append('{0}{1} {2}'.format(
+                    self.name, _format_labels(labels), _format_value(value)
+                ))
+                continue
+
+            for (bound, count,) in value.to_dict()['buckets']:
+                lines.append('{0}_bucket{1} {2}'.format(
+                    self.name, _format_labels(labels + [(
+                        'le', ('+Inf' if bound is None else (
+                            '{0:g}'.format(bound)
+                        )),
+                    )]), count
+                ))
+            lines.append('{0}_sum{1} {2}'.format(
+                self.name, _format_labels(labels), _format_value(value.total)
+            ))
+            lines.append('{0}_count{1} {2}'.format(
+                self.name, _format_labels(labels), value.count
+            ))
+        return lines
+
+
+class MetricsRegistry(meta.Loggable):
+    """ A registry of engine counters, gauges and histograms.
+
+    The registry is fed by the signals and stats of the crawlers it is
+    connected to (see :func:`~torvend.metrics.MetricsRegistry.connect`) and
+    by the client and service it is given to.
+    It renders its metrics in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        """ Initializes the registry with the metrics of ``METRICS``.
+        """
+
+        self.families = collections.OrderedDict()
+        for (kind, name, help_text, labels,) in METRICS:
+            self.register(kind, name, help_text, labels=labels)
+
+    def __repr__(self):
+        """ Returns a string representation of the registry.
+
+        :returns: A string representation of the registry
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} metrics={metric_count}>'
+        ).format(metric_count=len(self.families), **locals())
+
+    def __getstate__(self):
+        """ Gets the picklable state of the registry.
+
+        :returns: The state of the registry (without the logger)
+        :rtype: dict[str,....]
+        """
+
+        state = self.__dict__.copy()
+        state.pop('_log', None)
+        return state
+
+    def register(self, kind, name, help_text, labels=()):
+        """ Registers a metric.
+
+        :param str kind: The kind of the metric (``counter``, ``gauge`` or
+            ``histogram``)
+        :param str name: The name of the metric
+        :param str help_text: The description of the metric
+        :param labels: The names of the metric's labels
+        :type labels: tuple[str]
+        :raises ValueError: If a metric of the name is already registered
+        :returns: The registered metric family
+        :rtype: MetricFamily
+        """
+
+        if name in self.families:
+            raise ValueError((
+                "metric '{name}' is already registered"
+            ).format(**locals()))
+        self.families[name] = MetricFamily(
+            kind, name, help_text, labels=labels
+        )
+        return self.families[name]
+
+    def _get_family(self, name, *kinds):
+        """ Gets a registered metric family of some kinds.
+
+        :param str name: The name of the metric
+        :param kinds: The allowed kinds of the metric
+        :type kinds: tuple[str]
+        :raises KeyError: If no metric of the name is registered
+        :returns: The metric family
+        :rtype: MetricFamily
+        """
+
+        family = self.families[name]
+        assert family.kind in kinds, (
+            "metric '{name}' is a {family.kind}, expected one of {kinds}"
+        ).format(**locals())
+        return family
+
+    def get_value(self, name, **labels):
+        """ Gets the current value of a metric.
+
+        :param str name: The name of the metric
+        :param labels: The label values of the metric
+        :type labels: dict[str,str]
+        :returns: The value (a histogram for histograms, None if nothing
+            was recorded)
+        :rtype: int or float or torvend.stats.Histogram
+        """
+
+        family = self.families[name]
+        return family.values.get(family.get_key(labels))
+
+    def inc(self, name, value=1, **labels):
+        """ Increments a counter or gauge.
+
+        :param str name: The name of the metric
+        :param value: The value to increment by
+        :type value: int or float
+        :param labels: The label values of the metric
+        :type labels: dict[str,str]
+        :rtype: None
+        """
+
+        family = self._get_family(name, 'counter', 'gauge')
+        assert family.kind == 'gauge' or value >= 0, (
+            "counter '{name}' cannot be decremented"
+        ).format(**locals())
+        key = family.get_key(labels)
+        family.values[key] = family.values.get(key, 0) + value
+
+    def dec(self, name, value=1, **labels):
+        """ Decrements a gauge.
+
+        :param str name: The name of the metric
+        :param value: The value to decrement by
+        :type value: int or float
+        :param labels: The label values of the metric
+        :type labels: dict[str,str]
+        :rtype: None
+        """
+
+        self._get_family(name, 'gauge')
+        self.inc(name, value=-value, **labels)
+
+    def set(self, name, value, **labels):
+        """ Sets a gauge.
+
+        :param str name: The name of the metric
+        :param value: The value of the gauge
+        :type value: int or float
+        :param labels: The label values of the metric
+        :type labels: dict[str,str]
+        :rtype: None
+        """
+
+        family = self._get_family(name, 'gauge')
+        family.values[family.get_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        """ Records an observation of a histogram.
+
+        :param str name: The name of the metric
+        :param float value: The observed value
+        :param labels: The label values of the metric
+        :type labels: dict[str,str]
+        :rtype: None
+        """
+
+        family = self._get_family(name, 'histogram')
+        key = family.get_key(labels)
+        histogram = family.values.get(key)
+        if histogram is None:
+            histogram = family.values[key] = stats.Histogram()
+        histogram.record(value)
+
+    def merge(self, other):
+        """ Merges the values of another registry into this registry.
+
+        .. note:: Gauges are summed, as merged registries are expected to
+            be of separate processes.
+
+        :param MetricsRegistry other: The registry to merge
+        :rtype: None
+        """
+
+        for (name, other_family,) in other.families.items():
+            family = self.families.get(name)
+            if family is None:
+                family = self.register(
+                    other_family.kind, name, other_family.help_text,
+                    labels=other_family.labels
+                )
+            for (key, value,) in other_family.values.items():
+                if family.kind != 'histogram':
+                    family.values[key] = family.values.get(key, 0) + value
+                    continue
+                if key not in family.values:
+                    family.values[key] = stats.Histogram(
+                        buckets=value.buckets
+                    )
+                family.values[key].merge(value)
+
+    def render(self):
+        """ Renders all metrics in the text exposition format.
+
+        :returns: The text exposition of all metrics
+        :rtype: str
+        """
+
+        return ''.join(
+            (line + '\n')
+            for family in self.families.values()
+            for line in family.render()
+        )
+
+    def write(self, filepath):
+        """ Writes the text exposition of all metrics to a file.
+
+        The file is replaced atomically, which allows it to be picked up by
+        a textfile collector (such as node_exporter's) at any time.
+
+        :param str filepath: The path of the file to write
+        :rtype: None
+        """
+
+        temp_filepath = '{filepath}.tmp'.format(**locals())
+        with open(temp_filepath, 'w') as fp:
+            fp.write(self.render())
+        os.replace(temp_filepath, filepath)
+
+    def connect(self, crawler):
+        """ Connects the registry to the signals of a crawler.
+
+        :param scrapy.crawler.Crawler crawler: The crawler to record
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import scrapy.signals
+
+        for (handler, signal,) in (
+            (self._response_received, scrapy.signals.response_received,),
+            (self._response_parsed, stats.response_parsed,),
+            (self._item_dropped, scrapy.signals.item_dropped,),
+            (self._spider_closed, scrapy.signals.spider_closed,),
+        ):
+            crawler.signals.connect(handler, signal)
+
+    def _response_received(self, response, request, spider, **kwargs):
+        """ Counts a received response.
+
+        :param scrapy.http.Response response: The received response
+        :param scrapy.Request request: The request of the response
+        :param scrapy.Spider spider: The spider of the request
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        self.inc(
+            'torvend_requests_total',
+            spider=spider.name, status=response.status
+        )
+
+    def _response_parsed(self, spider, seconds, **kwargs):
+        """ Records the duration of parsing a response.
+
+        :param scrapy.Spider spider: The spider of the response
+        :param float seconds: The duration in seconds
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        self.observe('torvend_parse_seconds', seconds, spider=spider.name)
+
+    def _item_dropped(self, item, spider, **kwargs):
+        """ Counts a dropped item.
+
+        :param torvend.items.Torrent item: The dropped item
+        :param scrapy.Spider spider: The spider of the item
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        self.inc('torvend_items_dropped_total', spider=spider.name)
+
+    def _spider_closed(self, spider, reason, **kwargs):
+        """ Records the crawler stats of a closed spider.
+
+        :param scrapy.Spider spider: The closed spider
+        :param str reason: The reason the spider was closed
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        crawler_stats = spider.crawler.stats
+        for (name, stat_key,) in (
+            ('torvend_response_bytes_total', 'downloader/response_bytes',),
+            ('torvend_duplicates_filtered_total', 'dupefilter/filtered',),
+        ):
+            self.inc(
+                name, crawler_stats.get_value(stat_key, 0),
+                spider=spider.name
+            )
+        for (result, stat_key,) in (
+            ('new', 'pool/connections_new',),
+            ('reused', 'pool/connections_reused',),
+        ):
+            self.inc(
+                'torvend_connections_total',
+                crawler_stats.get_value(stat_key, 0),
+                spider=spider.name, result=result
+            )
+        (handshakes, offered,) = (
+            crawler_stats.get_value('pool/tls_handshakes', 0),
+            crawler_stats.get_value('pool/tls_sessions_offered', 0),
+        )
+        if handshakes > 0:
+            for (session, count,) in (
+                ('new', (handshakes - offered),), ('offered', offered,),
+            ):
+                self.inc(
+                    'torvend_tls_handshakes_total', count,
+                    spider=spider.name, session=session
+                )
+        self.inc(
+            'torvend_spiders_closed_total',
+            spider=spider.name, reason=reason
+        )
@@ -0,0 +1,389 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import collections
+
+from . import (meta,)
+
+from scrapy.core.downloader.handlers.http11 import (HTTP11DownloadHandler,)
+
+import OpenSSL.SSL
+import twisted.internet.defer
+from twisted.web.iweb import (IPolicyForHTTPS,)
+from twisted.internet.interfaces import (IOpenSSLClientConnectionCreator,)
+from zope.interface import (implementer,)
+
+# NOTE: the crawler stats connection (and TLS session) reuse is counted in
+STATS = (
+    'pool/connections_new', 'pool/connections_reused',
+    'pool/tls_handshakes', 'pool/tls_sessions_offered',
+)
+
+
+class PoolPolicy(collections.namedtuple('PoolPolicy', (
+    'keepalive', 'maxsize', 'timeout', 'tls_sessions',
+))):
+    """ The connection pool policy of a crawl.
+
+    The policy is read from the crawler settings:
+
+    - ``TORVEND_POOL_KEEPALIVE`` keeps connections open between requests
+      (default: True)
+    - ``TORVEND_POOL_MAXSIZE`` is the maximum number of idle connections
+      kept per host (default: ``CONCURRENT_REQUESTS_PER_DOMAIN``)
+    - ``TORVEND_POOL_TIMEOUT`` is the number of seconds idle connections
+      are kept (default: 240)
+    - ``TORVEND_TLS_SESSIONS`` resumes TLS sessions of previous connections
+      to the same host (default: True)
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """ Builds the pool policy of crawler settings.
+
+        :param scrapy.settings.Settings settings: The crawler settings
+        :returns: The pool policy
+        :rtype: PoolPolicy
+        """
+
+        return cls(
+            settings.getbool('TORVEND_POOL_KEEPALIVE', True),
+            settings.getint(
+                'TORVEND_POOL_MAXSIZE',
+                settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN')
+            ),
+            settings.getfloat('TORVEND_POOL_TIMEOUT', 240.0),
+            settings.getbool('TORVEND_TLS_SESSIONS', True),
+        )
+
+
+class TLSSessionCache(object):
+    """ A bounded cache of the TLS sessions of hosts.
+
+    Sessions are only available once a handshake has completed, so the
+    latest connections of a host are kept and their sessions are collected
+    when the next connection to the host is created.
+    Sessions can only be resumed by connections of the same context, so the
+    connection creators of hosts are cached as well.
+    """
+
+    def __init__(self, maxsize=256, pending_size=8):
+        """ Initializes the session cache.
+
+        :param int maxsize: The maximum number of cached host sessions
+        :param int pending_size: The maximum number of connections kept per
+            host until their sessions are collected
+        """
+
+        (self.maxsize, self.pending_size,) = (maxsize, pending_size,)
+        (self._sessions, self._pending, self._creators,) = (
+            collections.OrderedDict(), {}, collections.OrderedDict(),
+        )
+
+    def __len__(self):
+        """ Returns the number of cached host sessions.
+
+        :returns: The number of cached host sessions
+        :rtype: int
+        """
+
+        return len(self._sessions)
+
+    def get_creator(self, key, build_creator):
+        """ Gets the cached connection creator of a host.
+
+        :param tuple key: The (hostname, port) of the host
+        :param callable build_creator: Builds the connection creator of the
+            host if it is not cached
+        :returns: The connection creator of the host
+        :rtype: twisted.internet.interfaces.IOpenSSLClientConnectionCreator
+        """
+
+        creator = self._creators.get(key)
+        if creator is None:
+            creator = self._creators[key] = build_creator()
+            while len(self._creators) > self.maxsize:
+                self._creators.popitem(last=False)
+        return creator
+
+    def _collect(self, key):
+        """ Collects the session of a host's kept connections.
+
+        :param tuple key: The (hostname, port) of the host
+        :rtype: None
+        """
+
+        pending = []
+        for connection in self._pending.pop(key, []):
+            session = connection.get_session()
+            if session is None:
+                # NOTE: the handshake of the connection is not completed yet
+                pending.append(connection)
+                continue
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+        if len(pending) > 0:
+            self._pending[key] = pending
+        while len(self._sessions) > self.maxsize:
+            (evicted, _,) = self._sessions.popitem(last=False)
+            self._creators.pop(evicted, None)
+
+    def offer(self, key, connection):
+        """ Offers the cached session of a host to a new connection.
+
+        :param tuple key: The (hostname, port) of the host
+        :param OpenSSL.SSL.Connection connection: The new connection
+        :returns: True if a session was offered for resumption
+        :rtype: bool
+        """
+
+        self._collect(key)
+        pending = self._pending.setdefault(key, [])
+        pending.append(connection)
+        # NOTE: connections are kept after closing (to read their session)
+        del pending[:-self.pending_size]
+        session = self._sessions.get(key)
+        if session is None:
+            return False
+        try:
+            connection.set_session(session)
+        except (OpenSSL.SSL.Error, ValueError,):
+            del self._sessions[key]
+            return False
+        return True
+
+
+@implementer(IOpenSSLClientConnectionCreator)
+class _ResumingCreator(object):
+    """ A TLS connection creator offering cached sessions to connections.
+    """
+
+    def __init__(self, creator, key, session_cache, stats):
+        """ Initializes the connection creator.
+
+        :param creator: The connection creator of the host (an
+            ``IOpenSSLClientConnectionCreator``)
+        :param tuple key: The (hostname, port) of the host
+        :param TLSSessionCache session_cache: The cache of sessions
+        :param scrapy.statscollectors.StatsCollector stats: The crawler stats
+        """
+
+        (self._creator, self._key, self._session_cache, self._stats,) = (
+            creator, key, session_cache, stats,
+        )
+
+    def clientConnectionForTLS(self, tlsProtocol):
+        """ Creates a TLS connection (resuming a cached session).
+
+        :param twisted.protocols.tls.TLSMemoryBIOProtocol tlsProtocol: The
+            TLS protocol of the connection
+        :returns: The TLS connection
+        :rtype: OpenSSL.SSL.Connection
+        """
+
+        connection = self._creator.clientConnectionForTLS(tlsProtocol)
+        self._stats.inc_value('pool/tls_handshakes')
+        if self._session_cache.offer(self._key, connection):
+            self._stats.inc_value('pool/tls_sessions_offered')
+        return connection
+
+
+@implementer(IPolicyForHTTPS)
+class _ResumingPolicy(object):
+    """ A TLS policy resuming the sessions of previous connections.
+    """
+
+    def __init__(self, policy, session_cache, stats):
+        """ Initializes the TLS policy.
+
+        :param twisted.web.iweb.IPolicyForHTTPS policy: The wrapped policy
+        :param TLSSessionCache session_cache: The cache of sessions
+        :param scrapy.statscollectors.StatsCollector stats: The crawler stats
+        """
+
+        (self._policy, self._session_cache, self._stats,) = (
+            policy, session_cache, stats,
+        )
+
+    def creatorForNetloc(self, hostname, port):
+        """ Gets the TLS connection creator of a host.
+
+        :param bytes hostname: The hostname of the host
+        :param int port: The port of the host
+        :returns: The TLS connection creator
+        :rtype: twisted.internet.interfaces.IOpenSSLClientConnectionCreator
+        """
+
+        key = (hostname, port,)
+        return _ResumingCreator(
+            self._session_cache.get_creator(
+                key, lambda: self._policy.creatorForNetloc(hostname, port)
+            ),
+            key, self._session_cache, self._stats
+        )
+
+
+class _CountingPool(object):
+    """ A view of a shared connection pool counting a crawler's connections.
+    """
+
+    def __init__(self, pool, stats):
+        """ Initializes the pool view.
+
+        :param twisted.web.client.HTTPConnectionPool pool: The shared pool
+        :param scrapy.statscollectors.StatsCollector stats: The crawler stats
+        """
+
+        (self._shared_pool, self._stats,) = (pool, stats,)
+
+    def __getattr__(self, name):
+        """ Gets the attributes of the shared pool.
+
+        :param str name: The name of the attribute
+        :returns: The attribute of the shared pool
+        """
+
+        return getattr(self._shared_pool, name)
+
+    def getConnection(self, key, endpoint):
+        """ Gets a cached or new connection from the shared pool.
+
+        :param key: The key of interchangeable connections
+        :param endpoint: The endpoint to connect to
+        :type endpoint: twisted.internet.interfaces.IStreamClientEndpoint
+        :returns: A deferred firing with the connection
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        connection = self._shared_pool.getConnection(key, endpoint)
+        # NOTE: cached connections are returned as already fired deferreds
+        self._stats.inc_value((
+            'pool/connections_reused'
+            if connection.called else
+            'pool/connections_new'
+        ))
+        return connection
+
+    def closeCachedConnections(self):
+        """ Keeps the connections of the shared pool open (they are closed
+        once the reactor shuts down, see
+        :func:`~torvend.pool.PooledDownloadHandler.close_pools`).
+
+        :returns: An already fired deferred
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        return twisted.internet.defer.succeed(None)
+
+
+class PooledDownloadHandler(HTTP11DownloadHandler, meta.Loggable):
+    """ A HTTP(S) download handler sharing connections across crawls.
+
+    Every crawler of a process with the same :class:`PoolPolicy` shares a
+    single connection pool and TLS session cache, so searches of long
+    running applications (such as ``torvend serve``) reuse the connections
+    (and TLS sessions) of previous searches instead of connecting (and
+    negotiating) again.
+    Connection reuse is counted in the crawler stats (see ``STATS``).
+    Requests of paused crawls are held until their crawl is resumed (see
+    :class:`~torvend.backpressure.Backpressure`).
+    """
+
+    # NOTE: pools and session caches are shared by the crawlers of a process
+    _pools = {}
+    _session_caches = {}
+    _closing = False
+
+    def __init__(self, crawler):
+        """ Initializes the download handler.
+
+        :param scrapy.crawler.Crawler crawler: The crawler of the handler
+        """
+
+        super().__init__(crawler)
+        self.policy = PoolPolicy.from_settings(crawler.settings)
+        for stat_key in STATS:
+            crawler.stats.set_value(stat_key, 0)
+
+        self._pool = _CountingPool(
+            self._get_pool(self.policy, self._pool), crawler.stats
+        )
+        if self.policy.tls_sessions:
+            # NOTE: contexts (and their sessions) are only shared by
+            # crawlers of the same TLS settings
+            session_cache = self._session_caches.setdefault((
+                self.policy, type(self._contextFactory),
+                crawler.settings.get('DOWNLOADER_CLIENT_TLS_METHOD'),
+                crawler.settings.get('DOWNLOADER_CLIENT_TLS_CIPHERS'),
+            ), TLSSessionCache())
+            self._contextFactory = _ResumingPolicy(
+                self._contextFactory, session_cache, crawler.stats
+            )
+
+    async def download_request(self, request):
+        """ Downloads a request once its crawl is not paused.
+
+        :param scrapy.Request request: The request to download
+        :returns: The response of the request
+        :rtype: scrapy.http.Response
+        """
+
+        # NOTE: local import to speed up module loading
+        from scrapy.utils.defer import (maybe_deferred_to_future,)
+
+        # NOTE: requests are held before their download timeout starts
+        backpressure = getattr(self._crawler, 'backpressure', None)
+        if backpressure is not None and backpressure.paused:
+            self.log.debug((
+                'holding request `{request}` of paused crawl'
+            ).format(**locals()))
+            await maybe_deferred_to_future(backpressure.wait())
+        return (await super().download_request(request))
+
+    @classmethod
+    def _get_pool(cls, policy, crawler_pool):
+        """ Gets the shared connection pool of a pool policy.
+
+        :param PoolPolicy policy: The pool policy
+        :param twisted.web.client.HTTPConnectionPool crawler_pool: The pool
+            built by scrapy for the crawler (used as the shared pool of the
+            first crawler of the policy)
+        :returns: The shared connection pool
+        :rtype: twisted.web.client.HTTPConnectionPool
+        """
+
+        # NOTE: local import to speed up module loading (installs reactor)
+        import twisted.internet.reactor
+
+        if not cls._closing:
+            twisted.internet.reactor.addSystemEventTrigger(
+                'before', 'shutdown', cls.close_pools
+            )
+            cls._closing = True
+
+        pool = cls._pools.get(policy)
+        if pool is None:
+            pool = cls._pools[policy] = crawler_pool
+            pool.persistent = policy.keepalive
+            pool.maxPersistentPerHost = policy.maxsize
+            pool.cachedConnectionTimeout = policy.timeout
+        return pool
+
+    @classmethod
+    def close_pools(cls):
+        """ Closes the cached connections of all shared pools.
+
+        .. note:: Called before the reactor shuts down.
+
+        :returns: A deferred firing once all connections are closed
+        :rtype: twisted.internet.defer.Deferred
+        """
+
+        (pools, cls._pools,) = (list(cls._pools.values()), {},)
+        cls._session_caches.clear()
+        return twisted.internet.defer.DeferredList([
+            pool.closeCachedConnections()
+            for pool in pools
+        ])
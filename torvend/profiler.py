@@ -0,0 +1,282 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import os
+import sys
+import json
+import threading
+import collections
+
+from . import (meta,)
+
+# NOTE: the schema of speedscope's file format
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+class SamplingProfiler(meta.Loggable):
+    """ A low-overhead statistical profiler of all running threads.
+
+    A background thread periodically samples the stacks of every other
+    thread of the process (such as the reactor thread and its thread pool),
+    so unlike deterministic profilers the profiled code is not slowed down
+    by tracing every function call.
+    Stacks are rooted at the process and thread they were sampled from and
+    can be written as collapsed stacks (for flame graph tools) or as
+    `speedscope <https://www.speedscope.app>`_ JSON.
+    """
+
+    def __init__(self, interval=0.005):
+        """ Initializes the profiler.
+
+        :param float interval: The seconds between samples
+        """
+
+        self.interval = interval
+        # NOTE: stacks are tuples of (name, filename, line) frames (root first)
+        self.samples = collections.Counter()
+        (self._thread, self._stopped,) = (None, None,)
+
+    def __repr__(self):
+        """ Returns a string representation of the profiler.
+
+        :returns: A string representation of the profiler
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} interval={self.interval} '
+            'samples={self.sample_count}>'
+        ).format(**locals())
+
+    def __getstate__(self):
+        """ Gets the picklable state of the profiler.
+
+        :returns: The state of the profiler (without the logger and the
+            sampling thread)
+        :rtype: dict[str,....]
+        """
+
+        state = self.__dict__.copy()
+        state.pop('_log', None)
+        state.update(_thread=None, _stopped=None)
+        return state
+
+    def __enter__(self):
+        """ Starts sampling when entering a context.
+
+        :returns: The profiler
+        :rtype: SamplingProfiler
+        """
+
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """ Stops sampling when exiting a context.
+
+        :rtype: None
+        """
+
+        self.stop()
+
+    @property
+    def sample_count(self):
+        """ The number of sampled stacks.
+
+        :getter: Returns the number of sampled stacks
+        :setter: Does not allow setting
+        :rtype: int
+        """
+
+        return sum(self.samples.values())
+
+    @property
+    def running(self):
+        """ Indicates if the profiler is sampling.
+
+        :getter: Returns True if the profiler is sampling
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return self._thread is not None
+
+    def start(self):
+        """ Starts sampling in a background thread.
+
+        :rtype: None
+        """
+
+        assert not self.running, (
+            "profiler '{self}' is already running"
+        ).format(**locals())
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stopped,),
+            name='torvend-profiler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """ Stops sampling and waits for the background thread to exit.
+
+        :rtype: None
+        """
+
+        if not self.running:
+            return
+        self._stopped.set()
+        self._thread.join()
+        (self._thread, self._stopped,) = (None, None,)
+
+    def _run(self, stopped):
+        """ Samples all other threads until stopped.
+
+        :param threading.Event stopped: The event stopping the sampling
+        :rtype: None
+        """
+
+        ignored = threading.get_ident()
+        # NOTE: local import to speed up module loading
+        import multiprocessing
+
+        process_name = multiprocessing.current_process().name
+        while not stopped.wait(self.interval):
+            self.sample(process_name, ignored=ignored)
+
+    def sample(self, process_name, ignored=None):
+        """ Samples the current stack of every thread once.
+
+        :param str process_name: The name of the sampled process
+        :param int ignored: The identifier of a thread not to sample
+        :rtype: None
+        """
+
+        thread_names = dict(
+            (thread.ident, thread.name,)
+            for thread in threading.enumerate()
+        )
+        for (thread_id, frame,) in sys._current_frames().items():
+            if thread_id == ignored:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    (code.co_name, code.co_filename, code.co_firstlineno,)
+                )
+                frame = frame.f_back
+            stack.append((thread_names.get(thread_id, str(thread_id)), '', 0,))
+            stack.append((process_name, '', 0,))
+            stack.reverse()
+            self.samples[tuple(stack)] += 1
+
+    def merge(self, other):
+        """ Merges the samples of another profiler into this profiler.
+
+        :param SamplingProfiler other: The profiler to merge
+        :rtype: None
+        """
+
+        self.samples.update(other.samples)
+
+    def _get_label(self, frame, filenames):
+        """ Gets the label of a sampled frame.
+
+        :param tuple frame: The (name, filename, line) of the frame
+        :param filenames: A cache of shortened filenames
+        :type filenames: dict[str,str]
+        :returns: The label of the frame
+        :rtype: str
+        """
+
+        (name, filename, line,) = frame
+        if not filename:
+            return name
+        if filename not in filenames:
+            # NOTE: filenames are shortened to their import path
+            prefixes = [
+                entry
+                for entry in sys.path
+                if entry and filename.startswith(entry + os.sep)
+            ]
+            filenames[filename] = (
+                filename[(len(max(prefixes, key=len)) + 1):]
+                if prefixes else
+                filename
+            )
+        return '{name} ({short}:{line})'.format(
+            short=filenames[filename], **locals()
+        )
+
+    def to_collapsed(self):
+        """ Exports the samples as collapsed stacks.
+
+        :returns: A line of ``frame;frame;... count`` for every sampled stack
+        :rtype: str
+        """
+
+        filenames = {}
+        return ''.join(
+            '{0} {1}\n'.format(';'.join(
+                self._get_label(frame, filenames).replace(';', ':')
+                for frame in stack
+            ), count)
+            for (stack, count,) in sorted(self.samples.items())
+        )
+
+    def to_speedscope(self, name='torvend'):
+        """ Exports the samples as a speedscope document.
+
+        Every sampled thread is exported as a separate profile.
+
+        :param str name: The name of the document
+        :returns: The speedscope document
+        :rtype: dict[str,....]
+        """
+
+        (filenames, frames, indexes, profiles,) = ({}, [], {}, {},)
+        for (stack, count,) in sorted(self.samples.items()):
+            indexed = []
+            for frame in stack[2:]:
+                if frame not in indexes:
+                    indexes[frame] = len(frames)
+                    frames.append({
+                        'name': self._get_label(frame, filenames),
+                        'file': frame[1], 'line': frame[2],
+                    })
+                indexed.append(indexes[frame])
+            profile = profiles.setdefault(stack[:2], {
+                'type': 'sampled',
+                'name': ' '.join(entry for (entry, _, _,) in stack[:2]),
+                'unit': 'seconds', 'startValue': 0.0, 'endValue': 0.0,
+                'samples': [], 'weights': [],
+            })
+            profile['samples'].append(indexed)
+            profile['weights'].append(count * self.interval)
+            profile['endValue'] += (count * self.interval)
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': name, 'exporter': 'torvend',
+            'shared': {'frames': frames},
+            'profiles': list(profiles.values()),
+        }
+
+    def write(self, filepath, speedscope=None):
+        """ Writes the samples to a file.
+
+        :param str filepath: The path of the file to write
+        :param bool speedscope: True to write speedscope JSON, False to
+            write collapsed stacks (default: speedscope for ``.json`` files)
+        :rtype: None
+        """
+
+        if speedscope is None:
+            speedscope = filepath.lower().endswith('.json')
+        with open(filepath, 'w') as fp:
+            if speedscope:
+                json.dump(self.to_speedscope(
+                    name=os.path.basename(filepath)
+                ), fp)
+            else:
+                fp.write(self.to_collapsed())
@@ -0,0 +1,136 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import time
+import logging
+import multiprocessing
+
+from . import (meta,)
+
+
+class TokenBuckets(object):
+    """ Per-domain token buckets which can be shared between processes.
+
+    The bucket state lives in a shared memory array so that every process
+    which inherits the buckets (as a :class:`multiprocessing.Process`
+    argument) draws from the same per-domain allowance.
+    """
+
+    def __init__(self, domains, rate, burst=1, context=None):
+        """ Initializes the token buckets.
+
+        :param domains: The domains to rate limit
+        :type domains: list[str]
+        :param float rate: The number of requests per second for each domain
+        :param int burst: The number of requests allowed without delay
+        :param context: The multiprocessing context to allocate memory from
+        :type context: multiprocessing.context.BaseContext
+        """
+
+        assert rate > 0, (
+            "rate must be greater than 0, received '{rate}'"
+        ).format(**locals())
+        if context is None:
+            context = multiprocessing.get_context()
+
+        (self.rate, self.burst,) = (float(rate), float(max(1, burst)),)
+        self._index = {
+            domain: idx
+            for (idx, domain,) in enumerate(sorted(set(domains)))
+        }
+        # NOTE: each domain stores its (tokens, last refill) pair
+        self._state = context.Array(
+            'd', [self.burst, 0.0] * max(1, len(self._index))
+        )
+
+    def _get_index(self, host):
+        """ Gets the bucket index of a given host (or its parent domains).
+
+        :param str host: The host to get the bucket index for
+        :returns: The bucket index or None if the host is not limited
+        :rtype: int
+        """
+
+        labels = host.lower().split('.')
+        for idx in range(len(labels)):
+            domain = '.'.join(labels[idx:])
+            if domain in self._index:
+                return self._index[domain]
+
+    def reserve(self, host):
+        """ Reserves a token for a request to a given host.
+
+        :param str host: The host of the request
+        :returns: The number of seconds to wait before making the request
+        :rtype: float
+        """
+
+        idx = self._get_index(host)
+        if idx is None:
+            return 0.0
+
+        with self._state.get_lock():
+            now = time.monotonic()
+            (tokens, refilled,) = self._state[idx * 2:(idx * 2) + 2]
+            if refilled > 0:
+                tokens = min(
+                    self.burst,
+                    tokens + ((now - refilled) * self.rate)
+                )
+            tokens -= 1.0
+            self._state[idx * 2:(idx * 2) + 2] = [tokens, now]
+        return max(0.0, (-tokens / self.rate))
+
+
+class RateLimitMiddleware(meta.Loggable):
+    """ A downloader middleware which delays requests using token buckets.
+
+    The buckets are read from the spider's ``rate_limiter`` attribute.
+    """
+
+    def __init__(self, crawler):
+        """ Initializes the middleware.
+
+        :param scrapy.crawler.Crawler crawler: The running crawler
+        """
+
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """ Builds the middleware from a crawler.
+
+        :param scrapy.crawler.Crawler crawler: The running crawler
+        :returns: A new middleware instance
+        :rtype: RateLimitMiddleware
+        """
+
+        return cls(crawler)
+
+    async def process_request(self, request, spider=None):
+        """ Delays a request until its domain has a token available.
+
+        :param scrapy.Request request: The request to delay
+        :param scrapy.Spider spider: The spider of the request
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import furl
+        import twisted.internet.reactor
+        import twisted.internet.task
+        from scrapy.utils.defer import (maybe_deferred_to_future,)
+
+        rate_limiter = getattr(self.crawler.spider, 'rate_limiter', None)
+        if rate_limiter is None:
+            return
+
+        delay = rate_limiter.reserve(furl.furl(request.url).host or '')
+        if delay > 0:
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug((
+                    'delaying request `{request}` by {delay:.3f} seconds'
+                ).format(**locals()))
+            await maybe_deferred_to_future(twisted.internet.task.deferLater(
+                twisted.internet.reactor, delay, lambda: None
+            ))
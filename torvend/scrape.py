@@ -0,0 +1,381 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import time
+import random
+import socket
+import struct
+import selectors
+import urllib.parse
+
+from . import (meta, columnar,)
+
+# NOTE: the magic constant identifying the UDP tracker protocol (BEP 15)
+PROTOCOL_ID = 0x41727101980
+(ACTION_CONNECT, ACTION_SCRAPE, ACTION_ERROR,) = (0, 2, 3,)
+# NOTE: the most info hashes which fit a single scrape request
+MAX_HASHES = 74
+CONNECT_REQUEST = struct.Struct('>QII')
+CONNECT_RESPONSE = struct.Struct('>IIQ')
+SCRAPE_REQUEST = struct.Struct('>QII')
+RESPONSE_HEADER = struct.Struct('>II')
+SCRAPE_ENTRY = struct.Struct('>III')
+MAX_RESPONSE_SIZE = RESPONSE_HEADER.size + (SCRAPE_ENTRY.size * MAX_HASHES)
+
+
+def get_trackers(magnet):
+    """ Gets the UDP trackers of a magnet link.
+
+    :param str magnet: The magnet link
+    :returns: A list of (host, port) tuples of the UDP trackers
+    :rtype: list[tuple[str,int]]
+    """
+
+    trackers = []
+    query = urllib.parse.urlsplit(magnet or '').query
+    for tracker in urllib.parse.parse_qs(query).get('tr', []):
+        parsed = urllib.parse.urlsplit(tracker)
+        try:
+            (host, port,) = (parsed.hostname, parsed.port,)
+        except ValueError:
+            continue
+        if parsed.scheme == 'udp' and host and port:
+            trackers.append((host.lower(), port,))
+    return trackers
+
+
+class _TrackerSession(object):
+    """ The state of scraping a single tracker.
+    """
+
+    def __init__(self, tracker, sock, hashes):
+        """ Initializes the session.
+
+        :param tuple tracker: The (host, port) of the tracker
+        :param socket.socket sock: The socket connected to the tracker
+        :param hashes: The info hashes to scrape
+        :type hashes: list[str]
+        """
+
+        (self.tracker, self.socket,) = (tracker, sock,)
+        self.batches = [
+            hashes[idx:(idx + MAX_HASHES)]
+            for idx in range(0, len(hashes), MAX_HASHES)
+        ]
+        (self.connection_id, self.pending,) = (None, {},)
+        (self.attempts, self.deadline, self.failed,) = (0, 0.0, False,)
+
+    @property
+    def done(self):
+        """ Indicates if the session has finished.
+
+        :getter: Returns True if the session has no outstanding requests
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return self.failed or len(self.pending) <= 0
+
+    def _get_transaction_id(self):
+        """ Gets an unused random transaction id.
+
+        :returns: A transaction id
+        :rtype: int
+        """
+
+        transaction_id = random.getrandbits(32)
+        while transaction_id in self.pending:
+            transaction_id = random.getrandbits(32)
+        return transaction_id
+
+    def send(self, packet):
+        """ Sends a packet to the tracker.
+
+        :param bytes packet: The packet to send
+        :rtype: None
+        """
+
+        try:
+            self.socket.send(packet)
+        except OSError:
+            self.failed = True
+
+    def connect(self):
+        """ Requests a connection id from the tracker.
+
+        :rtype: None
+        """
+
+        transaction_id = self._get_transaction_id()
+        packet = CONNECT_REQUEST.pack(
+            PROTOCOL_ID, ACTION_CONNECT, transaction_id
+        )
+        self.pending[transaction_id] = (packet, None,)
+        self.send(packet)
+
+    def request(self):
+        """ Requests the scrape of every batch of info hashes.
+
+        :rtype: None
+        """
+
+        for batch in self.batches:
+            transaction_id = self._get_transaction_id()
+            packet = b''.join([
+                SCRAPE_REQUEST.pack(
+                    self.connection_id, ACTION_SCRAPE, transaction_id
+                ),
+                b''.join(
+                    columnar.encode_hash(info_hash) for info_hash in batch
+                ),
+            ])
+            self.pending[transaction_id] = (packet, batch,)
+            self.send(packet)
+
+    def resend(self):
+        """ Resends every outstanding request.
+
+        :rtype: None
+        """
+
+        for (packet, _,) in list(self.pending.values()):
+            self.send(packet)
+
+
+class TrackerScraper(meta.Loggable):
+    """ Scrapes live seeders and leechers from UDP trackers (BEP 15).
+
+    Info hashes are batched (up to 74 per request) for each tracker and all
+    trackers are scraped concurrently on non-blocking sockets, so a scrape
+    takes at most the (backed off) timeout of the slowest tracker.
+    """
+
+    def __init__(self, timeout=2.0, retries=1, max_trackers=4):
+        """ Initializes the scraper.
+
+        :param float timeout: The seconds to wait for a tracker response
+            (doubled for every retry)
+        :param int retries: The number of times unanswered requests are resent
+        :param int max_trackers: The maximum number of UDP trackers to scrape
+            for each torrent
+        """
+
+        (self.timeout, self.retries, self.max_trackers,) = \
+            (timeout, retries, max_trackers,)
+
+    def build_requests(self, torrents):
+        """ Groups the info hashes of torrents by the UDP trackers of their
+        magnet links.
+
+        :param torrents: The torrents to scrape
+        :type torrents: list[torvend.items.Torrent]
+        :returns: A dictionary of (host, port) trackers and info hashes
+        :rtype: dict[tuple[str,int],list[str]]
+        """
+
+        requests = {}
+        for torrent in torrents:
+            info_hash = (torrent.get('hash') or '').lower()
+            if not any(columnar.encode_hash(info_hash)):
+                continue
+            for tracker in get_trackers(
+                torrent.get('magnet')
+            )[:self.max_trackers]:
+                hashes = requests.setdefault(tracker, [])
+                if info_hash not in hashes:
+                    hashes.append(info_hash)
+        return requests
+
+    def _open_session(self, tracker, hashes):
+        """ Opens a session scraping a tracker.
+
+        :param tuple tracker: The (host, port) of the tracker
+        :param hashes: The info hashes to scrape
+        :type hashes: list[str]
+        :returns: The session or None if the tracker is unreachable
+        :rtype: _TrackerSession
+        """
+
+        try:
+            (family, _, _, _, address,) = socket.getaddrinfo(
+                *tracker, type=socket.SOCK_DGRAM
+            )[0]
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+        except OSError as exc:
+            self.log.warning((
+                'failed to resolve tracker `{tracker}`, {exc}'
+            ).format(**locals()))
+            return
+
+        sock.setblocking(False)
+        try:
+            sock.connect(address)
+        except OSError as exc:
+            sock.close()
+            self.log.warning((
+                'failed to connect to tracker `{tracker}`, {exc}'
+            ).format(**locals()))
+            return
+        return _TrackerSession(tracker, sock, hashes)
+
+    def _receive(self, session, counts):
+        """ Handles a response of a tracker.
+
+        :param _TrackerSession session: The session of the tracker
+        :param dict counts: The scraped counts to update
+        :rtype: None
+        """
+
+        try:
+            data = session.socket.recv(MAX_RESPONSE_SIZE)
+        except OSError:
+            # NOTE: ICMP errors (e.g. port unreachable) surface on receive
+            session.failed = True
+            return
+        if len(data) < RESPONSE_HEADER.size:
+            return
+
+        (action, transaction_id,) = RESPONSE_HEADER.unpack_from(data)
+        if transaction_id not in session.pending:
+            return
+        (_, batch,) = session.pending.pop(transaction_id)
+
+        if action == ACTION_ERROR:
+            session.failed = True
+            self.log.warning((
+                'tracker `{session.tracker}` responded with error `{error}`'
+            ).format(
+                error=data[RESPONSE_HEADER.size:].decode('utf-8', 'replace'),
+                **locals()
+            ))
+        elif action == ACTION_CONNECT and batch is None:
+            if len(data) >= CONNECT_RESPONSE.size:
+                (_, _, session.connection_id,) = \
+                    CONNECT_RESPONSE.unpack_from(data)
+                (session.attempts, session.deadline,) = \
+                    (0, (time.monotonic() + self.timeout),)
+                session.request()
+        elif action == ACTION_SCRAPE and batch is not None:
+            for (idx, info_hash,) in enumerate(batch):
+                offset = RESPONSE_HEADER.size + (idx * SCRAPE_ENTRY.size)
+                if len(data) < (offset + SCRAPE_ENTRY.size):
+                    break
+                self._add_count(
+                    counts, info_hash, SCRAPE_ENTRY.unpack_from(data, offset)
+                )
+
+    def _add_count(self, counts, info_hash, entry):
+        """ Adds a tracker's scrape entry of an info hash to the counts.
+
+        :param dict counts: The scraped counts to update
+        :param str info_hash: The scraped info hash
+        :param tuple entry: The (seeders, completed, leechers) of the hash
+        :rtype: None
+        """
+
+        (seeders, completed, leechers,) = entry
+        # NOTE: trackers report zeros for torrents they do not know about
+        if not any(entry):
+            return
+        if seeders >= counts.get(info_hash, (-1, 0,))[0]:
+            counts[info_hash] = (seeders, leechers,)
+
+    def _expire(self, session):
+        """ Retries or fails a session whose requests timed out.
+
+        :param _TrackerSession session: The session of the tracker
+        :rtype: None
+        """
+
+        session.attempts += 1
+        if session.attempts > self.retries:
+            session.failed = True
+            self.log.debug((
+                'tracker `{session.tracker}` timed out'
+            ).format(**locals()))
+            return
+
+        session.deadline = time.monotonic() + (
+            self.timeout * (2 ** session.attempts)
+        )
+        session.resend()
+
+    def scrape(self, requests):
+        """ Scrapes trackers for the seeders and leechers of info hashes.
+
+        .. note:: When several trackers report an info hash, the counts of the
+            tracker reporting the most seeders are kept.
+
+        :param requests: A dictionary of (host, port) trackers and info hashes
+            (see :func:`~torvend.scrape.TrackerScraper.build_requests`)
+        :type requests: dict[tuple[str,int],list[str]]
+        :returns: A dictionary of info hashes and (seeders, leechers)
+        :rtype: dict[str,tuple[int,int]]
+        """
+
+        (counts, sessions,) = ({}, [],)
+        with selectors.DefaultSelector() as selector:
+            deadline = time.monotonic() + self.timeout
+            for (tracker, hashes,) in requests.items():
+                session = self._open_session(tracker, list(hashes))
+                if session is None:
+                    continue
+                session.deadline = deadline
+                selector.register(
+                    session.socket, selectors.EVENT_READ, session
+                )
+                sessions.append(session)
+                session.connect()
+
+            while len(sessions) > 0:
+                timeout = min(session.deadline for session in sessions)
+                for (key, _,) in selector.select(
+                    max(0.0, timeout - time.monotonic())
+                ):
+                    self._receive(key.data, counts)
+
+                now = time.monotonic()
+                for session in list(sessions):
+                    if not session.done and session.deadline <= now:
+                        self._expire(session)
+                    if session.done:
+                        selector.unregister(session.socket)
+                        session.socket.close()
+                        sessions.remove(session)
+
+        self.log.debug((
+            'scraped {count} info hashes from {tracker_count} trackers'
+        ).format(count=len(counts), tracker_count=len(requests)))
+        return counts
+
+    def update(self, torrents, counts):
+        """ Updates the seeders and leechers of torrents from scraped counts.
+
+        :param torrents: The torrents to update
+        :type torrents: list[torvend.items.Torrent]
+        :param counts: A dictionary of info hashes and (seeders, leechers)
+        :type counts: dict[str,tuple[int,int]]
+        :returns: The number of updated torrents
+        :rtype: int
+        """
+
+        updated = 0
+        for torrent in torrents:
+            count = counts.get((torrent.get('hash') or '').lower())
+            if count is not None:
+                (torrent['seeders'], torrent['leechers'],) = count
+                updated += 1
+        return updated
+
+    def refresh(self, torrents):
+        """ Refreshes the seeders and leechers of torrents from their trackers.
+
+        :param torrents: The torrents to refresh
+        :type torrents: list[torvend.items.Torrent]
+        :returns: The number of refreshed torrents
+        :rtype: int
+        """
+
+        torrents = list(torrents)
+        counts = self.scrape(self.build_requests(torrents))
+        return self.update(torrents, counts)
@@ -0,0 +1,467 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import json
+
+from . import (meta, cache, metrics, exporters,)
+
+import twisted.web.server
+import twisted.web.resource
+import twisted.python.failure
+
+
+def _serialize_torrent(item):
+    """ Serializes a torrent item to JSON bytes.
+
+    :param torvend.items.Torrent item: The torrent item to serialize
+    :returns: The JSON bytes of the torrent item
+    :rtype: bytes
+    """
+
+    return exporters.dumps(exporters.serialize_torrent(item))
+
+
+class _Subscriber(object):
+    """ Streams torrent items to a HTTP request as NDJSON or SSE.
+
+    Once attached to the backpressure of a crawl, the subscriber is
+    registered as the request's push producer, so the crawl is paused while
+    the transport's write buffer of a slow client is full.
+    """
+
+    def __init__(self, request, sse=False):
+        """ Initializes the subscriber.
+
+        :param twisted.web.server.Request request: The request to stream to
+        :param bool sse: True if items should be streamed as server-sent
+            events rather than newline delimited JSON
+        """
+
+        (self.request, self.sse, self.closed,) = (request, sse, False,)
+        self.backpressure = None
+        self.request.setHeader(
+            b'Content-Type',
+            (b'text/event-stream' if sse else b'application/x-ndjson')
+        )
+        self.request.setHeader(b'Cache-Control', b'no-cache')
+        self.request.notifyFinish().addErrback(self._on_disconnect)
+
+    def _on_disconnect(self, failure):
+        """ Marks the subscriber as closed when the client disconnects.
+
+        :param twisted.python.failure.Failure failure: The disconnect reason
+        :rtype: None
+        """
+
+        self.closed = True
+        self.release()
+
+    def attach(self, backpressure):
+        """ Attaches the subscriber to the backpressure of a crawl.
+
+        :param backpressure: The backpressure of the crawl
+        :type backpressure: torvend.backpressure.Backpressure
+        :rtype: None
+        """
+
+        if self.closed:
+            return
+        self.backpressure = backpressure
+        self.request.registerProducer(self, True)
+
+    def release(self):
+        """ Stops holding the crawl paused.
+
+        :rtype: None
+        """
+
+        if self.backpressure is not None:
+            self.backpressure.resume(self)
+
+    def pauseProducing(self):
+        """ Pauses the crawl while the client's write buffer is full.
+
+        :rtype: None
+        """
+
+        if self.backpressure is not None:
+            self.backpressure.pause(self)
+
+    def resumeProducing(self):
+        """ Resumes the crawl once the client's write buffer is drained.
+
+        :rtype: None
+        """
+
+        self.release()
+
+    def stopProducing(self):
+        """ Stops writing to a client which has gone away.
+
+        :rtype: None
+        """
+
+        self.closed = True
+        self.release()
+
+    def write(self, item):
+        """ Writes a torrent item to the request.
+
+        :param torvend.items.Torrent item: The torrent item to write
+        :rtype: None
+        """
+
+        if self.closed:
+            return
+        serialized = _serialize_torrent(item)
+        if self.sse:
+            self.request.write(b'data: ' + serialized + b'\n\n')
+        else:
+            self.request.write(serialized + b'\n')
+
+    def finish(self):
+        """ Finishes the request.
+
+        :rtype: None
+        """
+
+        if self.closed:
+            return
+        if self.sse:
+            self.request.write(b'event: end\ndata: {}\n\n')
+        self.closed = True
+        if self.backpressure is not None:
+            self.release()
+            self.request.unregisterProducer()
+        self.request.finish()
+
+
+class SearchService(meta.Loggable):
+    """ A long running HTTP/JSON search service.
+
+    Searches run as crawls on the service's reactor (which is only started
+    once), identical in-flight searches are coalesced into a single crawl
+    (see :func:`~torvend.client.TorvendClient.crawl`), finished searches are
+    cached and the number of concurrently running crawls is limited.
+    When given a tracker scraper, stale cached searches are served right
+    away while their seeders and leechers are refreshed from trackers in the
+    background (once per search) instead of being crawled again.
+    When the client records metrics, they are exposed at ``/metrics``.
+    """
+
+    def __init__(
+        self, client,
+        results=25, max_concurrency=4, result_cache=None, scraper=None
+    ):
+        """ Initializes the service.
+
+        :param torvend.client.TorvendClient client: The client to search with
+        :param int results: The default number of results for each spider
+        :param int max_concurrency: The maximum number of running crawls
+        :param result_cache: The cache for finished searches
+        :type result_cache: torvend.cache.ResultCache
+        :param scraper: The scraper to refresh stale cached searches with
+        :type scraper: torvend.scrape.TrackerScraper
+        """
+
+        (self.client, self.results, self.max_concurrency,) = \
+            (client, results, max_concurrency,)
+        self.scraper = scraper
+        # NOTE: the running tracker scrapes of stale searches (by search key)
+        self._refreshing = {}
+        self.result_cache = (
+            result_cache
+            if result_cache is not None else
+            cache.ResultCache()
+        )
+
+    def _get_argument(self, request, name, default=None):
+        """ Gets a query argument of a request.
+
+        :param twisted.web.server.Request request: The request
+        :param str name: The name of the argument
+        :param default: The default value of the argument
+        :returns: The argument text or the default value
+        :rtype: str
+        """
+
+        values = request.args.get(name.encode('utf-8'))
+        if not values:
+            return default
+        return values[0].decode('utf-8')
+
+    def _render_error(self, request, status, message):
+        """ Renders a JSON error response.
+
+        :param twisted.web.server.Request request: The request
+        :param int status: The HTTP status code
+        :param str message: The error message
+        :returns: The response body
+        :rtype: bytes
+        """
+
+        request.setResponseCode(status)
+        request.setHeader(b'Content-Type', b'application/json')
+        return json.dumps({'error': message}).encode('utf-8')
+
+    def _finish_search(self, result, key, torrents, subscriber):
+        """ Handles a finished crawl of a search.
+
+        :param result: The result of the crawl deferred
+        :param tuple key: The search key of the crawl
+        :param torrents: The torrent items discovered by the crawl
+        :type torrents: list[torvend.items.Torrent]
+        :param _Subscriber subscriber: The subscriber of the search
+        :rtype: None
+        """
+
+        if isinstance(result, twisted.python.failure.Failure):
+            self.log.error((
+                'search `{key}` failed, {result}'
+            ).format(**locals()))
+        elif len(torrents) > self.client.replay_size:
+            self.log.debug((
+                'not caching search `{key}` with more than '
+                '{self.client.replay_size} torrents'
+            ).format(**locals()))
+        else:
+            self.result_cache.set(key, torrents)
+        subscriber.finish()
+
+    def _write_cached(self, torrents, subscriber):
+        """ Writes cached torrent items to a subscriber.
+
+        :param torrents: The cached torrent items
+        :type torrents: list[torvend.items.Torrent]
+        :param _Subscriber subscriber: The subscriber of the search
+        :rtype: None
+        """
+
+        for torrent in torrents:
+            subscriber.write(torrent)
+        subscriber.finish()
+
+    def _renew_cached(self, result, key, torrents):
+        """ Handles finished tracker scrapes of stale cached torrent items.
+
+        :param result: The result of the scrape deferred
+        :param tuple key: The search key of the cached torrent items
+        :param torrents: The cached torrent items
+        :type torrents: list[torvend.items.Torrent]
+        :rtype: None
+        """
+
+        self._refreshing.pop(key, None)
+        if isinstance(result, twisted.python.failure.Failure):
+            self.log.error((
+                'refreshing search `{key}` failed, {result}'
+            ).format(**locals()))
+            return
+
+        updated = self.scraper.update(torrents, result)
+        self.result_cache.renew(key)
+        self.log.debug((
+            'refreshed {updated} cached torrents of search `{key}`'
+        ).format(**locals()))
+
+    def _refresh_cached(self, key, torrents):
+        """ Refreshes stale cached torrent items by scraping their trackers.
+
+        Searches which are already being refreshed are not scraped again.
+
+        .. note:: Trackers are scraped in a thread to not block the reactor.
+
+        :param tuple key: The search key of the cached torrent items
+        :param torrents: The cached torrent items
+        :type torrents: list[torvend.items.Torrent]
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.threads
+
+        if key in self._refreshing:
+            return
+        refreshing = twisted.internet.threads.deferToThread(
+            self.scraper.scrape, self.scraper.build_requests(torrents)
+        )
+        self._refreshing[key] = refreshing
+        refreshing.addBoth(self._renew_cached, key, torrents)
+
+    def _count_cache(self, key, cached):
+        """ Counts a result cache lookup in the client's metrics.
+
+        :param tuple key: The search key of the lookup
+        :param cached: The cached torrent items (None if not cached)
+        :type cached: list[torvend.items.Torrent]
+        :rtype: None
+        """
+
+        if self.client.metrics is None:
+            return
+        if cached is None:
+            result = 'miss'
+        elif self.result_cache.is_stale(key):
+            result = 'stale'
+        else:
+            result = 'hit'
+        self.client.metrics.inc('torvend_cache_requests_total', result=result)
+
+    def render_search(self, request):
+        """ Renders a search request.
+
+        :param twisted.web.server.Request request: The request
+        :returns: The response body or ``NOT_DONE_YET`` when streaming
+        :rtype: bytes
+        """
+
+        query = self._get_argument(request, 'q', '').strip()
+        if len(query) <= 0:
+            return self._render_error(request, 400, "missing query 'q'")
+        try:
+            results = int(self._get_argument(
+                request, 'results', self.results
+            ))
+        except ValueError:
+            return self._render_error(request, 400, "invalid 'results'")
+
+        key = self.client.get_search_key(query, results=results)
+        accept = request.getHeader(b'Accept') or b''
+        sse = any([
+            self._get_argument(request, 'format') == 'sse',
+            b'text/event-stream' in accept,
+        ])
+
+        cached = self.result_cache.get(key, stale=(self.scraper is not None))
+        self._count_cache(key, cached)
+        if cached is not None:
+            # NOTE: stale items are written right away (while refreshing)
+            if self.result_cache.is_stale(key):
+                self._refresh_cached(key, cached)
+            self._write_cached(cached, _Subscriber(request, sse=sse))
+            return twisted.web.server.NOT_DONE_YET
+
+        in_flight = self.client.in_flight
+        joinable = (key in in_flight and in_flight[key].joinable)
+        # NOTE: crawls which can no longer be joined still count as running
+        if not joinable and len(self.client.running) >= self.max_concurrency:
+            request.setHeader(b'Retry-After', b'1')
+            return self._render_error(
+                request, 503, 'too many concurrent searches'
+            )
+
+        (subscriber, torrents,) = (_Subscriber(request, sse=sse), [],)
+        replay_size = self.client.replay_size
+
+        def _torrent_callback(item, **kwargs):
+            # NOTE: searches with more items than crawls replay are streamed
+            # without being kept (or cached)
+            if len(torrents) <= replay_size:
+                torrents.append(item)
+            subscriber.write(item)
+
+        try:
+            delay = self.client.crawl(
+                query, _torrent_callback, results=results
+            )
+        except Exception as exc:
+            # NOTE: crawls failing to start have not written any items yet
+            self.log.error((
+                'search `{key}` failed to start, {exc}'
+            ).format(**locals()))
+            subscriber.closed = True
+            return self._render_error(request, 500, 'search failed')
+        delay.addBoth(self._finish_search, key, torrents, subscriber)
+        # NOTE: crawls may finish synchronously (without backpressure)
+        if key in in_flight:
+            subscriber.attach(in_flight[key].backpressure)
+        return twisted.web.server.NOT_DONE_YET
+
+    def render_health(self, request):
+        """ Renders a health request.
+
+        :param twisted.web.server.Request request: The request
+        :returns: The response body
+        :rtype: bytes
+        """
+
+        request.setHeader(b'Content-Type', b'application/json')
+        return json.dumps({
+            'status': 'ok',
+            'in_flight': len(self.client.running),
+            'cached': len(self.result_cache),
+        }).encode('utf-8')
+
+    def render_metrics(self, request):
+        """ Renders a metrics request in the Prometheus text format.
+
+        :param twisted.web.server.Request request: The request
+        :returns: The response body
+        :rtype: bytes
+        """
+
+        if self.client.metrics is None:
+            return self._render_error(request, 404, 'metrics are disabled')
+        request.setHeader(
+            b'Content-Type', metrics.CONTENT_TYPE.encode('utf-8')
+        )
+        return self.client.metrics.render().encode('utf-8')
+
+    def build_site(self):
+        """ Builds the twisted site of the service.
+
+        :returns: The twisted site of the service
+        :rtype: twisted.web.server.Site
+        """
+
+        root = twisted.web.resource.Resource()
+        root.putChild(b'search', _ServiceResource(self.render_search))
+        root.putChild(b'health', _ServiceResource(self.render_health))
+        root.putChild(b'metrics', _ServiceResource(self.render_metrics))
+        return twisted.web.server.Site(root)
+
+    def listen(self, port=8080, host='127.0.0.1'):
+        """ Starts listening for requests on the reactor.
+
+        :param int port: The port to listen on
+        :param str host: The interface to listen on
+        :returns: The listening port
+        :rtype: twisted.internet.interfaces.IListeningPort
+        """
+
+        # NOTE: local import to speed up module loading
+        import twisted.internet.reactor
+
+        self.log.info((
+            'listening for searches on `{host}:{port}`'
+        ).format(**locals()))
+        return twisted.internet.reactor.listenTCP(
+            port, self.build_site(),
+            interface=host
+        )
+
+
+class _ServiceResource(twisted.web.resource.Resource):
+    """ A leaf resource which renders GET requests through a service method.
+    """
+
+    isLeaf = True
+
+    def __init__(self, render):
+        """ Initializes the resource.
+
+        :param callable render: The service method to render requests with
+        """
+
+        super(_ServiceResource, self).__init__()
+        self._render = render
+
+    def render_GET(self, request):
+        """ Renders a GET request.
+
+        :param twisted.web.server.Request request: The request
+        :returns: The response body or ``NOT_DONE_YET`` when streaming
+        :rtype: bytes
+        """
+
+        return self._render(request)
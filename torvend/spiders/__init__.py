@@ -1,11 +1,36 @@
 # Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
 # MIT License <https://opensource.org/licenses/MIT>
 
-from .idope import (IDopeSpider,)
-# from .rarbg import (RarbgSpider,)
-from .torlock import (TorlockSpider,)
-from .torrentz2 import (Torrentz2Spider,)
-from .skytorrents import (SkyTorrentsSpider,)
-from .thepiratebay import (ThePirateBaySpider,)
-from .limetorrents import (LimeTorrentsSpider,)
-from .onethreethreesevenx import (OneThreeThreeSevenXSpider,)
+from . import (registry,)
+
+# NOTE: spider classes are imported on first access (see ``registry``)
+__all__ = [spider_info.class_name for spider_info in registry.SPIDERS]
+
+
+def __getattr__(name):
+    """ Imports a spider class on first access.
+
+    :param str name: The name of the spider class
+    :raises AttributeError: If there is no such spider class
+    :returns: The spider class
+    :rtype: torvend.spiders._common.BaseSpider
+    """
+
+    for spider_info in registry.SPIDERS:
+        if spider_info.class_name == name:
+            spider_class = spider_info.load()
+            globals()[name] = spider_class
+            return spider_class
+    raise AttributeError((
+        "module '{__name__}' has no attribute '{name}'"
+    ).format(__name__=__name__, name=name))
+
+
+def __dir__():
+    """ Lists the attributes of the module (including unimported spiders).
+
+    :returns: The sorted attribute names of the module
+    :rtype: list[str]
+    """
+
+    return sorted(set(globals()) | set(__all__))
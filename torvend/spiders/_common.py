@@ -5,24 +5,58 @@ import re
 import abc
 import math
 import socket
+import contextlib
 
 from .. import (meta,)
+from ._stream import (STREAM_KEY, RowSelector, RowStream,)
 
 import bs4
 import furl
 import scrapy
-import requests
+import scrapy.signals
+import lxml.etree
+from scrapy.core.scraper import (Scraper,)
+from scrapy.utils.defer import (
+    deferred_from_coro, maybe_deferred_to_future,
+)
+
+# NOTE: streamed rows are sent to the item pipelines through the private
+# item processing api of scrapy's scraper (the first one available is used)
+ITEMPROC_METHODS = ('start_itemproc_async', 'start_itemproc',)
 
 
 class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
     """ The base spider for all spiders.
+
+    Spiders declaring the ``stream_rows`` selector of their listing rows
+    (such as ``#searchResult tr``) and implementing ``parse_row`` have their
+    listing pages parsed as the page's bytes are received, so rows are sent
+    to the item pipelines before the rest of the page is downloaded.
     """
 
-    def __init__(self, query=None, results=30, *args, **kwargs):
+    # NOTE: the selector of listing rows parsed as their bytes are received
+    # (see ``RowSelector``), None to only parse complete responses
+    stream_rows = None
+    # NOTE: streaming is only enabled for spiders built by a crawler
+    streaming = False
+
+    def __init__(
+        self, query=None, results=30, queries=None, torrent_filter=None,
+        base_url=None, search_stats=None, *args, **kwargs
+    ):
         """ Initializes a spider.
 
         :param str query: The query the spider should search for
         :param int results: The number of minimum results to yield (not exact)
+        :param queries: Multiple queries the spider should search for
+            (overrides ``query``)
+        :type queries: list[str]
+        :param torrent_filter: The filter found torrents must be accepted by
+        :type torrent_filter: torvend.filters.TorrentFilter
+        :param str base_url: An url to query instead of the spider's domains
+            (such as a local mock site)
+        :param search_stats: The stats to record stage timings in
+        :type search_stats: torvend.stats.SearchStats
         :param args: Any additional positional arguments
         :type args: list[....]
         :param kwargs: Any additional named arguments
@@ -30,7 +64,52 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
         """
 
         super(BaseSpider, self).__init__(*args, **kwargs)
-        (self.query, self.results,) = (query, results,)
+        if not queries:
+            queries = [query]
+        (self.query, self.queries, self.results, self.torrent_filter,) = \
+            (queries[0], queries, results, torrent_filter,)
+
+        (self.base_url, self.search_stats,) = (base_url, search_stats,)
+        if self.base_url:
+            # NOTE: rewrite domains so the offsite middleware allows the url
+            host = furl.furl(self.base_url).host
+            (self.allowed_domains, self._active_domains,) = ([host], [host],)
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        """ Builds the spider of a crawler.
+
+        :param scrapy.crawler.Crawler crawler: The crawler of the spider
+        :param args: Any additional positional arguments
+        :type args: list[....]
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :returns: The spider (streaming its listing rows if supported and
+            the ``TORVEND_STREAM_ROWS`` setting is not disabled)
+        :rtype: BaseSpider
+        """
+
+        spider = super(BaseSpider, cls).from_crawler(crawler, *args, **kwargs)
+        if spider.stream_rows is None or \
+                not crawler.settings.getbool('TORVEND_STREAM_ROWS', True):
+            return spider
+        if not any(hasattr(Scraper, name) for name in ITEMPROC_METHODS):
+            version = scrapy.__version__
+            spider.logger.warning((
+                'not streaming rows of `{spider.name}`, scrapy {version} '
+                'provides none of {ITEMPROC_METHODS}'
+            ).format(ITEMPROC_METHODS=ITEMPROC_METHODS, **locals()))
+            return spider
+
+        (spider.streaming, spider._row_selector, spider._pending,) = (
+            True, RowSelector(spider.stream_rows), set(),
+        )
+        for (handler, signal,) in (
+            (spider._headers_received, scrapy.signals.headers_received,),
+            (spider._bytes_received, scrapy.signals.bytes_received,),
+        ):
+            crawler.signals.connect(handler, signal)
+        return spider
 
     @property
     def active_domains(self):
@@ -43,14 +122,29 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
 
         if not hasattr(self, '_active_domains'):
             self._active_domains = []
-            for domain in self.allowed_domains:
-                try:
-                    socket.gethostbyname(domain)
-                    self._active_domains.append(domain)
-                except (socket.gaierror,):
-                    pass
+            with self.get_timer('dns'):
+                for domain in self.allowed_domains:
+                    try:
+                        socket.gethostbyname(domain)
+                        self._active_domains.append(domain)
+                    except (socket.gaierror,):
+                        pass
         return self._active_domains
 
+    def get_timer(self, stage):
+        """ Gets a context manager recording the duration of a stage.
+
+        :param str stage: The stage of the search
+            (see :data:`torvend.stats.STAGES`)
+        :returns: A context manager recording its block in the spider's
+            search stats (if any)
+        """
+
+        if self.search_stats is None:
+            # NOTE: ExitStack is essentially a null context manager
+            return contextlib.ExitStack()
+        return self.search_stats.timer(self.name, stage)
+
     @abc.abstractproperty
     def query_scheme(self):
         """ Required property for query scheme.
@@ -98,13 +192,28 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
         :rtype: list[scrapy.Request]
         """
 
-        for page_index in range(self.paging_index, math.ceil(
-            (self.results / self.paging_results)
-        ) + self.paging_index):
-            yield scrapy.Request(
-                self.get_url(self.query, page_index),
-                callback=self.parse
-            )
+        for query in self.queries:
+            for page_index in range(self.paging_index, math.ceil(
+                (self.results / self.paging_results)
+            ) + self.paging_index):
+                meta = {'query': query}
+                if self.streaming:
+                    meta[STREAM_KEY] = None
+                yield scrapy.Request(
+                    self.get_url(query, page_index),
+                    callback=self.parse,
+                    meta=meta
+                )
+
+    async def start(self):
+        """ The scrapy request starters (for scrapy >= 2.13).
+
+        :returns: Yields requests from ``start_requests``
+        :rtype: list[scrapy.Request]
+        """
+
+        for request in self.start_requests():
+            yield request
 
     def get_url(self, query, page, **kwargs):
         """ Gets the query url.
@@ -117,30 +226,96 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
         :rtype: str
         """
 
+        if self.base_url:
+            return furl.furl(self.base_url).join(self.get_query_path().format(
+                query=query, page=page
+            )).url
         return furl.furl().set(
             scheme=self.query_scheme,
             host=self.active_domains[0]
-        ).join(self.query_path.format(
+        ).join(self.get_query_path().format(
             query=query, page=page
         )).url
 
-    def get_source(self, url):
-        """ Gets the source from a given url.
+    def get_query_path(self):
+        """ Gets the query path, a hook for pushing filters into the url.
+
+        :returns: The path the query needs (see ``query_path``)
+        :rtype: str
+        """
+
+        return self.query_path
+
+    def accepts(self, torrent):
+        """ Checks if a (possibly partially parsed) torrent is accepted.
+
+        :param torvend.items.Torrent torrent: The torrent to check
+        :returns: True if the spider's filter accepts the torrent
+        :rtype: bool
+        """
+
+        if not self.torrent_filter:
+            return True
+        return self.torrent_filter.accepts(torrent)
+
+    def get_query(self, response):
+        """ Gets the query which lead to a given response (or request).
+
+        :param response: The response (or request) to get the query for
+        :type response: scrapy.http.Response
+        :returns: The query text
+        :rtype: str
+        """
+
+        return response.meta.get('query', self.query)
+
+    def fetch(self, url, **kwargs):
+        """ Fetches an url through the crawler's downloader.
+
+        The request is downloaded by the crawler's downloader (and its
+        middlewares, such as rate limiting), so unlike blocking HTTP clients
+        the reactor (and every other spider) keeps running while waiting.
 
-        :param str url: The url to retrieve the source from
+        :param str url: The url to fetch
+        :param kwargs: Any additional named arguments for the request
+        :type kwargs: dict[str,....]
         :raises ValueError:
             - when the response status code of the request is not 200
-        :returns: The source of a given url
-        :rtype: str
+        :returns: A deferred firing with the response
+        :rtype: twisted.internet.defer.Deferred
         """
 
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            raise ValueError((
-                "error requesting source of url '{url}', "
-                "received status '{response.status_code}'"
-            ).format(**locals()))
-        return response.text
+        request = scrapy.Request(url, dont_filter=True, **kwargs)
+        engine = self.crawler.engine
+        # NOTE: scrapy < 2.14 only provides the deprecated deferred api
+        if hasattr(engine, 'download_async'):
+            downloaded = deferred_from_coro(engine.download_async(request))
+        else:
+            downloaded = engine.download(request)
+
+        def _check_status(response):
+            if response.status != 200:
+                raise ValueError((
+                    "error requesting source of url '{url}', "
+                    "received status '{response.status}'"
+                ).format(url=url, response=response))
+            return response
+
+        return downloaded.addCallback(_check_status)
+
+    async def fetch_async(self, url, **kwargs):
+        """ Fetches an url through the crawler's downloader.
+
+        :param str url: The url to fetch
+        :param kwargs: Any additional named arguments for the request
+        :type kwargs: dict[str,....]
+        :raises ValueError:
+            - when the response status code of the request is not 200
+        :returns: The response
+        :rtype: scrapy.http.Response
+        """
+
+        return await maybe_deferred_to_future(self.fetch(url, **kwargs))
 
     def get_soup(self, content, parser='lxml'):
         """ Returns a BeautifulSoup instance of some content.
@@ -151,7 +326,149 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
         :rtype: bs4.BeautifulSoup
         """
 
-        return bs4.BeautifulSoup(content, parser)
+        with self.get_timer('soup'):
+            return bs4.BeautifulSoup(content, parser)
+
+    def get_row_soup(self, row):
+        """ Returns a BeautifulSoup tag of a streamed row.
+
+        :param lxml.etree._Element row: The completed row
+        :returns: The BeautifulSoup tag of the row
+        :rtype: bs4.element.Tag
+        """
+
+        # NOTE: the lxml parser drops rows (such as ``tr``) outside of pages
+        return self.get_soup(lxml.etree.tostring(
+            row, encoding='unicode', method='html', with_tail=False
+        ), parser='html.parser').find(row.tag)
+
+    def _headers_received(self, headers, request, spider, **kwargs):
+        """ Starts the row stream of a listing request.
+
+        :param scrapy.http.Headers headers: The received headers
+        :param scrapy.Request request: The request of the headers
+        :param scrapy.Spider spider: The spider of the request
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        if spider is not self or STREAM_KEY not in request.meta:
+            return
+        # NOTE: redirected and retried requests copy the stream of their
+        # original request, so every download starts a new stream skipping
+        # the rows already handled by previous downloads
+        previous = request.meta[STREAM_KEY]
+        try:
+            request.meta[STREAM_KEY] = RowStream(
+                self._row_selector,
+                content_encoding=headers.get(b'Content-Encoding'),
+                skip=(previous.handled if previous is not None else 0)
+            )
+        except ValueError as exc:
+            self.logger.debug((
+                'not streaming rows of `{request}`, {exc}'
+            ).format(**locals()))
+            request.meta[STREAM_KEY] = None
+
+    def _bytes_received(self, data, request, spider, **kwargs):
+        """ Sends the rows completed by received bytes to the pipelines.
+
+        :param bytes data: The received bytes
+        :param scrapy.Request request: The request of the bytes
+        :param scrapy.Spider spider: The spider of the request
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        stream = request.meta.get(STREAM_KEY)
+        if spider is not self or stream is None or stream.failed:
+            return
+        try:
+            for row in stream.feed(data):
+                row_soup = self.get_row_soup(row)
+                stream.release(row)
+                with self.get_timer('parse'):
+                    torrent = self.parse_row(row_soup, request)
+                stream.handled += 1
+                if torrent is not None:
+                    self._start_itemproc(torrent)
+        except Exception:
+            # NOTE: unhandled rows are parsed from the complete response
+            stream.failed = True
+            self.logger.exception((
+                'failed streaming rows of `{request}`'
+            ).format(**locals()))
+
+    def _start_itemproc(self, item):
+        """ Sends a streamed item to the item pipelines.
+
+        Streamed items are not the output of a spider callback, so they are
+        sent through scrapy's private item processing api (see
+        ``ITEMPROC_METHODS``, streaming is disabled if it is not available)
+        without a response and skip the ``process_spider_output`` of spider
+        middlewares.
+
+        :param torvend.items.Torrent item: The streamed item
+        :rtype: None
+        """
+
+        scraper = self.crawler.engine.scraper
+        # NOTE: scrapy < 2.14 only provides the deprecated deferred api
+        if hasattr(scraper, 'start_itemproc_async'):
+            processed = deferred_from_coro(
+                scraper.start_itemproc_async(item, response=None)
+            )
+        else:
+            processed = scraper.start_itemproc(item, response=None)
+        # NOTE: keeps the items' (asyncio) tasks referenced until finished
+        self._pending.add(processed)
+        processed.addBoth(
+            lambda result: self._pending.discard(processed) or result
+        )
+
+    def parse_rows(self, response):
+        """ Parses the (remaining) listing rows of a response.
+
+        Rows already handled while streaming the response are skipped, so
+        streaming spiders can implement ``parse`` as ``parse_rows``.
+
+        :param response: The listing response
+        :type response: scrapy.http.Response
+        :returns: Yields torrent items
+        :rtype: list[items.Torrent]
+        """
+
+        stream = response.meta.get(STREAM_KEY)
+        if stream is not None and not stream.failed:
+            rows = [
+                self.get_row_soup(row)
+                for row in stream.close()
+            ]
+        else:
+            rows = self.get_soup(response.text).select(self.stream_rows)
+            if stream is not None:
+                rows = rows[stream.handled:]
+
+        for row in rows:
+            torrent = self.parse_row(row, response.request)
+            if torrent is not None:
+                yield torrent
+
+    def parse_row(self, row, request):
+        """ Parses a listing row, required for streaming spiders.
+
+        Rows are parsed while their response is still streamed, so they
+        are only given the listing request (rather than the response).
+
+        :param bs4.element.Tag row: The listing row (see ``stream_rows``)
+        :param scrapy.Request request: The listing request
+        :returns: The torrent of the row (None if the row is skipped)
+        :rtype: items.Torrent
+        """
+
+        raise NotImplementedError()
 
     def parse_infohash(self, magnet_link):
         """ Parses the infohash from a given magnet link.
@@ -180,7 +497,8 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
         # NOTE: local import to speed up module loading
         import dateparser
 
-        return dateparser.parse(text, date_formats=formats)
+        with self.get_timer('datetime'):
+            return dateparser.parse(text, date_formats=formats)
 
     def parse_size(self, text):
         """ Parses a real byte size from some given text.
@@ -193,7 +511,8 @@ class BaseSpider(scrapy.Spider, meta.Loggable, abc.ABC):
         # NOTE: local import to speed up module loading
         import humanfriendly
 
-        return humanfriendly.parse_size(text)
+        with self.get_timer('size'):
+            return humanfriendly.parse_size(text)
 
     @abc.abstractmethod
     def parse(self, request):
@@ -0,0 +1,216 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import re
+import zlib
+
+import lxml.etree
+
+# NOTE: the request meta key of the row stream of a listing request
+STREAM_KEY = 'torvend_stream'
+# NOTE: the zlib window bits of decodable content encodings
+CONTENT_ENCODINGS = {
+    b'gzip': (16 + zlib.MAX_WBITS),
+    b'x-gzip': (16 + zlib.MAX_WBITS),
+    b'deflate': zlib.MAX_WBITS,
+}
+
+
+class RowSelector(object):
+    """ A minimal selector matching rows of a partially parsed page.
+
+    Selectors are simple selectors (``tag``, ``#id``, ``.class`` or a
+    combination such as ``div.resultdiv``) separated by descendant
+    combinators, for example ``#searchResult tr``.
+    """
+
+    _simple_regex = re.compile(
+        r'^(?P<tag>[a-zA-Z][a-zA-Z0-9]*)?'
+        r'(?:#(?P<id>[\w-]+))?(?P<classes>(?:\.[\w-]+)*)$'
+    )
+
+    def __init__(self, selector):
+        """ Initializes the selector.
+
+        :param str selector: The selector of rows
+        :raises ValueError:
+            - when the selector is not supported
+        """
+
+        self.selector = selector
+        self.parts = []
+        for simple in selector.split():
+            match = self._simple_regex.match(simple)
+            if match is None:
+                raise ValueError((
+                    "unsupported row selector '{selector}'"
+                ).format(**locals()))
+            (tag, id_, classes,) = match.group('tag', 'id', 'classes')
+            self.parts.append((
+                (tag.lower() if tag else None), id_,
+                frozenset(entry for entry in classes.split('.') if entry),
+            ))
+        if len(self.parts) <= 0:
+            raise ValueError((
+                "unsupported row selector '{selector}'"
+            ).format(**locals()))
+        self.tag = self.parts[-1][0]
+
+    def __repr__(self):
+        """ Returns a string representation of the selector.
+
+        :returns: A string representation of the selector
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} "{self.selector}">'
+        ).format(**locals())
+
+    def _matches_simple(self, element, part):
+        """ Checks if an element matches a simple selector.
+
+        :param lxml.etree._Element element: The element to check
+        :param tuple part: The (tag, id, classes) of the simple selector
+        :returns: True if the element matches
+        :rtype: bool
+        """
+
+        (tag, id_, classes,) = part
+        if tag is not None and element.tag != tag:
+            return False
+        if id_ is not None and element.get('id') != id_:
+            return False
+        return classes.issubset((element.get('class') or '').split())
+
+    def matches(self, element):
+        """ Checks if an element (and its ancestors) matches the selector.
+
+        :param lxml.etree._Element element: The element to check
+        :returns: True if the element is a row
+        :rtype: bool
+        """
+
+        if not self._matches_simple(element, self.parts[-1]):
+            return False
+        remaining = self.parts[:-1]
+        for ancestor in element.iterancestors():
+            if len(remaining) <= 0:
+                break
+            if self._matches_simple(ancestor, remaining[-1]):
+                remaining = remaining[:-1]
+        return len(remaining) <= 0
+
+
+class RowStream(object):
+    """ Incrementally parses the rows of a page as its bytes are received.
+
+    Bytes are fed into lxml's :class:`~lxml.etree.HTMLPullParser` (after
+    decoding any gzip or deflate content encoding) and completed rows are
+    returned as soon as their closing tag is parsed.
+    Completed rows and the elements before them are removed from the tree,
+    so only the unfinished part of a page is kept in memory.
+    """
+
+    def __init__(self, selector, content_encoding=None, skip=0):
+        """ Initializes the row stream.
+
+        :param RowSelector selector: The selector of rows
+        :param bytes content_encoding: The content encoding of the bytes
+        :param int skip: The number of leading rows already handled (by a
+            previous download of the page)
+        :raises ValueError:
+            - when the content encoding is not supported
+        """
+
+        self.selector = selector
+        self.parser = lxml.etree.HTMLPullParser(
+            events=('end',), tag=selector.tag
+        )
+        self.decoder = None
+        if content_encoding:
+            content_encoding = content_encoding.strip().lower()
+            if content_encoding not in CONTENT_ENCODINGS:
+                raise ValueError((
+                    "unsupported content encoding '{content_encoding}'"
+                ).format(**locals()))
+            self.decoder = zlib.decompressobj(
+                CONTENT_ENCODINGS[content_encoding]
+            )
+        # NOTE: the number of rows handled by the spider and if handling
+        # rows failed (leaving the remaining rows to the complete response)
+        (self.handled, self.failed, self.closed,) = (skip, False, False,)
+        self.skip = skip
+
+    def __repr__(self):
+        """ Returns a string representation of the row stream.
+
+        :returns: A string representation of the row stream
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} {self.selector!r} '
+            'handled={self.handled}>'
+        ).format(**locals())
+
+    def _read_rows(self):
+        """ Reads the completed rows of the parser.
+
+        :returns: The completed rows
+        :rtype: list[lxml.etree._Element]
+        """
+
+        rows = [
+            element
+            for (_, element,) in self.parser.read_events()
+            if self.selector.matches(element)
+        ]
+        if self.skip > 0:
+            (skipped, rows,) = (rows[:self.skip], rows[self.skip:],)
+            self.skip -= len(skipped)
+            for row in skipped:
+                self.release(row)
+        return rows
+
+    def release(self, row):
+        """ Removes a handled row (and the elements before it) from the tree.
+
+        :param lxml.etree._Element row: The handled row
+        :rtype: None
+        """
+
+        row.clear(keep_tail=True)
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+    def feed(self, data):
+        """ Feeds received bytes to the parser.
+
+        :param bytes data: The received bytes
+        :returns: The rows completed by the bytes
+        :rtype: list[lxml.etree._Element]
+        """
+
+        if self.decoder is not None:
+            data = self.decoder.decompress(data)
+        if data:
+            self.parser.feed(data)
+        return self._read_rows()
+
+    def close(self):
+        """ Finishes parsing the page.
+
+        :returns: The rows completed by finishing the page
+        :rtype: list[lxml.etree._Element]
+        """
+
+        if self.closed:
+            return []
+        self.closed = True
+        if self.decoder is not None:
+            data = self.decoder.flush()
+            if data:
+                self.parser.feed(data)
+        self.parser.close()
+        return self._read_rows()
@@ -15,6 +15,7 @@ class IDopeSpider(BaseSpider):
     allowed_domains = [
         'idope.se',
     ]
+    stream_rows = '#div2child div.resultdiv'
 
     _category_map = {
         'music': items.TorrentCategory.Audio,
@@ -77,51 +78,63 @@ class IDopeSpider(BaseSpider):
         :rtype: list[items.Torrent]
         """
 
-        soup = self.get_soup(response.text)
-
-        for result in soup\
-                .find('div', {'id': 'div2child'})\
-                .find_all('div', {'class': 'resultdiv'}):
-            torrent = items.Torrent(spider=self.name)
-
-            torrent['name'] = result.find(
-                'div', {'class': 'resultdivtopname'}
-            ).contents[0].strip()
-
-            torrent['source'] = furl.furl(response.url).set(
-                path=result.find('a').attrs['href'],
-                args={}
-            ).url
-            torrent['categories'] = [
-                self._category_map.get(
-                    result.find(
-                        'div', {'class': 'resultdivbottoncategory'}
-                    ).contents[0].strip().lower(),
-                    items.TorrentCategory.Unknown
-                )
-            ]
-            info_hash = result.find(
-                'div', {'class': 'hideinfohash'}
-            ).contents[0].strip()
-            torrent['hash'] = info_hash.lower()
-            torrent['magnet'] = (
-                'magnet:?xt=urn:btih:{info_hash}&dn'
-            ).format(**locals())
-
-            torrent['seeders'] = int(result.find(
-                'div', {'class': 'resultdivbottonseed'}
-            ).contents[0])
-            torrent['size'] = self.parse_size(result.find(
-                'div', {'class': 'resultdivbottonlength'}
-            ).contents[0])
-            torrent['uploaded'] = self.parse_datetime((
-                '{0} ago'
-            ).format(result.find(
-                'div', {'class': 'resultdivbottontime'}
-            ).contents[0]))
-
-            # handle non-reported torrent fields
-            torrent['leechers'] = 0
-            torrent['uploader'] = None
-
-            yield torrent
+        return self.parse_rows(response)
+
+    def parse_row(self, row, request):
+        """ Parses a result row.
+
+        :param bs4.element.Tag row: The result row
+        :param scrapy.Request request: The listing request
+        :returns: The torrent of the row (None if it is filtered)
+        :rtype: items.Torrent
+        """
+
+        torrent = items.Torrent(
+            spider=self.name, query=self.get_query(request)
+        )
+
+        torrent['name'] = row.find(
+            'div', {'class': 'resultdivtopname'}
+        ).contents[0].strip()
+
+        torrent['source'] = furl.furl(request.url).set(
+            path=row.find('a').attrs['href'],
+            args={}
+        ).url
+        torrent['categories'] = [
+            self._category_map.get(
+                row.find(
+                    'div', {'class': 'resultdivbottoncategory'}
+                ).contents[0].strip().lower(),
+                items.TorrentCategory.Unknown
+            )
+        ]
+        info_hash = row.find(
+            'div', {'class': 'hideinfohash'}
+        ).contents[0].strip()
+        torrent['hash'] = info_hash.lower()
+        torrent['magnet'] = (
+            'magnet:?xt=urn:btih:{info_hash}&dn'
+        ).format(**locals())
+
+        torrent['seeders'] = int(row.find(
+            'div', {'class': 'resultdivbottonseed'}
+        ).contents[0])
+        torrent['size'] = self.parse_size(row.find(
+            'div', {'class': 'resultdivbottonlength'}
+        ).contents[0])
+        # NOTE: reject filtered torrents before parsing their dates
+        if not self.accepts(torrent):
+            return
+
+        torrent['uploaded'] = self.parse_datetime((
+            '{0} ago'
+        ).format(row.find(
+            'div', {'class': 'resultdivbottontime'}
+        ).contents[0]))
+
+        # handle non-reported torrent fields
+        torrent['leechers'] = 0
+        torrent['uploader'] = None
+
+        return torrent
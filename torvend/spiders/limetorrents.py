@@ -120,7 +120,9 @@ class LimeTorrentsSpider(BaseSpider):
             return
 
         for result in results:
-            torrent = items.Torrent(spider=self.name)
+            torrent = items.Torrent(
+                spider=self.name, query=self.get_query(response)
+            )
 
             name_link = result.find(
                 'div', {'class': 'tt-name'}
@@ -141,6 +143,10 @@ class LimeTorrentsSpider(BaseSpider):
                 'td', {'class': 'tdleech'}
             ).contents[0].strip().replace(',', ''))
 
+            # NOTE: reject filtered torrents before requesting details
+            if not self.accepts(torrent):
+                continue
+
             torrent_request = scrapy.Request(
                 torrent['source'],
                 callback=self._parse_torrent
@@ -29,6 +29,14 @@ class OneThreeThreeSevenXSpider(BaseSpider):
         'tv': items.TorrentCategory.Video,
         'other': items.TorrentCategory.Unknown,
     }
+    # NOTE: video is split over several search categories and is not mapped
+    _search_category_map = {
+        items.TorrentCategory.Audio: 'Music',
+        items.TorrentCategory.Application: 'Apps',
+        items.TorrentCategory.Game: 'Games',
+        items.TorrentCategory.Adult: 'XXX',
+        items.TorrentCategory.Unknown: 'Other',
+    }
 
     @property
     def paging_index(self):
@@ -70,6 +78,24 @@ class OneThreeThreeSevenXSpider(BaseSpider):
 
         return '/search/{query}/{page}/'
 
+    def get_query_path(self):
+        """ Gets the query path, searching a single filtered category.
+
+        :returns: The path the query needs
+        :rtype: str
+        """
+
+        if not self.torrent_filter or \
+                len(self.torrent_filter.categories) != 1:
+            return self.query_path
+
+        (category,) = self.torrent_filter.categories
+        if category not in self._search_category_map:
+            return self.query_path
+        return (
+            '/category-search/{{query}}/{search_category}/{{page}}/'
+        ).format(search_category=self._search_category_map[category])
+
     def _parse_torrent(self, response):
         """ Handle parsing torrent info.
 
@@ -122,7 +148,9 @@ class OneThreeThreeSevenXSpider(BaseSpider):
             return
 
         for result in results:
-            torrent = items.Torrent(spider=self.name)
+            torrent = items.Torrent(
+                spider=self.name, query=self.get_query(response)
+            )
 
             name_link = result\
                 .find('td', {'class': 'name'})\
@@ -148,6 +176,10 @@ class OneThreeThreeSevenXSpider(BaseSpider):
                 'td', {'class': 'coll-5'}
             ).find('a').contents[0].strip()
 
+            # NOTE: reject filtered torrents before requesting details
+            if not self.accepts(torrent):
+                continue
+
             # handle additional request
             torrent_request = scrapy.Request(
                 torrent['source'],
@@ -126,7 +126,9 @@ class RarbgSpider(BaseSpider):
             return
 
         for result in results:
-            torrent = items.Torrent(spider=self.name)
+            torrent = items.Torrent(
+                spider=self.name, query=self.get_query(response)
+            )
             (
                 category_div, name_div, uploaded_div, size_div,
                 seeders_div, leechers_div, _, uploader_div
@@ -148,6 +150,10 @@ class RarbgSpider(BaseSpider):
             torrent['leechers'] = int(leechers_div.text.strip())
             torrent['uploader'] = uploader_div.text.strip()
 
+            # NOTE: reject filtered torrents before requesting details
+            if not self.accepts(torrent):
+                continue
+
             torrent_request = scrapy.Request(
                 torrent['source'],
                 callback=self._parse_torrent
@@ -0,0 +1,190 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import importlib
+import collections
+
+# NOTE: the entry point group external spiders are registered in
+ENTRY_POINT_GROUP = 'torvend.spiders'
+# NOTE: the category filter is pushed into the spider's search url
+CATEGORIES = 'categories'
+# NOTE: the spider requests a detail page for every torrent
+DETAILS = 'details'
+# NOTE: the spider parses listing rows as their bytes are received
+STREAMING = 'streaming'
+
+
+class SpiderInfo(collections.namedtuple('SpiderInfo', (
+    'name', 'module_name', 'class_name', 'domains', 'capabilities',
+))):
+    """ The static description of a spider.
+
+    Spiders discovered from entry points are described only by their name
+    and import path (their ``domains`` and ``capabilities`` are empty).
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_entry_point(cls, entry_point):
+        """ Describes a spider registered as an entry point.
+
+        :param importlib.metadata.EntryPoint entry_point: The entry point
+            (``name = module:SpiderClass``)
+        :returns: The description of the spider (without importing it)
+        :rtype: SpiderInfo
+        """
+
+        (module_name, _, class_name,) = entry_point.value.partition(':')
+        return cls(
+            entry_point.name.strip().lower(),
+            module_name.strip(), class_name.split('[')[0].strip(),
+            (), frozenset(),
+        )
+
+    @property
+    def target(self):
+        """ The import path of the spider class.
+
+        :getter: Returns the ``module:SpiderClass`` import path
+        :setter: Does not allow setting
+        :rtype: str
+        """
+
+        return '{self.module_name}:{self.class_name}'.format(**locals())
+
+    def load(self):
+        """ Imports the spider class.
+
+        :returns: The spider class
+        :rtype: torvend.spiders._common.BaseSpider
+        """
+
+        return getattr(
+            importlib.import_module(self.module_name, package=__package__),
+            self.class_name
+        )
+
+
+# NOTE: describes the included spiders without importing spider code (and
+# with it scrapy, bs4 and requests), must be kept in sync with the spider
+# classes and is ordered by class name
+SPIDERS = (
+    SpiderInfo(
+        'idope', '.idope', 'IDopeSpider',
+        ('idope.se',), frozenset([STREAMING]),
+    ),
+    SpiderInfo(
+        'limetorrents', '.limetorrents', 'LimeTorrentsSpider',
+        ('www.limetorrents.cc',), frozenset([DETAILS]),
+    ),
+    SpiderInfo(
+        '1337x', '.onethreethreesevenx', 'OneThreeThreeSevenXSpider',
+        ('1337x.to',), frozenset([CATEGORIES, DETAILS]),
+    ),
+    # SpiderInfo(
+    #     'rarbg', '.rarbg', 'RarbgSpider',
+    #     ('rarbg.to',), frozenset([DETAILS]),
+    # ),
+    SpiderInfo(
+        'skytorrents', '.skytorrents', 'SkyTorrentsSpider',
+        ('skytorrents.in',), frozenset(),
+    ),
+    SpiderInfo(
+        'thepiratebay', '.thepiratebay', 'ThePirateBaySpider',
+        ('thepiratebay.org', 'thepiratebay.se',),
+        frozenset([CATEGORIES, STREAMING]),
+    ),
+    SpiderInfo(
+        'torlock', '.torlock', 'TorlockSpider',
+        ('torlock.com',), frozenset([DETAILS]),
+    ),
+    SpiderInfo(
+        'torrentz2', '.torrentz2', 'Torrentz2Spider',
+        ('torrentz2.eu',), frozenset(),
+    ),
+)
+
+
+# NOTE: entry points are only discovered once per process
+_entry_points = None
+
+
+def _iter_entry_points():
+    """ Iterates over the entry points of the spider group.
+
+    :returns: An iterator of the entry points
+    :rtype: iter(importlib.metadata.EntryPoint)
+    """
+
+    # NOTE: local import to speed up module loading
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return iter(entry_points.select(group=ENTRY_POINT_GROUP))
+    # NOTE: python < 3.10 returns a dictionary of entry points by group
+    return iter(entry_points.get(ENTRY_POINT_GROUP, ()))
+
+
+def get_entry_points():
+    """ Gets the spiders registered as ``torvend.spiders`` entry points.
+
+    Entry points are read from the installed distribution metadata, so no
+    spider code is imported.
+    Entry points named like an included spider and entry points without a
+    spider class are skipped.
+
+    :returns: The registry entries of the discovered spiders
+    :rtype: tuple[SpiderInfo]
+    """
+
+    global _entry_points
+    if _entry_points is None:
+        (discovered, seen,) = ([], set(
+            spider_info.name for spider_info in SPIDERS
+        ),)
+        for entry_point in _iter_entry_points():
+            spider_info = SpiderInfo.from_entry_point(entry_point)
+            if spider_info.class_name and spider_info.name not in seen:
+                discovered.append(spider_info)
+                seen.add(spider_info.name)
+        _entry_points = tuple(discovered)
+    return _entry_points
+
+
+def get_spiders(plugins=True):
+    """ Gets the registry entries of all available spiders.
+
+    :param bool plugins: False to exclude spiders discovered from entry
+        points
+    :returns: The included spiders followed by any discovered spiders
+    :rtype: tuple[SpiderInfo]
+    """
+
+    if not plugins:
+        return SPIDERS
+    return SPIDERS + get_entry_points()
+
+
+def get_spider_info(name, plugins=True):
+    """ Gets the registry entry of a spider by name.
+
+    .. note:: Entry points are only discovered if the name is not one of the
+        included spiders.
+
+    :param str name: The name of the spider (case insensitive)
+    :param bool plugins: False to exclude spiders discovered from entry
+        points
+    :returns: The registry entry (None if there is no such spider)
+    :rtype: SpiderInfo
+    """
+
+    name = name.strip().lower()
+    for spider_info in SPIDERS:
+        if spider_info.name == name:
+            return spider_info
+    if plugins:
+        for spider_info in get_entry_points():
+            if spider_info.name == name:
+                return spider_info
@@ -78,7 +78,9 @@ class SkyTorrentsSpider(BaseSpider):
             return
 
         for result in results:
-            torrent = items.Torrent(spider=self.name)
+            torrent = items.Torrent(
+                spider=self.name, query=self.get_query(response)
+            )
 
             (name_link, magnet_link,) = result.find('td').find_all('a')[:2]
             torrent['name'] = name_link.text.strip()
@@ -18,6 +18,7 @@ class ThePirateBaySpider(BaseSpider):
         'thepiratebay.org',
         'thepiratebay.se',
     ]
+    stream_rows = '#searchResult tr'
 
     _category_map = {
         '100': items.TorrentCategory.Audio,
@@ -71,6 +72,24 @@ class ThePirateBaySpider(BaseSpider):
 
         return '/search/{query}/{page}'
 
+    def get_query_path(self):
+        """ Gets the query path, searching only the filtered categories.
+
+        :returns: The path the query needs
+        :rtype: str
+        """
+
+        if not self.torrent_filter or not self.torrent_filter.categories:
+            return self.query_path
+
+        # NOTE: 99 keeps the default result ordering
+        codes = ','.join(sorted(
+            code
+            for (code, category,) in self._category_map.items()
+            if category in self.torrent_filter.categories
+        ))
+        return ('{self.query_path}/99/{codes}').format(**locals())
+
     def parse(self, response):
         """ Required first level page parser.
 
@@ -80,65 +99,75 @@ class ThePirateBaySpider(BaseSpider):
         :rtype: list[items.Torrent]
         """
 
-        soup = self.get_soup(response.text)
-        try:
-            results = soup\
-                .find('table', {'id': 'searchResult'})\
-                .find_all('tr')[1:]
-        except AttributeError:
+        return self.parse_rows(response)
+
+    def parse_row(self, row, request):
+        """ Parses a result row.
+
+        :param bs4.element.Tag row: The result row
+        :param scrapy.Request request: The listing request
+        :returns: The torrent of the row (None for the header row)
+        :rtype: items.Torrent
+        """
+
+        result_category = row.find('td', {'class': 'vertTh'})
+        if result_category is None:
+            return
+
+        torrent = items.Torrent(
+            spider=self.name, query=self.get_query(request)
+        )
+        torrent['categories'] = [
+            self._category_map.get(
+                furl.furl(category.attrs['href']).path.segments[-1],
+                items.TorrentCategory.Unknown
+            ) for category in result_category.find_all('a')
+        ]
+        torrent['magnet'] = row.find(
+            'a', {'href': re.compile('^magnet\:.*')}
+        )['href']
+        torrent['hash'] = re.match(
+            r'.*magnet:\?xt=urn:(?:btih)+:([a-zA-Z0-9]+).*',
+            torrent['magnet']
+        ).groups()[0].lower()
+        (torrent['seeders'], torrent['leechers'],) = tuple([
+            int(column.contents[0])
+            for column in row.find_all('td', {'align': 'right'})
+        ])
+
+        # NOTE: reject filtered torrents before parsing their details
+        if not self.accepts(torrent):
             return
 
-        for result in results:
-            torrent = items.Torrent(spider=self.name)
-            torrent['categories'] = [
-                self._category_map.get(
-                    furl.furl(category.attrs['href']).path.segments[-1],
-                    items.TorrentCategory.Unknown
-                ) for category in result.find(
-                    'td', {'class': 'vertTh'}
-                ).find_all('a')
+        result_links = row.find('a', {'class': 'detLink'})
+        if 'href' in result_links.attrs:
+            torrent['source'] = furl.furl(request.url).set(
+                path=result_links.attrs['href'], args={}
+            ).url
+
+        torrent['name'] = result_links.contents[0].strip()
+
+        result_desc = row.find('font', {'class': 'detDesc'})
+        (time_content, size_content,) = \
+            result_desc.contents[0].split(',')[:2]
+        torrent['uploaded'] = self.parse_datetime(
+            time_content.split(' ')[-1],
+            formats=[
+                '%m-%d %Y',
+                '%m-%d %H:%M',
+                '%H:%M',
+                'Y-day %H:%M'
             ]
-            torrent['magnet'] = result.find(
-                'a', {'href': re.compile('^magnet\:.*')}
-            )['href']
-            torrent['hash'] = re.match(
-                r'.*magnet:\?xt=urn:(?:btih)+:([a-zA-Z0-9]+).*',
-                torrent['magnet']
-            ).groups()[0].lower()
-            (torrent['seeders'], torrent['leechers'],) = tuple([
-                int(column.contents[0])
-                for column in result.find_all('td', {'align': 'right'})
-            ])
-
-            result_links = result.find('a', {'class': 'detLink'})
-            if 'href' in result_links.attrs:
-                torrent['source'] = furl.furl(response.url).set(
-                    path=result_links.attrs['href'], args={}
-                ).url
-
-            torrent['name'] = result_links.contents[0].strip()
-
-            result_desc = result.find('font', {'class': 'detDesc'})
-            (time_content, size_content,) = \
-                result_desc.contents[0].split(',')[:2]
-            torrent['uploaded'] = self.parse_datetime(
-                time_content.split(' ')[-1],
-                formats=[
-                    '%m-%d %Y',
-                    '%m-%d %H:%M',
-                    '%H:%M',
-                    'Y-day %H:%M'
-                ]
-            )
-            torrent['size'] = self.parse_size(
-                size_content.split(' ')[-1]
-            )
-
-            try:
-                torrent['uploader'] = result_desc.find(
-                    'a', {'href': re.compile('^/user/.*')}
-                ).contents[0]
-            except AttributeError:
-                pass
-
-            yield torrent
+        )
+        torrent['size'] = self.parse_size(
+            size_content.split(' ')[-1]
+        )
+
+        try:
+            torrent['uploader'] = result_desc.find(
+                'a', {'href': re.compile('^/user/.*')}
+            ).contents[0]
+        except AttributeError:
+            pass
+
+        return torrent
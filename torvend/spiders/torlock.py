@@ -126,7 +126,9 @@ class TorlockSpider(BaseSpider):
             return
 
         for result in results:
-            torrent = items.Torrent(spider=self.name)
+            torrent = items.Torrent(
+                spider=self.name, query=self.get_query(response)
+            )
             name_link = result.find('td').find('div').find('a')
 
             torrent['name'] = name_link.text.strip()
@@ -150,6 +152,10 @@ class TorlockSpider(BaseSpider):
                 'td', {'class': 'tdl'}
             ).contents[0].strip())
 
+            # NOTE: reject filtered torrents before requesting details
+            if not self.accepts(torrent):
+                continue
+
             torrent_request = scrapy.Request(
                 torrent['source'],
                 callback=self._parse_torrent
@@ -84,7 +84,9 @@ class Torrentz2Spider(BaseSpider):
             return
 
         for result in results:
-            torrent = items.Torrent(spider=self.name)
+            torrent = items.Torrent(
+                spider=self.name, query=self.get_query(response)
+            )
 
             result_links = result.find('a')
             torrent['name'] = result_links.contents[0].strip()
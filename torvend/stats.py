@@ -0,0 +1,508 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import time
+import bisect
+import contextlib
+
+from . import (meta,)
+
+# NOTE: the upper bounds in seconds of histogram buckets (0.1ms to ~13s)
+BUCKETS = tuple((0.0001 * (2 ** idx)) for idx in range(18))
+# NOTE: the stages of a search (in pipeline order)
+STAGES = (
+    'dns', 'queue', 'download', 'detail',
+    'parse', 'soup', 'datetime', 'size',
+    'merge', 'render', 'search',
+)
+# NOTE: the name stages outside of any spider are recorded for
+CLIENT = 'client'
+# NOTE: the request meta key of the time a request was scheduled
+SCHEDULED_KEY = 'torvend_scheduled'
+# NOTE: the connection counts of a spider and the crawler stats of them
+CONNECTIONS = (
+    ('new', 'pool/connections_new',),
+    ('reused', 'pool/connections_reused',),
+    ('tls_handshakes', 'pool/tls_handshakes',),
+    ('tls_sessions_offered', 'pool/tls_sessions_offered',),
+)
+# NOTE: a crawler signal sent with the ``spider`` and ``seconds`` spent
+# producing the results of every parsed response
+response_parsed = object()
+
+
+class Histogram(object):
+    """ A histogram of durations with exponential buckets.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """ Initializes the histogram.
+
+        :param buckets: The upper bounds in seconds of the buckets
+        :type buckets: tuple[float]
+        """
+
+        # NOTE: the last count is of durations above all bucket bounds
+        (self.buckets, self.counts,) = (buckets, [0] * (len(buckets) + 1),)
+        (self.count, self.total, self.minimum, self.maximum,) = \
+            (0, 0.0, None, None,)
+
+    def __repr__(self):
+        """ Returns a string representation of the histogram.
+
+        :returns: A string representation of the histogram
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} count={self.count} '
+            'total={self.total:.6f}>'
+        ).format(**locals())
+
+    @property
+    def mean(self):
+        """ The mean duration.
+
+        :getter: Returns the mean duration in seconds
+        :setter: Does not allow setting
+        :rtype: float
+        """
+
+        if self.count <= 0:
+            return 0.0
+        return (self.total / self.count)
+
+    def record(self, seconds):
+        """ Records a duration.
+
+        :param float seconds: The duration in seconds
+        :rtype: None
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+        if self.maximum is None or seconds > self.maximum:
+            self.maximum = seconds
+
+    def get_percentile(self, percentile):
+        """ Gets the (bucket bound) duration of a percentile.
+
+        :param float percentile: The percentile (between 0 and 100)
+        :returns: The upper bound of the bucket the percentile falls into
+            (never more than the maximum duration)
+        :rtype: float
+        """
+
+        if self.count <= 0:
+            return 0.0
+        rank = max(1, int(round((percentile / 100.0) * self.count)))
+        seen = 0
+        for (idx, count,) in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if idx >= len(self.buckets):
+                    return self.maximum
+                return min(self.buckets[idx], self.maximum)
+        return self.maximum
+
+    def merge(self, other):
+        """ Merges the durations of another histogram into this histogram.
+
+        :param Histogram other: The histogram to merge (of the same buckets)
+        :rtype: None
+        """
+
+        assert other.buckets == self.buckets, (
+            "cannot merge histograms of different buckets"
+        )
+        self.counts = [
+            (count + other_count)
+            for (count, other_count,) in zip(self.counts, other.counts)
+        ]
+        self.count += other.count
+        self.total += other.total
+        for (attribute, choose,) in (('minimum', min,), ('maximum', max,),):
+            values = [
+                value
+                for value in (getattr(self, attribute), getattr(
+                    other, attribute
+                ),)
+                if value is not None
+            ]
+            setattr(self, attribute, (choose(values) if values else None))
+
+    def to_dict(self):
+        """ Exports the histogram to a dictionary.
+
+        :returns: The summary and cumulative bucket counts of the histogram
+        :rtype: dict[str,....]
+        """
+
+        (buckets, seen,) = ([], 0,)
+        for (bound, count,) in zip(self.buckets + (None,), self.counts):
+            seen += count
+            buckets.append([bound, seen])
+        return {
+            'count': self.count, 'total': self.total, 'mean': self.mean,
+            'min': self.minimum, 'max': self.maximum,
+            'p50': self.get_percentile(50), 'p90': self.get_percentile(90),
+            'p99': self.get_percentile(99),
+            'buckets': buckets,
+        }
+
+
+class SearchStats(meta.Loggable):
+    """ Per-spider and per-stage timings of a search.
+
+    Stages (see ``STAGES``) are recorded by spiders (``dns``, ``soup``,
+    ``datetime`` and ``size``), by the crawler signals the stats are
+    connected to (``queue``, ``download`` and ``detail``), by the
+    :class:`~torvend.stats.TimingMiddleware` (``parse``) and by the client
+    and cli (``merge``, ``render`` and ``search`` of ``CLIENT``).
+    Nested stages (``soup``, ``datetime`` and ``size``) are included in the
+    ``parse`` stage.
+    Connection counts (see ``CONNECTIONS``) are read from the crawler stats
+    of the :class:`~torvend.pool.PooledDownloadHandler` once a spider closes.
+    """
+
+    def __init__(self):
+        """ Initializes the search stats.
+        """
+
+        (self.histograms, self.items, self.connections,) = ({}, {}, {},)
+
+    def __repr__(self):
+        """ Returns a string representation of the search stats.
+
+        :returns: A string representation of the search stats
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} spiders={self.spiders}>'
+        ).format(**locals())
+
+    def __getstate__(self):
+        """ Gets the picklable state of the search stats.
+
+        :returns: The state of the search stats (without the logger)
+        :rtype: dict[str,....]
+        """
+
+        state = self.__dict__.copy()
+        state.pop('_log', None)
+        return state
+
+    @property
+    def spiders(self):
+        """ The names of spiders with recorded stages.
+
+        :getter: Returns a sorted list of spider names
+        :setter: Does not allow setting
+        :rtype: list[str]
+        """
+
+        return sorted(set(
+            spider_name
+            for (spider_name, _,) in self.histograms
+        ) | set(self.items))
+
+    def get_histogram(self, spider_name, stage):
+        """ Gets the histogram of a spider's stage.
+
+        :param str spider_name: The name of the spider
+        :param str stage: The stage of the search
+        :returns: The histogram (None if nothing was recorded)
+        :rtype: Histogram
+        """
+
+        return self.histograms.get((spider_name, stage,))
+
+    def record(self, spider_name, stage, seconds):
+        """ Records the duration of a spider's stage.
+
+        :param str spider_name: The name of the spider
+        :param str stage: The stage of the search
+        :param float seconds: The duration in seconds
+        :rtype: None
+        """
+
+        key = (spider_name, stage,)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.record(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, spider_name, stage):
+        """ A context manager recording the duration of its block.
+
+        :param str spider_name: The name of the spider
+        :param str stage: The stage of the search
+        """
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(spider_name, stage, (time.perf_counter() - started))
+
+    def merge(self, other):
+        """ Merges the timings of other search stats into these stats.
+
+        :param SearchStats other: The search stats to merge
+        :rtype: None
+        """
+
+        for (key, histogram,) in other.histograms.items():
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets=histogram.buckets)
+            self.histograms[key].merge(histogram)
+        for (spider_name, count,) in other.items.items():
+            self.items[spider_name] = self.items.get(spider_name, 0) + count
+        for (spider_name, counts,) in other.connections.items():
+            merged = self.connections.setdefault(spider_name, {})
+            for (key, count,) in counts.items():
+                merged[key] = merged.get(key, 0) + count
+
+    def get_reuse_ratio(self, spider_name=None, tls=False):
+        """ Gets the ratio of reused connections (or offered TLS sessions).
+
+        :param str spider_name: The name of the spider (None for all spiders)
+        :param bool tls: True to get the ratio of TLS handshakes which were
+            offered a session to resume
+        :returns: The ratio (None if there were no connections)
+        :rtype: float
+        """
+
+        (reused, total,) = (0, 0,)
+        for (name, counts,) in self.connections.items():
+            if spider_name is not None and name != spider_name:
+                continue
+            if tls:
+                reused += counts.get('tls_sessions_offered', 0)
+                total += counts.get('tls_handshakes', 0)
+            else:
+                reused += counts.get('reused', 0)
+                total += (counts.get('reused', 0) + counts.get('new', 0))
+        if total <= 0:
+            return None
+        return (reused / total)
+
+    def connect(self, crawler):
+        """ Connects the stats to the signals of a crawler.
+
+        :param scrapy.crawler.Crawler crawler: The crawler to record
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import scrapy.signals
+
+        for (handler, signal,) in (
+            (self._request_scheduled, scrapy.signals.request_scheduled,),
+            (self._response_received, scrapy.signals.response_received,),
+            (self._item_scraped, scrapy.signals.item_scraped,),
+            (self._spider_closed, scrapy.signals.spider_closed,),
+        ):
+            crawler.signals.connect(handler, signal)
+
+    def _request_scheduled(self, request, **kwargs):
+        """ Stamps the time a request was scheduled.
+
+        :param scrapy.Request request: The scheduled request
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        request.meta.setdefault(SCHEDULED_KEY, time.perf_counter())
+
+    def _response_received(self, response, request, spider, **kwargs):
+        """ Records the queueing and download duration of a request.
+
+        :param scrapy.http.Response response: The received response
+        :param scrapy.Request request: The request of the response
+        :param scrapy.Spider spider: The spider of the request
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        # NOTE: scrapy measures the network latency of every download
+        download = request.meta.get('download_latency', 0.0)
+        # NOTE: requests of torrent details carry their (partial) torrent
+        self.record(spider.name, (
+            'detail' if 'torrent' in request.meta else 'download'
+        ), download)
+
+        scheduled = request.meta.get(SCHEDULED_KEY)
+        if scheduled is not None:
+            self.record(spider.name, 'queue', max(0.0, (
+                time.perf_counter() - scheduled - download
+            )))
+
+    def _item_scraped(self, item, spider, **kwargs):
+        """ Counts a scraped item.
+
+        :param torvend.items.Torrent item: The scraped item
+        :param scrapy.Spider spider: The spider of the item
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        self.items[spider.name] = self.items.get(spider.name, 0) + 1
+
+    def _spider_closed(self, spider, **kwargs):
+        """ Reads the connection counts of a closed spider.
+
+        :param scrapy.Spider spider: The closed spider
+        :param kwargs: Any additional named arguments
+        :type kwargs: dict[str,....]
+        :rtype: None
+        """
+
+        crawler_stats = spider.crawler.stats
+        counts = self.connections.setdefault(spider.name, {})
+        for (key, stat_key,) in CONNECTIONS:
+            counts[key] = counts.get(key, 0) + crawler_stats.get_value(
+                stat_key, 0
+            )
+
+    def get_report(self):
+        """ Gets the recorded histograms in pipeline order.
+
+        :returns: A list of (spider name, stage, histogram) tuples, spiders
+            sorted by name and followed by the client stages
+        :rtype: list[tuple[str,str,Histogram]]
+        """
+
+        spider_names = [
+            spider_name
+            for spider_name in self.spiders
+            if spider_name != CLIENT
+        ] + [CLIENT]
+        return [
+            (spider_name, stage, self.histograms[(spider_name, stage,)],)
+            for spider_name in spider_names
+            for stage in STAGES
+            if (spider_name, stage,) in self.histograms
+        ]
+
+    def to_dict(self):
+        """ Exports the search stats to a dictionary.
+
+        :returns: A dictionary of spider names to their items, stages and
+            connection counts
+        :rtype: dict[str,dict[str,....]]
+        """
+
+        exported = {}
+        for (spider_name, stage, histogram,) in self.get_report():
+            exported.setdefault(spider_name, {
+                'items': self.items.get(spider_name, 0), 'stages': {},
+            })['stages'][stage] = histogram.to_dict()
+        for (spider_name, counts,) in self.connections.items():
+            exported.setdefault(spider_name, {
+                'items': self.items.get(spider_name, 0), 'stages': {},
+            })['connections'] = dict(counts)
+        return exported
+
+
+class TimingMiddleware(meta.Loggable):
+    """ A spider middleware which records the duration of spider callbacks.
+
+    The stats are read from the spider's ``search_stats`` attribute and the
+    duration is also sent as the ``response_parsed`` signal of the crawler.
+    Callbacks are generators, so only the time spent producing their
+    results is recorded (not the time spent by the engine consuming them).
+    """
+
+    def __init__(self, crawler):
+        """ Initializes the middleware.
+
+        :param scrapy.crawler.Crawler crawler: The running crawler
+        """
+
+        self.crawler = crawler
+
+    def _record(self, spider, elapsed):
+        """ Records the duration of producing the results of a callback.
+
+        :param scrapy.Spider spider: The spider of the callback
+        :param float elapsed: The duration in seconds
+        :rtype: None
+        """
+
+        search_stats = getattr(spider, 'search_stats', None)
+        if search_stats is not None:
+            search_stats.record(spider.name, 'parse', elapsed)
+        self.crawler.signals.send_catch_log(
+            signal=response_parsed, spider=spider, seconds=elapsed
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """ Builds the middleware from a crawler.
+
+        :param scrapy.crawler.Crawler crawler: The running crawler
+        :returns: A new middleware instance
+        :rtype: TimingMiddleware
+        """
+
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider=None):
+        """ Records the duration of producing the results of a callback.
+
+        :param scrapy.http.Response response: The parsed response
+        :param result: The results of the spider callback
+        :type result: list[....]
+        :param scrapy.Spider spider: The spider of the response
+        :returns: Yields the results of the spider callback
+        :rtype: list[....]
+        """
+
+        (results, elapsed,) = (iter(result), 0.0,)
+        while True:
+            started = time.perf_counter()
+            try:
+                entry = next(results)
+            except StopIteration:
+                break
+            finally:
+                elapsed += (time.perf_counter() - started)
+            yield entry
+        self._record(self.crawler.spider, elapsed)
+
+    async def process_spider_output_async(
+        self, response, result, spider=None
+    ):
+        """ Records the duration of producing the results of a callback.
+
+        .. note:: Scrapy wraps (synchronous) callback results in asynchronous
+            iterators, which do not suspend while the callback produces them.
+
+        :param scrapy.http.Response response: The parsed response
+        :param result: The results of the spider callback
+        :type result: list[....]
+        :param scrapy.Spider spider: The spider of the response
+        :returns: Yields the results of the spider callback
+        :rtype: list[....]
+        """
+
+        (results, elapsed,) = (result.__aiter__(), 0.0,)
+        while True:
+            started = time.perf_counter()
+            try:
+                entry = await results.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                elapsed += (time.perf_counter() - started)
+            yield entry
+        self._record(self.crawler.spider, elapsed)
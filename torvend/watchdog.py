@@ -0,0 +1,310 @@
+# Copyright (c) 2017 Stephen Bunn (stephen@bunn.io)
+# MIT License <https://opensource.org/licenses/MIT>
+
+import sys
+import time
+import threading
+import collections
+
+from . import (meta,)
+
+# NOTE: the attribution of stalls not caused by spider callbacks
+UNKNOWN = 'unknown'
+
+# NOTE: stacks are tuples of (filename, line, name) frames (outermost first)
+Stall = collections.namedtuple('Stall', (
+    'seconds', 'spider', 'callback', 'stack',
+))
+
+
+class StallWatchdog(meta.Loggable):
+    """ Detects (and reports) stalls of the reactor thread.
+
+    A heartbeat :class:`~twisted.internet.task.LoopingCall` records when the
+    reactor last ran it, while a background thread checks the heartbeat is
+    not overdue.
+    Whenever it is, the stack of the reactor thread is sampled, so once the
+    reactor runs the heartbeat again the stall is attributed to the spider
+    (and callback) blocking the reactor for most of its samples.
+    Stalls are logged with their blocking stack and recorded in the
+    ``torvend_reactor_stall_seconds`` histogram of the watchdog's metrics.
+    """
+
+    def __init__(
+        self, threshold=0.25, interval=0.05, metrics=None, stack_limit=8,
+        maxlen=100
+    ):
+        """ Initializes the watchdog.
+
+        :param float threshold: The seconds the heartbeat must be overdue
+            by to be reported as a stall
+        :param float interval: The seconds between heartbeats
+        :param metrics: The registry to record stalls in
+        :type metrics: torvend.metrics.MetricsRegistry
+        :param int stack_limit: The number of frames of recorded stacks
+        :param int maxlen: The number of most recent stalls to keep
+        """
+
+        (self.threshold, self.interval, self.metrics, self.stack_limit,) = \
+            (threshold, interval, metrics, stack_limit,)
+        self.stalls = collections.deque(maxlen=maxlen)
+        # NOTE: the identifier of the reactor thread (None if stopped)
+        (self.reactor_thread, self._last_beat, self._samples,) = \
+            (None, None, [],)
+        (self._heartbeat, self._thread, self._stopped,) = (None, None, None,)
+        # NOTE: the names of the spiders (code objects of) methods belong to
+        self._spider_codes = {}
+
+    def __repr__(self):
+        """ Returns a string representation of the watchdog.
+
+        :returns: A string representation of the watchdog
+        :rtype: str
+        """
+
+        return (
+            '<{self.__class__.__name__} threshold={self.threshold} '
+            'running={self.running} stalls={stalls}>'
+        ).format(stalls=len(self.stalls), **locals())
+
+    def __getstate__(self):
+        """ Gets the picklable state of the watchdog.
+
+        :returns: The state of the watchdog (without the logger, the
+            heartbeat, the monitoring thread and the spider methods)
+        :rtype: dict[str,....]
+        """
+
+        state = self.__dict__.copy()
+        state.pop('_log', None)
+        state.update(
+            reactor_thread=None, _last_beat=None, _samples=[],
+            _heartbeat=None, _thread=None, _stopped=None, _spider_codes={}
+        )
+        return state
+
+    @property
+    def running(self):
+        """ Indicates if the watchdog monitors the reactor.
+
+        :getter: Returns True if the watchdog monitors the reactor
+        :setter: Does not allow setting
+        :rtype: bool
+        """
+
+        return self.reactor_thread is not None
+
+    def start(self, metrics=None):
+        """ Starts monitoring the reactor (must be called by the reactor).
+
+        :param metrics: The registry to record stalls in (default: the
+            watchdog's metrics)
+        :type metrics: torvend.metrics.MetricsRegistry
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading (installs reactor)
+        import twisted.internet.task
+        import twisted.internet.reactor
+
+        if self.running:
+            return
+        if metrics is not None:
+            self.metrics = metrics
+        (self.reactor_thread, self._last_beat, self._samples,) = \
+            (threading.get_ident(), time.monotonic(), [],)
+        self._heartbeat = twisted.internet.task.LoopingCall(self._beat)
+        self._heartbeat.start(self.interval, now=False)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stopped,),
+            name='torvend-watchdog', daemon=True
+        )
+        self._thread.start()
+        twisted.internet.reactor.addSystemEventTrigger(
+            'before', 'shutdown', self.stop
+        )
+
+    def stop(self):
+        """ Stops monitoring the reactor.
+
+        :rtype: None
+        """
+
+        if not self.running:
+            return
+        if self._heartbeat.running:
+            self._heartbeat.stop()
+        self._stopped.set()
+        self._thread.join()
+        (
+            self.reactor_thread, self._heartbeat, self._thread,
+            self._stopped,
+        ) = (None, None, None, None,)
+
+    def get_overdue(self):
+        """ Gets the seconds the heartbeat is currently overdue by.
+
+        :returns: The seconds the heartbeat is overdue by (negative if not
+            yet due)
+        :rtype: float
+        """
+
+        return (time.monotonic() - self._last_beat - self.interval)
+
+    def _run(self, stopped):
+        """ Samples the reactor thread whenever its heartbeat is overdue.
+
+        :param threading.Event stopped: The event stopping the monitoring
+        :rtype: None
+        """
+
+        # NOTE: overdue heartbeats are sampled before they are stalls, so
+        # stalls barely above the threshold still have a stack
+        poll = min(self.interval, (self.threshold / 4.0))
+        while not stopped.wait(poll):
+            if self.get_overdue() > (self.threshold / 2.0):
+                self.sample()
+
+    def sample(self):
+        """ Samples the current stack of the reactor thread once.
+
+        :rtype: None
+        """
+
+        frame = sys._current_frames().get(self.reactor_thread)
+        if frame is not None:
+            self._samples.append(self.attribute(frame))
+
+    def _build_spider_codes(self):
+        """ Builds the names of the spiders methods belong to.
+
+        :returns: The names of the spiders by the code objects of their
+            methods (methods of base classes without a name belong to all
+            of their spiders)
+        :rtype: dict[types.CodeType,frozenset[str]]
+        """
+
+        # NOTE: local import to speed up module loading
+        import scrapy
+
+        (spider_codes, spider_classes, seen,) = \
+            (collections.defaultdict(set), [scrapy.Spider], set(),)
+        while len(spider_classes) > 0:
+            spider_class = spider_classes.pop()
+            if spider_class in seen:
+                continue
+            seen.add(spider_class)
+            spider_classes.extend(spider_class.__subclasses__())
+            if not isinstance(getattr(spider_class, 'name', None), str):
+                continue
+            for base_class in spider_class.__mro__:
+                # NOTE: methods of named base classes belong to that spider
+                if base_class is not spider_class and \
+                        isinstance(vars(base_class).get('name'), str):
+                    continue
+                for value in vars(base_class).values():
+                    # NOTE: class and static methods wrap their function
+                    code = getattr(
+                        getattr(value, '__func__', value), '__code__', None
+                    )
+                    if code is not None:
+                        spider_codes[code].add(spider_class.name)
+        return {
+            code: frozenset(names)
+            for (code, names,) in spider_codes.items()
+        }
+
+    def get_spiders(self, code):
+        """ Gets the names of the spiders a code object is a method of.
+
+        :param types.CodeType code: The code object
+        :returns: The names of the spiders (empty if not a spider method)
+        :rtype: frozenset[str]
+        """
+
+        spiders = self._spider_codes.get(code)
+        if spiders is None:
+            # NOTE: spiders may be defined after the methods were built
+            self._spider_codes.update(self._build_spider_codes())
+            spiders = self._spider_codes.setdefault(code, frozenset())
+        return spiders
+
+    def attribute(self, frame):
+        """ Attributes a stack to the spider callback it was called from.
+
+        The callback is the outermost method of a spider in the stack, so
+        helpers called by callbacks are attributed to their callback.
+        The spider is the one the outermost method of a single spider
+        belongs to (as methods of base classes may belong to many spiders).
+        Stacks are attributed by their code objects only, so the locals of
+        the (running) frames of other threads are never read.
+
+        :param frame: The innermost frame of the stack
+        :type frame: types.FrameType
+        :returns: The spider name, callback name and stack of the frame
+        :rtype: tuple[str,str,tuple]
+        """
+
+        (spider, callback, stack,) = (UNKNOWN, UNKNOWN, [],)
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, frame.f_lineno, code.co_name,))
+            spiders = self.get_spiders(code)
+            if len(spiders) > 0:
+                callback = code.co_name
+            if len(spiders) == 1:
+                (spider,) = spiders
+            frame = frame.f_back
+        stack.reverse()
+        return (spider, callback, tuple(stack[-self.stack_limit:]),)
+
+    def _beat(self):
+        """ Records the stall ending with an overdue heartbeat.
+
+        :rtype: None
+        """
+
+        (overdue, samples,) = (self.get_overdue(), self._samples,)
+        (self._last_beat, self._samples,) = (time.monotonic(), [],)
+        if overdue <= self.threshold:
+            return
+
+        (spider, callback, stack,) = (UNKNOWN, UNKNOWN, (),)
+        if len(samples) > 0:
+            ((spider, callback,), _,) = collections.Counter(
+                sample[:2] for sample in samples
+            ).most_common(1)[0]
+            stack = [
+                sample[-1]
+                for sample in samples
+                if sample[:2] == (spider, callback,)
+            ][-1]
+        self.record(Stall(overdue, spider, callback, stack))
+
+    def record(self, stall):
+        """ Records (and logs) a stall.
+
+        :param Stall stall: The stall to record
+        :rtype: None
+        """
+
+        # NOTE: local import to speed up module loading
+        import traceback
+
+        self.stalls.append(stall)
+        if self.metrics is not None:
+            self.metrics.observe(
+                'torvend_reactor_stall_seconds', stall.seconds,
+                spider=stall.spider, callback=stall.callback
+            )
+        formatted = ''.join(traceback.format_list(
+            traceback.StackSummary.from_list([
+                (filename, line, name, None,)
+                for (filename, line, name,) in stall.stack
+            ])
+        ))
+        self.log.warning((
+            'reactor stalled for {stall.seconds:.3f}s in callback '
+            '`{stall.callback}` of spider `{stall.spider}`\n{formatted}'
+        ).format(**locals()))